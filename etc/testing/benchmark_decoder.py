@@ -0,0 +1,67 @@
+import sys
+import json
+import asyncio
+from time import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent.parent))
+
+from g4f.requests.decoder import iter_sse, get_delta_content
+
+CHUNKS = 20000
+FRAME = b'data: {"id":"chatcmpl-1","object":"chat.completion.chunk","created":1,"model":"gpt-4o","choices":[{"index":0,"delta":{"content":"Hello"},"finish_reason":null}]}\n\n'
+
+class ResponseMock:
+    """Replays the body in network sized chunks, that split the frames."""
+    def __init__(self, body: bytes, chunk_size: int = 1400) -> None:
+        self.body = body
+        self.chunk_size = chunk_size
+
+    async def iter_content(self):
+        for start in range(0, len(self.body), self.chunk_size):
+            yield self.body[start:start + self.chunk_size]
+
+    async def iter_lines(self):
+        buffer = b""
+        async for chunk in self.iter_content():
+            buffer += chunk
+            *lines, buffer = buffer.split(b"\n")
+            for line in lines:
+                yield line
+        if buffer:
+            yield buffer
+
+async def current_loop(response: ResponseMock) -> int:
+    count = 0
+    async for line in response.iter_lines():
+        if line.startswith(b"data: "):
+            chunk = line[6:]
+            if chunk == b"[DONE]":
+                break
+            data = json.loads(chunk)
+            if data["choices"][0]["delta"].get("content"):
+                count += 1
+    return count
+
+async def decoder_loop(response: ResponseMock) -> int:
+    count = 0
+    async for event in iter_sse(response):
+        if event.data == b"[DONE]":
+            break
+        delta = get_delta_content(event.data)
+        if delta is None:
+            delta = event.json()["choices"][0]["delta"].get("content")
+        if delta:
+            count += 1
+    return count
+
+async def main():
+    body = FRAME * CHUNKS + b"data: [DONE]\n\n"
+    for name, method in (("iter_lines + json.loads", current_loop), ("iter_sse + get_delta_content", decoder_loop)):
+        start = time()
+        count = await method(ResponseMock(body))
+        secs = time() - start
+        print(f"{name}: {count} chunks in {round(secs, 3)} secs, {round(len(body) / secs / 1024 / 1024, 1)} MB/s")
+
+if __name__ == "__main__":
+    asyncio.run(main())
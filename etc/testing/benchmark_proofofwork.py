@@ -0,0 +1,56 @@
+import os
+import sys
+import json
+import base64
+import hashlib
+from time import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent.parent))
+
+from g4f.Provider.openai.pow_solver import PowSolver, search, split_proof_token
+
+SOLVES = 20
+DIFFICULTY = "0003ff"
+PROOF_TOKEN = [
+    8020, "Mon, 06 Jan 2025 12:00:00 GMT", None, 0,
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/131.0.0.0 Safari/537.36",
+    "https://tcr9i.chat.openai.com/v2/35536E1E-65B4-4D96-9D97-6ADB7EFF8147/api.js",
+    "dpl=1440a687921de39ff5ee56b92807faaadce73f13", "en", "en-US", None,
+    "plugins−[object PluginArray]", "_reactListeningcfilawjnerp", "alert"
+]
+
+def current_loop(seed: str, difficulty: str, proof_token: list) -> str:
+    diff_len = len(difficulty)
+    for i in range(100000):
+        proof_token[3] = i
+        json_data = json.dumps(proof_token)
+        base = base64.b64encode(json_data.encode()).decode()
+        hash_value = hashlib.sha3_512((seed + base).encode()).digest()
+        if hash_value.hex()[:diff_len] <= difficulty:
+            return base
+
+def split_search(seed: str, difficulty: str, proof_token: list) -> str:
+    return search(split_proof_token(proof_token), seed.encode(), difficulty, True, 0, 100000).decode()
+
+def main():
+    seeds = [f"0.{index}" for index in range(SOLVES)]
+    pool_solver = PowSolver()
+    pool_solver.processes = min(4, os.cpu_count() or 1)
+    # Start the processes before the measurement
+    pool_solver.solve(split_proof_token(PROOF_TOKEN), "warmup", "ff", 10)
+    methods = (
+        ("json.dumps loop", current_loop),
+        ("split search", split_search),
+        (f"process pool ({pool_solver.processes} processes)", lambda seed, difficulty, token: pool_solver.solve(split_proof_token(token), seed, difficulty, 100000)),
+    )
+    for name, method in methods:
+        start = time()
+        for seed in seeds:
+            assert method(seed, DIFFICULTY, list(PROOF_TOKEN)) is not None
+        secs = time() - start
+        print(f"{name}: {SOLVES} solves in {round(secs, 3)} secs, {round(SOLVES / secs, 1)} solves/sec")
+    pool_solver.shutdown()
+
+if __name__ == "__main__":
+    main()
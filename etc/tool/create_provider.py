@@ -127,8 +127,9 @@ And replace "gpt-3.5-turbo" with `model`.
         with open(provider_path, "w") as file:
             file.write(code)
         print("Saved at:", provider_path)
-        with open("g4f/Provider/__init__.py", "a") as file:
-            file.write(f"\nfrom .{name} import {name}")
+        from provider_manifest import create_manifest, write_manifest
+        write_manifest(create_manifest())
+        print("Updated the provider manifest")
 else:
     with open(provider_path, "r") as file:
         code = file.read()
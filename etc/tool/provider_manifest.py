@@ -0,0 +1,89 @@
+"""
+Generates g4f/Provider/manifest.py, the static registry of all providers.
+
+The manifest lets `g4f.Provider` resolve provider names and capabilities
+without importing every provider module. Run it after adding, renaming
+or moving a provider:
+
+    python -m etc.tool.provider_manifest
+"""
+from __future__ import annotations
+
+import pkgutil
+import importlib
+from pathlib import Path
+
+import g4f.Provider
+from g4f.providers.types import BaseProvider, ProviderType
+
+MANIFEST_FILE = Path(g4f.Provider.__file__).parent / "manifest.py"
+
+# Packages in the order of precedence, later names override earlier ones.
+# None exports all public names of the package.
+PACKAGES = [
+    ("deprecated", None),
+    ("needs_auth", None),
+    ("not_working", None),
+    ("local", None),
+    ("hf", ["HuggingFace", "HuggingChat", "HuggingFaceAPI", "HuggingFaceInference"]),
+    ("hf_space", ["HuggingSpace"]),
+    ("mini_max", ["HailuoAI", "MiniMax"]),
+    ("template", ["OpenaiTemplate", "BackendApi"]),
+]
+SKIP_MODULES = ["base_provider", "helper", "manifest"]
+BASE_CLASSES = [
+    "BaseProvider", "RetryProvider", "IterListProvider",
+    "AsyncProvider", "AsyncGeneratorProvider", "CreateImagesProvider"
+]
+
+def load_providers() -> list[ProviderType]:
+    """Imports all provider modules and returns the providers in registry order."""
+    namespace = {name: getattr(g4f.Provider, name) for name in BASE_CLASSES}
+    for package, names in PACKAGES:
+        module = importlib.import_module(f"g4f.Provider.{package}")
+        if names is None:
+            names = getattr(module, "__all__", [name for name in dir(module) if not name.startswith("_")])
+        for name in names:
+            namespace[name] = getattr(module, name)
+    for module_info in pkgutil.iter_modules(g4f.Provider.__path__):
+        if module_info.ispkg or module_info.name in SKIP_MODULES:
+            continue
+        module = importlib.import_module(f"g4f.Provider.{module_info.name}")
+        if hasattr(module, module_info.name):
+            namespace[module_info.name] = getattr(module, module_info.name)
+    providers = [
+        namespace[name] for name in sorted(namespace)
+        if isinstance(namespace[name], type) and issubclass(namespace[name], BaseProvider)
+    ]
+    return providers + namespace["HuggingSpace"].providers
+
+def create_manifest() -> dict[str, dict]:
+    return {
+        provider.__name__: {
+            "module": provider.__module__,
+            "label": getattr(provider, "label", None),
+            "parent": getattr(provider, "parent", None),
+            "working": provider.working,
+            "needs_auth": provider.needs_auth,
+            "supports_stream": provider.supports_stream,
+            "image": hasattr(provider, "image_models"),
+        } for provider in load_providers()
+    }
+
+def write_manifest(manifest: dict[str, dict]) -> None:
+    lines = [
+        "# This file is generated by etc/tool/provider_manifest.py. Do not edit.",
+        "",
+        "from __future__ import annotations",
+        "",
+        "providers: dict[str, dict] = {",
+        *[f"    {name!r}: {entry!r}," for name, entry in manifest.items()],
+        "}",
+        ""
+    ]
+    MANIFEST_FILE.write_text("\n".join(lines))
+
+if __name__ == "__main__":
+    manifest = create_manifest()
+    write_manifest(manifest)
+    print(f"Wrote {len(manifest)} providers to {MANIFEST_FILE}")
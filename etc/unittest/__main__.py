@@ -10,5 +10,17 @@ from .include import *
 from .retry_provider import *
 from .web_search import *
 from .models import *
+from .capabilities import *
+from .model_catalog import *
+from .decoder import *
+from .session_pool import *
+from .response_cache import *
+from .image_store import *
+from .upload_cache import *
+from .har_index import *
+from .pow_solver import *
+from .browser_pool import *
+from .token_pool import *
+from .credential_pool import *
 
 unittest.main()
\ No newline at end of file
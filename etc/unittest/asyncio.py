@@ -9,19 +9,18 @@ import unittest
 import g4f
 from g4f import ChatCompletion
 from g4f.client import Client
+from g4f.providers.asyncio import Runtime, runtime, to_sync_generator
 from .mocks import ProviderMock, AsyncProviderMock, AsyncGeneratorProviderMock
 
 DEFAULT_MESSAGES = [{'role': 'user', 'content': 'Hello'}]
 
 class TestChatCompletion(unittest.TestCase):
 
-    async def run_exception(self):
+    async def run_create(self):
         return ChatCompletion.create(g4f.models.default, DEFAULT_MESSAGES, AsyncProviderMock)
 
-    def test_exception(self):
-        if has_nest_asyncio:
-            self.skipTest('has nest_asyncio')
-        self.assertRaises(g4f.errors.NestAsyncioError, asyncio.run, self.run_exception())
+    def test_create_in_running_loop(self):
+        self.assertEqual("Mock", asyncio.run(self.run_create()))
 
     def test_create(self):
         result = ChatCompletion.create(g4f.models.default, DEFAULT_MESSAGES, AsyncProviderMock)
@@ -36,6 +35,73 @@ class TestChatCompletion(unittest.TestCase):
         response = client.chat.completions.create(DEFAULT_MESSAGES, "", max_tokens=0)
         self.assertEqual("Mock", response.choices[0].message.content)
 
+class TestChatCompletionWithoutRuntime(unittest.TestCase):
+
+    def setUp(self):
+        if not has_nest_asyncio:
+            self.skipTest('"nest_asyncio" not installed')
+        runtime.enabled = False
+
+    def tearDown(self):
+        runtime.enabled = True
+
+    async def run_create(self):
+        return ChatCompletion.create(g4f.models.default, DEFAULT_MESSAGES, AsyncProviderMock)
+
+    def test_create_in_running_loop(self):
+        self.assertEqual("Mock", asyncio.run(self.run_create()))
+
+class TestRuntime(unittest.TestCase):
+
+    def setUp(self):
+        self.runtime = Runtime()
+        self.runtime.queue_size = 2
+
+    def tearDown(self):
+        self.runtime.shutdown()
+
+    def test_iter(self):
+        async def generator():
+            for i in range(5):
+                yield i
+        self.assertEqual(list(self.runtime.iter(generator())), [0, 1, 2, 3, 4])
+
+    def test_backpressure_and_close(self):
+        produced = []
+        closed = []
+        async def generator():
+            try:
+                for i in range(100):
+                    produced.append(i)
+                    yield i
+            finally:
+                closed.append(True)
+        iterator = self.runtime.iter(generator())
+        self.assertEqual(next(iterator), 0)
+        self.runtime.run(asyncio.sleep(0.05))
+        self.assertLessEqual(len(produced), self.runtime.queue_size + 2)
+        iterator.close()
+        self.runtime.run(asyncio.sleep(0.05))
+        self.assertEqual(closed, [True])
+
+    def test_exception(self):
+        async def generator():
+            yield 1
+            raise ValueError()
+        self.assertRaises(ValueError, list, self.runtime.iter(generator()))
+
+    def test_reuse_loop(self):
+        async def get_loop():
+            return asyncio.get_running_loop()
+        self.assertIs(self.runtime.run(get_loop()), self.runtime.run(get_loop()))
+
+    def test_fallback_in_runtime_thread(self):
+        async def generator():
+            yield "Mock"
+        async def nested():
+            return list(to_sync_generator(generator()))
+        self.assertEqual(runtime.run(nested()), ["Mock"])
+
 class TestChatCompletionAsync(unittest.IsolatedAsyncioTestCase):
 
     async def test_base(self):
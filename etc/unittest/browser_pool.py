@@ -0,0 +1,165 @@
+from __future__ import annotations
+
+import asyncio
+import unittest
+
+from g4f.requests.browser_pool import BrowserPool
+
+class MockTab:
+    def __init__(self, browser: MockBrowser, url: str):
+        self.browser = browser
+        self.url = url
+        self.closed = False
+
+    async def get(self, url: str):
+        self.url = url
+        return self
+
+    async def close(self):
+        self.closed = True
+
+class MockBrowser:
+    def __init__(self, user_data_dir: str, proxy: str = None):
+        self.user_data_dir = user_data_dir
+        self.proxy = proxy
+        self.stopped = False
+        self.healthy = True
+        self.main_tab = MockTab(self, "about:blank")
+        self.tabs = []
+
+    async def get(self, url: str, new_tab: bool = False):
+        if not new_tab:
+            return await self.main_tab.get(url)
+        tab = MockTab(self, url)
+        self.tabs.append(tab)
+        return tab
+
+    def stop(self):
+        self.stopped = True
+
+class MockBrowserPool(BrowserPool):
+    def __init__(self):
+        super().__init__()
+        self.started = []
+        self.fail = False
+
+    async def start_browser(self, user_data_dir: str, proxy: str = None, **kwargs):
+        await asyncio.sleep(0.01)
+        if self.fail:
+            raise RuntimeError("Browser not found")
+        browser = MockBrowser(user_data_dir, proxy)
+        self.started.append(browser)
+        return browser
+
+    async def check_browser(self, browser: MockBrowser) -> bool:
+        if browser.healthy is None:
+            await asyncio.sleep(1)
+        return browser.healthy
+
+class TestBrowserPool(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.pool = MockBrowserPool()
+
+    def tearDown(self):
+        self.pool.close()
+
+    async def test_reuse_browser(self):
+        async with self.pool.lease("provider") as first:
+            tab = await first.get("https://example.com")
+        async with self.pool.lease("provider"):
+            pass
+        self.assertEqual(len(self.pool.started), 1)
+        self.assertEqual(tab.url, "https://example.com")
+        self.assertTrue(tab.closed)
+        self.assertFalse(self.pool.started[0].stopped)
+
+    async def test_profiles(self):
+        async with self.pool.lease("provider") as lease:
+            async with self.pool.lease("other", proxy="http://proxy") as other:
+                self.assertIsNot(lease.browser, other.browser)
+                self.assertEqual(other.browser.proxy, "http://proxy")
+        self.assertEqual(len(self.pool), 2)
+
+    async def test_concurrent_start(self):
+        async def get_browser():
+            async with self.pool.lease("provider") as lease:
+                await lease.get("https://example.com")
+                await asyncio.sleep(0.01)
+                return lease.browser
+        browsers = await asyncio.gather(*[get_browser() for _ in range(3)])
+        self.assertEqual(len(self.pool.started), 1)
+        self.assertIs(browsers[0], browsers[2])
+        self.assertEqual(len(browsers[0].tabs), 3)
+
+    async def test_exclusive(self):
+        order = []
+        async def exclusive():
+            async with self.pool.lease("provider", exclusive=True) as lease:
+                order.append("exclusive")
+                tab = await lease.get("https://example.com")
+                self.assertIs(tab, lease.browser.main_tab)
+        async with self.pool.lease("provider"):
+            task = asyncio.create_task(exclusive())
+            await asyncio.sleep(0.05)
+            order.append("shared")
+        await task
+        self.assertEqual(order, ["shared", "exclusive"])
+        self.assertFalse(self.pool.started[0].main_tab.closed)
+
+    async def test_max_browsers(self):
+        self.pool.max_browsers = 1
+        async with self.pool.lease("provider"):
+            with self.assertRaises(asyncio.TimeoutError):
+                async with self.pool.lease("other", timeout=0.05):
+                    pass
+        async with self.pool.lease("other") as lease:
+            self.assertEqual(lease.browser.user_data_dir, "other")
+        self.assertTrue(self.pool.started[0].stopped)
+        self.assertEqual(len(self.pool), 1)
+
+    async def test_recycle(self):
+        self.pool.max_uses = 2
+        for _ in range(3):
+            async with self.pool.lease("provider"):
+                pass
+        self.assertEqual(len(self.pool.started), 2)
+        self.assertTrue(self.pool.started[0].stopped)
+
+    async def test_health_check(self):
+        self.pool.check_interval = 0
+        async with self.pool.lease("provider"):
+            pass
+        self.pool.started[0].healthy = False
+        async with self.pool.lease("provider") as lease:
+            self.assertIs(lease.browser, self.pool.started[1])
+        self.assertTrue(self.pool.started[0].stopped)
+
+    async def test_failed_start(self):
+        self.pool.fail = True
+        with self.assertRaises(RuntimeError):
+            async with self.pool.lease("provider"):
+                pass
+        self.assertEqual(len(self.pool), 0)
+        self.pool.fail = False
+        async with self.pool.lease("provider") as lease:
+            self.assertFalse(lease.browser.stopped)
+
+    async def test_idle_timeout(self):
+        self.pool.idle_timeout = 0.05
+        async with self.pool.lease("provider"):
+            pass
+        await asyncio.sleep(0.1)
+        self.assertTrue(self.pool.started[0].stopped)
+        self.assertEqual(len(self.pool), 0)
+
+    async def test_cancelled_health_check(self):
+        self.pool.check_interval = 0
+        async with self.pool.lease("provider"):
+            pass
+        self.pool.started[0].healthy = None
+        with self.assertRaises(asyncio.TimeoutError):
+            async with self.pool.lease("provider", timeout=0.05):
+                pass
+        pooled = next(iter(self.pool.browsers.values()))
+        self.assertEqual(pooled.leases, 0)
@@ -0,0 +1,59 @@
+import unittest
+
+from g4f.models import Model, ModelUtils
+from g4f.providers.retry_provider import IterListProvider
+from g4f.capabilities import CapabilityIndex, Capability
+from g4f.client.service import get_model_and_provider
+from .mocks import ProviderMock, YieldProviderMock
+
+test_model = Model(
+    name          = "test/capabilities",
+    base_provider = "",
+    best_provider = IterListProvider([ProviderMock, YieldProviderMock])
+)
+
+class TestCapabilityIndex(unittest.TestCase):
+
+    def setUp(self):
+        ModelUtils.convert[test_model.name] = test_model
+        self.index = CapabilityIndex()
+
+    def tearDown(self):
+        ModelUtils.convert.pop(test_model.name, None)
+        YieldProviderMock.working = True
+
+    def test_model_providers(self):
+        self.assertEqual(self.index.get_providers(test_model.name), [ProviderMock, YieldProviderMock])
+        self.assertIn(test_model.name, self.index.get_models(ProviderMock.__name__))
+
+    def test_capability_flags(self):
+        self.assertTrue(self.index.get_flags(YieldProviderMock.__name__) & Capability.STREAM)
+        self.assertFalse(self.index.get_flags(YieldProviderMock.__name__) & Capability.AUTH)
+        self.assertEqual(self.index.get_providers(test_model.name, Capability.STREAM), [YieldProviderMock])
+
+    def test_invalidate_on_working(self):
+        self.index.get_providers(test_model.name)
+        version = self.index.version
+        YieldProviderMock.working = False
+        self.assertEqual(self.index.get_providers(test_model.name), [ProviderMock])
+        self.assertGreater(self.index.version, version)
+
+    def test_cached_response(self):
+        content, etag = self.index.get_response("test", lambda: {"models": [test_model.name]})
+        self.assertEqual(self.index.get_response("test", lambda: {}), (content, etag))
+        YieldProviderMock.working = False
+        self.assertNotEqual(self.index.get_response("test", lambda: {})[1], etag)
+
+    def test_shared_best_provider(self):
+        providers = test_model.best_provider.providers
+        YieldProviderMock.working = False
+        model, provider = get_model_and_provider(test_model, None, False)
+        self.assertEqual(provider.providers, [ProviderMock])
+        self.assertIsNot(provider, test_model.best_provider)
+        self.assertIs(test_model.best_provider.providers, providers)
+        self.assertEqual(providers, [ProviderMock, YieldProviderMock])
+
+    def test_ignore_working(self):
+        YieldProviderMock.working = False
+        model, provider = get_model_and_provider(test_model, None, False, ignore_working=True)
+        self.assertEqual(provider.providers, [ProviderMock, YieldProviderMock])
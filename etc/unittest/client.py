@@ -1,12 +1,18 @@
 from __future__ import annotations
 
+import json
+import asyncio
 import unittest
 
-from g4f.errors import ModelNotFoundError
+from g4f.errors import ModelNotFoundError, TimeoutError
 from g4f.client import Client, AsyncClient, ChatCompletion, ChatCompletionChunk, get_model_and_provider
+from g4f.client.helper import StopMatcher
+from g4f.client.stubs import ChunkEncoder
+from g4f.client.single_flight import single_flight
+from g4f.providers.retry_provider import iter_with_watchdog
 from g4f.Provider.Copilot import Copilot
 from g4f.models import gpt_4o
-from .mocks import AsyncGeneratorProviderMock, ModelProviderMock, YieldProviderMock
+from .mocks import AsyncGeneratorProviderMock, ModelProviderMock, YieldProviderMock, CountingProviderMock
 
 DEFAULT_MESSAGES = [{'role': 'user', 'content': 'Hello'}]
 
@@ -60,6 +66,119 @@ class AsyncTestPassModel(unittest.IsolatedAsyncioTestCase):
         self.assertIsInstance(response, ChatCompletion)
         self.assertEqual("How are you?", response.choices[0].message.content)
 
+class TestSingleFlight(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        single_flight.enabled = True
+        single_flight.hits = single_flight.misses = single_flight.skipped = 0
+        CountingProviderMock.calls = 0
+        self.client = AsyncClient(provider=CountingProviderMock)
+
+    def tearDown(self):
+        single_flight.enabled = False
+        single_flight.force = False
+
+    async def collect(self, **kwargs) -> str:
+        content = ""
+        async for chunk in self.client.chat.completions.create(DEFAULT_MESSAGES, "", stream=True, **{"temperature": 0, **kwargs}):
+            content += chunk.choices[0].delta.content or ""
+        return content
+
+    async def test_coalesce(self):
+        responses = await asyncio.gather(*[self.client.chat.completions.create(DEFAULT_MESSAGES, "", temperature=0) for _ in range(3)])
+        self.assertEqual(CountingProviderMock.calls, 1)
+        self.assertEqual(single_flight.hits, 2)
+        for response in responses:
+            self.assertEqual("How are you?", response.choices[0].message.content)
+
+    async def test_stream_fan_out(self):
+        self.assertEqual(await asyncio.gather(self.collect(), self.collect()), ["How are you?", "How are you?"])
+        self.assertEqual(CountingProviderMock.calls, 1)
+        self.assertEqual(len(single_flight.flights), 0)
+
+    async def test_client_api_keys(self):
+        other_client = AsyncClient(provider=CountingProviderMock, api_key="other")
+        async def collect(client: AsyncClient) -> str:
+            response = await client.chat.completions.create(DEFAULT_MESSAGES, "", temperature=0)
+            return response.choices[0].message.content
+        # The api key of the client is part of the key, like an api key of the request
+        await asyncio.gather(collect(self.client), collect(other_client))
+        self.assertEqual(CountingProviderMock.calls, 2)
+
+    async def test_skip_temperature(self):
+        await asyncio.gather(self.collect(temperature=0.5), self.collect(temperature=None))
+        self.assertEqual(CountingProviderMock.calls, 2)
+        self.assertEqual(single_flight.skipped, 2)
+        single_flight.force = True
+        await asyncio.gather(self.collect(temperature=0.5), self.collect(temperature=0.5))
+        self.assertEqual(CountingProviderMock.calls, 3)
+
+class TestChunkEncoder(unittest.TestCase):
+
+    def setUp(self):
+        if not hasattr(ChatCompletionChunk, "model_fields"):
+            self.skipTest("pydantic is not installed")
+
+    def create_chunk(self, content: str) -> ChatCompletionChunk:
+        chunk = ChatCompletionChunk.model_construct(content, None, "id", 1)
+        chunk.model = "model"
+        chunk.provider = "Provider"
+        return chunk
+
+    def decode(self, data: bytes) -> list[dict]:
+        return [json.loads(frame[6:]) for frame in data.decode().split("\n\n") if frame]
+
+    def test_encode_delta(self):
+        chunk = self.create_chunk('Hello "world" \u00e9\n')
+        self.assertEqual(self.decode(ChunkEncoder().encode(chunk)), [json.loads(chunk.json())])
+
+    def test_coalesce(self):
+        encoder = ChunkEncoder(coalesce_size=5)
+        self.assertEqual(encoder.encode(self.create_chunk("He")), b"")
+        self.assertEqual(encoder.encode(self.create_chunk("ll")), b"")
+        frames = self.decode(encoder.encode(self.create_chunk("o!")))
+        self.assertEqual(frames[0]["choices"][0]["delta"]["content"], "Hello!")
+        encoder.encode(self.create_chunk("?"))
+        frames = self.decode(encoder.encode(ChatCompletionChunk.model_construct(None, "stop", "id", 1)))
+        self.assertEqual(len(frames), 2)
+        self.assertEqual(frames[0]["choices"][0]["delta"]["content"], "?")
+        self.assertEqual(frames[1]["choices"][0]["finish_reason"], "stop")
+
+    def test_coalesce_interval(self):
+        encoder = ChunkEncoder(coalesce_interval=0.05)
+        async def response():
+            yield self.create_chunk("He")
+            yield self.create_chunk("llo")
+            await asyncio.sleep(0.2)
+            yield self.create_chunk("!")
+        async def stream():
+            frames = []
+            async for data in encoder.stream(response()):
+                frames.append([frame["choices"][0]["delta"]["content"] for frame in self.decode(data)])
+            return frames
+        # The buffered content is sent before the delayed chunk arrives
+        self.assertEqual(asyncio.run(stream()), [["Hello"]])
+        self.assertEqual(self.decode(encoder.flush())[0]["choices"][0]["delta"]["content"], "!")
+
+    def test_coalesce_deadline(self):
+        encoder = ChunkEncoder(coalesce_interval=0.05)
+        async def response():
+            yield self.create_chunk("Hello")
+            await asyncio.sleep(1)
+            yield self.create_chunk("!")
+        async def stream():
+            frames = []
+            deadline_at = asyncio.get_running_loop().time() + 0.2
+            try:
+                async for data in encoder.stream(iter_with_watchdog(response(), None, deadline_at)):
+                    frames.append(data)
+            except TimeoutError as e:
+                return frames, e
+        # The deadline is raised as an error, after the buffered content was sent
+        frames, error = asyncio.run(stream())
+        self.assertEqual([self.decode(data)[0]["choices"][0]["delta"]["content"] for data in frames], ["Hello"])
+        self.assertIsInstance(error, TimeoutError)
+
 class TestPassModel(unittest.TestCase):
 
     def test_response(self):
@@ -107,6 +226,25 @@ class TestPassModel(unittest.TestCase):
         self.assertIsInstance(response, ChatCompletion)
         self.assertEqual("How are you?", response.choices[0].message.content)
 
+    def test_stop_across_chunks(self):
+        client = Client(provider=YieldProviderMock)
+        messages = [{'role': 'user', 'content': chunk} for chunk in ["How a", "re ", "you", "?"]]
+        response = client.chat.completions.create(messages, "Hello", stop=["are", "?"])
+        self.assertEqual("How ", response.choices[0].message.content)
+        self.assertEqual("stop", response.choices[0].finish_reason)
+        response = client.chat.completions.create(messages, "Hello", stream=True, stop=["you?", "x"])
+        content = "".join(chunk.choices[0].delta.content or "" for chunk in response)
+        self.assertEqual("How are ", content)
+
+    def test_stop_matcher(self):
+        matcher = StopMatcher(["abcx", "bc", "d"])
+        self.assertEqual(matcher.feed("xa"), ("x", False))
+        self.assertEqual(matcher.feed("b"), ("", False))
+        self.assertEqual(matcher.feed("cd"), ("a", True))
+        matcher = StopMatcher(["end"])
+        self.assertEqual(matcher.feed("the e"), ("the ", False))
+        self.assertEqual(matcher.flush(), "e")
+
     def test_model_not_found(self):
         def run_exception():
             client = Client()
@@ -0,0 +1,126 @@
+from __future__ import annotations
+
+import os
+import json
+import time
+import asyncio
+import tempfile
+import unittest
+
+from g4f.cookies import get_cookies_dir, set_cookies_dir
+from g4f.errors import RateLimitError
+from g4f.providers.base_provider import AsyncAuthedProvider
+from g4f.providers.response import AuthResult
+from g4f.Provider.needs_auth.OpenaiChat import OpenaiChat
+from g4f.providers.credential_pool import CredentialPool, credential_pool, API_KEY, AUTH, ROUND_ROBIN
+from g4f.requests.raise_for_status import get_retry_after, parse_duration
+
+class ProviderMock:
+    needs_auth = True
+
+class AuthedProviderMock(AsyncAuthedProvider):
+    @classmethod
+    async def create_authed(cls, model, messages, auth_result, **kwargs):
+        yield auth_result.api_key
+
+class TestCredentialPool(unittest.TestCase):
+
+    def setUp(self):
+        self.cookies_dir = get_cookies_dir()
+        self.tempdir = tempfile.TemporaryDirectory()
+        set_cookies_dir(self.tempdir.name)
+        self.pool = CredentialPool()
+
+    def tearDown(self):
+        set_cookies_dir(self.cookies_dir)
+        self.tempdir.cleanup()
+
+    def write(self, filename: str, data: dict):
+        with open(os.path.join(self.tempdir.name, filename), "w") as file:
+            json.dump(data, file)
+
+    def test_no_accounts(self):
+        self.assertIsNone(self.pool.acquire(ProviderMock, API_KEY))
+
+    def test_least_loaded(self):
+        self.write("api_key_ProviderMock.json", {"api_key": "first"})
+        self.write("api_key_ProviderMock-second.json", {"api_key": "second"})
+        first = self.pool.acquire(ProviderMock, API_KEY)
+        second = self.pool.acquire(ProviderMock, API_KEY)
+        self.assertEqual({first.data["api_key"], second.data["api_key"]}, {"first", "second"})
+        self.pool.release(second)
+        self.assertIs(self.pool.acquire(ProviderMock, API_KEY), second)
+
+    def test_round_robin(self):
+        self.pool.strategy = ROUND_ROBIN
+        self.write("api_key_ProviderMock-a.json", {"api_key": "a"})
+        self.write("api_key_ProviderMock-b.json", {"api_key": "b"})
+        names = []
+        for _ in range(4):
+            account = self.pool.acquire(ProviderMock, API_KEY)
+            self.pool.release(account)
+            names.append(account.name)
+        self.assertEqual(names, ["a", "b", "a", "b"])
+
+    def test_park_rate_limited(self):
+        self.write("api_key_ProviderMock-a.json", {"api_key": "a"})
+        self.write("api_key_ProviderMock-b.json", {"api_key": "b"})
+        account = self.pool.acquire(ProviderMock, API_KEY)
+        with self.assertRaises(RateLimitError):
+            with self.pool.use(account):
+                raise RateLimitError("Rate limit", retry_after=30)
+        self.assertEqual(account.active, 0)
+        self.assertAlmostEqual(account.get_retry_after(), 30, delta=1)
+        other = self.pool.acquire(ProviderMock, API_KEY)
+        self.assertIsNot(other, account)
+        self.pool.park(other)
+        with self.assertRaises(RateLimitError) as context:
+            self.pool.acquire(ProviderMock, API_KEY)
+        self.assertAlmostEqual(context.exception.retry_after, 30, delta=1)
+
+    def test_reload(self):
+        self.write("api_key_ProviderMock.json", {"api_key": "first"})
+        account = self.pool.acquire(ProviderMock, API_KEY)
+        self.write("api_key_ProviderMock.json", {"api_key": "changed"})
+        os.utime(os.path.join(self.tempdir.name, "api_key_ProviderMock.json"), (time.time() + 1, time.time() + 1))
+        self.write("api_key_ProviderMock-second.json", {"api_key": "second"})
+        second = self.pool.acquire(ProviderMock, API_KEY)
+        self.assertEqual(second.name, "second")
+        self.assertEqual(account.data["api_key"], "changed")
+        self.assertEqual(len(self.pool.get_dict()["ProviderMock:api_key"]), 2)
+
+    def test_authed_provider(self):
+        self.write("auth_AuthedProviderMock-a.json", {"api_key": "a"})
+        self.write("auth_AuthedProviderMock-b.json", {"api_key": "b"})
+        async def create():
+            return [chunk async for chunk in AuthedProviderMock.create_async_generator("model", [])]
+        results = [asyncio.run(create()) for _ in range(2)]
+        self.assertEqual(sorted(results), [["a"], ["b"]])
+        for account in credential_pool.load(AuthedProviderMock, AUTH).values():
+            self.assertEqual(account.requests, 1)
+            self.assertEqual(account.active, 0)
+
+class TestRequestHeaders(unittest.TestCase):
+
+    def test_account_headers(self):
+        auth_results = [
+            AuthResult(api_key=name, headers={"user-agent": "agent"}, cookies={"oai-did": name})
+            for name in ("a", "b")
+        ]
+        headers = [OpenaiChat._get_request_headers(auth_result, auth_result.api_key) for auth_result in auth_results]
+        # Each request gets the api key and the cookies of its own account
+        self.assertEqual([(h["authorization"], h["cookie"]) for h in headers], [("Bearer a", "oai-did=a"), ("Bearer b", "oai-did=b")])
+        self.assertEqual(auth_results[0].headers, {"user-agent": "agent"})
+
+class TestRetryAfter(unittest.TestCase):
+
+    def test_retry_after(self):
+        self.assertEqual(get_retry_after({"retry-after": "20"}), 20)
+        self.assertAlmostEqual(get_retry_after({"retry-after": time.strftime("%a, %d %b %Y %H:%M:%S GMT", time.gmtime(time.time() + 60))}), 60, delta=2)
+        self.assertEqual(get_retry_after({"x-ratelimit-reset-requests": "1m30s"}), 90)
+        self.assertIsNone(get_retry_after({}))
+
+    def test_parse_duration(self):
+        self.assertEqual(parse_duration("250ms"), 0.25)
+        self.assertEqual(parse_duration("2h"), 7200)
+        self.assertIsNone(parse_duration("soon"))
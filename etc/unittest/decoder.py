@@ -0,0 +1,59 @@
+from __future__ import annotations
+
+import unittest
+
+from g4f.requests.decoder import SSEDecoder, NDJSONDecoder, get_delta_content
+
+class TestSSEDecoder(unittest.TestCase):
+
+    def decode(self, chunks: list[bytes]) -> list:
+        decoder = SSEDecoder()
+        events = [event for chunk in chunks for event in decoder.feed(chunk)]
+        event = decoder.flush()
+        if event is not None:
+            events.append(event)
+        return [(event.event, event.data) for event in events]
+
+    def test_partial_frames(self):
+        self.assertEqual(
+            self.decode([b'data: {"a"', b':1}\n', b"\ndata: [DONE]\n\n"]),
+            [("message", b'{"a":1}'), ("message", b"[DONE]")]
+        )
+
+    def test_event_and_multiline_data(self):
+        self.assertEqual(
+            self.decode([b": comment\r\nevent: error\r\ndata: line1\r\ndata:line2\r\n\r\n"]),
+            [("error", b"line1\nline2")]
+        )
+
+    def test_flush_without_empty_line(self):
+        self.assertEqual(self.decode([b"data: last"]), [("message", b"last")])
+
+    def test_line_mode(self):
+        decoder = SSEDecoder()
+        events = [*decoder.feed(b'data: {"a":1}\n')]
+        self.assertEqual([event.data for event in events], [b'{"a":1}'])
+        self.assertEqual(events[0].json(), {"a": 1})
+        events = [*decoder.feed(b'\ndata: {"b":2}\ndata: {"c"'), *decoder.feed(b':3}\ndata: {\ndata: }\n\n')]
+        self.assertEqual([event.data for event in events], [b'{"b":2}', b'{"c":3}', b"{\n}"])
+        self.assertEqual([event.data for event in decoder.feed(b"data: [DONE]\n")], [b"[DONE]"])
+        self.assertIsNone(decoder.flush())
+
+class TestNDJSONDecoder(unittest.TestCase):
+
+    def test_lines(self):
+        decoder = NDJSONDecoder()
+        items = [*decoder.feed(b'{"a": 1}\n\n{"b"'), *decoder.feed(b": 2}")]
+        self.assertEqual(items, [{"a": 1}])
+        self.assertEqual(decoder.flush(), {"b": 2})
+
+class TestDeltaContent(unittest.TestCase):
+
+    def test_fast_path(self):
+        data = b'{"id":"1","choices":[{"index":0,"delta":{"content":"Hello"},"finish_reason":null}]}'
+        self.assertEqual(get_delta_content(data), "Hello")
+
+    def test_fallback(self):
+        self.assertIsNone(get_delta_content(b'{"choices":[{"delta":{"content":"a\\"b"}}]}'))
+        self.assertIsNone(get_delta_content(b'{"choices":[{"delta":{"content":"a"},"finish_reason":"stop"}]}'))
+        self.assertIsNone(get_delta_content(b'{"choices":[{"delta":{"content":null}}]}'))
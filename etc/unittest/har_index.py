@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+import os
+import json
+import tempfile
+import unittest
+
+import g4f.har_index as har_index_module
+from g4f.har_index import HarIndex, iter_har_entries
+from g4f.cookies import CookiesConfig, read_cookie_files, set_cookies_dir, get_cookies_dir
+
+def create_entry(url: str, host: str, cookies: dict, text: str = None) -> dict:
+    return {
+        "request": {
+            "method": "GET",
+            "url": url,
+            "headers": [{"name": "Host", "value": host}, {"name": "Cookie", "value": "secret"}],
+            "cookies": [{"name": name, "value": value} for name, value in cookies.items()],
+        },
+        "response": {"status": 200, "content": {"text": text or "x" * 1000}},
+    }
+
+HAR = {"log": {"version": "1.2", "pages": [], "entries": [
+    create_entry("https://chatgpt.com/", "chatgpt.com", {"a": "1"}, '{"accessToken":"token"}'),
+    create_entry("https://github.com/", "github.com", {"b": "2"}),
+]}}
+
+class TestHarIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cookies_dir = get_cookies_dir()
+        set_cookies_dir(self.tmp.name)
+        self.path = os.path.join(self.tmp.name, "test.har")
+        with open(self.path, "w") as file:
+            json.dump(HAR, file, indent=2)
+        self.index = HarIndex()
+        self.cookies = CookiesConfig.cookies
+
+    def tearDown(self):
+        CookiesConfig.cookies = self.cookies
+        set_cookies_dir(self.cookies_dir)
+        self.tmp.cleanup()
+
+    def test_iter_entries(self):
+        entries = list(iter_har_entries(self.path, chunk_size=16))
+        self.assertEqual(entries, HAR["log"]["entries"])
+        with open(self.path, "w") as file:
+            file.write('{"log": {"entries": [{"request": ')
+        with self.assertRaises(json.JSONDecodeError):
+            list(iter_har_entries(self.path, chunk_size=16))
+
+    def test_compact_entries(self):
+        entries = self.index.get_entries(self.path)
+        self.assertEqual(entries[0]["url"], "https://chatgpt.com/")
+        self.assertEqual(entries[0]["headers"], {"host": "chatgpt.com"})
+        self.assertEqual(entries[0]["cookies"], {"a": "1"})
+        self.assertEqual(entries[0]["access_token"], "token")
+        self.assertNotIn("access_token", entries[1])
+
+    def test_reuse(self):
+        calls = []
+        original = har_index_module.iter_har_entries
+        def iter_entries(path):
+            calls.append(path)
+            return original(path)
+        har_index_module.iter_har_entries = iter_entries
+        try:
+            self.index.get_entries(self.path)
+            self.index.get_entries(self.path)
+            self.assertEqual(len(calls), 1)
+            self.index.save()
+            index = HarIndex()
+            self.assertEqual(index.get_entries(self.path), self.index.get_entries(self.path))
+            self.assertEqual(len(calls), 1)
+            with open(self.path, "a") as file:
+                file.write("\n")
+            index.get_entries(self.path)
+            self.assertEqual(len(calls), 2)
+        finally:
+            har_index_module.iter_har_entries = original
+
+    def test_read_cookie_files(self):
+        with open(os.path.join(self.tmp.name, "cookies.json"), "w") as file:
+            json.dump([{"domain": ".google.com", "name": "c", "value": "3"}], file)
+        read_cookie_files()
+        self.assertEqual(CookiesConfig.cookies["chatgpt.com"], {"a": "1"})
+        self.assertEqual(CookiesConfig.cookies["github.com"], {"b": "2"})
+        self.assertEqual(CookiesConfig.cookies[".google.com"], {"c": "3"})
+        self.assertTrue(os.path.exists(os.path.join(self.tmp.name, har_index_module.INDEX_FILE)))
@@ -5,6 +5,7 @@ import unittest
 
 from g4f.client import AsyncClient, ImagesResponse
 from g4f.providers.retry_provider import IterListProvider
+from g4f.providers.scores import scores
 from .mocks import (
     YieldImageResponseProviderMock,
     MissingAuthProviderMock,
@@ -14,6 +15,14 @@ from .mocks import (
 
 DEFAULT_MESSAGES = [{'role': 'user', 'content': 'Hello'}]
 
+def setUpModule():
+    # Don't write the scores of mock providers to the cookies dir
+    scores.persist = False
+
+def tearDownModule():
+    scores.reset()
+    scores.persist = True
+
 class TestIterListProvider(unittest.IsolatedAsyncioTestCase):
 
     async def test_skip_provider(self):
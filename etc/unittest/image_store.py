@@ -0,0 +1,289 @@
+from __future__ import annotations
+
+import os
+import base64
+import asyncio
+import tempfile
+import unittest
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import g4f.image.image_store as image_store_module
+from aiohttp import ClientResponseError
+
+from g4f.image.image_store import ImageStore
+from g4f.image.downloader import ImageDownloader
+from g4f.image.copy_images import copy_images
+from g4f.image.thumbnails import ThumbnailCache, get_preview_url
+from g4f.image import to_data_uri, to_bytes, to_image_refs, has_requirements, ImageRef
+from g4f.client.helper import get_request_key
+from g4f.image.downscale import ImageDownscaler
+from g4f.providers.base_provider import with_image_budget
+from .mocks import AsyncGeneratorProviderMock, ImageBudgetProviderMock
+from g4f.requests.session_pool import session_pool
+
+PNG = b"\x89PNG\r\n\x1a\n" + b"\x00" * 100
+
+class TestImageStore(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.images_dir = image_store_module.images_dir
+        image_store_module.images_dir = self.tmp.name
+        self.store = ImageStore()
+
+    def tearDown(self):
+        image_store_module.images_dir = self.images_dir
+        self.tmp.cleanup()
+
+    def test_dedup(self):
+        filename = self.store.save_bytes(PNG)
+        self.assertTrue(filename.endswith(".png"))
+        self.assertEqual(self.store.save_bytes(PNG, ".jpg"), filename)
+        self.assertEqual(os.listdir(self.tmp.name), [filename])
+        self.assertEqual(self.store.get_etag(filename), f'"{filename[:-4]}"')
+        self.assertIsNone(self.store.get_etag("1234_image_abc.jpg"))
+
+    def test_evict_lru(self):
+        self.store.max_size = 250
+        self.store.evict_interval = 0
+        first = self.store.save_bytes(PNG + b"1")
+        second = self.store.save_bytes(PNG + b"2")
+        os.utime(os.path.join(self.tmp.name, first), (0, 0))
+        self.store.save_bytes(PNG + b"3")
+        self.assertNotIn(first, os.listdir(self.tmp.name))
+        self.assertIn(second, os.listdir(self.tmp.name))
+
+    def test_evict_thumbnails(self):
+        self.store.evict_interval = 0
+        first = self.store.save_bytes(PNG + b"1")
+        second = self.store.save_bytes(PNG + b"2")
+        os.makedirs(os.path.join(self.tmp.name, "thumbnails"))
+        thumbnail = os.path.join(self.tmp.name, "thumbnails", f"{first[:-4]}_100x100.webp")
+        with open(thumbnail, "wb") as file:
+            file.write(b"0" * 200)
+        os.utime(os.path.join(self.tmp.name, first), (0, 0))
+        self.store.max_size = 3 * len(PNG) + 100
+        self.store.save_bytes(PNG + b"3")
+        self.assertNotIn(first, os.listdir(self.tmp.name))
+        self.assertFalse(os.path.exists(thumbnail))
+        self.assertIn(second, os.listdir(self.tmp.name))
+
+    def test_copy_data_uri(self):
+        self.store.save_bytes(PNG)
+        async def copy():
+            try:
+                return await copy_images([to_data_uri(PNG)])
+            finally:
+                await session_pool.close()
+        images = asyncio.run(copy())
+        self.assertEqual(images, [f"/images/{self.store.save_bytes(PNG)}"])
+        self.assertEqual(len(os.listdir(self.tmp.name)), 1)
+
+class TestImageRef(unittest.TestCase):
+
+    def test_data_uri(self):
+        data_uri = to_data_uri(PNG)
+        image = ImageRef.from_data_uri(data_uri)
+        self.assertEqual(image.mime_type, "image/png")
+        self.assertNotIn("data", image.__dict__)
+        self.assertIs(to_data_uri(image), data_uri)
+        self.assertEqual(to_bytes(image), PNG)
+        self.assertEqual(image.extension, "png")
+
+    def test_bytes(self):
+        image = ImageRef(PNG)
+        self.assertIs(to_bytes(image), PNG)
+        self.assertEqual(to_data_uri(image), to_data_uri(PNG))
+        self.assertEqual(len(image), len(PNG))
+
+    def test_invalid(self):
+        with self.assertRaises(ValueError):
+            ImageRef.from_data_uri("./image.png")
+        with self.assertRaises(ValueError):
+            ImageRef.from_data_uri("data:text/plain;base64,YWJj")
+
+    def test_refs(self):
+        images = to_image_refs([(to_data_uri(PNG), "image.png"), ("https://example.com/image.png", None)])
+        self.assertIsInstance(images[0][0], ImageRef)
+        self.assertEqual(images[1][0], "https://example.com/image.png")
+        self.assertEqual(
+            get_request_key("model", None, [], images=images),
+            get_request_key("model", None, [], images=to_image_refs([(PNG, "image.png"), ("https://example.com/image.png", None)]))
+        )
+
+class TestImageDownscaler(unittest.TestCase):
+
+    def setUp(self):
+        self.downscaler = ImageDownscaler()
+
+    def test_within_budget(self):
+        image = ImageRef(PNG)
+        self.assertIs(self.downscaler.fit(image, max_bytes=len(PNG)), image)
+        images = self.downscaler.fit_images([(PNG, "image.png"), ("https://example.com/image.png", None)], max_bytes=len(PNG))
+        self.assertEqual(images[0][0].data, PNG)
+        self.assertEqual(images[1][0], "https://example.com/image.png")
+
+    def test_downscale(self):
+        if not has_requirements:
+            self.skipTest("pillow is not installed")
+        from PIL import Image
+        from io import BytesIO
+        buffer = BytesIO()
+        Image.new("RGB", (1000, 800), (255, 0, 0)).save(buffer, "PNG")
+        image = ImageRef(buffer.getvalue())
+        result = self.downscaler.fit(image, max_pixels=100 * 100)
+        self.assertLessEqual(result.width * result.height, 100 * 100)
+        self.assertEqual(result.mime_type, "image/jpeg")
+        self.assertIs(self.downscaler.fit(image, max_pixels=100 * 100), result)
+        self.assertEqual(self.downscaler.hits, 1)
+
+    def test_downscale_modes(self):
+        if not has_requirements:
+            self.skipTest("pillow is not installed")
+        from PIL import Image
+        from io import BytesIO
+        palette = Image.new("P", (400, 400), 0)
+        palette.info["transparency"] = 0
+        for source in (palette, Image.new("LA", (400, 400), (0, 0)), Image.new("CMYK", (400, 400), (0, 0, 0, 255))):
+            buffer = BytesIO()
+            source.save(buffer, "TIFF" if source.mode == "CMYK" else "PNG")
+            result = self.downscaler.fit(ImageRef(buffer.getvalue()), max_pixels=100 * 100)
+            self.assertEqual(result.mime_type, "image/jpeg")
+            with result.to_image() as image:
+                self.assertEqual(image.mode, "RGB")
+                # Transparent pixels are white, the others are kept
+                self.assertEqual(image.getpixel((0, 0))[0] > 128, source.mode != "CMYK")
+
+    def test_downscale_failed(self):
+        if not has_requirements:
+            self.skipTest("pillow is not installed")
+        from PIL import Image
+        from io import BytesIO
+        buffer = BytesIO()
+        Image.new("RGB", (400, 400)).save(buffer, "PNG")
+        image = ImageRef(buffer.getvalue())
+        with patch("g4f.image.downscale.process_image", side_effect=OSError("cannot write mode")):
+            self.assertIs(self.downscaler.fit(image, max_pixels=100 * 100), image)
+
+    def test_invalid_image(self):
+        if not has_requirements:
+            self.skipTest("pillow is not installed")
+        image = ImageRef(b"not an image")
+        self.assertIs(self.downscaler.fit(image, max_pixels=100 * 100), image)
+        self.assertIs(self.downscaler.fit(image, max_bytes=4), image)
+        from PIL import Image
+        from io import BytesIO
+        buffer = BytesIO()
+        Image.new("RGB", (400, 400)).save(buffer, "PNG")
+        image = ImageRef(buffer.getvalue())
+        # Opening the image raises a DecompressionBombError
+        with patch("PIL.Image.MAX_IMAGE_PIXELS", 100):
+            self.assertIs(self.downscaler.fit(image, max_pixels=100 * 100), image)
+
+    def test_provider_budget(self):
+        create_function = AsyncGeneratorProviderMock.get_async_create_function()
+        self.assertIs(with_image_budget(AsyncGeneratorProviderMock, create_function), create_function)
+        async def run():
+            response = ImageBudgetProviderMock.get_async_create_function()("", [], True, images=[(PNG, None)])
+            return "".join([chunk async for chunk in response])
+        # Without pillow the images are passed unchanged
+        if has_requirements:
+            self.skipTest("pillow is installed")
+        self.assertEqual(int(asyncio.run(run())), len(PNG))
+
+class TestThumbnails(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.images_dir = image_store_module.images_dir
+        image_store_module.images_dir = self.tmp.name
+        self.thumbnails = ThumbnailCache()
+
+    def tearDown(self):
+        image_store_module.images_dir = self.images_dir
+        self.tmp.cleanup()
+
+    def test_preview_url(self):
+        self.assertEqual(get_preview_url("/images/abc.png?url=x"), "/thumbnail/abc.png?w=200&h=200")
+        self.assertEqual(get_preview_url("https://example.com/abc.png"), "https://example.com/abc.png")
+
+    def test_unsupported_format(self):
+        with self.assertRaises(ValueError):
+            self.thumbnails.get_file("abc.png", 100, 100, "gif")
+
+    def test_thumbnail(self):
+        if not has_requirements:
+            self.skipTest("pillow is not installed")
+        from PIL import Image
+        Image.new("RGB", (400, 300)).save(os.path.join(self.tmp.name, "image.png"))
+        target = self.thumbnails.get_file("image.png", 100, 100)
+        self.assertTrue(target.endswith("_100x100.webp"))
+        with Image.open(target) as image:
+            self.assertLessEqual(max(image.size), 100)
+        self.assertEqual(asyncio.run(self.thumbnails.get("image.png", 100, 100)), target)
+        self.assertEqual(self.thumbnails.get_sync("image.png", 100, 100), target)
+        self.assertIsNone(self.thumbnails.get_file("missing.png", 100, 100))
+
+class MockResponse:
+    def __init__(self, status: int, data: bytes):
+        self.status = status
+        self.data = data
+        self.request_info = SimpleNamespace(real_url="https://host/image.png")
+
+    def raise_for_status(self):
+        if self.status >= 400:
+            raise ClientResponseError(self.request_info, (), status=self.status)
+
+    @property
+    def content(self):
+        return self
+
+    async def iter_chunked(self, size: int):
+        for i in range(0, len(self.data), 3):
+            yield self.data[i:i + 3]
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        pass
+
+class MockSession:
+    def __init__(self, statuses: list[int]):
+        self.statuses = statuses
+        self.requests = 0
+
+    def get(self, url: str, **kwargs):
+        self.requests += 1
+        return MockResponse(self.statuses.pop(0), PNG)
+
+class TestImageDownloader(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.downloader = ImageDownloader()
+        self.downloader.retry_delay = 0
+
+    async def test_base64(self):
+        self.assertEqual(await self.downloader.fetch_base64(MockSession([200]), "https://host/image.png"), base64.b64encode(PNG).decode())
+
+    async def test_retry(self):
+        session = MockSession([503, 200])
+        self.assertEqual(await self.downloader.fetch_base64(session, "https://host/image.png"), base64.b64encode(PNG).decode())
+        self.assertEqual(session.requests, 2)
+        with self.assertRaises(ClientResponseError):
+            await self.downloader.fetch_base64(MockSession([404, 200]), "https://host/image.png")
+
+    async def test_busy_host(self):
+        self.downloader.limit = 2
+        self.downloader.limit_per_host = 1
+        session = MockSession([200, 200, 200])
+        release = asyncio.Event()
+        async def wait(chunks):
+            await release.wait()
+        busy = [asyncio.create_task(self.downloader.fetch(session, "https://busy/image.png", wait)) for _ in range(2)]
+        await asyncio.sleep(0)
+        other = await asyncio.wait_for(self.downloader.fetch_base64(session, "https://other/image.png"), 1)
+        self.assertEqual(other, base64.b64encode(PNG).decode())
+        release.set()
+        await asyncio.gather(*busy)
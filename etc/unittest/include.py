@@ -1,4 +1,14 @@
+import os
+import sys
 import unittest
+import subprocess
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).parent.parent.parent
+IMPORT_TIME_BUDGET = float(os.environ.get("G4F_IMPORT_TIME_BUDGET", 1.5))
+
+def run_python(code: str) -> str:
+    return subprocess.check_output([sys.executable, "-c", code], cwd=ROOT_DIR, text=True).strip()
 
 class TestImport(unittest.TestCase):
 
@@ -11,5 +21,26 @@ class TestImport(unittest.TestCase):
         from g4f.requests import StreamSession
         self.assertIsInstance(StreamSession, type)
 
+    def test_provider_manifest(self):
+        from etc.tool.provider_manifest import create_manifest
+        from g4f.Provider.manifest import providers
+        self.assertEqual(create_manifest(), providers, "Run: python -m etc.tool.provider_manifest")
+
+    def test_lazy_providers(self):
+        import g4f.Provider
+        from g4f.Provider.deprecated import Acytoo
+        self.assertIs(g4f.Provider.Acytoo, Acytoo)
+        self.assertIs(g4f.Provider.ProviderUtils.convert["Acytoo"], Acytoo)
+        modules = run_python("import sys, g4f; print(' '.join(sys.modules))").split()
+        self.assertNotIn("g4f.Provider.deprecated", modules)
+        self.assertNotIn("g4f.Provider.not_working", modules)
+
+class TestImportTime(unittest.TestCase):
+
+    def test_import_time(self):
+        code = "import time; start = time.perf_counter(); import g4f; print(time.perf_counter() - start)"
+        import_time = min(float(run_python(code)) for _ in range(3))
+        self.assertLess(import_time, IMPORT_TIME_BUDGET, f"import g4f took {import_time:.2f}s")
+
 if __name__ == '__main__':
-    unittest.main()
\ No newline at end of file
+    unittest.main()
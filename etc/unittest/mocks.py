@@ -1,3 +1,5 @@
+import asyncio
+
 from g4f.providers.base_provider import AbstractProvider, AsyncProvider, AsyncGeneratorProvider
 from g4f.providers.response import ImageResponse
 from g4f.errors import MissingAuthError
@@ -94,4 +96,43 @@ class YieldNoneProviderMock(AsyncGeneratorProvider):
     async def create_async_generator(
         cls, model, messages, stream, **kwargs
     ):
-        yield None
\ No newline at end of file
+        yield None
+
+class SlowProviderMock(AsyncGeneratorProvider):
+    working = True
+    cancelled = False
+
+    @classmethod
+    async def create_async_generator(
+        cls, model, messages, stream, **kwargs
+    ):
+        try:
+            await asyncio.sleep(5)
+            yield cls.__name__
+        except asyncio.CancelledError:
+            cls.cancelled = True
+            raise
+
+class CountingProviderMock(AsyncGeneratorProvider):
+    working = True
+    calls = 0
+
+    @classmethod
+    async def create_async_generator(
+        cls, model, messages, stream, **kwargs
+    ):
+        cls.calls += 1
+        for chunk in ["How ", "are ", "you?"]:
+            await asyncio.sleep(0.01)
+            yield chunk
+
+class ImageBudgetProviderMock(AsyncGeneratorProvider):
+    working = True
+    image_max_bytes = 64
+
+    @classmethod
+    async def create_async_generator(
+        cls, model, messages, stream, images=None, **kwargs
+    ):
+        for image, _ in images:
+            yield f"{len(image)} "
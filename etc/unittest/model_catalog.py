@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+import time
+import asyncio
+import unittest
+import tempfile
+from pathlib import Path
+
+from g4f.providers.base_provider import AsyncGeneratorProvider, ProviderModelMixin
+from g4f.providers.model_catalog import ModelCatalog, CatalogEntry
+
+class CatalogProviderMock(AsyncGeneratorProvider, ProviderModelMixin):
+    working = True
+    fallback_models = ["fallback"]
+    calls = 0
+
+    @classmethod
+    async def fetch_models(cls, **kwargs) -> dict:
+        cls.calls += 1
+        await asyncio.sleep(0.01)
+        return {"models": ["text", "image"], "image_models": ["image"]}
+
+    async def create_async_generator(model, messages, **kwargs):
+        yield "Hello"
+
+class FailingCatalogProviderMock(CatalogProviderMock):
+    @classmethod
+    async def fetch_models(cls, **kwargs) -> dict:
+        raise RuntimeError()
+
+class KeyCatalogProviderMock(CatalogProviderMock):
+    @classmethod
+    async def fetch_models(cls, api_key: str = None, **kwargs) -> dict:
+        if api_key != "valid":
+            raise RuntimeError("Invalid api key")
+        return await super().fetch_models(**kwargs)
+
+class StaticCatalogProviderMock(CatalogProviderMock):
+    models = ["static"]
+
+class TestModelCatalog(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.catalog = self.create_catalog()
+        CatalogProviderMock.models = []
+        CatalogProviderMock.image_models = []
+        CatalogProviderMock.calls = 0
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def create_catalog(self) -> ModelCatalog:
+        catalog = ModelCatalog()
+        catalog.get_file = lambda: Path(self.temp_dir.name) / "catalog.json"
+        return catalog
+
+    def test_cold_fetch(self):
+        self.assertEqual(self.catalog.get_models(CatalogProviderMock), ["text", "image"])
+        self.assertEqual(CatalogProviderMock.image_models, ["image"])
+        self.assertEqual(self.catalog.get_models(CatalogProviderMock), ["text", "image"])
+        self.assertEqual(CatalogProviderMock.calls, 1)
+
+    def test_fallback_on_error(self):
+        self.assertEqual(self.catalog.get_models(FailingCatalogProviderMock), ["fallback"])
+        self.assertIn(FailingCatalogProviderMock.__name__, self.catalog.failed_at)
+        self.assertIsNone(self.catalog.schedule(FailingCatalogProviderMock))
+
+    def test_corrected_api_key(self):
+        self.assertEqual(self.catalog.get_models(KeyCatalogProviderMock, api_key="invalid"), ["fallback"])
+        self.assertIsNone(self.catalog.schedule(KeyCatalogProviderMock, api_key="invalid"))
+        self.assertEqual(self.catalog.get_models(KeyCatalogProviderMock, api_key="valid"), ["text", "image"])
+
+    def test_models_per_account(self):
+        self.assertEqual(self.catalog.get_models(KeyCatalogProviderMock, api_key="valid"), ["text", "image"])
+        # The models of an api key are not returned for another key
+        self.assertEqual(self.catalog.get_models(KeyCatalogProviderMock, api_key="invalid"), ["fallback"])
+        self.assertIsNone(self.catalog.get_entry(KeyCatalogProviderMock.__name__))
+
+    def test_static_models(self):
+        self.assertEqual(self.catalog.get_models(StaticCatalogProviderMock), ["static"])
+        self.assertEqual(StaticCatalogProviderMock.calls, 0)
+
+    def test_stale_while_revalidate(self):
+        self.catalog.entries[CatalogProviderMock.__name__] = CatalogEntry(["stale"], fetched_at=time.time() - 7200)
+        self.assertEqual(self.catalog.get_models(CatalogProviderMock), ["stale"])
+        self.catalog.pending[CatalogProviderMock.__name__].result(5)
+        self.assertEqual(self.catalog.get_models(CatalogProviderMock), ["text", "image"])
+
+    def test_persistence(self):
+        self.catalog.get_models(CatalogProviderMock)
+        catalog = self.create_catalog()
+        self.assertEqual(catalog.get_entry(CatalogProviderMock.__name__).models, ["text", "image"])
+        catalog.get_models(CatalogProviderMock)
+        self.assertEqual(CatalogProviderMock.calls, 1)
+
+    def test_async_caller_does_not_wait(self):
+        async def get_models():
+            return self.catalog.get_models(CatalogProviderMock)
+        self.assertEqual(asyncio.run(get_models()), ["fallback"])
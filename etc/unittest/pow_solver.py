@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+import json
+import base64
+import hashlib
+import unittest
+
+from g4f.Provider.openai.pow_solver import PowSolver, search, split_proof_token
+from g4f.Provider.openai.proofofwork import generate_proof_token
+
+PROOF_TOKEN = [8020, "Mon, 06 Jan 2025 12:00:00 GMT", None, 0, "Mozilla/5.0", "https://example.com/api.js", "en", None, "alert"]
+
+def current_loop(seed: str, difficulty: str, proof_token: list) -> str:
+    for i in range(100000):
+        proof_token[3] = i
+        base = base64.b64encode(json.dumps(proof_token).encode()).decode()
+        if hashlib.sha3_512((seed + base).encode()).digest().hex()[:len(difficulty)] <= difficulty:
+            return base
+
+class TestPowSolver(unittest.TestCase):
+
+    def test_split(self):
+        prefix, suffix = split_proof_token(PROOF_TOKEN)
+        self.assertEqual(prefix + b"0" + suffix, json.dumps(PROOF_TOKEN).encode())
+
+    def test_same_answer(self):
+        for seed in ("0.1", "0.2", "0.3"):
+            expected = current_loop(seed, "0fff", list(PROOF_TOKEN))
+            answer = search(split_proof_token(PROOF_TOKEN), seed.encode(), "0fff", True, 0, 100000)
+            self.assertEqual(answer.decode(), expected)
+
+    def test_two_nonces(self):
+        parts = (b'[1,"a",', b',"b",', b',"c"]')
+        answer = search(parts, b"seed", "0fff", False, 0, 100000, (0, 1))
+        decoded = json.loads(base64.b64decode(answer))
+        self.assertEqual(decoded[4], decoded[2] >> 1)
+        self.assertLessEqual(hashlib.sha3_512(b"seed" + answer).digest()[:4], bytes.fromhex("0fff"))
+
+    def test_memoize(self):
+        solver = PowSolver()
+        solver.processes = 0
+        parts = split_proof_token(PROOF_TOKEN)
+        answer = solver.solve(parts, "0.1", "0fff", 100000)
+        self.assertIn((parts, "0.1", "0fff", True, (0,)), solver.answers)
+        self.assertEqual(solver.solve(parts, "0.1", "0fff", 100000), answer)
+        self.assertIsNone(solver.solve(parts, "0.1", "0000000", 10))
+
+    def test_thread_search(self):
+        solver = PowSolver()
+        self.assertIsNone(solver.get_executor())
+        answer = solver.solve(split_proof_token(PROOF_TOKEN), "0.7", "0fff", 100000)
+        self.assertEqual(answer, current_loop("0.7", "0fff", list(PROOF_TOKEN)))
+
+    def test_process_pool(self):
+        solver = PowSolver()
+        solver.processes = 2
+        solver.chunk_size = 100
+        try:
+            answer = solver.solve(split_proof_token(PROOF_TOKEN), "0.4", "00ff", 100000)
+        finally:
+            solver.shutdown()
+        self.assertLessEqual(hashlib.sha3_512(("0.4" + answer).encode()).digest().hex()[:4], "00ff")
+
+    def test_lowest_nonce(self):
+        solver = PowSolver()
+        solver.processes = 2
+        solver.chunk_size = 10
+        parts = split_proof_token(PROOF_TOKEN)
+        try:
+            answer = solver.solve(parts, "0.6", "3fff", 100000)
+        finally:
+            solver.shutdown()
+        self.assertEqual(answer, search(parts, b"0.6", "3fff", True, 0, 100000).decode())
+
+    def test_proof_token(self):
+        token = generate_proof_token(True, "0.5", "0fff", proof_token=list(PROOF_TOKEN))
+        self.assertEqual(token, "gAAAAAB" + current_loop("0.5", "0fff", list(PROOF_TOKEN)))
@@ -0,0 +1,125 @@
+from __future__ import annotations
+
+import time
+import tempfile
+import unittest
+from pathlib import Path
+
+from g4f.client import Client, AsyncClient
+from g4f.client.response_cache import ResponseCache, CacheControl, response_cache
+from .mocks import CountingProviderMock
+
+DEFAULT_MESSAGES = [{'role': 'user', 'content': 'Hello'}]
+
+class TestResponseCache(unittest.TestCase):
+
+    def setUp(self):
+        self.cache = ResponseCache()
+
+    def test_cache_control(self):
+        cache_control = CacheControl.parse("no-store, Max-Age=60")
+        self.assertTrue(cache_control.no_store)
+        self.assertFalse(cache_control.no_cache)
+        self.assertEqual(cache_control.max_age, 60)
+
+    def test_lru_budget(self):
+        self.cache.max_bytes = 100
+        self.cache.put("a", {"chunks": ["a" * 30]})
+        self.cache.put("b", {"chunks": ["b" * 30]})
+        self.cache.get("a")
+        self.cache.put("c", {"chunks": ["c" * 30]})
+        self.assertIsNotNone(self.cache.get("a"))
+        self.assertIsNone(self.cache.get("b"))
+        self.assertLessEqual(self.cache.size, 100)
+
+    def test_ttl(self):
+        self.cache.put("a", {"chunks": ["a"]})
+        self.assertEqual(self.cache.get("a")[0], {"chunks": ["a"]})
+        self.assertIsNone(self.cache.get("a", max_age=-1))
+        self.cache.entries["a"] = (time.time() - self.cache.ttl - 1, self.cache.entries["a"][1])
+        self.assertIsNone(self.cache.get("a"))
+
+    def test_stream_mode(self):
+        self.cache.enabled = True
+        cache_control = CacheControl()
+        get_key = lambda stream, **kwargs: self.cache.get_key("model", None, DEFAULT_MESSAGES, cache_control, stream, temperature=0, **kwargs)
+        self.assertEqual(get_key(True), get_key(False))
+        self.assertNotEqual(get_key(True, tools=[{"type": "function"}]), get_key(False, tools=[{"type": "function"}]))
+        self.assertNotEqual(get_key(True, response_format={"type": "json_object"}), get_key(False, response_format={"type": "json_object"}))
+        self.cache.put("a", {"chunks": ["a"], "finish_reason": "tool_calls", "tool_calls": [{"id": "1"}], "stream": False})
+        self.assertIsNone(self.cache.lookup("a", True, cache_control))
+        self.assertEqual(self.cache.lookup("a", False, cache_control)[0].choices[0].message.content, "a")
+
+    def test_disk(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            self.cache.disk = True
+            self.cache.get_file = lambda: Path(tmp) / "cache.sqlite3"
+            self.cache.put("a", {"chunks": ["a"]})
+            self.cache.entries.clear()
+            self.assertEqual(self.cache.get("a")[0], {"chunks": ["a"]})
+            self.assertIn("a", self.cache.entries)
+            self.cache.connection.close()
+
+    def test_disk_override(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            self.cache.get_file = lambda: Path(tmp) / "cache.sqlite3"
+            self.cache.put("a", {"chunks": ["a"]}, disk=True)
+            self.cache.entries.clear()
+            self.assertIsNone(self.cache.get("a"))
+            self.assertEqual(self.cache.get("a", disk=True)[0], {"chunks": ["a"]})
+            self.cache.connection.close()
+
+class TestClientResponseCache(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        response_cache.enabled = True
+        response_cache.clear()
+        CountingProviderMock.calls = 0
+
+    def tearDown(self):
+        response_cache.enabled = False
+        response_cache.clear()
+
+    async def test_replay_stream(self):
+        client = AsyncClient(provider=CountingProviderMock)
+        first = [chunk async for chunk in client.chat.completions.create(DEFAULT_MESSAGES, "", stream=True, temperature=0)]
+        chunks = [chunk async for chunk in client.chat.completions.create(DEFAULT_MESSAGES, "", stream=True, temperature=0)]
+        self.assertEqual(CountingProviderMock.calls, 1)
+        self.assertEqual([chunk.choices[0].delta.content for chunk in chunks], [chunk.choices[0].delta.content for chunk in first])
+        self.assertEqual([chunk.choices[0].delta.content for chunk in chunks], ["How ", "are ", "you?", None])
+        self.assertEqual(chunks[-1].choices[0].finish_reason, "stop")
+        response = await client.chat.completions.create(DEFAULT_MESSAGES, "", temperature=0)
+        self.assertEqual(response.choices[0].message.content, "How are you?")
+        self.assertEqual(CountingProviderMock.calls, 1)
+
+    async def test_no_cache(self):
+        client = AsyncClient(provider=CountingProviderMock)
+        await client.chat.completions.create(DEFAULT_MESSAGES, "", temperature=0)
+        await client.chat.completions.create(DEFAULT_MESSAGES, "", temperature=0, cache_control="no-cache")
+        self.assertEqual(CountingProviderMock.calls, 2)
+        await client.chat.completions.create(DEFAULT_MESSAGES, "", temperature=1)
+        await client.chat.completions.create(DEFAULT_MESSAGES, "", temperature=1)
+        self.assertEqual(CountingProviderMock.calls, 4)
+        await client.chat.completions.create(DEFAULT_MESSAGES, "")
+        await client.chat.completions.create(DEFAULT_MESSAGES, "")
+        self.assertEqual(CountingProviderMock.calls, 6)
+        await client.chat.completions.create(DEFAULT_MESSAGES, "", cache_control="max-age=60")
+        await client.chat.completions.create(DEFAULT_MESSAGES, "", cache_control="max-age=60")
+        self.assertEqual(CountingProviderMock.calls, 7)
+
+    async def test_client_api_keys(self):
+        for api_key in ("first", "second", "first"):
+            client = AsyncClient(provider=CountingProviderMock, api_key=api_key)
+            await client.chat.completions.create(DEFAULT_MESSAGES, "", temperature=0)
+        # The responses of the api key of a client are not replayed for another client
+        self.assertEqual(CountingProviderMock.calls, 2)
+        client = Client(provider=CountingProviderMock, api_key="second")
+        client.chat.completions.create(DEFAULT_MESSAGES, "", temperature=0)
+        self.assertEqual(CountingProviderMock.calls, 2)
+
+    def test_sync_client(self):
+        client = Client(provider=CountingProviderMock)
+        content = "".join(chunk.choices[0].delta.content or "" for chunk in client.chat.completions.create(DEFAULT_MESSAGES, "", stream=True, temperature=0))
+        response = client.chat.completions.create(DEFAULT_MESSAGES, "", temperature=0)
+        self.assertEqual(response.choices[0].message.content, content)
+        self.assertEqual(CountingProviderMock.calls, 1)
@@ -1,13 +1,26 @@
 from __future__ import annotations
 
 import unittest
+import asyncio
 
-from g4f.client import AsyncClient, ChatCompletion, ChatCompletionChunk
-from g4f.providers.retry_provider import IterListProvider
-from .mocks import YieldProviderMock, RaiseExceptionProviderMock, AsyncRaiseExceptionProviderMock, YieldNoneProviderMock
+from g4f.client import Client, AsyncClient, ChatCompletion, ChatCompletionChunk
+from g4f.errors import RetryProviderError, TimeoutError, ResponseStatusError, MissingAuthError, ModelNotFoundError
+from g4f.providers.retry_provider import IterListProvider, RetryProvider, iter_with_watchdog
+from g4f.providers.scores import ProviderScores, scores
+from g4f.providers.circuit_breaker import CircuitBreaker, breakers, OPEN, HALF_OPEN, CLOSED
+from .mocks import YieldProviderMock, RaiseExceptionProviderMock, AsyncRaiseExceptionProviderMock, YieldNoneProviderMock, AsyncGeneratorProviderMock
+from .mocks import SlowProviderMock
 
 DEFAULT_MESSAGES = [{'role': 'user', 'content': 'Hello'}]
 
+def setUpModule():
+    # Don't write the scores of mock providers to the cookies dir
+    scores.persist = False
+
+def tearDownModule():
+    scores.reset()
+    scores.persist = True
+
 class TestIterListProvider(unittest.IsolatedAsyncioTestCase):
 
     async def test_skip_provider(self):
@@ -57,4 +70,152 @@ class TestIterListProvider(unittest.IsolatedAsyncioTestCase):
         self.assertEqual(len(response_list), 2)
         for chunk in response_list:
             if chunk.choices[0].delta.content is not None:
-                self.assertEqual(chunk.choices[0].delta.content, "Hello")
\ No newline at end of file
+                self.assertEqual(chunk.choices[0].delta.content, "Hello")
+
+class TestHedgedRequests(unittest.IsolatedAsyncioTestCase):
+
+    async def test_hedge_slow_provider(self):
+        SlowProviderMock.cancelled = False
+        client = AsyncClient(provider=RetryProvider([SlowProviderMock, YieldProviderMock], False, hedge_after=0.05))
+        response = await asyncio.wait_for(client.chat.completions.create(DEFAULT_MESSAGES, ""), 2)
+        self.assertEqual("Hello", response.choices[0].message.content)
+        self.assertTrue(SlowProviderMock.cancelled)
+
+    async def test_hedge_request_parameter(self):
+        client = AsyncClient(provider=IterListProvider([SlowProviderMock, YieldProviderMock], False))
+        response = client.chat.completions.create(DEFAULT_MESSAGES, "", stream=True, hedge_after=0.05)
+        content = "".join([chunk.choices[0].delta.content async for chunk in response if chunk.choices[0].delta.content])
+        self.assertEqual("Hello", content)
+
+    async def test_hedge_failure_fallback(self):
+        client = AsyncClient(provider=IterListProvider([AsyncRaiseExceptionProviderMock, YieldProviderMock], False, 10))
+        response = await asyncio.wait_for(client.chat.completions.create(DEFAULT_MESSAGES, ""), 2)
+        self.assertEqual("Hello", response.choices[0].message.content)
+
+class TestTimeouts(unittest.IsolatedAsyncioTestCase):
+
+    def tearDown(self):
+        breakers.reset()
+
+    async def test_first_token_timeout(self):
+        client = AsyncClient(provider=IterListProvider([SlowProviderMock, YieldProviderMock], False))
+        response = await asyncio.wait_for(client.chat.completions.create(DEFAULT_MESSAGES, "", first_token_timeout=0.05), 2)
+        self.assertEqual("Hello", response.choices[0].message.content)
+
+    async def test_deadline_exceeded(self):
+        client = AsyncClient(provider=SlowProviderMock)
+        with self.assertRaisesRegex(RetryProviderError, "TimeoutError"):
+            await asyncio.wait_for(client.chat.completions.create(DEFAULT_MESSAGES, "", deadline=0.1), 2)
+
+    async def test_watchdog_in_caller_task(self):
+        tasks = set()
+        async def response():
+            for _ in range(3):
+                tasks.add(asyncio.current_task())
+                yield "Hello"
+        deadline_at = asyncio.get_running_loop().time() + 5
+        chunks = [chunk async for chunk in iter_with_watchdog(response(), deadline_at, deadline_at)]
+        self.assertEqual(chunks, ["Hello"] * 3)
+        if hasattr(asyncio, "timeout_at"):
+            self.assertEqual(tasks, {asyncio.current_task()})
+        else:
+            # Python < 3.11: The fallback awaits each chunk in its own task
+            self.assertNotIn(asyncio.current_task(), tasks)
+
+    async def test_watchdog_not_cancel_caller(self):
+        async def response():
+            for _ in range(3):
+                await asyncio.sleep(0)
+                yield "Hello"
+        deadline_at = asyncio.get_running_loop().time() + 0.05
+        with self.assertRaisesRegex(TimeoutError, "Deadline exceeded"):
+            async for _ in iter_with_watchdog(response(), None, deadline_at):
+                await asyncio.sleep(0.1)
+
+    def test_deadline_sync(self):
+        client = Client(provider=RetryProvider([SlowProviderMock, YieldProviderMock], False, deadline=0.2))
+        response = client.chat.completions.create(DEFAULT_MESSAGES, "")
+        self.assertEqual("Hello", response.choices[0].message.content)
+
+class TestProviderScores(unittest.TestCase):
+
+    def setUp(self):
+        self.scores = ProviderScores()
+        self.scores.loaded = True
+        self.scores.exploration = 0
+
+    def test_sort_by_latency(self):
+        self.scores.add_success(YieldProviderMock.__name__, "model", 2.0)
+        self.scores.add_success(AsyncGeneratorProviderMock.__name__, "model", 0.5)
+        providers = self.scores.sort_providers([YieldProviderMock, AsyncGeneratorProviderMock], "model")
+        self.assertEqual(providers, [AsyncGeneratorProviderMock, YieldProviderMock])
+
+    def test_failures_rank_last(self):
+        self.scores.add_success(YieldProviderMock.__name__, "model", 1.0)
+        self.scores.add_success(AsyncGeneratorProviderMock.__name__, "model", 0.5)
+        for _ in range(5):
+            self.scores.add_failure(AsyncGeneratorProviderMock.__name__, "model")
+        providers = self.scores.sort_providers([AsyncGeneratorProviderMock, YieldProviderMock], "model")
+        self.assertEqual(providers, [YieldProviderMock, AsyncGeneratorProviderMock])
+
+    def test_unknown_first(self):
+        self.scores.add_success(YieldProviderMock.__name__, "model", 0.1)
+        providers = self.scores.sort_providers([YieldProviderMock, AsyncGeneratorProviderMock], "model")
+        self.assertEqual(providers[0], AsyncGeneratorProviderMock)
+
+    def test_tracker(self):
+        tracker = self.scores.track(YieldProviderMock.__name__, "model")
+        tracker.add_token()
+        tracker.add_token()
+        tracker.finish()
+        tracker.finish(False)
+        score = self.scores.get(YieldProviderMock.__name__, "model")
+        self.assertEqual(score.requests, 1)
+        self.assertEqual(score.failures, 0)
+        self.assertIsNotNone(score.ttft)
+
+class TestCircuitBreaker(unittest.IsolatedAsyncioTestCase):
+
+    def tearDown(self):
+        breakers.reset()
+
+    def test_open_after_failures(self):
+        breaker = CircuitBreaker("Mock")
+        for _ in range(breaker.failure_threshold):
+            self.assertTrue(breaker.allow_request())
+            breaker.add_failure(ResponseStatusError("Response 503: Mock"))
+        self.assertEqual(breaker.state, OPEN)
+        self.assertFalse(breaker.allow_request())
+
+    def test_client_errors(self):
+        breaker = CircuitBreaker("Mock")
+        for error in (MissingAuthError("Mock"), ModelNotFoundError("Mock"), ResponseStatusError("Response 404: Mock"), RuntimeError("Mock")):
+            breaker.add_failure(error)
+        self.assertEqual(breaker.consecutive_failures, 0)
+        for error in (ConnectionResetError("Mock"), TimeoutError("Mock"), ResponseStatusError("Response 502: Bad gateway")):
+            breaker.add_failure(error)
+        self.assertEqual(breaker.consecutive_failures, 3)
+        # A client error releases the half-open probe
+        breaker.open("Test")
+        breaker.opened_at -= breaker.cooldown + 1
+        self.assertTrue(breaker.allow_request())
+        breaker.add_failure(MissingAuthError("Mock"))
+        self.assertEqual(breaker.state, HALF_OPEN)
+        self.assertTrue(breaker.allow_request())
+
+    def test_half_open_probe(self):
+        breaker = CircuitBreaker("Mock")
+        breaker.open("Test")
+        breaker.opened_at -= breaker.cooldown + 1
+        self.assertTrue(breaker.allow_request())
+        self.assertEqual(breaker.state, HALF_OPEN)
+        self.assertFalse(breaker.allow_request())
+        breaker.add_success()
+        self.assertEqual(breaker.state, CLOSED)
+
+    async def test_skip_open_provider(self):
+        breakers.get(RaiseExceptionProviderMock.__name__).open("Test")
+        client = AsyncClient(provider=IterListProvider([RaiseExceptionProviderMock, YieldProviderMock], False))
+        response = await client.chat.completions.create(DEFAULT_MESSAGES, "")
+        self.assertEqual("Hello", response.choices[0].message.content)
+        self.assertEqual(breakers.get(RaiseExceptionProviderMock.__name__).state, OPEN)
@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+import asyncio
+import unittest
+
+from aiohttp import ClientSession, ClientTimeout
+
+from g4f.requests.session_pool import SessionPool
+
+class MockSession:
+    def __init__(self, proxy: str = None, impersonate: str = None, max_clients: int = None):
+        self.proxy = proxy
+        self.impersonate = impersonate
+        self.closed = False
+        self.requests = []
+
+    def request(self, method: str, url: str, **kwargs):
+        self.requests.append((method, url, kwargs))
+
+    async def close(self):
+        self.closed = True
+
+class TestSessionPool(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.pool = SessionPool()
+
+    async def asyncTearDown(self):
+        await self.pool.close()
+
+    async def test_reuse_session(self):
+        async with self.pool.lease("Provider", MockSession) as first:
+            pass
+        async with self.pool.lease("Provider", MockSession) as second:
+            pass
+        self.assertIs(first.session, second.session)
+        self.assertEqual(len(self.pool), 1)
+
+    async def test_isolated_keys(self):
+        async with self.pool.lease("Provider", MockSession) as session:
+            async with self.pool.lease("Provider", MockSession, account="user") as account:
+                async with self.pool.lease("Other", MockSession, proxy="http://proxy") as other:
+                    self.assertIsNot(session.session, account.session)
+                    self.assertEqual(other.proxy, "http://proxy")
+        self.assertEqual(len(self.pool), 3)
+
+    async def test_merge_request_args(self):
+        async with self.pool.lease("Provider", MockSession, headers={"a": "1"}, cookies={"c": "1"}, timeout=10) as session:
+            session.get("url", headers={"b": "2"})
+            session.post("url", timeout=5, json={})
+        self.assertEqual(session.requests, [
+            ("GET", "url", {"headers": {"a": "1", "b": "2"}, "cookies": {"c": "1"}, "timeout": 10}),
+            ("POST", "url", {"headers": {"a": "1"}, "cookies": {"c": "1"}, "timeout": 5, "json": {}}),
+        ])
+
+    async def test_evict_idle(self):
+        async with self.pool.lease("Provider", MockSession) as session:
+            self.pool.idle_timeout = 0
+            self.pool.evict_idle()
+            self.assertEqual(len(self.pool), 1)
+        self.pool.evict_idle()
+        await asyncio.sleep(0)
+        self.assertEqual(len(self.pool), 0)
+        self.assertTrue(session.closed)
+
+    async def test_aiohttp_session(self):
+        async with self.pool.lease("Provider", ClientSession, timeout=(5, 30)) as session:
+            self.assertEqual(session.timeout, ClientTimeout(30, 5))
+            self.assertEqual(session.connector.limit, self.pool.limit)
+        await self.pool.close()
+        self.assertTrue(session.closed)
+
+    async def test_shared_session_without_cookie_jar(self):
+        async with self.pool.lease("images", ClientSession, store_cookies=False) as session:
+            session.cookie_jar.update_cookies({"session": "user"})
+            self.assertEqual(len(session.cookie_jar), 0)
+        async with self.pool.lease("images", ClientSession) as stored:
+            self.assertIsNot(session.session, stored.session)
+
+    async def test_new_session_without_cookie_jar(self):
+        async with self.pool.lease("images", MockSession, store_cookies=False) as first:
+            pass
+        async with self.pool.lease("images", MockSession, store_cookies=False) as second:
+            pass
+        await asyncio.sleep(0)
+        # A session, that stores cookies anyway, is used by one lease only
+        self.assertIsNot(first.session, second.session)
+        self.assertTrue(first.closed and second.closed)
+        self.assertEqual(len(self.pool), 0)
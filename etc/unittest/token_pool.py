@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+import time
+import asyncio
+import unittest
+
+from g4f.providers.token_pool import TokenPool
+
+class TokenFactoryMock:
+    def __init__(self, fail: bool = False):
+        self.count = 0
+        self.fail = fail
+
+    async def __call__(self) -> str:
+        self.count += 1
+        token = f"token-{self.count}"
+        await asyncio.sleep(0.01)
+        if self.fail:
+            raise RuntimeError("Token not found")
+        return token
+
+class TestTokenPool(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.pool = TokenPool()
+        self.pool.enabled = True
+
+    def tearDown(self):
+        self.pool.clear()
+
+    async def test_miss_and_prefetch(self):
+        fetch = TokenFactoryMock()
+        self.assertEqual(await self.pool.get(("Provider",), fetch), "token-1")
+        await asyncio.sleep(0.05)
+        self.assertEqual(await self.pool.get(("Provider",), fetch), "token-2")
+        self.assertEqual(self.pool.get_dict()["hits"], 1)
+        self.assertEqual(self.pool.get_dict()["misses"], 1)
+
+    async def test_replace_used_token(self):
+        fetch = TokenFactoryMock()
+        await self.pool.get(("Provider",), fetch, size=2)
+        await asyncio.sleep(0.05)
+        tokens = [await self.pool.get(("Provider",), fetch, size=2) for _ in range(2)]
+        self.assertEqual(tokens, ["token-2", "token-3"])
+        await asyncio.sleep(0.05)
+        self.assertEqual(self.pool.get_dict()["tokens"], 2)
+
+    async def test_expired_token(self):
+        self.pool.enabled = False
+        fetch = TokenFactoryMock()
+        factory = self.pool.register(("Provider",), fetch)
+        factory.tokens.append((time.monotonic() - 1, "expired"))
+        self.assertEqual(await self.pool.get(("Provider",), fetch), "token-1")
+        self.assertEqual(self.pool.get_dict()["misses"], 1)
+
+    async def test_refresh_expired_token(self):
+        fetch = TokenFactoryMock()
+        await self.pool.get(("Provider",), fetch, ttl=0.05)
+        await asyncio.sleep(0.15)
+        self.assertGreater(fetch.count, 3)
+
+    async def test_keys(self):
+        first, second = TokenFactoryMock(), TokenFactoryMock()
+        await self.pool.get(("Provider", "http://proxy"), first)
+        await self.pool.get(("Provider", None), second)
+        await asyncio.sleep(0.05)
+        self.assertEqual(first.count, 2)
+        self.assertEqual(second.count, 2)
+
+    async def test_failed_fetch(self):
+        fetch = TokenFactoryMock(fail=True)
+        with self.assertRaises(RuntimeError):
+            await self.pool.get(("Provider",), fetch)
+        await asyncio.sleep(0.05)
+        self.assertEqual(fetch.count, 1)
+
+    async def test_failed_prefetch_backoff(self):
+        fetch = TokenFactoryMock()
+        self.assertEqual(await self.pool.get(("Provider",), fetch), "token-1")
+        fetch.fail = True
+        await asyncio.sleep(0.05)
+        self.assertEqual(fetch.count, 2)
+        self.assertEqual(self.pool.get_dict()["tokens"], 0)
+        fetch.fail = False
+        self.assertEqual(await self.pool.get(("Provider",), fetch), "token-3")
+        await asyncio.sleep(0.05)
+        self.assertEqual(fetch.count, 3)
+
+    async def test_disabled_by_default(self):
+        pool = TokenPool()
+        fetch = TokenFactoryMock()
+        await pool.get(("Provider",), fetch)
+        await asyncio.sleep(0.05)
+        self.assertEqual(fetch.count, 1)
+
+    async def test_idle(self):
+        self.pool.idle_timeout = 0
+        fetch = TokenFactoryMock()
+        await self.pool.get(("Provider",), fetch)
+        await asyncio.sleep(0.05)
+        self.assertEqual(fetch.count, 1)
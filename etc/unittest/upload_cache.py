@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+import asyncio
+import unittest
+
+from g4f.image import ImageRef, to_data_uri
+from g4f.providers.upload_cache import UploadCache, get_account
+
+PNG = b"\x89PNG\r\n\x1a\n" + b"\x00" * 100
+JPEG = b"\xFF\xD8\xFF" + b"\x00" * 100
+
+class TestUploadCache(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.cache = UploadCache()
+        self.uploads = []
+
+    async def upload(self, image: ImageRef, image_name: str = None):
+        self.uploads.append(image_name)
+        file_id = f"file-{len(self.uploads)}"
+        await asyncio.sleep(0.01)
+        return file_id
+
+    async def test_dedup(self):
+        images = [(PNG, "a.png"), (to_data_uri(PNG), "b.png"), (JPEG, "c.jpg")]
+        self.assertEqual(await self.cache.upload_all("Provider", None, images, self.upload), ["file-1", "file-1", "file-2"])
+        self.assertEqual(self.uploads, ["a.png", "c.jpg"])
+        self.assertEqual(await self.cache.upload_all("Provider", None, [(JPEG, None)], self.upload), ["file-2"])
+        self.assertEqual(len(self.uploads), 2)
+        self.assertEqual(self.cache.hits, 1)
+
+    async def test_account(self):
+        await self.cache.upload_all("Provider", get_account("token1"), [(PNG, None)], self.upload)
+        await self.cache.upload_all("Provider", get_account("token2"), [(PNG, None)], self.upload)
+        await self.cache.upload_all("Other", get_account("token1"), [(PNG, None)], self.upload)
+        self.assertEqual(len(self.uploads), 3)
+        self.assertNotIn("token1", get_account("token1"))
+
+    async def test_expired(self):
+        await self.cache.upload_all("Provider", None, [(PNG, None)], self.upload, ttl=-1)
+        await self.cache.upload_all("Provider", None, [(PNG, None)], self.upload)
+        self.assertEqual(len(self.uploads), 2)
+
+    async def test_concurrency(self):
+        self.cache.concurrency = 2
+        running = []
+        async def upload(image: ImageRef, image_name: str = None):
+            running.append(1)
+            self.assertLessEqual(len(running), 2)
+            await asyncio.sleep(0.01)
+            running.pop()
+            return image.digest
+        images = [(bytes([0xFF, 0xD8, 0xFF, i]), None) for i in range(6)]
+        self.assertEqual(len(set(await self.cache.upload_all("Provider", None, images, upload))), 6)
+
+    async def test_failed(self):
+        async def upload(image: ImageRef, image_name: str = None):
+            raise RuntimeError("Upload failed")
+        with self.assertRaises(RuntimeError):
+            await self.cache.upload_all("Provider", None, [(PNG, None)], upload)
+        self.assertEqual(len(self.cache.entries), 0)
+        self.assertEqual(len(self.cache.pending), 0)
+
+    async def test_uncached(self):
+        await self.cache.upload_all("Provider", None, [(PNG, None)], self.upload, cache=False)
+        self.assertEqual(await self.cache.upload_all("Provider", None, [(PNG, None)], self.upload, cache=False), ["file-2"])
+        self.assertEqual(len(self.cache.entries), 0)
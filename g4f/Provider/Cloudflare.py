@@ -1,13 +1,13 @@
 from __future__ import annotations
 
-import asyncio
 import json
 from pathlib import Path
 
 from ..typing import AsyncResult, Messages, Cookies
-from .base_provider import AsyncGeneratorProvider, ProviderModelMixin, get_running_loop
-from ..requests import Session, StreamSession, get_args_from_nodriver, raise_for_status, merge_cookies
-from ..requests import DEFAULT_HEADERS, has_nodriver, has_curl_cffi
+from .base_provider import AsyncGeneratorProvider, ProviderModelMixin
+from ..requests import StreamSession, get_args_from_nodriver, raise_for_status, merge_cookies, iter_sse
+from ..requests import DEFAULT_HEADERS, has_nodriver
+from ..providers.model_catalog import catalog
 from ..providers.response import FinishReason
 from ..cookies import get_cookies_dir
 from ..errors import ResponseStatusError, ModelNotFoundError
@@ -42,26 +42,25 @@ class Cloudflare(AsyncGeneratorProvider, ProviderModelMixin):
 
     @classmethod
     def get_models(cls) -> str:
-        if not cls.models:
-            if cls._args is None:
-                if has_nodriver:
-                    get_running_loop(check_nested=True)
-                    args = get_args_from_nodriver(cls.url)
-                    cls._args = asyncio.run(args)
-                elif not has_curl_cffi:
-                    return cls.models
-                else:
-                    cls._args = {"headers": DEFAULT_HEADERS, "cookies": {}}
-            with Session(**cls._args) as session:
-                response = session.get(cls.models_url)
+        return catalog.get_models(cls)
+
+    @classmethod
+    async def fetch_models(cls, **kwargs) -> list[str]:
+        if cls._args is None:
+            cache_file = cls.get_cache_file()
+            if cache_file.exists():
+                with cache_file.open("r") as f:
+                    cls._args = json.load(f)
+            elif has_nodriver:
+                cls._args = await get_args_from_nodriver(cls.url)
+            else:
+                cls._args = {"headers": DEFAULT_HEADERS, "cookies": {}}
+        async with StreamSession(**cls._args) as session:
+            async with session.get(cls.models_url) as response:
                 cls._args["cookies"] = merge_cookies(cls._args["cookies"], response)
-                try:
-                    raise_for_status(response)
-                except ResponseStatusError:
-                    return cls.models
-                json_data = response.json()
-                cls.models = [model.get("name") for model in json_data.get("models")]
-        return cls.models
+                await raise_for_status(response)
+                json_data = await response.json()
+        return [model.get("name") for model in json_data.get("models")]
 
     @classmethod
     async def create_async_generator(
@@ -108,19 +107,18 @@ class Cloudflare(AsyncGeneratorProvider, ProviderModelMixin):
                         cache_file.unlink()
                     raise
                 reason = None
-                async for line in response.iter_lines():
-                    if line.startswith(b'data: '):
-                        if line == b'data: [DONE]':
-                            break
-                        try:
-                            content = json.loads(line[6:].decode())
-                            if content.get("response") and content.get("response") != '</s>':
-                                yield content['response']
-                                reason = "max_tokens"
-                            elif content.get("response") == '':
-                                reason = "stop"
-                        except Exception:
-                            continue
+                async for event in iter_sse(response):
+                    if event.data == b'[DONE]':
+                        break
+                    try:
+                        content = event.json()
+                        if content.get("response") and content.get("response") != '</s>':
+                            yield content['response']
+                            reason = "max_tokens"
+                        elif content.get("response") == '':
+                            reason = "stop"
+                    except Exception:
+                        continue
                 if reason is not None:
                     yield FinishReason(reason)
 
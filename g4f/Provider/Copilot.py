@@ -21,12 +21,13 @@ except ImportError:
 from .base_provider import AbstractProvider, ProviderModelMixin
 from .helper import format_prompt_max_length
 from .openai.har_file import get_headers, get_har_files
+from ..har_index import har_index
 from ..typing import CreateResult, Messages, ImagesType
 from ..errors import MissingRequirementsError, NoValidHarFileError, MissingAuthError
 from ..requests.raise_for_status import raise_for_status
 from ..providers.response import BaseConversation, JsonConversation, RequestLogin, Parameters, ImageResponse
 from ..providers.asyncio import get_running_loop
-from ..requests import get_nodriver
+from ..requests import browser_pool
 from ..image import to_bytes, is_accepted_format
 from .helper import get_last_user_message
 from .. import debug
@@ -207,9 +208,8 @@ class Copilot(AbstractProvider, ProviderModelMixin):
                 yield Parameters(**{"cookies": {c.name: c.value for c in session.cookies.jar}})
 
 async def get_access_token_and_cookies(url: str, proxy: str = None, target: str = "ChatAI",):
-    browser, stop_browser = await get_nodriver(proxy=proxy, user_data_dir="copilot")
-    try:
-        page = await browser.get(url)
+    async with browser_pool.lease("copilot", proxy=proxy) as lease:
+        page = await lease.get(url)
         access_token = None
         while access_token is None:
             access_token = await page.evaluate("""
@@ -231,28 +231,24 @@ async def get_access_token_and_cookies(url: str, proxy: str = None, target: str
         cookies = {}
         for c in await page.send(nodriver.cdp.network.get_cookies([url])):
             cookies[c.name] = c.value
-        await page.close()
         return access_token, cookies
-    finally:
-        stop_browser()
 
 def readHAR(url: str):
     api_key = None
     cookies = None
     for path in get_har_files():
-        with open(path, 'rb') as file:
-            try:
-                harFile = json.loads(file.read())
-            except json.JSONDecodeError:
-                # Error: not a HAR file!
-                continue
-            for v in harFile['log']['entries']:
-                if v['request']['url'].startswith(url):
-                    v_headers = get_headers(v)
-                    if "authorization" in v_headers:
-                        api_key = v_headers["authorization"].split(maxsplit=1).pop()
-                    if v['request']['cookies']:
-                        cookies = {c['name']: c['value'] for c in v['request']['cookies']}
+        entries = har_index.get_entries(path)
+        if entries is None:
+            # Error: not a HAR file!
+            continue
+        for v in entries:
+            if v['url'].startswith(url):
+                v_headers = get_headers(v)
+                if "authorization" in v_headers:
+                    api_key = v_headers["authorization"].split(maxsplit=1).pop()
+                if v['cookies']:
+                    cookies = dict(v['cookies'])
+    har_index.save()
     if api_key is None:
         raise NoValidHarFileError("No access token found in .har files")
 
@@ -5,9 +5,12 @@ from aiohttp import ClientSession, ClientTimeout
 import json
 import asyncio
 import random
+from functools import partial
 
 from ..typing import AsyncResult, Messages, Cookies
 from ..requests.raise_for_status import raise_for_status
+from ..requests import session_pool
+from ..providers.token_pool import token_pool
 from .base_provider import AsyncGeneratorProvider, ProviderModelMixin
 from .helper import format_prompt
 from ..providers.response import FinishReason, JsonConversation
@@ -97,6 +100,12 @@ class DDG(AsyncGeneratorProvider, ProviderModelMixin):
 
         raise RuntimeError("Failed to fetch VQD token: Maximum retries exceeded")
 
+    @classmethod
+    async def fetch_vqd_token(cls, proxy: str = None) -> str:
+        """Fetches a VQD token with a pooled session, so it can be fetched ahead of a request."""
+        async with session_pool.lease(cls.__name__, ClientSession, proxy=proxy) as session:
+            return await cls.fetch_vqd(session)
+
     @classmethod
     async def create_async_generator(
         cls,
@@ -118,7 +127,10 @@ class DDG(AsyncGeneratorProvider, ProviderModelMixin):
             async with ClientSession(timeout=ClientTimeout(total=timeout), cookies=cookies) as session:
                 if conversation is None:
                     conversation = Conversation(model)
-                    conversation.vqd = await cls.fetch_vqd(session)
+                    if cookies is None:
+                        conversation.vqd = await token_pool.get((cls.__name__, proxy), partial(cls.fetch_vqd_token, proxy), ttl=120)
+                    else:
+                        conversation.vqd = await cls.fetch_vqd(session)
                     conversation.message_history = [{"role": "user", "content": format_prompt(messages)}]
                 else:
                     conversation.message_history.append(messages[-1])
@@ -21,9 +21,7 @@ class Jmuz(OpenaiTemplate):
 
     @classmethod
     def get_models(cls, **kwargs):
-        if not cls.models:
-            cls.models = super().get_models(api_key=cls.api_key, api_base=cls.api_base)
-        return cls.models
+        return super().get_models(api_key=cls.api_key, api_base=cls.api_base)
 
     @classmethod
     async def create_async_generator(
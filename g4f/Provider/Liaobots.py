@@ -1,12 +1,14 @@
 from __future__ import annotations
 
 import uuid
-from aiohttp import ClientSession, BaseConnector
+from functools import partial
+from aiohttp import ClientSession, BaseConnector, CookieJar
 
 from ..typing import AsyncResult, Messages
 from .base_provider import AsyncGeneratorProvider, ProviderModelMixin
 from .helper import get_connector
 from ..requests import raise_for_status
+from ..providers.token_pool import token_pool
 
 models = {
     "gpt-4o-mini-free": {
@@ -247,17 +249,14 @@ class Liaobots(AsyncGeneratorProvider, ProviderModelMixin):
         **kwargs
     ) -> AsyncResult:
         model = cls.get_model(model)
-        
-        headers = {
-            "authority": "liaobots.com",
-            "content-type": "application/json",
-            "origin": cls.url,
-            "referer": f"{cls.url}/",
-            "user-agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/112.0.0.0 Safari/537.36",
-        }
+        # A prefetched auth code is valid for its own cookies, without a login on the request path
+        prefetched = connector is None
+        auth_code, cookie_jar = cls._auth_code, cls._cookie_jar
+        if prefetched:
+            auth_code, cookie_jar = await token_pool.get((cls.__name__, proxy), partial(cls.fetch_auth_code, proxy), ttl=60)
         async with ClientSession(
-            headers=headers,
-            cookie_jar=cls._cookie_jar,
+            headers=cls.get_headers(),
+            cookie_jar=cookie_jar,
             connector=get_connector(connector, proxy, True)
         ) as session:
             data = {
@@ -267,7 +266,7 @@ class Liaobots(AsyncGeneratorProvider, ProviderModelMixin):
                 "key": "",
                 "prompt": kwargs.get("system_message", "You are a helpful assistant."),
             }
-            if not cls._auth_code:
+            if not prefetched and not cls._auth_code:
                 async with session.post(
                     "https://liaobots.work/recaptcha/api/login",
                     data={"token": "abcdefghijklmnopqrst"},
@@ -275,20 +274,22 @@ class Liaobots(AsyncGeneratorProvider, ProviderModelMixin):
                 ) as response:
                     await raise_for_status(response)
             try:
-                async with session.post(
-                    "https://liaobots.work/api/user",
-                    json={"authcode": cls._auth_code},
-                    verify_ssl=False
-                ) as response:
-                    await raise_for_status(response)
-                    cls._auth_code = (await response.json(content_type=None))["authCode"]
-                    if not cls._auth_code:
-                        raise RuntimeError("Empty auth code")
-                    cls._cookie_jar = session.cookie_jar
+                if not prefetched:
+                    async with session.post(
+                        "https://liaobots.work/api/user",
+                        json={"authcode": cls._auth_code},
+                        verify_ssl=False
+                    ) as response:
+                        await raise_for_status(response)
+                        cls._auth_code = (await response.json(content_type=None))["authCode"]
+                        if not cls._auth_code:
+                            raise RuntimeError("Empty auth code")
+                        cls._cookie_jar = session.cookie_jar
+                    auth_code = cls._auth_code
                 async with session.post(
                     "https://liaobots.work/api/chat",
                     json=data,
-                    headers={"x-auth-code": cls._auth_code},
+                    headers={"x-auth-code": auth_code},
                     verify_ssl=False
                 ) as response:
                     await raise_for_status(response)
@@ -321,6 +322,42 @@ class Liaobots(AsyncGeneratorProvider, ProviderModelMixin):
                         if chunk:
                             yield chunk.decode(errors="ignore")
 
+    @classmethod
+    def get_headers(cls) -> dict:
+        return {
+            "authority": "liaobots.com",
+            "content-type": "application/json",
+            "origin": cls.url,
+            "referer": f"{cls.url}/",
+            "user-agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/112.0.0.0 Safari/537.36",
+        }
+
+    @classmethod
+    async def fetch_auth_code(cls, proxy: str = None) -> tuple[str, CookieJar]:
+        """Logs in with a new session and returns its auth code and cookies, so it can be fetched ahead of a request."""
+        cookie_jar = CookieJar()
+        async with ClientSession(
+            headers=cls.get_headers(),
+            cookie_jar=cookie_jar,
+            connector=get_connector(None, proxy, True)
+        ) as session:
+            async with session.post(
+                "https://liaobots.work/recaptcha/api/login",
+                data={"token": "abcdefghijklmnopqrst"},
+                verify_ssl=False
+            ) as response:
+                await raise_for_status(response)
+            async with session.post(
+                "https://liaobots.work/api/user",
+                json={"authcode": ""},
+                verify_ssl=False
+            ) as response:
+                await raise_for_status(response)
+                auth_code = (await response.json(content_type=None))["authCode"]
+        if not auth_code:
+            raise RuntimeError("Empty auth code")
+        return auth_code, cookie_jar
+
     @classmethod
     async def initialize_auth_code(cls, session: ClientSession) -> None:
         """
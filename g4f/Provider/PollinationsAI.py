@@ -2,7 +2,7 @@ from __future__ import annotations
 
 import json
 import random
-import requests
+import asyncio
 from urllib.parse import quote_plus
 from typing import Optional
 from aiohttp import ClientSession
@@ -13,7 +13,8 @@ from ..typing import AsyncResult, Messages, ImagesType
 from ..image import to_data_uri
 from ..errors import ModelNotFoundError
 from ..requests.raise_for_status import raise_for_status
-from ..requests.aiohttp import get_connector
+from ..requests.session_pool import session_pool
+from ..providers.model_catalog import catalog
 from ..providers.response import ImageResponse, ImagePreview, FinishReason, Usage, Reasoning
 
 DEFAULT_HEADERS = {
@@ -66,31 +67,26 @@ class PollinationsAI(AsyncGeneratorProvider, ProviderModelMixin):
         ### Image Models ###
         "sdxl-turbo": "turbo",
     }
-    text_models = []
-    image_models = []
+    image_models = extra_image_models
 
     @classmethod
     def get_models(cls, **kwargs):
-        if not cls.text_models or not cls.image_models:
-            try:
-                image_response = requests.get("https://image.pollinations.ai/models")
-                image_response.raise_for_status()
-                new_image_models = image_response.json()
-                cls.image_models = list(dict.fromkeys([*cls.extra_image_models, *new_image_models]))
-                
-                text_response = requests.get("https://text.pollinations.ai/models")
-                text_response.raise_for_status()
-                original_text_models = [model.get("name") for model in text_response.json()]
-                
-                combined_text = cls.extra_text_models + [
-                    model for model in original_text_models 
-                    if model not in cls.extra_text_models
-                ]
-                cls.text_models = list(dict.fromkeys(combined_text))
-            except Exception as e:
-                raise RuntimeError(f"Failed to fetch models: {e}") from e
-            
-        return cls.text_models + cls.image_models
+        return catalog.get_models(cls)
+
+    @classmethod
+    async def fetch_models(cls, **kwargs) -> dict:
+        async with session_pool.lease(cls.__name__, ClientSession, headers=DEFAULT_HEADERS) as session:
+            async def get_json(url: str):
+                async with session.get(url) as response:
+                    await raise_for_status(response)
+                    return await response.json()
+            new_image_models, text_models = await asyncio.gather(
+                get_json("https://image.pollinations.ai/models"),
+                get_json("https://text.pollinations.ai/models")
+            )
+        image_models = list(dict.fromkeys([*cls.extra_image_models, *new_image_models]))
+        text_models = list(dict.fromkeys([*cls.extra_text_models, *[model.get("name") for model in text_models]]))
+        return {"models": text_models + image_models, "image_models": image_models}
 
     @classmethod
     async def create_async_generator(
@@ -185,7 +181,7 @@ class PollinationsAI(AsyncGeneratorProvider, ProviderModelMixin):
         url = f"{cls.image_api_endpoint}prompt/{quote_plus(prompt)}?{query}"
         yield ImagePreview(url, prompt)
         
-        async with ClientSession(headers=DEFAULT_HEADERS, connector=get_connector(proxy=proxy)) as session:
+        async with session_pool.lease(cls.__name__, ClientSession, proxy=proxy, headers=DEFAULT_HEADERS) as session:
             async with session.get(url, allow_redirects=True) as response:
                 await raise_for_status(response)
                 image_url = str(response.url)
@@ -222,7 +218,7 @@ class PollinationsAI(AsyncGeneratorProvider, ProviderModelMixin):
             last_message["content"] = image_content + [{"type": "text", "text": last_message["content"]}]
             messages[-1] = last_message
 
-        async with ClientSession(headers=DEFAULT_HEADERS, connector=get_connector(proxy=proxy)) as session:
+        async with session_pool.lease(cls.__name__, ClientSession, proxy=proxy, headers=DEFAULT_HEADERS) as session:
             data = filter_none(**{
                 "messages": messages,
                 "model": model,
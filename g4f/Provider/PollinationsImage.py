@@ -14,8 +14,7 @@ class PollinationsImage(PollinationsAI):
 
     @classmethod
     def get_models(cls, **kwargs):
-        if not cls.image_models:
-            cls.image_models = list(dict.fromkeys([*cls.image_models, *cls.extra_image_models]))
+        PollinationsAI.get_models()
         return cls.image_models
 
     @classmethod
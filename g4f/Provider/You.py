@@ -8,7 +8,7 @@ from ..typing import AsyncResult, Messages, ImageType, Cookies
 from .base_provider import AsyncGeneratorProvider, ProviderModelMixin
 from .helper import format_prompt
 from ..image import EXTENSIONS_MAP, to_bytes, is_accepted_format
-from ..requests import StreamSession, FormData, raise_for_status, get_nodriver
+from ..requests import StreamSession, FormData, raise_for_status, browser_pool
 from ..providers.response import ImagePreview, ImageResponse
 from ..cookies import get_cookies
 from ..errors import MissingRequirementsError, ResponseError
@@ -78,16 +78,12 @@ class You(AsyncGeneratorProvider, ProviderModelMixin):
             except MissingRequirementsError:
                 pass
             if not cookies or "afUserId" not in cookies:
-                browser, stop_browser = await get_nodriver(proxy=proxy)
-                try:
-                    page = await browser.get(cls.url)
+                async with browser_pool.lease(proxy=proxy) as lease:
+                    page = await lease.get(cls.url)
                     await page.wait_for('[data-testid="user-profile-button"]', timeout=900)
                     cookies = {}
                     for c in await page.send(nodriver.cdp.network.get_cookies([cls.url])):
                         cookies[c.name] = c.value
-                    await page.close()
-                finally:
-                    stop_browser()
         async with StreamSession(
             proxy=proxy,
             impersonate="chrome",
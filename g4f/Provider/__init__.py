@@ -1,65 +1,76 @@
 from __future__ import annotations
 
+import sys
+import importlib
+from types import ModuleType
+from collections.abc import Mapping, Iterator
+
 from ..providers.types          import BaseProvider, ProviderType
 from ..providers.retry_provider import RetryProvider, IterListProvider
 from ..providers.base_provider  import AsyncProvider, AsyncGeneratorProvider
 from ..providers.create_images  import CreateImagesProvider
 
-from .deprecated       import *
-from .needs_auth       import *
-from .not_working      import *
-from .local            import *
-from .hf               import HuggingFace, HuggingChat, HuggingFaceAPI, HuggingFaceInference
-from .hf_space         import HuggingSpace
-from .mini_max         import HailuoAI, MiniMax
-from .template         import OpenaiTemplate, BackendApi
+# Generated by etc/tool/provider_manifest.py
+from .manifest import providers as manifest
 
-from .Blackbox             import Blackbox
-from .BlackboxAPI          import BlackboxAPI
-from .ChatGLM              import ChatGLM
-from .ChatGpt              import ChatGpt
-from .ChatGptEs            import ChatGptEs
-from .Cloudflare           import Cloudflare
-from .Copilot              import Copilot
-from .DDG                  import DDG
-from .DeepInfraChat        import DeepInfraChat
-from .Free2GPT             import Free2GPT
-from .FreeGpt              import FreeGpt
-from .GizAI                import GizAI
-from .Glider               import Glider
-from .ImageLabs            import ImageLabs
-from .Jmuz                 import Jmuz
-from .Liaobots             import Liaobots
-from .Mhystical            import Mhystical
-from .OIVSCode             import OIVSCode
-from .PerplexityLabs       import PerplexityLabs
-from .Pi                   import Pi
-from .Pizzagpt             import Pizzagpt
-from .PollinationsAI       import PollinationsAI
-from .PollinationsImage    import PollinationsImage
-from .Prodia               import Prodia
-from .TeachAnything        import TeachAnything
-from .You                  import You
-from .Yqcloud              import Yqcloud
+def load_provider(name: str) -> ProviderType:
+    """Imports the module of a provider from the manifest and returns the provider."""
+    provider = globals().get(name)
+    if not isinstance(provider, type):
+        provider = getattr(importlib.import_module(manifest[name]["module"]), name)
+        globals()[name] = provider
+    return provider
 
-import sys
+def get_provider_names(**capabilities) -> list[str]:
+    """
+    Returns the names of the providers with the given capabilities, without importing them.
+    Example: get_provider_names(working=True, image=True)
+    """
+    return [
+        name for name, entry in manifest.items()
+        if all(entry.get(key) == value for key, value in capabilities.items())
+    ]
+
+class ProviderMap(Mapping):
+    """Maps the provider names to the providers. The providers are imported on first access."""
+
+    def __getitem__(self, name: str) -> ProviderType:
+        if name not in manifest:
+            raise KeyError(name)
+        return load_provider(name)
+
+    def __contains__(self, name: object) -> bool:
+        return name in manifest
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(manifest)
+
+    def __len__(self) -> int:
+        return len(manifest)
+
+__all__: list[str] = list(manifest)
+__map__: dict[str, ProviderType] = ProviderMap()
+
+def __getattr__(name: str):
+    if name in manifest:
+        return load_provider(name)
+    if name == "__providers__":
+        providers = [load_provider(name) for name in manifest]
+        globals()[name] = providers
+        return providers
+    try:
+        return importlib.import_module(f".{name}", __name__)
+    except ModuleNotFoundError:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+class ProviderModule(ModuleType):
+    def __setattr__(self, name: str, value) -> None:
+        # Importing a provider module binds the module to the package, keep the provider instead.
+        if isinstance(value, ModuleType) and name in manifest and manifest[name]["module"] == value.__name__:
+            value = getattr(value, name)
+        super().__setattr__(name, value)
 
-__modules__: list = [
-    getattr(sys.modules[__name__], provider) for provider in dir()
-    if not provider.startswith("__")
-]
-__providers__: list[ProviderType] = [
-    provider for provider in __modules__
-    if isinstance(provider, type)
-    and issubclass(provider, BaseProvider)
-]
-__providers__ = __providers__ + HuggingSpace.providers
-__all__: list[str] = [
-    provider.__name__ for provider in __providers__
-]
-__map__: dict[str, ProviderType] = dict([
-    (provider.__name__, provider) for provider in __providers__
-])
+sys.modules[__name__].__class__ = ProviderModule
 
 class ProviderUtils:
     convert: dict[str, ProviderType] = __map__
@@ -3,12 +3,13 @@ from __future__ import annotations
 import json
 import base64
 import random
-import requests
+import asyncio
 
 from ...typing import AsyncResult, Messages
 from ..base_provider import AsyncGeneratorProvider, ProviderModelMixin, format_prompt
 from ...errors import ModelNotFoundError, ModelNotSupportedError, ResponseError
 from ...requests import StreamSession, raise_for_status
+from ...providers.model_catalog import catalog
 from ...providers.response import FinishReason, ImageResponse
 from ..helper import format_image_prompt
 from .models import default_model, default_image_model, model_aliases, fallback_models
@@ -22,22 +23,29 @@ class HuggingFaceInference(AsyncGeneratorProvider, ProviderModelMixin):
     default_model = default_model
     default_image_model = default_image_model
     model_aliases = model_aliases
+    fallback_models = fallback_models
 
     @classmethod
     def get_models(cls) -> list[str]:
-        if not cls.models:
-            models = fallback_models.copy()
-            url = "https://huggingface.co/api/models?inference=warm&pipeline_tag=text-generation"
-            extra_models = [model["id"] for model in requests.get(url).json()]
-            extra_models.sort()
-            models.extend([model for model in extra_models if model not in models])
-            if not cls.image_models:
-                url = "https://huggingface.co/api/models?pipeline_tag=text-to-image"
-                cls.image_models = [model["id"] for model in requests.get(url).json() if model["trendingScore"] >= 20]
-                cls.image_models.sort()
-                models.extend([model for model in cls.image_models if model not in models])
-            cls.models = models
-        return cls.models
+        return catalog.get_models(cls)
+
+    @classmethod
+    async def fetch_models(cls, **kwargs) -> dict:
+        async with StreamSession() as session:
+            async def get_json(url: str):
+                async with session.get(url) as response:
+                    await raise_for_status(response)
+                    return await response.json()
+            text_models, image_models = await asyncio.gather(
+                get_json("https://huggingface.co/api/models?inference=warm&pipeline_tag=text-generation"),
+                get_json("https://huggingface.co/api/models?pipeline_tag=text-to-image")
+            )
+        models = fallback_models.copy()
+        extra_models = sorted([model["id"] for model in text_models])
+        models.extend([model for model in extra_models if model not in models])
+        image_models = sorted([model["id"] for model in image_models if model["trendingScore"] >= 20])
+        models.extend([model for model in image_models if model not in models])
+        return {"models": models, "image_models": image_models}
 
     @classmethod
     async def create_async_generator(
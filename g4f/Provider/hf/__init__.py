@@ -20,9 +20,8 @@ class HuggingFace(AsyncGeneratorProvider, ProviderModelMixin):
 
     @classmethod
     def get_models(cls) -> list[str]:
-        if not cls.models:
-            cls.models = HuggingFaceInference.get_models()
-            cls.image_models = HuggingFaceInference.image_models
+        cls.models = HuggingFaceInference.get_models()
+        cls.image_models = HuggingFaceInference.image_models
         return cls.models
 
     model_aliases = model_aliases
@@ -97,7 +97,7 @@ class G4F(Janus_Pro_7B):
         async with ClientSession() as session:
             if zerogpu_token is None:
                 yield Reasoning(status="Acquiring GPU Token")
-                zerogpu_uuid, zerogpu_token = await get_zerogpu_token(cls.space, session, JsonConversation(), cookies)
+                zerogpu_uuid, zerogpu_token = await get_zerogpu_token(cls.space, session, JsonConversation(), cookies, proxy)
             headers = {
                 "x-zerogpu-token": zerogpu_token,
                 "x-zerogpu-uuid": zerogpu_uuid,
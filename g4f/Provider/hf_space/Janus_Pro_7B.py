@@ -4,6 +4,7 @@ import json
 import uuid
 import re
 import time
+from functools import partial
 from datetime import datetime, timezone, timedelta
 import urllib.parse
 
@@ -15,6 +16,8 @@ from ...requests.aiohttp import StreamSession, StreamResponse, FormData
 from ...requests.raise_for_status import raise_for_status
 from ...image import to_bytes, is_accepted_format
 from ...cookies import get_cookies
+from ...providers.token_pool import token_pool
+from ...providers.upload_cache import get_account
 from ...errors import ResponseError
 from ... import debug
 from .raise_for_status import raise_for_status
@@ -94,7 +97,7 @@ class Janus_Pro_7B(AsyncGeneratorProvider, ProviderModelMixin):
         async with StreamSession(proxy=proxy, impersonate="chrome") as session:
             session_hash = generate_session_hash() if conversation is None else getattr(conversation, "session_hash")
             if zerogpu_token is None:
-                zerogpu_uuid, zerogpu_token = await get_zerogpu_token(cls.space, session, conversation, cookies)
+                zerogpu_uuid, zerogpu_token = await get_zerogpu_token(cls.space, session, conversation, cookies, proxy)
             if conversation is None or not hasattr(conversation, "session_hash"):
                 conversation = JsonConversation(session_hash=session_hash, zerogpu_token=zerogpu_token, zerogpu_uuid=zerogpu_uuid)
             conversation.zerogpu_token = zerogpu_token
@@ -162,11 +165,24 @@ class Janus_Pro_7B(AsyncGeneratorProvider, ProviderModelMixin):
                         except json.JSONDecodeError:
                             debug.log("Could not parse JSON:", decoded_line)
 
-async def get_zerogpu_token(space: str, session: StreamSession, conversation: JsonConversation, cookies: Cookies = None):
+async def get_zerogpu_token(space: str, session: StreamSession, conversation: JsonConversation, cookies: Cookies = None, proxy: str = None):
     zerogpu_uuid = None if conversation is None else getattr(conversation, "zerogpu_uuid", None)
-    zerogpu_token = "[object Object]"
-
     cookies = get_cookies("huggingface.co", raise_requirements_error=False) if cookies is None else cookies
+    if zerogpu_uuid is None:
+        # A new session: Take a token, that was fetched ahead of the request
+        account = get_account(json.dumps(cookies, sort_keys=True)) if cookies else None
+        return await token_pool.get(
+            ("zerogpu", space, account, proxy),
+            partial(fetch_zerogpu_token, space, cookies=cookies, proxy=proxy),
+            ttl=300
+        )
+    return await fetch_zerogpu_token(space, session, zerogpu_uuid, cookies)
+
+async def fetch_zerogpu_token(space: str, session: StreamSession = None, zerogpu_uuid: str = None, cookies: Cookies = None, proxy: str = None):
+    if session is None:
+        async with StreamSession(proxy=proxy, impersonate="chrome") as session:
+            return await fetch_zerogpu_token(space, session, zerogpu_uuid, cookies)
+    zerogpu_token = "[object Object]"
     if zerogpu_uuid is None:
         async with session.get(f"https://huggingface.co/spaces/{space}", cookies=cookies) as response:
             match = re.search(r"&quot;token&quot;:&quot;([^&]+?)&quot;", await response.text())
@@ -184,4 +200,4 @@ async def get_zerogpu_token(space: str, session: StreamSession, conversation: Js
             if "token" in response_data:
                 zerogpu_token = response_data["token"]
 
-    return zerogpu_uuid, zerogpu_token
\ No newline at end of file
+    return zerogpu_uuid, zerogpu_token
@@ -1,10 +1,11 @@
 from __future__ import annotations
 
-import requests
 import os
 
 from ..needs_auth.OpenaiAPI import OpenaiAPI
 from ...typing import AsyncResult, Messages
+from ...requests import StreamSession, raise_for_status
+from ...providers.model_catalog import catalog
 
 class Ollama(OpenaiAPI):
     label = "Ollama"
@@ -13,19 +14,28 @@ class Ollama(OpenaiAPI):
     needs_auth = False
     working = True
 
+    models_ttl = 60
+
     @classmethod
     def get_models(cls, api_base: str = None, **kwargs):
-        if not cls.models:
-            if api_base is None:
-                host = os.getenv("OLLAMA_HOST", "127.0.0.1")
-                port = os.getenv("OLLAMA_PORT", "11434")
-                url = f"http://{host}:{port}/api/tags"
-            else:
-                url = api_base.replace("/v1", "/api/tags")
-            models = requests.get(url).json()["models"]
-            cls.models = [model["name"] for model in models]
-            cls.default_model = cls.models[0]
-        return cls.models
+        models = catalog.get_models(cls, api_base=api_base)
+        if models and api_base is None:
+            cls.default_model = models[0]
+        return models
+
+    @classmethod
+    async def fetch_models(cls, api_base: str = None, **kwargs) -> list[str]:
+        if api_base is None:
+            host = os.getenv("OLLAMA_HOST", "127.0.0.1")
+            port = os.getenv("OLLAMA_PORT", "11434")
+            url = f"http://{host}:{port}/api/tags"
+        else:
+            url = api_base.replace("/v1", "/api/tags")
+        async with StreamSession() as session:
+            async with session.get(url) as response:
+                await raise_for_status(response)
+                data = await response.json()
+        return [model["name"] for model in data["models"]]
 
     @classmethod
     def create_async_generator(
@@ -0,0 +1,148 @@
+# This file is generated by etc/tool/provider_manifest.py. Do not edit.
+
+from __future__ import annotations
+
+providers: dict[str, dict] = {
+    'AI365VIP': {'module': 'g4f.Provider.not_working.AI365VIP', 'label': None, 'parent': None, 'working': False, 'needs_auth': False, 'supports_stream': True, 'image': True},
+    'AIChatFree': {'module': 'g4f.Provider.not_working.AIChatFree', 'label': None, 'parent': None, 'working': False, 'needs_auth': False, 'supports_stream': True, 'image': True},
+    'AIUncensored': {'module': 'g4f.Provider.not_working.AIUncensored', 'label': None, 'parent': None, 'working': False, 'needs_auth': False, 'supports_stream': True, 'image': True},
+    'Acytoo': {'module': 'g4f.Provider.deprecated.Acytoo', 'label': None, 'parent': None, 'working': False, 'needs_auth': False, 'supports_stream': True, 'image': False},
+    'AiAsk': {'module': 'g4f.Provider.deprecated.AiAsk', 'label': None, 'parent': None, 'working': False, 'needs_auth': False, 'supports_stream': True, 'image': False},
+    'AiChatOnline': {'module': 'g4f.Provider.not_working.AiChatOnline', 'label': None, 'parent': None, 'working': False, 'needs_auth': False, 'supports_stream': True, 'image': True},
+    'AiChats': {'module': 'g4f.Provider.not_working.AiChats', 'label': None, 'parent': None, 'working': False, 'needs_auth': False, 'supports_stream': True, 'image': True},
+    'AiService': {'module': 'g4f.Provider.deprecated.AiService', 'label': None, 'parent': None, 'working': False, 'needs_auth': False, 'supports_stream': False, 'image': False},
+    'Aibn': {'module': 'g4f.Provider.deprecated.Aibn', 'label': None, 'parent': None, 'working': False, 'needs_auth': False, 'supports_stream': True, 'image': False},
+    'Aichat': {'module': 'g4f.Provider.deprecated.Aichat', 'label': None, 'parent': None, 'working': False, 'needs_auth': False, 'supports_stream': False, 'image': False},
+    'Ails': {'module': 'g4f.Provider.deprecated.Ails', 'label': None, 'parent': None, 'working': False, 'needs_auth': False, 'supports_stream': True, 'image': False},
+    'Airforce': {'module': 'g4f.Provider.not_working.Airforce', 'label': None, 'parent': None, 'working': False, 'needs_auth': False, 'supports_stream': True, 'image': True},
+    'Aivvm': {'module': 'g4f.Provider.deprecated.Aivvm', 'label': None, 'parent': None, 'working': False, 'needs_auth': False, 'supports_stream': True, 'image': False},
+    'AmigoChat': {'module': 'g4f.Provider.not_working.AmigoChat', 'label': None, 'parent': None, 'working': False, 'needs_auth': False, 'supports_stream': True, 'image': True},
+    'Anthropic': {'module': 'g4f.Provider.needs_auth.Anthropic', 'label': 'Anthropic API', 'parent': None, 'working': True, 'needs_auth': True, 'supports_stream': True, 'image': True},
+    'AsyncGeneratorProvider': {'module': 'g4f.providers.base_provider', 'label': None, 'parent': None, 'working': False, 'needs_auth': False, 'supports_stream': True, 'image': False},
+    'AsyncProvider': {'module': 'g4f.providers.base_provider', 'label': None, 'parent': None, 'working': False, 'needs_auth': False, 'supports_stream': False, 'image': False},
+    'Aura': {'module': 'g4f.Provider.not_working.Aura', 'label': None, 'parent': None, 'working': False, 'needs_auth': False, 'supports_stream': True, 'image': False},
+    'AutonomousAI': {'module': 'g4f.Provider.not_working.AutonomousAI', 'label': None, 'parent': None, 'working': False, 'needs_auth': False, 'supports_stream': True, 'image': True},
+    'BackendApi': {'module': 'g4f.Provider.template.BackendApi', 'label': None, 'parent': None, 'working': False, 'needs_auth': False, 'supports_stream': True, 'image': True},
+    'BaseProvider': {'module': 'g4f.providers.types', 'label': None, 'parent': None, 'working': False, 'needs_auth': False, 'supports_stream': False, 'image': False},
+    'Berlin': {'module': 'g4f.Provider.deprecated.Berlin', 'label': None, 'parent': None, 'working': False, 'needs_auth': False, 'supports_stream': True, 'image': False},
+    'BingCreateImages': {'module': 'g4f.Provider.needs_auth.BingCreateImages', 'label': 'Microsoft Designer in Bing', 'parent': None, 'working': True, 'needs_auth': True, 'supports_stream': True, 'image': True},
+    'Blackbox': {'module': 'g4f.Provider.Blackbox', 'label': 'Blackbox AI', 'parent': None, 'working': True, 'needs_auth': False, 'supports_stream': True, 'image': True},
+    'BlackboxAPI': {'module': 'g4f.Provider.BlackboxAPI', 'label': 'Blackbox AI API', 'parent': None, 'working': True, 'needs_auth': False, 'supports_stream': False, 'image': True},
+    'CablyAI': {'module': 'g4f.Provider.needs_auth.CablyAI', 'label': None, 'parent': None, 'working': True, 'needs_auth': False, 'supports_stream': True, 'image': True},
+    'Cerebras': {'module': 'g4f.Provider.needs_auth.Cerebras', 'label': 'Cerebras Inference', 'parent': None, 'working': True, 'needs_auth': True, 'supports_stream': True, 'image': True},
+    'ChatAnywhere': {'module': 'g4f.Provider.deprecated.ChatAnywhere', 'label': None, 'parent': None, 'working': False, 'needs_auth': False, 'supports_stream': True, 'image': False},
+    'ChatGLM': {'module': 'g4f.Provider.ChatGLM', 'label': None, 'parent': None, 'working': True, 'needs_auth': False, 'supports_stream': True, 'image': True},
+    'ChatGpt': {'module': 'g4f.Provider.ChatGpt', 'label': 'ChatGpt', 'parent': None, 'working': False, 'needs_auth': False, 'supports_stream': True, 'image': True},
+    'ChatGptEs': {'module': 'g4f.Provider.ChatGptEs', 'label': None, 'parent': None, 'working': True, 'needs_auth': False, 'supports_stream': True, 'image': True},
+    'ChatGptt': {'module': 'g4f.Provider.not_working.ChatGptt', 'label': None, 'parent': None, 'working': False, 'needs_auth': False, 'supports_stream': True, 'image': True},
+    'Chatgpt4Online': {'module': 'g4f.Provider.not_working.Chatgpt4Online', 'label': None, 'parent': None, 'working': False, 'needs_auth': False, 'supports_stream': True, 'image': False},
+    'Chatgpt4o': {'module': 'g4f.Provider.not_working.Chatgpt4o', 'label': None, 'parent': None, 'working': False, 'needs_auth': False, 'supports_stream': False, 'image': True},
+    'ChatgptDuo': {'module': 'g4f.Provider.deprecated.ChatgptDuo', 'label': None, 'parent': None, 'working': False, 'needs_auth': False, 'supports_stream': False, 'image': False},
+    'ChatgptFree': {'module': 'g4f.Provider.not_working.ChatgptFree', 'label': None, 'parent': None, 'working': False, 'needs_auth': False, 'supports_stream': True, 'image': True},
+    'Cloudflare': {'module': 'g4f.Provider.Cloudflare', 'label': 'Cloudflare AI', 'parent': None, 'working': True, 'needs_auth': False, 'supports_stream': True, 'image': True},
+    'CodeLinkAva': {'module': 'g4f.Provider.deprecated.CodeLinkAva', 'label': None, 'parent': None, 'working': False, 'needs_auth': False, 'supports_stream': True, 'image': False},
+    'Copilot': {'module': 'g4f.Provider.Copilot', 'label': 'Microsoft Copilot', 'parent': None, 'working': True, 'needs_auth': False, 'supports_stream': True, 'image': True},
+    'CopilotAccount': {'module': 'g4f.Provider.needs_auth.CopilotAccount', 'label': 'Microsoft Copilot', 'parent': 'Copilot', 'working': True, 'needs_auth': True, 'supports_stream': True, 'image': True},
+    'CreateImagesProvider': {'module': 'g4f.providers.create_images', 'label': None, 'parent': None, 'working': False, 'needs_auth': False, 'supports_stream': False, 'image': False},
+    'Cromicle': {'module': 'g4f.Provider.deprecated.Cromicle', 'label': None, 'parent': None, 'working': False, 'needs_auth': False, 'supports_stream': True, 'image': False},
+    'Custom': {'module': 'g4f.Provider.needs_auth.Custom', 'label': 'Custom Provider', 'parent': None, 'working': True, 'needs_auth': False, 'supports_stream': True, 'image': True},
+    'DDG': {'module': 'g4f.Provider.DDG', 'label': 'DuckDuckGo AI Chat', 'parent': None, 'working': True, 'needs_auth': False, 'supports_stream': True, 'image': True},
+    'DarkAI': {'module': 'g4f.Provider.not_working.DarkAI', 'label': None, 'parent': None, 'working': False, 'needs_auth': False, 'supports_stream': True, 'image': True},
+    'DeepInfra': {'module': 'g4f.Provider.needs_auth.DeepInfra', 'label': None, 'parent': None, 'working': True, 'needs_auth': True, 'supports_stream': True, 'image': True},
+    'DeepInfraChat': {'module': 'g4f.Provider.DeepInfraChat', 'label': None, 'parent': None, 'working': True, 'needs_auth': False, 'supports_stream': True, 'image': True},
+    'DeepSeek': {'module': 'g4f.Provider.needs_auth.DeepSeek', 'label': 'DeepSeek', 'parent': None, 'working': True, 'needs_auth': True, 'supports_stream': True, 'image': True},
+    'DeepSeekAPI': {'module': 'g4f.Provider.needs_auth.DeepSeekAPI', 'label': None, 'parent': None, 'working': False, 'needs_auth': True, 'supports_stream': True, 'image': False},
+    'DfeHub': {'module': 'g4f.Provider.deprecated.DfeHub', 'label': None, 'parent': None, 'working': False, 'needs_auth': False, 'supports_stream': True, 'image': False},
+    'EasyChat': {'module': 'g4f.Provider.deprecated.EasyChat', 'label': None, 'parent': None, 'working': False, 'needs_auth': False, 'supports_stream': True, 'image': False},
+    'Equing': {'module': 'g4f.Provider.deprecated.Equing', 'label': None, 'parent': None, 'working': False, 'needs_auth': False, 'supports_stream': True, 'image': False},
+    'FakeGpt': {'module': 'g4f.Provider.deprecated.FakeGpt', 'label': None, 'parent': None, 'working': False, 'needs_auth': False, 'supports_stream': True, 'image': False},
+    'FastGpt': {'module': 'g4f.Provider.deprecated.FastGpt', 'label': None, 'parent': None, 'working': False, 'needs_auth': False, 'supports_stream': True, 'image': False},
+    'Feature': {'module': 'g4f.Provider.needs_auth.Custom', 'label': 'Feature Provider', 'parent': None, 'working': False, 'needs_auth': False, 'supports_stream': True, 'image': True},
+    'FlowGpt': {'module': 'g4f.Provider.not_working.FlowGpt', 'label': None, 'parent': None, 'working': False, 'needs_auth': False, 'supports_stream': True, 'image': True},
+    'Forefront': {'module': 'g4f.Provider.deprecated.Forefront', 'label': None, 'parent': None, 'working': False, 'needs_auth': False, 'supports_stream': True, 'image': False},
+    'Free2GPT': {'module': 'g4f.Provider.Free2GPT', 'label': None, 'parent': None, 'working': True, 'needs_auth': False, 'supports_stream': True, 'image': True},
+    'FreeGpt': {'module': 'g4f.Provider.FreeGpt', 'label': None, 'parent': None, 'working': True, 'needs_auth': False, 'supports_stream': True, 'image': True},
+    'FreeNetfly': {'module': 'g4f.Provider.not_working.FreeNetfly', 'label': None, 'parent': None, 'working': False, 'needs_auth': False, 'supports_stream': True, 'image': True},
+    'GPROChat': {'module': 'g4f.Provider.not_working.GPROChat', 'label': None, 'parent': None, 'working': False, 'needs_auth': False, 'supports_stream': True, 'image': True},
+    'GPTalk': {'module': 'g4f.Provider.deprecated.GPTalk', 'label': None, 'parent': None, 'working': False, 'needs_auth': False, 'supports_stream': True, 'image': False},
+    'GeekGpt': {'module': 'g4f.Provider.deprecated.GeekGpt', 'label': None, 'parent': None, 'working': False, 'needs_auth': False, 'supports_stream': True, 'image': False},
+    'Gemini': {'module': 'g4f.Provider.needs_auth.Gemini', 'label': 'Google Gemini', 'parent': None, 'working': True, 'needs_auth': True, 'supports_stream': True, 'image': True},
+    'GeminiPro': {'module': 'g4f.Provider.needs_auth.GeminiPro', 'label': 'Google Gemini API', 'parent': None, 'working': True, 'needs_auth': True, 'supports_stream': True, 'image': True},
+    'GetGpt': {'module': 'g4f.Provider.deprecated.GetGpt', 'label': None, 'parent': None, 'working': False, 'needs_auth': False, 'supports_stream': True, 'image': False},
+    'GigaChat': {'module': 'g4f.Provider.needs_auth.GigaChat', 'label': None, 'parent': None, 'working': True, 'needs_auth': True, 'supports_stream': True, 'image': True},
+    'GithubCopilot': {'module': 'g4f.Provider.needs_auth.GithubCopilot', 'label': 'GitHub Copilot', 'parent': None, 'working': True, 'needs_auth': True, 'supports_stream': True, 'image': True},
+    'GizAI': {'module': 'g4f.Provider.GizAI', 'label': None, 'parent': None, 'working': True, 'needs_auth': False, 'supports_stream': False, 'image': True},
+    'GlhfChat': {'module': 'g4f.Provider.needs_auth.GlhfChat', 'label': None, 'parent': None, 'working': True, 'needs_auth': True, 'supports_stream': True, 'image': True},
+    'Glider': {'module': 'g4f.Provider.Glider', 'label': 'Glider', 'parent': None, 'working': True, 'needs_auth': False, 'supports_stream': True, 'image': True},
+    'Groq': {'module': 'g4f.Provider.needs_auth.Groq', 'label': None, 'parent': None, 'working': True, 'needs_auth': True, 'supports_stream': True, 'image': True},
+    'H2o': {'module': 'g4f.Provider.deprecated.H2o', 'label': None, 'parent': None, 'working': False, 'needs_auth': False, 'supports_stream': True, 'image': False},
+    'HailuoAI': {'module': 'g4f.Provider.mini_max.HailuoAI', 'label': 'Hailuo AI', 'parent': None, 'working': True, 'needs_auth': False, 'supports_stream': True, 'image': True},
+    'Hashnode': {'module': 'g4f.Provider.deprecated.Hashnode', 'label': None, 'parent': None, 'working': False, 'needs_auth': False, 'supports_stream': True, 'image': False},
+    'HuggingChat': {'module': 'g4f.Provider.hf.HuggingChat', 'label': None, 'parent': None, 'working': True, 'needs_auth': True, 'supports_stream': True, 'image': True},
+    'HuggingFace': {'module': 'g4f.Provider.hf', 'label': None, 'parent': None, 'working': True, 'needs_auth': False, 'supports_stream': True, 'image': True},
+    'HuggingFaceAPI': {'module': 'g4f.Provider.hf.HuggingFaceAPI', 'label': 'HuggingFace (Inference API)', 'parent': 'HuggingFace', 'working': True, 'needs_auth': True, 'supports_stream': True, 'image': True},
+    'HuggingFaceInference': {'module': 'g4f.Provider.hf.HuggingFaceInference', 'label': None, 'parent': 'HuggingFace', 'working': True, 'needs_auth': False, 'supports_stream': True, 'image': True},
+    'HuggingSpace': {'module': 'g4f.Provider.hf_space', 'label': None, 'parent': 'HuggingFace', 'working': True, 'needs_auth': False, 'supports_stream': True, 'image': True},
+    'ImageLabs': {'module': 'g4f.Provider.ImageLabs', 'label': None, 'parent': None, 'working': True, 'needs_auth': False, 'supports_stream': False, 'image': True},
+    'IterListProvider': {'module': 'g4f.providers.retry_provider', 'label': None, 'parent': None, 'working': False, 'needs_auth': False, 'supports_stream': True, 'image': False},
+    'Jmuz': {'module': 'g4f.Provider.Jmuz', 'label': None, 'parent': None, 'working': True, 'needs_auth': False, 'supports_stream': True, 'image': True},
+    'Koala': {'module': 'g4f.Provider.not_working.Koala', 'label': None, 'parent': None, 'working': False, 'needs_auth': False, 'supports_stream': True, 'image': True},
+    'Liaobots': {'module': 'g4f.Provider.Liaobots', 'label': None, 'parent': None, 'working': True, 'needs_auth': False, 'supports_stream': True, 'image': True},
+    'Local': {'module': 'g4f.Provider.local.Local', 'label': 'GPT4All', 'parent': None, 'working': True, 'needs_auth': False, 'supports_stream': True, 'image': True},
+    'Lockchat': {'module': 'g4f.Provider.deprecated.Lockchat', 'label': None, 'parent': None, 'working': False, 'needs_auth': False, 'supports_stream': True, 'image': False},
+    'MagickPen': {'module': 'g4f.Provider.not_working.MagickPen', 'label': None, 'parent': None, 'working': False, 'needs_auth': False, 'supports_stream': True, 'image': True},
+    'MetaAI': {'module': 'g4f.Provider.needs_auth.MetaAI', 'label': 'Meta AI', 'parent': None, 'working': True, 'needs_auth': False, 'supports_stream': True, 'image': True},
+    'MetaAIAccount': {'module': 'g4f.Provider.needs_auth.MetaAIAccount', 'label': 'Meta AI', 'parent': 'MetaAI', 'working': True, 'needs_auth': True, 'supports_stream': True, 'image': True},
+    'Mhystical': {'module': 'g4f.Provider.Mhystical', 'label': None, 'parent': None, 'working': True, 'needs_auth': False, 'supports_stream': False, 'image': True},
+    'MicrosoftDesigner': {'module': 'g4f.Provider.needs_auth.MicrosoftDesigner', 'label': 'Microsoft Designer', 'parent': None, 'working': True, 'needs_auth': True, 'supports_stream': True, 'image': True},
+    'MiniMax': {'module': 'g4f.Provider.mini_max.MiniMax', 'label': 'MiniMax API', 'parent': None, 'working': True, 'needs_auth': True, 'supports_stream': True, 'image': True},
+    'MyShell': {'module': 'g4f.Provider.not_working.MyShell', 'label': None, 'parent': None, 'working': False, 'needs_auth': False, 'supports_stream': True, 'image': False},
+    'Myshell': {'module': 'g4f.Provider.deprecated.Myshell', 'label': None, 'parent': None, 'working': False, 'needs_auth': False, 'supports_stream': True, 'image': False},
+    'OIVSCode': {'module': 'g4f.Provider.OIVSCode', 'label': 'OI VSCode Server', 'parent': None, 'working': True, 'needs_auth': False, 'supports_stream': True, 'image': True},
+    'Ollama': {'module': 'g4f.Provider.local.Ollama', 'label': 'Ollama', 'parent': None, 'working': True, 'needs_auth': False, 'supports_stream': True, 'image': True},
+    'Opchatgpts': {'module': 'g4f.Provider.deprecated.Opchatgpts', 'label': None, 'parent': None, 'working': False, 'needs_auth': False, 'supports_stream': True, 'image': False},
+    'OpenAssistant': {'module': 'g4f.Provider.deprecated.OpenAssistant', 'label': None, 'parent': None, 'working': False, 'needs_auth': True, 'supports_stream': True, 'image': False},
+    'OpenaiAPI': {'module': 'g4f.Provider.needs_auth.OpenaiAPI', 'label': 'OpenAI API', 'parent': None, 'working': True, 'needs_auth': True, 'supports_stream': True, 'image': True},
+    'OpenaiAccount': {'module': 'g4f.Provider.needs_auth.OpenaiAccount', 'label': 'OpenAI ChatGPT', 'parent': 'OpenaiChat', 'working': True, 'needs_auth': True, 'supports_stream': True, 'image': True},
+    'OpenaiChat': {'module': 'g4f.Provider.needs_auth.OpenaiChat', 'label': 'OpenAI ChatGPT', 'parent': None, 'working': True, 'needs_auth': False, 'supports_stream': True, 'image': True},
+    'OpenaiTemplate': {'module': 'g4f.Provider.template.OpenaiTemplate', 'label': None, 'parent': None, 'working': False, 'needs_auth': False, 'supports_stream': True, 'image': True},
+    'PerplexityApi': {'module': 'g4f.Provider.needs_auth.PerplexityApi', 'label': 'Perplexity API', 'parent': None, 'working': True, 'needs_auth': True, 'supports_stream': True, 'image': True},
+    'PerplexityLabs': {'module': 'g4f.Provider.PerplexityLabs', 'label': None, 'parent': None, 'working': True, 'needs_auth': False, 'supports_stream': True, 'image': True},
+    'Phind': {'module': 'g4f.Provider.deprecated.Phind', 'label': None, 'parent': None, 'working': False, 'needs_auth': False, 'supports_stream': True, 'image': False},
+    'Pi': {'module': 'g4f.Provider.Pi', 'label': None, 'parent': None, 'working': True, 'needs_auth': False, 'supports_stream': True, 'image': False},
+    'Pizzagpt': {'module': 'g4f.Provider.Pizzagpt', 'label': None, 'parent': None, 'working': False, 'needs_auth': False, 'supports_stream': True, 'image': True},
+    'Poe': {'module': 'g4f.Provider.not_working.Poe', 'label': None, 'parent': None, 'working': False, 'needs_auth': True, 'supports_stream': True, 'image': False},
+    'PollinationsAI': {'module': 'g4f.Provider.PollinationsAI', 'label': 'Pollinations AI', 'parent': None, 'working': True, 'needs_auth': False, 'supports_stream': False, 'image': True},
+    'PollinationsImage': {'module': 'g4f.Provider.PollinationsImage', 'label': 'Pollinations AI (Image)', 'parent': None, 'working': True, 'needs_auth': False, 'supports_stream': False, 'image': True},
+    'Prodia': {'module': 'g4f.Provider.Prodia', 'label': None, 'parent': None, 'working': True, 'needs_auth': False, 'supports_stream': True, 'image': True},
+    'Raycast': {'module': 'g4f.Provider.not_working.Raycast', 'label': None, 'parent': None, 'working': False, 'needs_auth': True, 'supports_stream': True, 'image': False},
+    'Reka': {'module': 'g4f.Provider.needs_auth.Reka', 'label': None, 'parent': None, 'working': True, 'needs_auth': True, 'supports_stream': True, 'image': False},
+    'Replicate': {'module': 'g4f.Provider.needs_auth.Replicate', 'label': None, 'parent': None, 'working': True, 'needs_auth': True, 'supports_stream': True, 'image': True},
+    'ReplicateHome': {'module': 'g4f.Provider.not_working.ReplicateHome', 'label': None, 'parent': None, 'working': False, 'needs_auth': False, 'supports_stream': True, 'image': True},
+    'RetryProvider': {'module': 'g4f.providers.retry_provider', 'label': None, 'parent': None, 'working': False, 'needs_auth': False, 'supports_stream': True, 'image': False},
+    'RobocodersAPI': {'module': 'g4f.Provider.not_working.RobocodersAPI', 'label': 'API Robocoders AI', 'parent': None, 'working': False, 'needs_auth': False, 'supports_stream': True, 'image': True},
+    'RubiksAI': {'module': 'g4f.Provider.not_working.RubiksAI', 'label': 'Rubiks AI', 'parent': None, 'working': True, 'needs_auth': False, 'supports_stream': True, 'image': True},
+    'TeachAnything': {'module': 'g4f.Provider.TeachAnything', 'label': None, 'parent': None, 'working': True, 'needs_auth': False, 'supports_stream': True, 'image': True},
+    'Theb': {'module': 'g4f.Provider.not_working.Theb', 'label': 'TheB.AI', 'parent': None, 'working': False, 'needs_auth': False, 'supports_stream': True, 'image': False},
+    'ThebApi': {'module': 'g4f.Provider.needs_auth.ThebApi', 'label': 'TheB.AI API', 'parent': None, 'working': True, 'needs_auth': True, 'supports_stream': True, 'image': True},
+    'Upstage': {'module': 'g4f.Provider.not_working.Upstage', 'label': None, 'parent': None, 'working': False, 'needs_auth': False, 'supports_stream': True, 'image': True},
+    'V50': {'module': 'g4f.Provider.deprecated.V50', 'label': None, 'parent': None, 'working': False, 'needs_auth': False, 'supports_stream': False, 'image': False},
+    'Vitalentum': {'module': 'g4f.Provider.deprecated.Vitalentum', 'label': None, 'parent': None, 'working': False, 'needs_auth': False, 'supports_stream': True, 'image': False},
+    'Wewordle': {'module': 'g4f.Provider.deprecated.Wewordle', 'label': None, 'parent': None, 'working': False, 'needs_auth': False, 'supports_stream': False, 'image': False},
+    'WhiteRabbitNeo': {'module': 'g4f.Provider.needs_auth.WhiteRabbitNeo', 'label': None, 'parent': None, 'working': True, 'needs_auth': True, 'supports_stream': True, 'image': False},
+    'Wuguokai': {'module': 'g4f.Provider.deprecated.Wuguokai', 'label': None, 'parent': None, 'working': False, 'needs_auth': False, 'supports_stream': False, 'image': False},
+    'Ylokh': {'module': 'g4f.Provider.deprecated.Ylokh', 'label': None, 'parent': None, 'working': False, 'needs_auth': False, 'supports_stream': True, 'image': False},
+    'You': {'module': 'g4f.Provider.You', 'label': 'You.com', 'parent': None, 'working': True, 'needs_auth': False, 'supports_stream': True, 'image': True},
+    'Yqcloud': {'module': 'g4f.Provider.Yqcloud', 'label': None, 'parent': None, 'working': True, 'needs_auth': False, 'supports_stream': True, 'image': True},
+    'xAI': {'module': 'g4f.Provider.needs_auth.xAI', 'label': None, 'parent': None, 'working': True, 'needs_auth': True, 'supports_stream': True, 'image': True},
+    'BlackForestLabsFlux1Dev': {'module': 'g4f.Provider.hf_space.BlackForestLabsFlux1Dev', 'label': None, 'parent': None, 'working': True, 'needs_auth': False, 'supports_stream': True, 'image': True},
+    'BlackForestLabsFlux1Schnell': {'module': 'g4f.Provider.hf_space.BlackForestLabsFlux1Schnell', 'label': None, 'parent': None, 'working': True, 'needs_auth': False, 'supports_stream': True, 'image': True},
+    'VoodoohopFlux1Schnell': {'module': 'g4f.Provider.hf_space.VoodoohopFlux1Schnell', 'label': None, 'parent': None, 'working': True, 'needs_auth': False, 'supports_stream': True, 'image': True},
+    'CohereForAI': {'module': 'g4f.Provider.hf_space.CohereForAI', 'label': None, 'parent': None, 'working': True, 'needs_auth': False, 'supports_stream': True, 'image': True},
+    'Janus_Pro_7B': {'module': 'g4f.Provider.hf_space.Janus_Pro_7B', 'label': None, 'parent': None, 'working': True, 'needs_auth': False, 'supports_stream': True, 'image': True},
+    'Qwen_QVQ_72B': {'module': 'g4f.Provider.hf_space.Qwen_QVQ_72B', 'label': None, 'parent': None, 'working': True, 'needs_auth': False, 'supports_stream': True, 'image': True},
+    'Qwen_Qwen_2_5M_Demo': {'module': 'g4f.Provider.hf_space.Qwen_Qwen_2_5M_Demo', 'label': None, 'parent': None, 'working': True, 'needs_auth': False, 'supports_stream': True, 'image': True},
+    'Qwen_Qwen_2_72B_Instruct': {'module': 'g4f.Provider.hf_space.Qwen_Qwen_2_72B_Instruct', 'label': None, 'parent': None, 'working': True, 'needs_auth': False, 'supports_stream': True, 'image': True},
+    'StableDiffusion35Large': {'module': 'g4f.Provider.hf_space.StableDiffusion35Large', 'label': None, 'parent': None, 'working': True, 'needs_auth': False, 'supports_stream': True, 'image': True},
+    'G4F': {'module': 'g4f.Provider.hf_space.G4F', 'label': 'G4F framework', 'parent': None, 'working': True, 'needs_auth': False, 'supports_stream': True, 'image': True},
+}
@@ -1,6 +1,5 @@
 from __future__ import annotations
 
-import requests
 import json
 import base64
 from typing import Optional
@@ -8,6 +7,7 @@ from typing import Optional
 from ..helper import filter_none
 from ...typing import AsyncResult, Messages, ImagesType
 from ...requests import StreamSession, raise_for_status
+from ...providers.model_catalog import catalog
 from ...providers.response import FinishReason, ToolCalls, Usage
 from ...errors import MissingAuthError
 from ...image import to_bytes, is_accepted_format
@@ -24,7 +24,9 @@ class Anthropic(OpenaiAPI):
     supports_system_message = True
     supports_message_history = True
     default_model = "claude-3-5-sonnet-latest"
-    models = [
+    image_max_pixels = 1568 * 1568
+    image_max_bytes = 5 * 1024 * 1024
+    fallback_models = [
         default_model,
         "claude-3-5-sonnet-20241022",
         "claude-3-5-haiku-latest",
@@ -43,17 +45,21 @@ class Anthropic(OpenaiAPI):
 
     @classmethod
     def get_models(cls, api_key: str = None, **kwargs):
-        if not cls.models:
-            url = f"https://api.anthropic.com/v1/models"
-            response = requests.get(url, headers={
-                "Content-Type": "application/json",
-                "x-api-key": api_key,
-                "anthropic-version": "2023-06-01"
-            })
-            raise_for_status(response)
-            models = response.json()
-            cls.models = [model["id"] for model in models["data"]]
-        return cls.models
+        return catalog.get_models(cls, api_key=api_key)
+
+    @classmethod
+    async def fetch_models(cls, api_key: str = None, **kwargs) -> list[str]:
+        if api_key is None:
+            raise MissingAuthError('Add a "api_key"')
+        async with StreamSession(headers={
+            "Content-Type": "application/json",
+            "x-api-key": api_key,
+            "anthropic-version": "2023-06-01"
+        }) as session:
+            async with session.get(f"{cls.api_base}/models") as response:
+                await raise_for_status(response)
+                data = await response.json()
+        return [model["id"] for model in data["data"]]
 
     @classmethod
     async def create_async_generator(
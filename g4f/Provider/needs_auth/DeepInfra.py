@@ -1,8 +1,8 @@
 from __future__ import annotations
 
-import requests
 from ...typing import AsyncResult, Messages
 from ...requests import StreamSession, raise_for_status
+from ...providers.model_catalog import catalog
 from ...providers.response import ImageResponse
 from ..template import OpenaiTemplate
 from ..helper import format_image_prompt
@@ -19,23 +19,22 @@ class DeepInfra(OpenaiTemplate):
 
     @classmethod
     def get_models(cls, **kwargs):
-        if not cls.models:
-            url = 'https://api.deepinfra.com/models/featured'
-            response = requests.get(url)
-            models = response.json()
-            
-            cls.models = []
-            cls.image_models = []
-            
-            for model in models:
-                if model["type"] == "text-generation":
-                    cls.models.append(model['model_name'])
-                elif model["reported_type"] == "text-to-image":
-                    cls.image_models.append(model['model_name'])
-            
-            cls.models.extend(cls.image_models)
+        return catalog.get_models(cls)
 
-        return cls.models
+    @classmethod
+    async def fetch_models(cls, **kwargs) -> dict:
+        async with StreamSession() as session:
+            async with session.get("https://api.deepinfra.com/models/featured") as response:
+                await raise_for_status(response)
+                data = await response.json()
+        models = []
+        image_models = []
+        for model in data:
+            if model["type"] == "text-generation":
+                models.append(model["model_name"])
+            elif model["reported_type"] == "text-to-image":
+                image_models.append(model["model_name"])
+        return {"models": models + image_models, "image_models": image_models}
 
     @classmethod
     def get_image_models(cls, **kwargs):
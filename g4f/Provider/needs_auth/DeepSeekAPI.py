@@ -10,7 +10,7 @@ from ..base_provider import AsyncAuthedProvider
 from ...providers.helper import get_last_user_message
 from ... import requests
 from ...errors import MissingAuthError
-from ...requests import get_args_from_nodriver, get_nodriver
+from ...requests import get_args_from_nodriver, browser_pool
 from ...providers.response import AuthResult, RequestLogin, Reasoning, JsonConversation, FinishReason
 from ...typing import AsyncResult, Messages
 from ... import debug
@@ -61,8 +61,8 @@ class DeepSeekAPI(AsyncAuthedProvider):
 
     @classmethod
     async def on_auth_async(cls, proxy: str = None, **kwargs) -> AsyncIterator:
-        if not hasattr(cls, "browser"):
-            cls.browser, cls.stop_browser = await get_nodriver()
+        # Open the browser for the login
+        await browser_pool.warm("deepseek", proxy)
         yield RequestLogin(cls.__name__, os.environ.get("G4F_LOGIN_URL") or "")
         async def callback(page):
             while True:
@@ -70,7 +70,7 @@ class DeepSeekAPI(AsyncAuthedProvider):
                 cls._access_token = json.loads(await page.evaluate("localStorage.getItem('userToken')") or "{}").get("value")
                 if cls._access_token:
                     break
-        args = await get_args_from_nodriver(cls.url, proxy, callback=callback, browser=cls.browser)
+        args = await get_args_from_nodriver(cls.url, proxy, callback=callback, user_data_dir="deepseek")
         yield AuthResult(
             api_key=cls._access_token,
             **args
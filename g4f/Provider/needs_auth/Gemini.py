@@ -22,9 +22,10 @@ from ..helper import format_prompt, get_cookies
 from ...providers.response import JsonConversation, SynthesizeData, RequestLogin, ImageResponse
 from ...requests.raise_for_status import raise_for_status
 from ...requests.aiohttp import get_connector
-from ...requests import get_nodriver
+from ...requests import browser_pool
 from ...errors import MissingAuthError
-from ...image import to_bytes
+from ...image import ImageRef
+from ...providers.upload_cache import upload_cache, get_account
 from ..helper import get_last_user_message
 from ... import debug
 
@@ -68,6 +69,7 @@ class Gemini(AsyncGeneratorProvider, ProviderModelMixin):
     models = [default_model, "gemini-1.5-flash", "gemini-1.5-pro"]
 
     synthesize_content_type = "audio/vnd.wav"
+    image_max_pixels = 3072 * 3072
     
     _cookies: Cookies = None
     _snlm0e: str = None
@@ -79,20 +81,16 @@ class Gemini(AsyncGeneratorProvider, ProviderModelMixin):
             if debug.logging:
                 print("Skip nodriver login in Gemini provider")
             return
-        browser, stop_browser = await get_nodriver(proxy=proxy, user_data_dir="gemini")
-        try:
+        async with browser_pool.lease("gemini", proxy=proxy) as lease:
             login_url = os.environ.get("G4F_LOGIN_URL")
             if login_url:
                 yield RequestLogin(cls.label, login_url)
-            page = await browser.get(f"{cls.url}/app")
+            page = await lease.get(f"{cls.url}/app")
             await page.select("div.ql-editor.textarea", 240)
             cookies = {}
             for c in await page.send(nodriver.cdp.network.get_cookies([cls.url])):
                 cookies[c.name] = c.value
-            await page.close()
             cls._cookies = cookies
-        finally:
-            stop_browser()
 
     @classmethod
     async def create_async_generator(
@@ -132,7 +130,7 @@ class Gemini(AsyncGeneratorProvider, ProviderModelMixin):
                 raise RuntimeError("Invalid cookies. SNlM0e not found")
 
             yield SynthesizeData(cls.__name__, {"text": messages[-1]["content"]})
-            images = await cls.upload_images(base_connector, images) if images else None
+            images = await cls.upload_images(base_connector, images, get_account((cls._cookies or {}).get("__Secure-1PSID"))) if images else None
             async with ClientSession(
                 cookies=cls._cookies,
                 headers=REQUEST_HEADERS,
@@ -263,13 +261,13 @@ class Gemini(AsyncGeneratorProvider, ProviderModelMixin):
             0,
         ]
 
-    async def upload_images(connector: BaseConnector, images: ImagesType) -> list:
-        async def upload_image(image: bytes, image_name: str = None):
+    async def upload_images(connector: BaseConnector, images: ImagesType, account: str = None) -> list:
+        async def upload_image(image: ImageRef, image_name: str = None) -> str:
             async with ClientSession(
                 headers=UPLOAD_IMAGE_HEADERS,
                 connector=connector
             ) as session:
-                image = to_bytes(image)
+                image = image.data
 
                 async with session.options(UPLOAD_IMAGE_URL) as response:
                     await raise_for_status(response)
@@ -294,8 +292,9 @@ class Gemini(AsyncGeneratorProvider, ProviderModelMixin):
                     upload_url, headers=headers, data=image
                 ) as response:
                     await raise_for_status(response)
-                    return [await response.text(), image_name]
-        return await asyncio.gather(*[upload_image(image, image_name) for image, image_name in images])
+                    return await response.text()
+        uploaded = await upload_cache.upload_all(Gemini.__name__, account, images, upload_image, cache=account is not None)
+        return [[image_url, image_name] for image_url, (_, image_name) in zip(uploaded, images)]
 
     @classmethod
     async def fetch_snlm0e(cls, session: ClientSession, cookies: Cookies):
@@ -2,7 +2,6 @@ from __future__ import annotations
 
 import base64
 import json
-import requests
 from typing import Optional
 from aiohttp import ClientSession, BaseConnector
 
@@ -10,10 +9,10 @@ from ...typing import AsyncResult, Messages, ImagesType
 from ...image import to_bytes, is_accepted_format
 from ...errors import MissingAuthError
 from ...requests.raise_for_status import raise_for_status
+from ...providers.model_catalog import catalog
 from ...providers.response import Usage, FinishReason
 from ..base_provider import AsyncGeneratorProvider, ProviderModelMixin
 from ..helper import get_connector
-from ... import debug
 
 class GeminiPro(AsyncGeneratorProvider, ProviderModelMixin):
     label = "Google Gemini API"
@@ -38,22 +37,22 @@ class GeminiPro(AsyncGeneratorProvider, ProviderModelMixin):
 
     @classmethod
     def get_models(cls, api_key: str = None, api_base: str = api_base) -> list[str]:
-        if not cls.models:
-            try:
-                url = f"{cls.api_base if not api_base else api_base}/models"
-                response = requests.get(url, params={"key": api_key})
-                raise_for_status(response)
-                data = response.json()
-                cls.models = [
-                    model.get("name").split("/").pop()
-                    for model in data.get("models")
-                    if "generateContent" in model.get("supportedGenerationMethods")
-                ]
-                cls.models.sort()
-            except Exception as e:
-                debug.log(e)
-                return cls.fallback_models
-        return cls.models
+        return catalog.get_models(cls, api_key=api_key, api_base=api_base)
+
+    @classmethod
+    async def fetch_models(cls, api_key: str = None, api_base: str = None, **kwargs) -> list[str]:
+        if not api_key:
+            raise MissingAuthError('Add a "api_key"')
+        url = f"{cls.api_base if not api_base else api_base}/models"
+        async with ClientSession() as session:
+            async with session.get(url, params={"key": api_key}) as response:
+                await raise_for_status(response)
+                data = await response.json()
+        return sorted([
+            model.get("name").split("/").pop()
+            for model in data.get("models")
+            if "generateContent" in model.get("supportedGenerationMethods")
+        ])
 
     @classmethod
     async def create_async_generator(
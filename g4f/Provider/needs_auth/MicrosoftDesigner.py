@@ -4,15 +4,15 @@ import uuid
 import aiohttp
 import random
 import asyncio
-import json
 
 from ...providers.response import ImageResponse
 from ...errors import MissingRequirementsError, NoValidHarFileError
 from ...typing import AsyncResult, Messages
 from ...requests.raise_for_status import raise_for_status
 from ...requests.aiohttp import get_connector
-from ...requests import get_nodriver
+from ...requests import browser_pool
 from ..Copilot import get_headers, get_har_files
+from ...har_index import har_index
 from ..base_provider import AsyncGeneratorProvider, ProviderModelMixin
 from ..helper import get_random_hex, format_image_prompt
 from ... import debug
@@ -124,28 +124,26 @@ def readHAR(url: str) -> tuple[str, str]:
     api_key = None
     user_agent = None
     for path in get_har_files():
-        with open(path, 'rb') as file:
-            try:
-                harFile = json.loads(file.read())
-            except json.JSONDecodeError:
-                # Error: not a HAR file!
-                continue
-            for v in harFile['log']['entries']:
-                if v['request']['url'].startswith(url):
-                    v_headers = get_headers(v)
-                    if "authorization" in v_headers:
-                        api_key = v_headers["authorization"].split(maxsplit=1).pop()
-                    if "user-agent" in v_headers:
-                        user_agent = v_headers["user-agent"]
+        entries = har_index.get_entries(path)
+        if entries is None:
+            # Error: not a HAR file!
+            continue
+        for v in entries:
+            if v['url'].startswith(url):
+                v_headers = get_headers(v)
+                if "authorization" in v_headers:
+                    api_key = v_headers["authorization"].split(maxsplit=1).pop()
+                if "user-agent" in v_headers:
+                    user_agent = v_headers["user-agent"]
+    har_index.save()
     if api_key is None:
         raise NoValidHarFileError("No access token found in .har files")
 
     return api_key, user_agent
 
 async def get_access_token_and_user_agent(url: str, proxy: str = None):
-    browser, stop_browser = await get_nodriver(proxy=proxy, user_data_dir="designer")
-    try:
-        page = await browser.get(url)
+    async with browser_pool.lease("designer", proxy=proxy) as lease:
+        page = await lease.get(url)
         user_agent = await page.evaluate("navigator.userAgent")
         access_token = None
         while access_token is None:
@@ -165,7 +163,4 @@ async def get_access_token_and_user_agent(url: str, proxy: str = None):
             """)
             if access_token is None:
                 await asyncio.sleep(1)
-        await page.close()
-        return access_token, user_agent
-    finally:
-        stop_browser()
\ No newline at end of file
+        return access_token, user_agent
\ No newline at end of file
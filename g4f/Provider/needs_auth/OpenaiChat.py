@@ -8,6 +8,7 @@ import json
 import base64
 import time
 import random
+from functools import partial
 from typing import AsyncIterator, Iterator, Optional, Generator, Dict, List
 from copy import copy
 
@@ -21,14 +22,16 @@ from ..base_provider import AsyncAuthedProvider, ProviderModelMixin
 from ...typing import AsyncResult, Messages, Cookies, ImagesType
 from ...requests.raise_for_status import raise_for_status
 from ...requests import StreamSession
-from ...requests import get_nodriver
-from ...image import ImageRequest, to_image, to_bytes, is_accepted_format
+from ...requests import browser_pool, session_pool
+from ...image import ImageRequest, ImageRef
 from ...errors import MissingAuthError, NoValidHarFileError
 from ...providers.response import JsonConversation, FinishReason, SynthesizeData, AuthResult, ImageResponse
 from ...providers.response import Sources, TitleGeneration, RequestLogin, Parameters, Reasoning
 from ..helper import format_cookies
 from ..openai.models import default_model, default_image_model, models, image_models, text_models
 from ..openai.har_file import get_request_config
+from ...providers.upload_cache import upload_cache, get_account
+from ...providers.token_pool import token_pool
 from ..openai.har_file import RequestConfig, arkReq, arkose_url, start_url, conversation_url, backend_url, backend_anon_url
 from ..openai.proofofwork import generate_proof_token
 from ..openai.new import get_requirements_token, get_config
@@ -93,6 +96,7 @@ class OpenaiChat(AsyncAuthedProvider, ProviderModelMixin):
     url = "https://chatgpt.com"
     working = True
     use_nodriver = True
+    har_accounts = True
     supports_gpt_4 = True
     supports_message_history = True
     supports_system_message = True
@@ -102,6 +106,8 @@ class OpenaiChat(AsyncAuthedProvider, ProviderModelMixin):
     vision_models = text_models
     models = models
     synthesize_content_type = "audio/mpeg"
+    image_max_pixels = 2048 * 2048
+    image_max_bytes = 20 * 1024 * 1024
     request_config = RequestConfig()
 
     _api_key: str = None
@@ -128,46 +134,43 @@ class OpenaiChat(AsyncAuthedProvider, ProviderModelMixin):
         session: StreamSession,
         auth_result: AuthResult,
         images: ImagesType,
+        headers: dict = None
     ) -> ImageRequest:
         """
-        Upload an image to the service and get the download URL
+        Upload images to the service and get the download URLs.
+        Images are uploaded concurrently, images uploaded before are not uploaded again.
         
         Args:
             session: The StreamSession object to use for requests
-            headers: The headers to include in the requests
+            auth_result: The auth result of the account
             images: The images to upload, either a PIL Image object or a bytes object
+            headers: The headers of the request, the headers of the auth result by default
         
         Returns:
-            An ImageRequest object that contains the download URL, file name, and other data
+            A list of ImageRequest objects that contain the download URL, file name, and other data
         """
-        async def upload_image(image, image_name):
-            # Convert the image to a PIL Image object and get the extension
-            data_bytes = to_bytes(image)
-            image = to_image(data_bytes)
-            extension = image.format.lower()
+        async def upload_image(image: ImageRef, image_name: str = None) -> dict:
             data = {
                 "file_name": "" if image_name is None else image_name,
-                "file_size": len(data_bytes),
+                "file_size": len(image),
                 "use_case":	"multimodal"
             }
             # Post the image data to the service and get the image data
-            headers = auth_result.headers if hasattr(auth_result, "headers") else None
             async with session.post(f"{cls.url}/backend-api/files", json=data, headers=headers) as response:
-                cls._update_request_args(auth_result, session)
+                cls._update_request_headers(headers, auth_result, session)
                 await raise_for_status(response, "Create file failed")
                 image_data = {
                     **data,
                     **await response.json(),
-                    "mime_type": is_accepted_format(data_bytes),
-                    "extension": extension,
+                    "mime_type": image.mime_type,
+                    "extension": image.extension,
                     "height": image.height,
                     "width": image.width
                 }
             # Put the image bytes to the upload URL and check the status
-            await asyncio.sleep(1)
             async with session.put(
                 image_data["upload_url"],
-                data=data_bytes,
+                data=image.data,
                 headers={
                     **UPLOAD_HEADERS,
                     "Content-Type": image_data["mime_type"],
@@ -181,15 +184,25 @@ class OpenaiChat(AsyncAuthedProvider, ProviderModelMixin):
             async with session.post(
                 f"{cls.url}/backend-api/files/{image_data['file_id']}/uploaded",
                 json={},
-                headers=auth_result.headers
+                headers=headers
             ) as response:
-                cls._update_request_args(auth_result, session)
+                cls._update_request_headers(headers, auth_result, session)
                 await raise_for_status(response, "Get download url failed")
                 image_data["download_url"] = (await response.json())["download_url"]
-            return ImageRequest(image_data)
+            return image_data
         if not images:
             return
-        return [await upload_image(image, image_name) for image, image_name in images]
+        if headers is None:
+            headers = getattr(auth_result, "headers", None)
+        # Anonymous sessions have no account, their uploads are not shared
+        account = get_account(getattr(auth_result, "api_key", None))
+        uploaded = await upload_cache.upload_all(
+            cls.__name__, account, images, upload_image, cache=account is not None
+        )
+        return [
+            ImageRequest({**image_data, "file_name": "" if image_name is None else image_name})
+            for image_data, (_, image_name) in zip(uploaded, images)
+        ]
 
     @classmethod
     def create_messages(cls, messages: Messages, image_requests: ImageRequest = None, system_hints: list = None):
@@ -240,7 +253,7 @@ class OpenaiChat(AsyncAuthedProvider, ProviderModelMixin):
         return messages
 
     @classmethod
-    async def get_generated_image(cls, session: StreamSession, auth_result: AuthResult, element: dict, prompt: str = None) -> ImageResponse:
+    async def get_generated_image(cls, session: StreamSession, auth_result: AuthResult, element: dict, prompt: str = None, headers: dict = None) -> ImageResponse:
         try:
             prompt = element["metadata"]["dalle"]["prompt"]
             file_id = element["asset_pointer"].split("file-service://", 1)[1]
@@ -248,9 +261,11 @@ class OpenaiChat(AsyncAuthedProvider, ProviderModelMixin):
             return
         except Exception as e:
             raise RuntimeError(f"No Image: {e.__class__.__name__}: {e}")
+        if headers is None:
+            headers = getattr(auth_result, "headers", None)
         try:
-            async with session.get(f"{cls.url}/backend-api/files/{file_id}/download", headers=auth_result.headers) as response:
-                cls._update_request_args(auth_result, session)
+            async with session.get(f"{cls.url}/backend-api/files/{file_id}/download", headers=headers) as response:
+                cls._update_request_headers(headers, auth_result, session)
                 await raise_for_status(response)
                 download_url = (await response.json())["download_url"]
                 return ImageResponse(download_url, prompt)
@@ -311,16 +326,20 @@ class OpenaiChat(AsyncAuthedProvider, ProviderModelMixin):
                     async with session.get(cls.url, headers=INIT_HEADERS) as response:
                         cls._update_request_args(auth_result, session)
                         await raise_for_status(response)
+                api_key = cls._api_key
+                headers = cls._headers.copy()
             else:
-                if cls._headers is None and getattr(auth_result, "cookies", None):
-                    cls._create_request_args(auth_result.cookies, auth_result.headers)
-                if not cls._set_api_key(getattr(auth_result, "api_key", None)):
+                # The request args of the account are kept in locals,
+                # the credential pool runs requests of other accounts meanwhile
+                api_key = getattr(auth_result, "api_key", None)
+                if not cls._is_valid_api_key(api_key):
                     raise MissingAuthError("Access token is not valid")
-                async with session.get(cls.url, headers=cls._headers) as response:
-                    cls._update_request_args(auth_result, session)
+                headers = cls._get_request_headers(auth_result, api_key)
+                async with session.get(cls.url, headers=headers) as response:
+                    cls._update_request_headers(headers, auth_result, session)
                     await raise_for_status(response)
                 try:
-                    image_requests = await cls.upload_images(session, auth_result, images) if images else None
+                    image_requests = await cls.upload_images(session, auth_result, images, headers) if images else None
                 except Exception as e:
                     debug.log("OpenaiChat: Upload image failed")
                     debug.log(f"{e.__class__.__name__}: {e}")
@@ -331,27 +350,19 @@ class OpenaiChat(AsyncAuthedProvider, ProviderModelMixin):
                 conversation = copy(conversation)
             if getattr(auth_result, "cookies", {}).get("oai-did") != getattr(conversation, "user_id", None):
                 conversation = Conversation(None, str(uuid.uuid4()))
-            if cls._api_key is None:
+            if api_key is None:
                 auto_continue = False
             conversation.finish_reason = None
             sources = Sources([])
             while conversation.finish_reason is None:
-                async with session.post(
-                    f"{cls.url}/backend-anon/sentinel/chat-requirements"
-                    if cls._api_key is None else
-                    f"{cls.url}/backend-api/sentinel/chat-requirements",
-                    json={"p": None if not getattr(auth_result, "proof_token", None) else get_requirements_token(getattr(auth_result, "proof_token", None))},
-                    headers=cls._headers
-                ) as response:
-                    if response.status in (401, 403):
-                        auth_result.reset()
-                    else:
-                        cls._update_request_args(auth_result, session)
-                    await raise_for_status(response)
-                    chat_requirements = await response.json()
-                    need_turnstile = chat_requirements.get("turnstile", {}).get("required", False)
-                    need_arkose = chat_requirements.get("arkose", {}).get("required", False) 
-                    chat_token = chat_requirements.get("token")  
+                chat_requirements, proofofwork = await token_pool.get(
+                    (cls.__name__, get_account(api_key), proxy),
+                    partial(cls.fetch_requirements, auth_result, proxy, api_key, headers.copy()),
+                    ttl=60
+                )
+                need_turnstile = chat_requirements.get("turnstile", {}).get("required", False)
+                need_arkose = chat_requirements.get("arkose", {}).get("required", False)
+                chat_token = chat_requirements.get("token")
 
                 # if need_arkose and cls.request_config.arkose_token is None:
                 #     await get_request_config(proxy)
@@ -359,14 +370,6 @@ class OpenaiChat(AsyncAuthedProvider, ProviderModelMixin):
                 #     cls._set_api_key(auth_result.access_token)
                 #     if auth_result.arkose_token is None:
                 #         raise MissingAuthError("No arkose token found in .har file")
-                if "proofofwork" in chat_requirements:
-                    if getattr(auth_result, "proof_token", None) is None:
-                        auth_result.proof_token = get_config(auth_result.headers.get("user-agent"))
-                    proofofwork = generate_proof_token(
-                        **chat_requirements["proofofwork"],
-                        user_agent=getattr(auth_result, "headers", {}).get("user-agent"),
-                        proof_token=getattr(auth_result, "proof_token", None)
-                    )
                 [debug.log(text) for text in (
                     #f"Arkose: {'False' if not need_arkose else auth_result.arkose_token[:12]+'...'}",
                     #f"Proofofwork: {'False' if proofofwork is None else proofofwork[:12]+'...'}",
@@ -404,33 +407,33 @@ class OpenaiChat(AsyncAuthedProvider, ProviderModelMixin):
                     conversation.parent_message_id = None
                     messages = messages if conversation_id is None else [messages[-1]]
                     data["messages"] = cls.create_messages(messages, image_requests, ["search"] if web_search else None)
-                headers = {
-                    **cls._headers,
+                conversation_headers = {
+                    **headers,
                     "accept": "text/event-stream",
                     "content-type": "application/json",
                     "openai-sentinel-chat-requirements-token": chat_token,
                 }
                 #if cls.request_config.arkose_token:
-                #    headers["openai-sentinel-arkose-token"] = cls.request_config.arkose_token
+                #    conversation_headers["openai-sentinel-arkose-token"] = cls.request_config.arkose_token
                 if proofofwork is not None:
-                    headers["openai-sentinel-proof-token"] = proofofwork
+                    conversation_headers["openai-sentinel-proof-token"] = proofofwork
                 if need_turnstile and getattr(auth_result, "turnstile_token", None) is not None:
-                    headers['openai-sentinel-turnstile-token'] = auth_result.turnstile_token
+                    conversation_headers['openai-sentinel-turnstile-token'] = auth_result.turnstile_token
                 async with session.post(
                     f"{cls.url}/backend-anon/conversation"
-                    if cls._api_key is None else
+                    if api_key is None else
                     f"{cls.url}/backend-api/conversation",
                     json=data,
-                    headers=headers
+                    headers=conversation_headers
                 ) as response:
-                    cls._update_request_args(auth_result, session)
+                    cls._update_request_headers(headers, auth_result, session)
                     if response.status == 403:
                         auth_result.proof_token = None
                         cls.request_config.proof_token = None
                     await raise_for_status(response)
                     buffer = u""
                     async for line in response.iter_lines():
-                        async for chunk in cls.iter_messages_line(session, auth_result, line, conversation, sources):
+                        async for chunk in cls.iter_messages_line(session, auth_result, line, conversation, sources, headers):
                             if isinstance(chunk, str):
                                 chunk = chunk.replace("\ue203", "").replace("\ue204", "").replace("\ue206", "")
                                 buffer += chunk
@@ -473,14 +476,14 @@ class OpenaiChat(AsyncAuthedProvider, ProviderModelMixin):
                     "action": "continue" if conversation.finish_reason == "max_tokens" else "variant",
                     "conversation": conversation.get_dict(),
                     "proof_token": cls.request_config.proof_token,
-                    "cookies": cls._cookies,
-                    "headers": cls._headers,
+                    "cookies": getattr(auth_result, "cookies", None),
+                    "headers": headers,
                     "web_search": web_search,
                 })
             yield FinishReason(conversation.finish_reason)
 
     @classmethod
-    async def iter_messages_line(cls, session: StreamSession, auth_result: AuthResult, line: bytes, fields: Conversation, sources: Sources) -> AsyncIterator:
+    async def iter_messages_line(cls, session: StreamSession, auth_result: AuthResult, line: bytes, fields: Conversation, sources: Sources, headers: dict = None) -> AsyncIterator:
         if not line.startswith(b"data: "):
             return
         elif line.startswith(b"data: [DONE]"):
@@ -532,7 +535,7 @@ class OpenaiChat(AsyncAuthedProvider, ProviderModelMixin):
                         generated_images = []
                         for element in c.get("parts"):
                             if isinstance(element, dict) and element.get("content_type") == "image_asset_pointer":
-                                image = cls.get_generated_image(session, auth_result, element)
+                                image = cls.get_generated_image(session, auth_result, element, headers=headers)
                                 generated_images.append(image)
                         for image_response in await asyncio.gather(*generated_images):
                             if image_response is not None:
@@ -605,11 +608,49 @@ class OpenaiChat(AsyncAuthedProvider, ProviderModelMixin):
             "cookies": cls.request_config.cookies,
         })
 
+    @classmethod
+    async def fetch_requirements(cls, auth_result: AuthResult, proxy: str = None, api_key: str = None, headers: dict = None) -> tuple[dict, Optional[str]]:
+        """
+        Fetches the chat requirements and solves their proof of work.
+        A pooled session is used, so they can be fetched ahead of a request.
+        The api key and the headers of the account are passed in,
+        the class attributes may belong to another account.
+        """
+        requirements_token = None
+        if getattr(auth_result, "proof_token", None):
+            # Solve off the event loop, so that other streams are not blocked
+            requirements_token = await asyncio.get_running_loop().run_in_executor(None, get_requirements_token, auth_result.proof_token)
+        async with session_pool.lease(cls.__name__, proxy=proxy, impersonate="chrome", account=get_account(api_key)) as session:
+            async with session.post(
+                f"{cls.url}/backend-anon/sentinel/chat-requirements"
+                if api_key is None else
+                f"{cls.url}/backend-api/sentinel/chat-requirements",
+                json={"p": requirements_token},
+                headers=headers
+            ) as response:
+                if response.status in (401, 403):
+                    auth_result.reset()
+                else:
+                    cls._update_auth_cookies(auth_result, session)
+                await raise_for_status(response)
+                chat_requirements = await response.json()
+        proofofwork = None
+        if "proofofwork" in chat_requirements:
+            if getattr(auth_result, "proof_token", None) is None:
+                auth_result.proof_token = get_config(auth_result.headers.get("user-agent"))
+            # Solve off the event loop, so that other streams are not blocked
+            proofofwork = await asyncio.get_running_loop().run_in_executor(None, partial(
+                generate_proof_token,
+                **chat_requirements["proofofwork"],
+                user_agent=getattr(auth_result, "headers", {}).get("user-agent"),
+                proof_token=getattr(auth_result, "proof_token", None)
+            ))
+        return chat_requirements, proofofwork
+
     @classmethod
     async def nodriver_auth(cls, proxy: str = None):
-        browser, stop_browser = await get_nodriver(proxy=proxy)
-        try:
-            page = browser.main_tab
+        async with browser_pool.lease("openai", proxy=proxy) as lease:
+            page = await lease.get("about:blank")
             def on_request(event: nodriver.cdp.network.RequestWillBeSent):
                 if event.request.url == start_url or event.request.url.startswith(conversation_url):
                     cls.request_config.headers = event.request.headers
@@ -632,7 +673,7 @@ class OpenaiChat(AsyncAuthedProvider, ProviderModelMixin):
                     )
             await page.send(nodriver.cdp.network.enable())
             page.add_handler(nodriver.cdp.network.RequestWillBeSent, on_request)
-            page = await browser.get(cls.url)
+            page = await lease.get(cls.url)
             user_agent = await page.evaluate("window.navigator.userAgent")
             await page.select("#prompt-textarea", 240)
             await page.evaluate("document.getElementById('prompt-textarea').innerText = 'Hello'")
@@ -653,11 +694,8 @@ class OpenaiChat(AsyncAuthedProvider, ProviderModelMixin):
                 await asyncio.sleep(1)
             cls.request_config.data_build = await page.evaluate("document.documentElement.getAttribute('data-build')")
             cls.request_config.cookies = await page.send(get_cookies([cls.url]))
-            await page.close()
             cls._create_request_args(cls.request_config.cookies, cls.request_config.headers, user_agent=user_agent)
             cls._set_api_key(cls._api_key)
-        finally:
-            stop_browser()
 
     @staticmethod
     def get_default_headers() -> Dict[str, str]:
@@ -677,26 +715,58 @@ class OpenaiChat(AsyncAuthedProvider, ProviderModelMixin):
     @classmethod
     def _update_request_args(cls, auth_result: AuthResult, session: StreamSession):
         if hasattr(auth_result, "cookies"):
-            for c in session.cookie_jar if hasattr(session, "cookie_jar") else session.cookies.jar:
-                auth_result.cookies[getattr(c, "key", getattr(c, "name", ""))] = c.value
+            cls._update_auth_cookies(auth_result, session)
             cls._cookies = auth_result.cookies
         cls._update_cookie_header()
 
+    @staticmethod
+    def _update_auth_cookies(auth_result: AuthResult, session: StreamSession):
+        if hasattr(auth_result, "cookies"):
+            for c in session.cookie_jar if hasattr(session, "cookie_jar") else session.cookies.jar:
+                auth_result.cookies[getattr(c, "key", getattr(c, "name", ""))] = c.value
+
     @classmethod
-    def _set_api_key(cls, api_key: str):
+    def _get_request_headers(cls, auth_result: AuthResult, api_key: str) -> dict:
+        """Returns a copy of the headers of the account, with its api key and cookies."""
+        headers = dict(getattr(auth_result, "headers", None) or cls._headers or cls.get_default_headers())
+        headers["authorization"] = f"Bearer {api_key}"
+        if getattr(auth_result, "cookies", None):
+            headers["cookie"] = format_cookies(auth_result.cookies)
+        return headers
+
+    @classmethod
+    def _update_request_headers(cls, headers: Optional[dict], auth_result: AuthResult, session: StreamSession):
+        cls._update_auth_cookies(auth_result, session)
+        if headers is not None and getattr(auth_result, "cookies", None):
+            headers["cookie"] = format_cookies(auth_result.cookies)
+
+    @staticmethod
+    def _get_expires(api_key: str) -> Optional[int]:
+        exp = api_key.split(".")[1]
+        exp = (exp + "=" * (4 - len(exp) % 4)).encode()
+        return json.loads(base64.b64decode(exp)).get("exp")
+
+    @classmethod
+    def _is_valid_api_key(cls, api_key: str) -> bool:
         if api_key:
-            exp = api_key.split(".")[1]
-            exp = (exp + "=" * (4 - len(exp) % 4)).encode()
-            cls._expires = json.loads(base64.b64decode(exp)).get("exp")
-            debug.log(f"OpenaiChat: API key expires at\n {cls._expires} we have:\n {time.time()}")
-            if time.time() > cls._expires:
+            expires = cls._get_expires(api_key)
+            debug.log(f"OpenaiChat: API key expires at\n {expires} we have:\n {time.time()}")
+            if time.time() > expires:
                 debug.log(f"OpenaiChat: API key is expired")
             else:
-                cls._api_key = api_key
-                cls._headers["authorization"] = f"Bearer {api_key}"
                 return True
         return False
 
+    @classmethod
+    def _set_api_key(cls, api_key: str):
+        if api_key:
+            cls._expires = cls._get_expires(api_key)
+        if cls._is_valid_api_key(api_key):
+            cls._api_key = api_key
+            cls._headers["authorization"] = f"Bearer {api_key}"
+            return True
+        return False
+
     @classmethod
     def _update_cookie_header(cls):
         if cls._cookies:
@@ -13,6 +13,7 @@ from copy import deepcopy
 from .crypt import decrypt, encrypt
 from ...requests import StreamSession
 from ...cookies import get_cookies_dir
+from ...har_index import har_index
 from ...errors import NoValidHarFileError
 from ... import debug
 
@@ -58,49 +59,45 @@ def get_har_files():
 
 def readHAR(request_config: RequestConfig):
     for path in get_har_files():
-        with open(path, 'rb') as file:
-            try:
-                harFile = json.loads(file.read())
-            except json.JSONDecodeError:
-                # Error: not a HAR file!
-                continue
-            for v in harFile['log']['entries']:
-                v_headers = get_headers(v)
-                if arkose_url == v['request']['url']:
-                    request_config.arkose_request = parseHAREntry(v)
-                elif v['request']['url'].startswith(start_url):
-                    try:
-                        match = re.search(r'"accessToken":"(.*?)"', v["response"]["content"]["text"])
-                        if match:
-                            request_config.access_token = match.group(1)
-                    except KeyError:
-                        pass
-                    try:
-                        if "openai-sentinel-proof-token" in v_headers:
-                            request_config.headers = v_headers
-                            request_config.proof_token = json.loads(base64.b64decode(
-                                v_headers["openai-sentinel-proof-token"].split("gAAAAAB", 1)[-1].encode()
-                            ).decode())
-                        if "openai-sentinel-turnstile-token" in v_headers:
-                            request_config.turnstile_token = v_headers["openai-sentinel-turnstile-token"]
-                        if "authorization" in v_headers:
-                            request_config.access_token = v_headers["authorization"].split(" ")[1]
-                        request_config.cookies = {c['name']: c['value'] for c in v['request']['cookies']}
-                    except Exception as e:
-                        debug.log(f"Error on read headers: {e}")
+        # The entries are read from the index, only changed files are parsed again
+        entries = har_index.get_entries(path)
+        if entries is None:
+            # Error: not a HAR file!
+            continue
+        for v in entries:
+            v_headers = get_headers(v)
+            if arkose_url == v['url']:
+                request_config.arkose_request = parseHAREntry(v)
+            elif v['url'].startswith(start_url):
+                if "access_token" in v:
+                    request_config.access_token = v["access_token"]
+                try:
+                    if "openai-sentinel-proof-token" in v_headers:
+                        request_config.headers = v_headers
+                        request_config.proof_token = json.loads(base64.b64decode(
+                            v_headers["openai-sentinel-proof-token"].split("gAAAAAB", 1)[-1].encode()
+                        ).decode())
+                    if "openai-sentinel-turnstile-token" in v_headers:
+                        request_config.turnstile_token = v_headers["openai-sentinel-turnstile-token"]
+                    if "authorization" in v_headers:
+                        request_config.access_token = v_headers["authorization"].split(" ")[1]
+                    request_config.cookies = dict(v['cookies'])
+                except Exception as e:
+                    debug.log(f"Error on read headers: {e}")
+    har_index.save()
     if request_config.proof_token is None:
         raise NoValidHarFileError("No proof_token found in .har files")
 
 def get_headers(entry) -> dict:
-    return {h['name'].lower(): h['value'] for h in entry['request']['headers'] if h['name'].lower() not in ['content-length', 'cookie'] and not h['name'].startswith(':')}
+    return {name: value for name, value in entry['headers'].items() if name not in ['content-length', 'cookie'] and not name.startswith(':')}
 
 def parseHAREntry(entry) -> arkReq:
     tmpArk = arkReq(
-        arkURL=entry['request']['url'],
+        arkURL=entry['url'],
         arkBx="",
         arkHeader=get_headers(entry),
-        arkBody={p['name']: unquote(p['value']) for p in entry['request']['postData']['params'] if p['name'] not in ['rnd']},
-        arkCookies={c['name']: c['value'] for c in entry['request']['cookies']},
+        arkBody={name: unquote(value) for name, value in entry['params'].items() if name not in ['rnd']},
+        arkCookies=dict(entry['cookies']),
         userAgent=""
     )
     tmpArk.userAgent = tmpArk.arkHeader.get('user-agent', '')
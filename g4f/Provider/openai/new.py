@@ -1,4 +1,3 @@
-import hashlib
 import base64
 import random
 import json
@@ -15,6 +14,7 @@ from datetime import (
 )
 
 from .har_file import RequestConfig
+from .pow_solver import pow_solver
 
 cores       = [16, 24, 32]
 screens     = [3000, 4000, 6000]
@@ -414,31 +414,14 @@ def get_answer_token(seed, diff, config):
         raise Exception("Failed to solve 'gAAAAAB' challenge")
 
 def generate_answer(seed, diff, config):
-    diff_len            = len(diff)
-    seed_encoded        = seed.encode()
     p1 = (json.dumps(config[:3], separators=(',', ':'), ensure_ascii=False)[:-1] + ',').encode()
     p2 = (',' + json.dumps(config[4:9], separators=(',', ':'), ensure_ascii=False)[1:-1] + ',').encode()
     p3 = (',' + json.dumps(config[10:], separators=(',', ':'), ensure_ascii=False)[1:]).encode()
 
-    target_diff = bytes.fromhex(diff)
-
-    for i in range(maxAttempts):
-        d1   = str(i).encode()
-        d2   = str(i >> 1).encode()
-        
-        string = (
-            p1 
-            + d1 
-            + p2 
-            + d2 
-            + p3
-        )
-        
-        base_encode = base64.b64encode(string)
-        hash_value  = hashlib.new("sha3_512", seed_encoded + base_encode).digest()
-        
-        if hash_value[:diff_len] <= target_diff:
-            return base_encode.decode(), True
+    # The nonces are config[3] = i and config[9] = i >> 1
+    answer = pow_solver.solve((p1, p2, p3), seed, diff, maxAttempts, hex_compare=False, shifts=(0, 1))
+    if answer is not None:
+        return answer, True
 
     return 'wQ8Lk5FbGpA2NcR9dShT6gYjU7VxZ4D' + base64.b64encode(f'"{seed}"'.encode()).decode(), False
 
@@ -0,0 +1,178 @@
+from __future__ import annotations
+
+import json
+import base64
+import hashlib
+import threading
+import multiprocessing
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, Executor, FIRST_COMPLETED, wait
+from concurrent.futures.process import BrokenProcessPool
+from typing import Optional
+
+from ... import debug
+
+def split_proof_token(proof_token: list) -> tuple[bytes, bytes]:
+    """Splits `json.dumps(proof_token)` into the parts before and after the nonce at index 3."""
+    return (
+        (json.dumps(proof_token[:3])[:-1] + ", ").encode(),
+        (", " + json.dumps(proof_token[4:])[1:]).encode(),
+    )
+
+def search(
+    parts: tuple[bytes, ...],
+    seed: bytes,
+    difficulty: str,
+    hex_compare: bool,
+    start: int,
+    stop: int,
+    shifts: tuple[int, ...] = (0,)
+) -> Optional[bytes]:
+    """
+    Searches the nonces from start to stop and returns the base64 encoded answer, or None.
+
+    The answer is `parts[0] + str(i >> shifts[0]) + parts[1] + ... + parts[-1]`.
+    The base64 of the fixed prefix and suffix and the hash state of the seed
+    and the prefix are computed once, only the bytes around the nonces are encoded in the loop.
+    """
+    first, *middle, last = parts
+    aligned = len(first) - len(first) % 3
+    prefix = base64.b64encode(first[:aligned])
+    head = first[aligned:]
+    state = hashlib.sha3_512(seed + prefix)
+    # The encoded suffix for each alignment of the bytes before it
+    tails = []
+    for offset in range(3):
+        split = (3 - offset) % 3
+        tails.append((last[:split], base64.b64encode(last[split:])))
+    length = len(difficulty)
+    if hex_compare:
+        size = (length + 1) // 2
+    else:
+        target = bytes.fromhex(difficulty)
+    middle.append(b"")
+    for i in range(start, stop):
+        variable = head + b"".join([str(i >> shift).encode() + part for shift, part in zip(shifts, middle)])
+        tail, encoded_tail = tails[len(variable) % 3]
+        encoded = base64.b64encode(variable + tail)
+        hash_value = state.copy()
+        hash_value.update(encoded)
+        hash_value.update(encoded_tail)
+        digest = hash_value.digest()
+        if hex_compare:
+            solved = digest[:size].hex()[:length] <= difficulty
+        else:
+            solved = digest[:length] <= target
+        if solved:
+            return prefix + encoded + encoded_tail
+    return None
+
+class PowSolver:
+    """
+    Solver for proof of work challenges, like the sentinel tokens of OpenAI.
+
+    The nonces are searched in the calling thread, or in ranges across
+    a process pool if enabled. The answer with the lowest nonce is returned,
+    like by a sequential search. Answers are memoized by config, seed and difficulty.
+
+    Attributes:
+        processes (int): The number of worker processes, 0 searches in the calling thread.
+        chunk_size (int): The number of nonces in a range.
+        max_entries (int): The number of memoized answers.
+    """
+    processes: int = 0
+    chunk_size: int = 20000
+    max_entries: int = 128
+
+    def __init__(self) -> None:
+        self.executor: Optional[Executor] = None
+        self.answers: OrderedDict[tuple, Optional[str]] = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get_executor(self) -> Optional[Executor]:
+        if self.processes < 2:
+            return None
+        with self.lock:
+            if self.executor is None:
+                try:
+                    # Forked workers could inherit the locks of other threads, like of the event loop
+                    self.executor = ProcessPoolExecutor(self.processes, mp_context=multiprocessing.get_context("spawn"))
+                except (OSError, NotImplementedError) as e:
+                    debug.log(f"Proof of work: Process pool not available: {type(e).__name__}: {e}")
+                    self.processes = 0
+            return self.executor
+
+    def solve(
+        self,
+        parts: tuple[bytes, ...],
+        seed: str,
+        difficulty: str,
+        max_attempts: int,
+        hex_compare: bool = True,
+        shifts: tuple[int, ...] = (0,)
+    ) -> Optional[str]:
+        """Returns the base64 encoded answer, or None if no nonce below max_attempts solves it."""
+        key = (parts, seed, difficulty, hex_compare, shifts)
+        with self.lock:
+            if key in self.answers:
+                self.answers.move_to_end(key)
+                return self.answers[key]
+        args = (parts, seed.encode(), difficulty, hex_compare)
+        executor = self.get_executor()
+        answer = None
+        if executor is not None:
+            try:
+                answer = self.search_parallel(executor, args, max_attempts, shifts)
+            except BrokenProcessPool as e:
+                debug.log(f"Proof of work: {type(e).__name__}: {e}")
+                self.executor = None
+                executor = None
+        if executor is None:
+            answer = search(*args, 0, max_attempts, shifts)
+        answer = None if answer is None else answer.decode()
+        with self.lock:
+            self.answers[key] = answer
+            while len(self.answers) > self.max_entries:
+                self.answers.popitem(last=False)
+        return answer
+
+    def search_parallel(self, executor: Executor, args: tuple, max_attempts: int, shifts: tuple[int, ...]) -> Optional[bytes]:
+        ranges = iter(range(0, max_attempts, self.chunk_size))
+        pending = {}
+        best = None
+        def submit() -> None:
+            start = next(ranges, None)
+            if start is not None:
+                pending[executor.submit(search, *args, start, min(start + self.chunk_size, max_attempts), shifts)] = start
+        # Keep each process busy, later ranges are only searched if no answer was found
+        for _ in range(self.processes * 2):
+            submit()
+        try:
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    start = pending.pop(future)
+                    answer = future.result()
+                    if answer is not None and (best is None or start < best[0]):
+                        best = (start, answer)
+                if best is None:
+                    for _ in done:
+                        submit()
+                    continue
+                # Only the running ranges before the answer can have a lower nonce
+                for future, start in list(pending.items()):
+                    if start > best[0]:
+                        future.cancel()
+                        del pending[future]
+        finally:
+            # Don't leave queued ranges in the pool, if the search failed
+            for future in pending:
+                future.cancel()
+        return None if best is None else best[1]
+
+    def shutdown(self) -> None:
+        if self.executor is not None:
+            self.executor.shutdown(wait=False)
+            self.executor = None
+
+pow_solver = PowSolver()
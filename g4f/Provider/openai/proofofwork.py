@@ -1,9 +1,9 @@
 import random
-import hashlib
-import json
 import base64
 from datetime import datetime, timezone
 
+from .pow_solver import pow_solver, split_proof_token
+
 def generate_proof_token(required: bool, seed: str = "", difficulty: str = "", user_agent: str = None, proof_token: str = None):
     if not required:
         return
@@ -24,15 +24,9 @@ def generate_proof_token(required: bool, seed: str = "", difficulty: str = "", u
             random.choice(["alert", "ontransitionend", "onprogress"])
         ]
 
-    diff_len = len(difficulty)
-    for i in range(100000):
-        proof_token[3] = i
-        json_data = json.dumps(proof_token)
-        base = base64.b64encode(json_data.encode()).decode()
-        hash_value = hashlib.sha3_512((seed + base).encode()).digest()
-
-        if hash_value.hex()[:diff_len] <= difficulty:
-            return "gAAAAAB" + base
+    base = pow_solver.solve(split_proof_token(proof_token), seed, difficulty, 100000)
+    if base is not None:
+        return "gAAAAAB" + base
 
     fallback_base = base64.b64encode(f'"{seed}"'.encode()).decode()
     return "gAAAAABwQ8Lk5FbGpA2NcR9dShT6gYjU7VxZ4D" + fallback_base
@@ -1,9 +1,7 @@
 from __future__ import annotations
 
-import json
-
 from ...typing import Messages, AsyncResult, ImagesType
-from ...requests import StreamSession
+from ...requests import StreamSession, iter_ndjson
 from ...image import to_data_uri
 from ...providers.base_provider import AsyncGeneratorProvider, ProviderModelMixin
 from ...providers.response import RawResponse
@@ -36,5 +34,5 @@ class BackendApi(AsyncGeneratorProvider, ProviderModelMixin):
                 "api_key": api_key,
                 **kwargs
             }, ssl=cls.ssl) as response:
-                async for line in response.iter_lines():
-                    yield RawResponse(**json.loads(line))
\ No newline at end of file
+                async for data in iter_ndjson(response):
+                    yield RawResponse(**data)
\ No newline at end of file
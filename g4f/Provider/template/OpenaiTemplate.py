@@ -1,16 +1,14 @@
 from __future__ import annotations
 
-import json
-import requests
-
 from ..helper import filter_none, format_image_prompt
 from ..base_provider import AsyncGeneratorProvider, ProviderModelMixin, RaiseErrorMixin
 from ...typing import Union, Optional, AsyncResult, Messages, ImagesType
-from ...requests import StreamSession, raise_for_status
+from ...requests import session_pool, raise_for_status, iter_sse, get_delta_content
+from ...providers.model_catalog import catalog
+from ...providers.upload_cache import get_account
 from ...providers.response import FinishReason, ToolCalls, Usage, ImageResponse
 from ...errors import MissingAuthError, ResponseError
 from ...image import to_data_uri
-from ... import debug
 
 class OpenaiTemplate(AsyncGeneratorProvider, ProviderModelMixin, RaiseErrorMixin):
     api_base = ""
@@ -21,30 +19,31 @@ class OpenaiTemplate(AsyncGeneratorProvider, ProviderModelMixin, RaiseErrorMixin
     fallback_models = []
     sort_models = True
     ssl = None
+    image_max_pixels = 2048 * 2048
+    image_max_bytes = 20 * 1024 * 1024
 
     @classmethod
     def get_models(cls, api_key: str = None, api_base: str = None) -> list[str]:
-        if not cls.models:
-            try:
-                headers = {}
-                if api_base is None:
-                    api_base = cls.api_base
-                if api_key is None and cls.api_key is not None:
-                    api_key = cls.api_key
-                if api_key is not None:
-                    headers["authorization"] = f"Bearer {api_key}"
-                response = requests.get(f"{api_base}/models", headers=headers, verify=cls.ssl)
-                raise_for_status(response)
-                data = response.json()
-                data = data.get("data") if isinstance(data, dict) else data
-                cls.image_models = [model.get("id") for model in data if model.get("image")]
-                cls.models = [model.get("id") for model in data]
-                if cls.sort_models:
-                    cls.models.sort()
-            except Exception as e:
-                debug.log(e)
-                return cls.fallback_models
-        return cls.models
+        return catalog.get_models(cls, api_key=api_key, api_base=api_base)
+
+    @classmethod
+    async def fetch_models(cls, api_key: str = None, api_base: str = None, **kwargs) -> dict:
+        headers = {}
+        if api_base is None:
+            api_base = cls.api_base
+        if api_key is None and cls.api_key is not None:
+            api_key = cls.api_key
+        if api_key is not None:
+            headers["authorization"] = f"Bearer {api_key}"
+        async with session_pool.lease(cls.__name__, account=get_account(api_key), headers=headers) as session:
+            async with session.get(f"{api_base}/models", ssl=cls.ssl) as response:
+                await raise_for_status(response)
+                data = await response.json()
+        data = data.get("data") if isinstance(data, dict) else data
+        models = [model.get("id") for model in data]
+        if cls.sort_models:
+            models.sort()
+        return {"models": models, "image_models": [model.get("id") for model in data if model.get("image")]}
 
     @classmethod
     async def create_async_generator(
@@ -73,11 +72,13 @@ class OpenaiTemplate(AsyncGeneratorProvider, ProviderModelMixin, RaiseErrorMixin
             api_key = cls.api_key
         if cls.needs_auth and api_key is None:
             raise MissingAuthError('Add a "api_key"')
-        async with StreamSession(
+        async with session_pool.lease(
+            cls.__name__,
             proxy=proxy,
+            impersonate=impersonate,
+            account=get_account(api_key),
             headers=cls.get_headers(stream, api_key, headers),
             timeout=timeout,
-            impersonate=impersonate,
         ) as session:
             model = cls.get_model(model, api_key=api_key, api_base=api_base)
             if api_base is None:
@@ -145,26 +146,30 @@ class OpenaiTemplate(AsyncGeneratorProvider, ProviderModelMixin, RaiseErrorMixin
                     await raise_for_status(response)
                     first = True
                     is_thinking = 0
-                    async for line in response.iter_lines():
-                        if line.startswith(b"data: "):
-                            chunk = line[6:]
-                            if chunk == b"[DONE]":
-                                break
-                            data = json.loads(chunk)
+                    async for event in iter_sse(response):
+                        if event.data == b"[DONE]":
+                            break
+                        delta = get_delta_content(event.data)
+                        if delta is None:
+                            data = event.json()
                             cls.raise_error(data)
                             choice = data["choices"][0]
-                            if "content" in choice["delta"] and choice["delta"]["content"]:
-                                delta = choice["delta"]["content"]
-                                if first:
-                                    delta = delta.lstrip()
-                                if delta:
-                                    first = False
-                                    yield delta
-                            if "usage" in data and data["usage"]:
-                                yield Usage(**data["usage"])
-                            if "finish_reason" in choice and choice["finish_reason"] is not None:
-                                yield FinishReason(choice["finish_reason"])
-                                break
+                            delta = choice["delta"].get("content")
+                        else:
+                            data = choice = None
+                        if delta:
+                            if first:
+                                delta = delta.lstrip()
+                            if delta:
+                                first = False
+                                yield delta
+                        if data is None:
+                            continue
+                        if "usage" in data and data["usage"]:
+                            yield Usage(**data["usage"])
+                        if "finish_reason" in choice and choice["finish_reason"] is not None:
+                            yield FinishReason(choice["finish_reason"])
+                            break
                 else:
                     await raise_for_status(response)
                     raise ResponseError(f"Not supported content-type: {content_type}")
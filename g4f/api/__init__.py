@@ -6,11 +6,12 @@ import uvicorn
 import secrets
 import os
 import shutil
-from email.utils import formatdate
 import os.path
 import hashlib
 import asyncio
-from fastapi import FastAPI, Response, Request, UploadFile, Depends
+from urllib.parse import quote
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Response, Request, UploadFile, Depends, Header
 from fastapi.middleware.wsgi import WSGIMiddleware
 from fastapi.responses import StreamingResponse, RedirectResponse, HTMLResponse, JSONResponse
 from fastapi.exceptions import RequestValidationError
@@ -29,7 +30,6 @@ from fastapi.encoders import jsonable_encoder
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials, HTTPBasic
 from fastapi.middleware.cors import CORSMiddleware
 from starlette.responses import FileResponse
-from types import SimpleNamespace
 from typing import Union, Optional, List
 
 import g4f
@@ -37,17 +37,29 @@ import g4f.Provider
 import g4f.debug
 from g4f.client import AsyncClient, ChatCompletion, ImagesResponse, convert_to_provider
 from g4f.providers.response import BaseConversation, JsonConversation
+from g4f.providers.scores import scores
+from g4f.providers.circuit_breaker import breakers
+from g4f.capabilities import index, Capability
+from g4f.requests import session_pool, browser_pool
 from g4f.client.helper import filter_none
-from g4f.image import is_data_uri_an_image
+from g4f.client.stubs import ChunkEncoder
+from g4f.client.single_flight import single_flight
+from g4f.client.response_cache import response_cache, cache_status
+from g4f.image import ImageRef
 from g4f.image.copy_images import images_dir, copy_images, get_source_url
-from g4f.errors import ProviderNotFoundError, ModelNotFoundError, MissingAuthError, NoValidHarFileError
+from g4f.image.image_store import image_store
+from g4f.image.thumbnails import thumbnails
+from g4f.errors import ProviderNotFoundError, ModelNotFoundError, MissingAuthError, NoValidHarFileError, MissingRequirementsError
 from g4f.cookies import read_cookie_files, get_cookies_dir
-from g4f.Provider import ProviderType, ProviderUtils, __providers__
+from g4f.providers.credential_pool import credential_pool
+from g4f.providers.token_pool import token_pool
+from g4f.Provider.openai.pow_solver import pow_solver
+from g4f.Provider import ProviderType, ProviderUtils
 from g4f.gui import get_gui_app
 from g4f.tools.files import supports_filename, get_async_streaming
 from .stubs import (
     ChatCompletionsConfig, ImageGenerationConfig,
-    ProviderResponseModel, ModelResponseModel,
+    ProviderResponseModel, ModelResponseModel, ProviderScoreModel,
     ErrorResponseModel, ProviderResponseDetailModel,
     FileResponseModel, UploadResponseModel, Annotated
 )
@@ -57,8 +69,18 @@ logger = logging.getLogger(__name__)
 
 DEFAULT_PORT = 1337
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    # Close the pooled sessions of the providers
+    await session_pool.close()
+    # Stop the browsers, that are kept open for logins
+    browser_pool.close()
+    # Stop the processes of the proof of work solver
+    pow_solver.shutdown()
+
 def create_app():
-    app = FastAPI()
+    app = FastAPI(lifespan=lifespan)
 
     # Add CORS middleware
     app.add_middleware(
@@ -83,6 +105,32 @@ def create_app():
     if not AppConfig.ignore_cookie_files:
         read_cookie_files()
 
+    if AppConfig.single_flight:
+        single_flight.enabled = True
+        single_flight.force = AppConfig.single_flight_force
+
+    if AppConfig.response_cache:
+        response_cache.enabled = True
+        response_cache.disk = AppConfig.response_cache_disk
+        if AppConfig.response_cache_ttl is not None:
+            response_cache.ttl = AppConfig.response_cache_ttl
+
+    if AppConfig.images_max_size is not None:
+        image_store.max_size = int(AppConfig.images_max_size * 1024 * 1024)
+    if AppConfig.images_max_age is not None:
+        image_store.max_age = AppConfig.images_max_age * 24 * 60 * 60
+
+    if AppConfig.browsers is not None:
+        browser_pool.max_browsers = AppConfig.browsers
+    if AppConfig.browser_max_uses is not None:
+        browser_pool.max_uses = AppConfig.browser_max_uses
+
+    if AppConfig.pow_processes is not None:
+        pow_solver.processes = AppConfig.pow_processes
+
+    if AppConfig.prefetch_tokens:
+        token_pool.enabled = True
+
     if AppConfig.ignored_providers:
         for provider in AppConfig.ignored_providers:
             if provider in ProviderUtils.convert:
@@ -121,6 +169,15 @@ class ErrorResponse(Response):
     def render(self, content) -> bytes:
         return str(content).encode(errors="ignore")
 
+def cached_json_response(request: Request, key: str, create: callable) -> Response:
+    """Returns a precomputed JSON response of the capability index, or 304 if the ETag matches."""
+    content, etag = index.get_response(key, create)
+    headers = {"etag": f'"{etag}"'}
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and etag in [tag.strip(' W/"') for tag in if_none_match.split(",")]:
+        return NotModifiedResponse(headers)
+    return Response(content, media_type="application/json", headers=headers)
+
 class AppConfig:
     ignored_providers: Optional[list[str]] = None
     g4f_api_key: Optional[str] = None
@@ -129,6 +186,21 @@ class AppConfig:
     provider: str = None
     image_provider: str = None
     proxy: str = None
+    deadline: float = None
+    first_token_timeout: float = None
+    coalesce_size: int = 0
+    coalesce_interval: float = 0
+    single_flight: bool = False
+    single_flight_force: bool = False
+    response_cache: bool = False
+    response_cache_ttl: float = None
+    response_cache_disk: bool = False
+    images_max_size: float = None
+    images_max_age: float = None
+    browsers: int = None
+    browser_max_uses: int = None
+    pow_processes: int = None
+    prefetch_tokens: bool = False
     gui: bool = False
     demo: bool = False
 
@@ -225,8 +297,8 @@ class Api:
         @self.app.get("/v1/models", responses={
             HTTP_200_OK: {"model": List[ModelResponseModel]},
         })
-        async def models():
-            return {
+        async def models(request: Request):
+            return cached_json_response(request, "models", lambda: {
                 "object": "list",
                 "data": [{
                     "id": model_id,
@@ -241,12 +313,12 @@ class Api:
                     "object": "model",
                     "created": 0,
                     "owned_by": getattr(provider, "label", None),
-                    "image": bool(getattr(provider, "image_models", False)),
+                    "image": bool(index.get_flags(provider_name) & Capability.IMAGE),
                     "provider": True,
-                } for provider_name, provider in g4f.Provider.ProviderUtils.convert.items()
+                } for provider_name, provider in index.providers.items()
                     if provider.working and provider_name != "Custom"
                 ]
-            }
+            })
 
         @self.app.get("/api/{provider}/models", responses={
             HTTP_200_OK: {"model": List[ModelResponseModel]},
@@ -298,7 +370,8 @@ class Api:
         async def chat_completions(
             config: ChatCompletionsConfig,
             credentials: Annotated[HTTPAuthorizationCredentials, Depends(Api.security)] = None,
-            provider: str = None
+            provider: str = None,
+            cache_control: Annotated[Optional[str], Header()] = None
         ):
             try:
                 if config.provider is None:
@@ -316,18 +389,18 @@ class Api:
                         if config.provider in self.conversations[config.conversation_id]:
                             conversation = self.conversations[config.conversation_id][config.provider]
 
+                images = None
                 if config.image is not None:
                     try:
-                        is_data_uri_an_image(config.image)
+                        images = [(ImageRef.from_data_uri(config.image), config.image_name)]
                     except ValueError as e:
                         return ErrorResponse.from_message(f"The image you send must be a data URI. Example: data:image/jpeg;base64,...", status_code=HTTP_422_UNPROCESSABLE_ENTITY)
-                if config.images is not None:
-                    for image in config.images:
-                        try:
-                            is_data_uri_an_image(image[0])
-                        except ValueError as e:
-                            example = json.dumps({"images": [["data:image/jpeg;base64,...", "filename"]]})
-                            return ErrorResponse.from_message(f'The image you send must be a data URI. Example: {example}', status_code=HTTP_422_UNPROCESSABLE_ENTITY)
+                elif config.images is not None:
+                    try:
+                        images = [(ImageRef.from_data_uri(image), image_name) for image, image_name in config.images]
+                    except ValueError as e:
+                        example = json.dumps({"images": [["data:image/jpeg;base64,...", "filename"]]})
+                        return ErrorResponse.from_message(f'The image you send must be a data URI. Example: {example}', status_code=HTTP_422_UNPROCESSABLE_ENTITY)
 
                 # Create the completion response
                 response = self.client.chat.completions.create(
@@ -336,38 +409,49 @@ class Api:
                             "model": AppConfig.model,
                             "provider": AppConfig.provider,
                             "proxy": AppConfig.proxy,
+                            "deadline": AppConfig.deadline,
+                            "first_token_timeout": AppConfig.first_token_timeout,
                             **config.dict(exclude_none=True),
                             **{
                                 "conversation_id": None,
                                 "return_conversation": return_conversation,
-                                "conversation": conversation
+                                "conversation": conversation,
+                                "image": None,
+                                "image_name": None,
+                                "images": images
                             }
                         },
-                        ignored=AppConfig.ignored_providers
+                        ignored=AppConfig.ignored_providers,
+                        cache_control=cache_control
                     ),
                 )
+                status = cache_status.get()
+                headers = None if status is None else {"X-Cache": status[0], "Age": str(status[1])}
 
                 if not config.stream:
-                    return await response
+                    if headers is None:
+                        return await response
+                    return JSONResponse(jsonable_encoder(await response), headers=headers)
 
                 async def streaming():
+                    encoder = ChunkEncoder(AppConfig.coalesce_size, AppConfig.coalesce_interval)
                     try:
-                        async for chunk in response:
+                        async for chunk in encoder.stream(response):
                             if isinstance(chunk, BaseConversation):
                                 if config.conversation_id is not None and config.provider is not None:
                                     if config.conversation_id not in self.conversations:
                                         self.conversations[config.conversation_id] = {}
                                     self.conversations[config.conversation_id][config.provider] = chunk
-                            else:
-                                yield f"data: {chunk.json()}\n\n"
+                            elif isinstance(chunk, bytes):
+                                yield chunk
                     except GeneratorExit:
                         pass
                     except Exception as e:
                         logger.exception(e)
-                        yield f'data: {format_exception(e, config)}\n\n'
-                    yield "data: [DONE]\n\n"
+                        yield encoder.flush() + f'data: {format_exception(e, config)}\n\n'.encode()
+                    yield encoder.flush() + b"data: [DONE]\n\n"
 
-                return StreamingResponse(streaming(), media_type="text/event-stream")
+                return StreamingResponse(streaming(), media_type="text/event-stream", headers=headers)
 
             except (ModelNotFoundError, ProviderNotFoundError) as e:
                 logger.exception(e)
@@ -390,8 +474,9 @@ class Api:
             provider: str,
             config: ChatCompletionsConfig,
             credentials: Annotated[HTTPAuthorizationCredentials, Depends(Api.security)] = None,
+            cache_control: Annotated[Optional[str], Header()] = None
         ):
-            return await chat_completions(config, credentials, provider)
+            return await chat_completions(config, credentials, provider, cache_control)
 
         responses = {
             HTTP_200_OK: {"model": ImagesResponse},
@@ -436,20 +521,44 @@ class Api:
         @self.app.get("/v1/providers", responses={
             HTTP_200_OK: {"model": List[ProviderResponseModel]},
         })
-        async def providers():
-            return [{
-                'id': provider.__name__,
-                'object': 'provider',
-                'created': 0,
-                'url': provider.url,
-                'label': getattr(provider, "label", None),
-            } for provider in __providers__ if provider.working]
+        async def providers(request: Request):
+            def create():
+                return [{
+                    'id': provider.__name__,
+                    'object': 'provider',
+                    'created': 0,
+                    'url': provider.url,
+                    'label': getattr(provider, "label", None),
+                    **filter_none(circuit_breaker=breakers.get_state(provider.__name__)),
+                } for provider in index.providers.values() if provider.working]
+            # The circuit breaker state changes with every request, cache only without open breakers
+            if not breakers.is_closed():
+                return create()
+            return cached_json_response(request, "providers", create)
+
+        @self.app.get("/v1/scores", responses={
+            HTTP_200_OK: {"model": dict[str, dict[str, ProviderScoreModel]]},
+        })
+        async def provider_scores():
+            return scores.get_dict()
+
+        @self.app.get("/v1/single-flight")
+        async def single_flight_stats():
+            return single_flight.get_dict()
+
+        @self.app.get("/v1/response-cache")
+        async def response_cache_stats():
+            return response_cache.get_dict()
+
+        @self.app.get("/v1/credentials")
+        async def credentials_stats():
+            return credential_pool.get_dict()
 
         @self.app.get("/v1/providers/{provider}", responses={
             HTTP_200_OK: {"model": ProviderResponseDetailModel},
             HTTP_404_NOT_FOUND: {"model": ErrorResponseModel},
         })
-        async def providers_info(provider: str):
+        async def providers_info(request: Request, provider: str):
             if provider not in ProviderUtils.convert:
                 return ErrorResponse.from_message("The provider does not exist.", 404)
             provider: ProviderType = ProviderUtils.convert[provider]
@@ -458,17 +567,24 @@ class Api:
                     return provider.get_models() if hasattr(provider, "get_models") else []
                 except:
                     return []
-            return {
-                'id': provider.__name__,
-                'object': 'provider',
-                'created': 0,
-                'url': provider.url,
-                'label': getattr(provider, "label", None),
-                'models': safe_get_models(provider),
-                'image_models': getattr(provider, "image_models", []) or [],
-                'vision_models': [model for model in [getattr(provider, "default_vision_model", None)] if model],
-                'params': [*provider.get_parameters()] if hasattr(provider, "get_parameters") else []
-            }
+            models = safe_get_models(provider)
+            index.refresh()
+            def create():
+                return {
+                    'id': provider.__name__,
+                    'object': 'provider',
+                    'created': 0,
+                    'url': provider.url,
+                    'label': getattr(provider, "label", None),
+                    'models': models,
+                    'image_models': getattr(provider, "image_models", []) or [],
+                    'vision_models': [model for model in [getattr(provider, "default_vision_model", None)] if model],
+                    'params': index.get_parameters(provider),
+                    **filter_none(circuit_breaker=breakers.get_state(provider.__name__)),
+                }
+            if provider.__name__ not in index.providers or breakers.get_state(provider.__name__) is not None:
+                return create()
+            return cached_json_response(request, f"providers/{provider.__name__}", create)
 
         @self.app.post("/v1/upload_cookies", responses={
             HTTP_200_OK: {"model": List[FileResponseModel]},
@@ -551,34 +667,19 @@ class Api:
             HTTP_404_NOT_FOUND: {}
         })
         async def get_image(filename, request: Request):
-            target = os.path.join(images_dir, os.path.basename(filename))
+            filename = os.path.basename(filename)
+            target = os.path.join(images_dir, filename)
             ext = os.path.splitext(filename)[1][1:]
-            stat_result = SimpleNamespace()
-            stat_result.st_size = 0
-            if os.path.isfile(target):
-                stat_result.st_size = os.stat(target).st_size
-            stat_result.st_mtime = int(f"{filename.split('_')[0]}") if filename.startswith("1") else 0
+            # Stored images are named by their content hash
+            etag = image_store.get_etag(filename) or f'"{hashlib.md5(filename.encode()).hexdigest()}"'
             headers = {
                 "cache-control": "public, max-age=31536000",
                 "content-type": f"image/{ext.replace('jpg', 'jpeg') or 'jpeg'}",
-                "last-modified": formatdate(stat_result.st_mtime, usegmt=True),
-                "etag": f'"{hashlib.md5(filename.encode()).hexdigest()}"',
-                **({
-                    "content-length": str(stat_result.st_size),
-                } if stat_result.st_size else {})
+                "etag": etag,
             }
-            response = FileResponse(
-                target,
-                headers=headers,
-                filename=filename,
-            )
-            try:
-                if_none_match = request.headers["if-none-match"]
-                etag = response.headers["etag"]
-                if etag in [tag.strip(" W/") for tag in if_none_match.split(",")]:
-                    return NotModifiedResponse(response.headers)
-            except KeyError:
-                pass
+            if_none_match = request.headers.get("if-none-match")
+            if if_none_match is not None and etag in [tag.strip(" W/") for tag in if_none_match.split(",")]:
+                return NotModifiedResponse(headers)
             if not os.path.isfile(target):
                 source_url = get_source_url(str(request.query_params))
                 if source_url is not None:
@@ -592,14 +693,28 @@ class Api:
                         return RedirectResponse(url=source_url)
             if not os.path.isfile(target):
                 return ErrorResponse.from_message("File not found", HTTP_404_NOT_FOUND)
-            async def stream():
-                with open(target, "rb") as file:
-                    while True:
-                        chunk = file.read(65536)
-                        if not chunk:
-                            break
-                        yield chunk
-            return StreamingResponse(stream(), headers=headers)
+            image_store.touch(target)
+            # FileResponse handles Range requests and uses zero-copy "pathsend", if the server supports it
+            return FileResponse(target, headers=headers, filename=filename)
+
+        @self.app.get("/thumbnail/{filename}", responses={
+            HTTP_200_OK: {"content": {"image/*": {}}},
+            HTTP_404_NOT_FOUND: {},
+            HTTP_422_UNPROCESSABLE_ENTITY: {"model": ErrorResponseModel},
+        })
+        async def get_thumbnail(filename, w: int = 200, h: int = 200, format: str = "webp"):
+            try:
+                target = await thumbnails.get(filename, w, h, format)
+            except MissingRequirementsError:
+                return RedirectResponse(url=f"/images/{quote(os.path.basename(filename))}")
+            except ValueError as e:
+                return ErrorResponse.from_exception(e, status_code=HTTP_422_UNPROCESSABLE_ENTITY)
+            if target is None:
+                return ErrorResponse.from_message("File not found", HTTP_404_NOT_FOUND)
+            return FileResponse(target, headers={
+                "cache-control": "public, max-age=31536000",
+                "content-type": f"image/{format.replace('jpg', 'jpeg')}",
+            })
 
 def format_exception(e: Union[Exception, str], config: Union[ChatCompletionsConfig, ImageGenerationConfig] = None, image: bool = False) -> str:
     last_provider = {} if not image else g4f.get_last_provider(True)
@@ -29,6 +29,9 @@ class ChatCompletionsConfig(BaseModel):
     history_disabled: Optional[bool] = None
     auto_continue: Optional[bool] = None
     timeout: Optional[int] = None
+    hedge_after: Union[float, str, None] = Field(default=None, examples=[2.5, "auto"])
+    deadline: Optional[float] = Field(default=None, examples=[60])
+    first_token_timeout: Optional[float] = Field(default=None, examples=[10])
     tool_calls: list = Field(default=[], examples=[[
 		{
 			"function": {
@@ -49,12 +52,21 @@ class ImageGenerationConfig(BaseModel):
     api_key: Optional[str] = None
     proxy: Optional[str] = None
 
+class CircuitBreakerModel(BaseModel):
+    state: str
+    reason: Optional[str]
+    last_error: Optional[str]
+    consecutive_failures: int
+    error_rate: float
+    retry_after: float
+
 class ProviderResponseModel(BaseModel):
     id: str
     object: str = "provider"
     created: int
     url: Optional[str]
     label: Optional[str]
+    circuit_breaker: Optional[CircuitBreakerModel] = None
 
 class ProviderResponseDetailModel(ProviderResponseModel):
     models: list[str]
@@ -62,6 +74,15 @@ class ProviderResponseDetailModel(ProviderResponseModel):
     vision_models: list[str]
     params: list[str]
 
+class ProviderScoreModel(BaseModel):
+    success_rate: float
+    ttft: Optional[float]
+    tokens_per_second: Optional[float]
+    requests: int
+    failures: int
+    last_used: float
+    samples: list[float]
+
 class ModelResponseModel(BaseModel):
     id: str
     object: str = "model"
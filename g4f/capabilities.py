@@ -0,0 +1,152 @@
+from __future__ import annotations
+
+import json
+import threading
+from enum import IntFlag
+from hashlib import md5
+from typing import Callable, Optional
+
+from .models import ModelUtils, ImageModel, VisionModel
+from .providers.types import ProviderType
+from .providers.retry_provider import IterListProvider
+from . import Provider
+
+class Capability(IntFlag):
+    STREAM = 1
+    VISION = 2
+    IMAGE = 4
+    SYSTEM_MESSAGE = 8
+    AUTH = 16
+
+def get_capabilities(provider: ProviderType) -> Capability:
+    flags = Capability(0)
+    if provider.supports_stream:
+        flags |= Capability.STREAM
+    if getattr(provider, "default_vision_model", None) is not None or getattr(provider, "vision_models", None):
+        flags |= Capability.VISION
+    if getattr(provider, "image_models", None):
+        flags |= Capability.IMAGE
+    if provider.supports_system_message:
+        flags |= Capability.SYSTEM_MESSAGE
+    if provider.needs_auth:
+        flags |= Capability.AUTH
+    return flags
+
+def get_model_providers(model) -> list[ProviderType]:
+    if isinstance(model.best_provider, IterListProvider):
+        return list(model.best_provider.providers)
+    return [] if model.best_provider is None else [model.best_provider]
+
+class CapabilityIndex:
+    """
+    Index of the models and providers with their capabilities.
+
+    It maps the models to their working providers and the providers to their models,
+    with a bitset of capabilities per provider and model. The index is built once and
+    rebuilt, when the working flag or the model list of a provider changes.
+    Listing responses are cached as JSON with an ETag until the next rebuild.
+    """
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.signature: Optional[tuple] = None
+        self.version: int = 0
+        self.providers: dict[str, ProviderType] = {}
+        self.provider_flags: dict[str, Capability] = {}
+        self.provider_models: dict[str, list[str]] = {}
+        self.model_flags: dict[str, Capability] = {}
+        self.model_providers: dict[str, list[ProviderType]] = {}
+        self.parameters: dict[str, list[str]] = {}
+        self.responses: dict[str, tuple[bytes, str]] = {}
+
+    def get_candidates(self) -> list[ProviderType]:
+        providers = {name: Provider.load_provider(name) for name in Provider.get_provider_names(working=True)}
+        for model in ModelUtils.convert.values():
+            for provider in get_model_providers(model):
+                providers.setdefault(provider.__name__, provider)
+        return list(providers.values())
+
+    def get_signature(self, providers: list[ProviderType]) -> tuple:
+        return (len(ModelUtils.convert), *[
+            (provider.__name__, provider.working, id(getattr(provider, "models", None)), len(getattr(provider, "models", None) or []))
+            for provider in providers
+        ])
+
+    def refresh(self) -> None:
+        """Rebuilds the index, if a provider has changed."""
+        providers = self.get_candidates() if self.signature is None else list(self.providers.values())
+        signature = self.get_signature(providers)
+        if signature != self.signature:
+            with self.lock:
+                self.build(self.get_candidates())
+
+    def build(self, providers: list[ProviderType]) -> None:
+        self.providers = {provider.__name__: provider for provider in providers}
+        self.provider_flags = {provider.__name__: get_capabilities(provider) for provider in providers}
+        self.provider_models = {
+            provider.__name__: list(getattr(provider, "models", None) or [])
+            for provider in providers
+        }
+        self.model_flags = {}
+        self.model_providers = {}
+        for model in ModelUtils.convert.values():
+            working = [provider for provider in get_model_providers(model) if provider.working]
+            if not working:
+                continue
+            flags = Capability(0)
+            if isinstance(model, ImageModel):
+                flags |= Capability.IMAGE
+            if isinstance(model, VisionModel):
+                flags |= Capability.VISION
+            self.model_flags[model.name] = flags
+            self.model_providers[model.name] = working
+            for provider in working:
+                models = self.provider_models.setdefault(provider.__name__, [])
+                if model.name not in models:
+                    models.append(model.name)
+        self.responses = {}
+        self.signature = self.get_signature(providers)
+        self.version += 1
+
+    def invalidate(self) -> None:
+        with self.lock:
+            self.signature = None
+
+    def get_providers(self, model: str, flags: Capability = Capability(0)) -> list[ProviderType]:
+        """Returns the working providers of a model, that have all the capabilities in flags."""
+        self.refresh()
+        return [
+            provider for provider in self.model_providers.get(model, [])
+            if self.provider_flags[provider.__name__] & flags == flags
+        ]
+
+    def get_models(self, provider: str) -> list[str]:
+        self.refresh()
+        return self.provider_models.get(provider, [])
+
+    def get_flags(self, provider: str) -> Capability:
+        self.refresh()
+        return self.provider_flags.get(provider, Capability(0))
+
+    def find_providers(self, flags: Capability) -> list[str]:
+        """Returns the names of the working providers, that have all the capabilities in flags."""
+        self.refresh()
+        return [
+            name for name, provider_flags in self.provider_flags.items()
+            if provider_flags & flags == flags and self.providers[name].working
+        ]
+
+    def get_parameters(self, provider: ProviderType) -> list[str]:
+        """Returns the parameter names of a provider. The signature is inspected only once."""
+        if provider.__name__ not in self.parameters:
+            self.parameters[provider.__name__] = [*provider.get_parameters()] if hasattr(provider, "get_parameters") else []
+        return self.parameters[provider.__name__]
+
+    def get_response(self, key: str, create: Callable[[], object]) -> tuple[bytes, str]:
+        """Returns a cached JSON response and its ETag. It is created once per index version."""
+        self.refresh()
+        if key not in self.responses:
+            content = json.dumps(create(), separators=(",", ":")).encode()
+            self.responses[key] = (content, md5(content).hexdigest())
+        return self.responses[key]
+
+index = CapabilityIndex()
@@ -14,16 +14,31 @@ def get_api_parser():
     api_parser.add_argument("--debug", "-d", action="store_true", help="Enable verbose logging.")
     api_parser.add_argument("--gui", "-g", default=None, action="store_true", help="Start also the gui.")
     api_parser.add_argument("--model", default=None, help="Default model for chat completion. (incompatible with --reload and --workers)")
-    api_parser.add_argument("--provider", choices=[provider.__name__ for provider in Provider.__providers__ if provider.working],
+    api_parser.add_argument("--provider", choices=Provider.get_provider_names(working=True),
                             default=None, help="Default provider for chat completion. (incompatible with --reload and --workers)")
-    api_parser.add_argument("--image-provider", choices=[provider.__name__ for provider in Provider.__providers__ if provider.working and hasattr(provider, "image_models")],
+    api_parser.add_argument("--image-provider", choices=Provider.get_provider_names(working=True, image=True),
                             default=None, help="Default provider for image generation. (incompatible with --reload and --workers)"),
     api_parser.add_argument("--proxy", default=None, help="Default used proxy. (incompatible with --reload and --workers)")
+    api_parser.add_argument("--deadline", type=float, default=None, help="Default total seconds for a chat completion. (incompatible with --reload and --workers)")
+    api_parser.add_argument("--first-token-timeout", type=float, default=None, help="Default seconds to wait for the first token of a provider. (incompatible with --reload and --workers)")
+    api_parser.add_argument("--coalesce-size", type=int, default=0, help="Coalesce streamed deltas into one event until this many characters are buffered. (incompatible with --reload and --workers)")
+    api_parser.add_argument("--coalesce-interval", type=float, default=0, help="Coalesce streamed deltas into one event for up to this many seconds. (incompatible with --reload and --workers)")
+    api_parser.add_argument("--single-flight", action="store_true", help="Share one upstream call between identical concurrent completions. (incompatible with --reload and --workers)")
+    api_parser.add_argument("--single-flight-force", action="store_true", help="Share calls of completions with a non-zero temperature too. (incompatible with --reload and --workers)")
+    api_parser.add_argument("--response-cache", action="store_true", help="Cache completion responses in memory. (incompatible with --reload and --workers)")
+    api_parser.add_argument("--response-cache-ttl", type=float, default=None, help="Seconds after which cached responses expire. (incompatible with --reload and --workers)")
+    api_parser.add_argument("--response-cache-disk", action="store_true", help="Store cached responses in a sqlite database in the cookies dir too. (incompatible with --reload and --workers)")
+    api_parser.add_argument("--images-max-size", type=float, default=None, help="Size budget of generated images in MB. Least recently used images are evicted. (incompatible with --reload and --workers)")
+    api_parser.add_argument("--images-max-age", type=float, default=None, help="Evict generated images after this many days without use. (incompatible with --reload and --workers)")
+    api_parser.add_argument("--browsers", type=int, default=None, help="Number of browsers, that are kept open for logins. (incompatible with --reload and --workers)")
+    api_parser.add_argument("--browser-max-uses", type=int, default=None, help="Restart a browser after this many logins. (incompatible with --reload and --workers)")
+    api_parser.add_argument("--pow-processes", type=int, default=None, help="Solve proof of work challenges in a pool of this many processes. (incompatible with --reload and --workers)")
+    api_parser.add_argument("--prefetch-tokens", action="store_true", help="Fetch one-shot provider tokens ahead of the requests. (incompatible with --reload and --workers)")
     api_parser.add_argument("--workers", type=int, default=None, help="Number of workers.")
     api_parser.add_argument("--disable-colors", action="store_true", help="Don't use colors.")
     api_parser.add_argument("--ignore-cookie-files", action="store_true", help="Don't read .har and cookie files. (incompatible with --reload and --workers)")
     api_parser.add_argument("--g4f-api-key", type=str, default=None, help="Sets an authentication key for your API. (incompatible with --reload and --workers)")
-    api_parser.add_argument("--ignored-providers", nargs="+", choices=[provider.__name__ for provider in Provider.__providers__ if provider.working],
+    api_parser.add_argument("--ignored-providers", nargs="+", choices=Provider.get_provider_names(working=True),
                             default=[], help="List of providers to ignore when processing request. (incompatible with --reload and --workers)")
     api_parser.add_argument("--cookie-browsers", nargs="+", choices=[browser.__name__ for browser in g4f.cookies.browsers],
                             default=[], help="List of browsers to access or retrieve cookies from. (incompatible with --reload and --workers)")
@@ -60,6 +75,21 @@ def run_api_args(args):
         provider=args.provider,
         image_provider=args.image_provider,
         proxy=args.proxy,
+        deadline=args.deadline,
+        first_token_timeout=args.first_token_timeout,
+        coalesce_size=args.coalesce_size,
+        coalesce_interval=args.coalesce_interval,
+        single_flight=args.single_flight,
+        single_flight_force=args.single_flight_force,
+        response_cache=args.response_cache,
+        response_cache_ttl=args.response_cache_ttl,
+        response_cache_disk=args.response_cache_disk,
+        images_max_size=args.images_max_size,
+        images_max_age=args.images_max_age,
+        browsers=args.browsers,
+        browser_max_uses=args.browser_max_uses,
+        pow_processes=args.pow_processes,
+        prefetch_tokens=args.prefetch_tokens,
         model=args.model,
         gui=args.gui,
         demo=args.demo,
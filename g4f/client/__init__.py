@@ -6,23 +6,28 @@ import random
 import string
 import asyncio
 import aiohttp
-import base64
 from typing import Union, AsyncIterator, Iterator, Awaitable, Optional
 
+from ..image import to_image_refs
 from ..image.copy_images import copy_images
+from ..image.downloader import downloader
+from ..requests.session_pool import session_pool
 from ..typing import Messages, ImageType
 from ..providers.types import ProviderType, BaseRetryProvider
 from ..providers.response import ResponseType, ImageResponse, FinishReason, BaseConversation, SynthesizeData, ToolCalls, Usage
 from ..errors import NoImageResponseError
 from ..providers.retry_provider import IterListProvider
-from ..providers.asyncio import to_sync_generator
+from ..providers.asyncio import to_sync_generator, run_sync
 from ..Provider.needs_auth import BingCreateImages, OpenaiAccount
 from ..tools.run_tools import async_iter_run_tools, iter_run_tools
 from .stubs import ChatCompletion, ChatCompletionChunk, Image, ImagesResponse
 from .image_models import ImageModels
 from .types import IterResponse, ImageProvider, Client as BaseClient
 from .service import get_model_and_provider, convert_to_provider
-from .helper import find_stop, filter_json, filter_none, safe_aclose
+from ..capabilities import index
+from .helper import StopMatcher, filter_json, filter_none, safe_aclose
+from .single_flight import single_flight
+from .response_cache import response_cache, CacheControl, async_replay
 from .. import debug
 
 ChatCompletionResponseType = Iterator[Union[ChatCompletion, ChatCompletionChunk, BaseConversation]]
@@ -37,6 +42,10 @@ except NameError:
         except StopAsyncIteration:
             raise StopIteration
 
+def has_native_stop(provider: ProviderType) -> bool:
+    """Returns True if the provider applies the stop sequences itself. They are not scanned locally then."""
+    return not isinstance(provider, BaseRetryProvider) and "stop" in index.get_parameters(provider)
+
 # Synchronous iter_response function
 def iter_response(
     response: Union[Iterator[Union[str, ResponseType]]],
@@ -45,7 +54,8 @@ def iter_response(
     max_tokens: Optional[int] = None,
     stop: Optional[list[str]] = None
 ) -> ChatCompletionResponseType:
-    content = ""
+    content = []
+    matcher = StopMatcher(stop) if stop else None
     finish_reason = None
     tool_calls = None
     usage = None
@@ -84,19 +94,20 @@ def iter_response(
                 else:
                     temp = repr(chunk)
             chunk = temp
-            
-        content += chunk
 
         if max_tokens is not None and idx + 1 >= max_tokens:
             finish_reason = "length"
 
-        first, content, chunk = find_stop(stop, content, chunk if stream else None)
-
-        if first != -1:
-            finish_reason = "stop"
+        if matcher is not None:
+            chunk, stopped = matcher.feed(chunk)
+            if stopped:
+                finish_reason = "stop"
 
         if stream:
-            yield ChatCompletionChunk.model_construct(chunk, None, completion_id, int(time.time()))
+            if chunk:
+                yield ChatCompletionChunk.model_construct(chunk, None, completion_id, int(time.time()))
+        else:
+            content.append(chunk)
 
         if finish_reason is not None:
             break
@@ -105,6 +116,13 @@ def iter_response(
     if usage is None:
         usage = Usage(prompt_tokens=0, completion_tokens=idx, total_tokens=idx)
 
+    if matcher is not None:
+        chunk = matcher.flush()
+        if not stream:
+            content.append(chunk)
+        elif chunk:
+            yield ChatCompletionChunk.model_construct(chunk, None, completion_id, int(time.time()))
+
     finish_reason = "stop" if finish_reason is None else finish_reason
 
     if stream:
@@ -113,6 +131,7 @@ def iter_response(
             usage=usage.get_dict()
         )
     else:
+        content = "".join(content)
         if response_format is not None and "type" in response_format:
             if response_format["type"] == "json_object":
                 content = filter_json(content)
@@ -139,7 +158,8 @@ async def async_iter_response(
     max_tokens: Optional[int] = None,
     stop: Optional[list[str]] = None
 ) -> AsyncChatCompletionResponseType:
-    content = ""
+    content = []
+    matcher = StopMatcher(stop) if stop else None
     finish_reason = None
     completion_id = ''.join(random.choices(string.ascii_letters + string.digits, k=28))
     idx = 0
@@ -166,23 +186,32 @@ async def async_iter_response(
                 continue
 
             chunk = str(chunk)
-            content += chunk
             idx += 1
 
             if max_tokens is not None and idx >= max_tokens:
                 finish_reason = "length"
 
-            first, content, chunk = find_stop(stop, content, chunk if stream else None)
-
-            if first != -1:
-                finish_reason = "stop"
+            if matcher is not None:
+                chunk, stopped = matcher.feed(chunk)
+                if stopped:
+                    finish_reason = "stop"
 
             if stream:
-                yield ChatCompletionChunk.model_construct(chunk, None, completion_id, int(time.time()))
+                if chunk:
+                    yield ChatCompletionChunk.model_construct(chunk, None, completion_id, int(time.time()))
+            else:
+                content.append(chunk)
 
             if finish_reason is not None:
                 break
 
+        if matcher is not None:
+            chunk = matcher.flush()
+            if not stream:
+                content.append(chunk)
+            elif chunk:
+                yield ChatCompletionChunk.model_construct(chunk, None, completion_id, int(time.time()))
+
         finish_reason = "stop" if finish_reason is None else finish_reason
 
         if usage is None:
@@ -194,6 +223,7 @@ async def async_iter_response(
                 usage=usage.get_dict()
             )
         else:
+            content = "".join(content)
             if response_format is not None and "type" in response_format:
                 if response_format["type"] == "json_object":
                     content = filter_json(content)
@@ -254,10 +284,16 @@ class Completions:
         api_key: Optional[str] = None,
         ignore_working: Optional[bool] = False,
         ignore_stream: Optional[bool] = False,
+        deadline: Optional[float] = None,
+        first_token_timeout: Optional[float] = None,
+        cache_control: Optional[str] = None,
         **kwargs
     ) -> ChatCompletion:
         if image is not None:
             kwargs["images"] = [(image, image_name)]
+        if kwargs.get("images"):
+            # Decode each image at most once per request
+            kwargs["images"] = to_image_refs(kwargs["images"])
         model, provider = get_model_and_provider(
             model,
             self.provider if provider is None else provider,
@@ -269,6 +305,24 @@ class Completions:
         stop = [stop] if isinstance(stop, str) else stop
         if ignore_stream:
             kwargs["ignore_stream"] = True
+        if (deadline is not None or first_token_timeout is not None) and not isinstance(provider, BaseRetryProvider):
+            # The timeouts are enforced by the IterListProvider
+            provider = IterListProvider([provider], False)
+
+        api_key = self.client.api_key if api_key is None else api_key
+        cache_control = CacheControl.parse(cache_control)
+        cache_key = response_cache.get_key(
+            model, provider, messages, cache_control, stream,
+            response_format=response_format,
+            max_tokens=max_tokens,
+            stop=stop,
+            api_key=api_key,
+            **kwargs
+        )
+        cached = response_cache.lookup(cache_key, stream, cache_control)
+        if cached is not None:
+            response = iter(cached)
+            return response if stream else next(response)
 
         response = iter_run_tools(
             provider.get_create_function(),
@@ -279,13 +333,17 @@ class Completions:
                 proxy=self.client.proxy if proxy is None else proxy,
                 max_tokens=max_tokens,
                 stop=stop,
-                api_key=self.client.api_key if api_key is None else api_key
+                api_key=api_key,
+                deadline=deadline,
+                first_token_timeout=first_token_timeout
             ),
             **kwargs
         )
 
-        response = iter_response(response, stream, response_format, max_tokens, stop)
+        response = iter_response(response, stream, response_format, max_tokens, None if has_native_stop(provider) else stop)
         response = iter_append_model_and_provider(response, model, provider)
+        if cache_key is not None:
+            response = response_cache.record(cache_key, response, cache_control)
         if stream:
             return response
         else:
@@ -323,7 +381,7 @@ class Images:
         """
         Synchronous generate method that runs the async_generate method in an event loop.
         """
-        return asyncio.run(self.async_generate(prompt, model, provider, response_format, proxy, **kwargs))
+        return run_sync(self.async_generate(prompt, model, provider, response_format, proxy, **kwargs))
 
     async def get_provider_handler(self, model: Optional[str], provider: Optional[ImageProvider], default: ImageProvider) -> ImageProvider:
         if provider is None:
@@ -426,7 +484,7 @@ class Images:
         response_format: Optional[str] = None,
         **kwargs
     ) -> ImagesResponse:
-        return asyncio.run(self.async_create_variation(
+        return run_sync(self.async_create_variation(
            image, model, provider, response_format, **kwargs
         ))
 
@@ -483,17 +541,18 @@ class Images:
             images = [Image.model_construct(url=image, revised_prompt=response.alt) for image in response.get_list()]
         elif response_format == "b64_json":
             # Convert URLs directly to base64 without saving
-            async def get_b64_from_url(url: str) -> Image:
-                async with aiohttp.ClientSession(cookies=response.get("cookies")) as session:
-                    async with session.get(url, proxy=proxy) as resp:
-                        if resp.status == 200:
-                            image_data = await resp.read()
-                            b64_data = base64.b64encode(image_data).decode()
-                            return Image.model_construct(b64_json=b64_data, revised_prompt=response.alt)
-            images = await asyncio.gather(*[get_b64_from_url(image) for image in response.get_list()])
+            async with session_pool.lease("images", aiohttp.ClientSession, proxy=proxy, cookies=response.get("cookies"), store_cookies=False) as session:
+                async def get_b64_from_url(url: str) -> Image:
+                    try:
+                        b64_data = await downloader.fetch_base64(session, url)
+                    except aiohttp.ClientError as e:
+                        debug.log(f"Image download failed: {type(e).__name__}: {e}")
+                        return None
+                    return Image.model_construct(b64_json=b64_data, revised_prompt=response.alt)
+                images = await asyncio.gather(*[get_b64_from_url(image) for image in response.get_list()])
         else:
             # Save locally for None (default) case
-            images = await copy_images(response.get_list(), response.get("cookies"), proxy)
+            images = await copy_images(response.get_list(), response.get("cookies"), proxy=proxy)
             images = [Image.model_construct(url=f"/images/{os.path.basename(image)}", revised_prompt=response.alt) for image in images]
         
         return ImagesResponse.model_construct(
@@ -540,10 +599,16 @@ class AsyncCompletions:
         api_key: Optional[str] = None,
         ignore_working: Optional[bool] = False,
         ignore_stream: Optional[bool] = False,
+        deadline: Optional[float] = None,
+        first_token_timeout: Optional[float] = None,
+        cache_control: Optional[str] = None,
         **kwargs
     ) -> Awaitable[ChatCompletion]:
         if image is not None:
             kwargs["images"] = [(image, image_name)]
+        if kwargs.get("images"):
+            # Decode each image at most once per request
+            kwargs["images"] = to_image_refs(kwargs["images"])
         model, provider = get_model_and_provider(
             model,
             self.provider if provider is None else provider,
@@ -555,7 +620,25 @@ class AsyncCompletions:
         stop = [stop] if isinstance(stop, str) else stop
         if ignore_stream:
             kwargs["ignore_stream"] = True
-            
+        if (deadline is not None or first_token_timeout is not None) and not isinstance(provider, BaseRetryProvider):
+            # The timeouts are enforced by the IterListProvider
+            provider = IterListProvider([provider], False)
+
+        api_key = self.client.api_key if api_key is None else api_key
+        cache_control = CacheControl.parse(cache_control)
+        cache_key = response_cache.get_key(
+            model, provider, messages, cache_control, stream,
+            response_format=response_format,
+            max_tokens=max_tokens,
+            stop=stop,
+            api_key=api_key,
+            **kwargs
+        )
+        cached = response_cache.lookup(cache_key, stream, cache_control)
+        if cached is not None:
+            response = async_replay(cached)
+            return response if stream else anext(response)
+
         response = async_iter_run_tools(
             provider,
             model,
@@ -565,13 +648,28 @@ class AsyncCompletions:
                 proxy=self.client.proxy if proxy is None else proxy,
                 max_tokens=max_tokens,
                 stop=stop,
-                api_key=self.client.api_key if api_key is None else api_key
+                api_key=api_key,
+                deadline=deadline,
+                first_token_timeout=first_token_timeout
             ),
             **kwargs
         )
 
-        response = async_iter_response(response, stream, response_format, max_tokens, stop)
+        response = async_iter_response(response, stream, response_format, max_tokens, None if has_native_stop(provider) else stop)
         response = async_iter_append_model_and_provider(response, model, provider)
+        if cache_key is not None:
+            response = response_cache.async_record(cache_key, response, cache_control)
+
+        key = single_flight.get_key(
+            model, provider, messages, stream,
+            response_format=response_format,
+            max_tokens=max_tokens,
+            stop=stop,
+            api_key=api_key,
+            **kwargs
+        )
+        if key is not None:
+            response = single_flight.iter(key, response)
 
         if stream:
             return response
@@ -1,10 +1,15 @@
 from __future__ import annotations
 
 import re
+import json
+import hashlib
 import logging
+from collections import deque
 
 from typing import AsyncIterator, Iterator, AsyncGenerator, Optional
 
+from ..image import ImageRef
+
 def filter_markdown(text: str, allowd_types=None, default=None) -> str:
     """
     Parses code block from a string.
@@ -33,22 +38,106 @@ def filter_json(text: str) -> str:
     """
     return filter_markdown(text, ["", "json"], text)
 
-def find_stop(stop: Optional[list[str]], content: str, chunk: str = None):
-    first = -1
-    word = None
-    if stop is not None:
-        for word in list(stop):
-            first = content.find(word)
-            if first != -1:
-                content = content[:first]
-                break
-        if chunk is not None and first != -1:
-            first = chunk.find(word)
-            if first != -1:
-                chunk = chunk[:first]
-            else:
-                first = 0
-    return first, content, chunk
+class StopMatcher:
+    """
+    Incremental matcher of stop sequences in a stream of text chunks.
+
+    All stop sequences are matched in one pass with an Aho-Corasick automaton,
+    so a stop sequence split across chunks is found like in the full text.
+    Only the tail, that could be the start of a stop sequence, is held back.
+    It is shorter than the longest stop sequence.
+    """
+    def __init__(self, stop: list[str]) -> None:
+        self.goto: list[dict[str, int]] = [{}]
+        self.fail: list[int] = [0]
+        self.depth: list[int] = [0]
+        self.output: list[int] = [0]
+        self.first_chars = set()
+        for word in stop:
+            if word:
+                self.add_word(word)
+        self.build()
+        self.state = 0
+        self.tail = ""
+
+    def add_word(self, word: str) -> None:
+        self.first_chars.add(word[0])
+        state = 0
+        for char in word:
+            if char not in self.goto[state]:
+                self.goto.append({})
+                self.fail.append(0)
+                self.depth.append(self.depth[state] + 1)
+                self.output.append(0)
+                self.goto[state][char] = len(self.goto) - 1
+            state = self.goto[state][char]
+        self.output[state] = len(word)
+
+    def build(self) -> None:
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            # A longer stop sequence, that ends here, starts earlier in the text
+            if not self.output[state]:
+                self.output[state] = self.output[self.fail[state]]
+            for char, next_state in self.goto[state].items():
+                fail = self.fail[state]
+                while fail and char not in self.goto[fail]:
+                    fail = self.fail[fail]
+                self.fail[next_state] = self.goto[fail].get(char, 0)
+                queue.append(next_state)
+
+    def feed(self, chunk: str) -> tuple[str, bool]:
+        """
+        Returns the text, that can be emitted, and True if a stop sequence was found.
+        The text ends before the stop sequence.
+        """
+        if not self.state and self.first_chars.isdisjoint(chunk):
+            return chunk, False
+        state = self.state
+        for index, char in enumerate(chunk):
+            while state and char not in self.goto[state]:
+                state = self.fail[state]
+            state = self.goto[state].get(char, 0)
+            if self.output[state]:
+                text = self.tail + chunk[:index + 1]
+                self.state = 0
+                self.tail = ""
+                return text[:len(text) - self.output[state]], True
+        self.state = state
+        text = self.tail + chunk
+        hold = self.depth[state]
+        self.tail = text[len(text) - hold:] if hold else ""
+        return text[:len(text) - hold], False
+
+    def flush(self) -> str:
+        """Returns the held back tail at the end of the stream."""
+        tail = self.tail
+        self.state = 0
+        self.tail = ""
+        return tail
+
+def get_request_key(model: str, provider, messages: list, **kwargs) -> Optional[str]:
+    """
+    Returns a normalized key of a completion request.
+    Returns None, if the arguments are not JSON serializable.
+    Image references are keyed by their content hash.
+    """
+    providers = getattr(provider, "providers", None)
+    provider_name = [p.__name__ for p in providers] if providers else getattr(provider, "__name__", provider)
+    try:
+        data = json.dumps(
+            [model, provider_name, messages, {key: value for key, value in kwargs.items() if value is not None}],
+            sort_keys=True, separators=(",", ":"), default=get_image_key
+        )
+    except (TypeError, ValueError):
+        return None
+    return hashlib.sha256(data.encode()).hexdigest()
+
+def get_image_key(value) -> str:
+    if isinstance(value, ImageRef):
+        return value.digest
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
 
 def filter_none(**kwargs) -> dict:
     return {
@@ -0,0 +1,303 @@
+from __future__ import annotations
+
+import re
+import time
+import random
+import string
+import sqlite3
+import threading
+from pathlib import Path
+from collections import OrderedDict
+from contextvars import ContextVar
+from typing import Iterator, AsyncIterator, Optional, Union
+
+from .stubs import ChatCompletion, ChatCompletionChunk, dump_json
+from .helper import get_request_key
+from ..requests.decoder import loads
+from ..cookies import get_cookies_dir
+from .. import debug
+
+CACHE_FILE = ".response_cache.sqlite3"
+HIT = "HIT"
+MISS = "MISS"
+
+cache_status: ContextVar[Optional[tuple[str, int]]] = ContextVar("cache_status", default=None)
+
+class CacheControl:
+    """
+    Parsed Cache-Control directives of a request.
+
+    Attributes:
+        no_cache (bool): Don't serve a cached response.
+        no_store (bool): Don't store the response.
+        max_age (int): Serve only cached responses younger than this many seconds.
+    """
+    def __init__(self, no_cache: bool = False, no_store: bool = False, max_age: Optional[int] = None) -> None:
+        self.no_cache = no_cache
+        self.no_store = no_store
+        self.max_age = max_age
+
+    @classmethod
+    def parse(cls, value: Optional[str]) -> CacheControl:
+        if not value:
+            return cls()
+        directives = [directive.strip().lower() for directive in value.split(",")]
+        max_age = None
+        for directive in directives:
+            match = re.fullmatch(r"max-age\s*=\s*(\d+)", directive)
+            if match:
+                max_age = int(match.group(1))
+        return cls("no-cache" in directives, "no-store" in directives, max_age)
+
+class CacheRecorder:
+    """Collects the chunks of a completion response into a cache entry."""
+    def __init__(self) -> None:
+        self.chunks: list[str] = []
+        self.finish_reason: Optional[str] = None
+        self.usage: Optional[dict] = None
+        self.tool_calls: Optional[list] = None
+        self.model: Optional[str] = None
+        self.provider: Optional[str] = None
+        self.stream: bool = False
+
+    def add(self, chunk) -> bool:
+        """Adds a chunk. Returns True, if it is the last chunk of the completion."""
+        if isinstance(chunk, ChatCompletionChunk):
+            choice = chunk.choices[0]
+            if choice.delta.content:
+                self.chunks.append(choice.delta.content)
+            self.stream = True
+        elif isinstance(chunk, ChatCompletion):
+            choice = chunk.choices[0]
+            self.chunks.append(choice.message.content)
+            self.tool_calls = getattr(choice.message, "tool_calls", None)
+        else:
+            return False
+        self.usage = getattr(chunk, "usage", None) or self.usage
+        self.model = chunk.model or self.model
+        self.provider = chunk.provider or self.provider
+        if choice.finish_reason is not None:
+            self.finish_reason = choice.finish_reason
+            return True
+        return False
+
+    def get_entry(self) -> Optional[dict]:
+        """Returns the entry, or None if the response is not complete."""
+        if self.finish_reason is None:
+            return None
+        return {
+            "model": self.model,
+            "provider": self.provider,
+            "chunks": self.chunks,
+            "finish_reason": self.finish_reason,
+            "usage": self.usage,
+            "tool_calls": self.tool_calls,
+            "stream": self.stream,
+        }
+
+class ResponseCache:
+    """
+    Cache of completion responses with an in-memory LRU and an optional sqlite tier.
+
+    Entries are stored as the text chunks of the response,
+    so a cached response is replayed with the same chunks to streaming clients.
+    Responses of requests with a non-zero or without a temperature are only cached,
+    if the request has a Cache-Control max-age directive.
+    A response is replayed in the other stream mode only if no data is lost:
+    Requests with tools or a JSON response format are cached per stream mode.
+
+    Attributes:
+        enabled (bool): Use the cache in Client and AsyncClient.
+        ttl (float): Seconds after which an entry expires.
+        max_bytes (int): The byte budget of the in-memory tier.
+        disk (bool): Store entries in a sqlite database in the cookies dir too.
+        disk_max_bytes (int): The byte budget of the sqlite tier.
+    """
+    enabled: bool = False
+    ttl: float = 3600
+    max_bytes: int = 32 * 1024 * 1024
+    disk: bool = False
+    disk_max_bytes: int = 256 * 1024 * 1024
+
+    def __init__(self) -> None:
+        self.entries: OrderedDict[str, tuple[float, bytes]] = OrderedDict()
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+        self.connection: Optional[sqlite3.Connection] = None
+
+    def get_key(self, model: str, provider, messages: list, cache_control: CacheControl, stream: bool = False, **kwargs) -> Optional[str]:
+        """Returns the key of a request or None, if it should not be cached."""
+        if not self.enabled:
+            return None
+        if kwargs.get("conversation") is not None or kwargs.get("return_conversation"):
+            return None
+        # The default temperature of the providers is not 0
+        if kwargs.get("temperature", 1) != 0 and cache_control.max_age is None:
+            return None
+        response_format = kwargs.get("response_format")
+        if kwargs.get("tools") or (isinstance(response_format, dict) and response_format.get("type") == "json_object"):
+            # Streamed responses have no tool calls, the content of completions is filtered JSON
+            kwargs["stream"] = stream
+        return get_request_key(model, provider, messages, **kwargs)
+
+    def get(self, key: str, max_age: Optional[float] = None, disk: Optional[bool] = None) -> Optional[tuple[dict, int]]:
+        """Returns the entry and its age in seconds, or None. `disk` overrides the sqlite tier setting."""
+        max_age = self.ttl if max_age is None else min(max_age, self.ttl)
+        now = time.time()
+        with self.lock:
+            item = self.entries.get(key)
+            if item is not None:
+                self.entries.move_to_end(key)
+        if item is None and (self.disk if disk is None else disk):
+            item = self.get_from_disk(key)
+            if item is not None:
+                self.put_in_memory(key, *item)
+        if item is None or now - item[0] > max_age:
+            return None
+        created, data = item
+        return loads(data), int(now - created)
+
+    def put(self, key: str, entry: dict, disk: Optional[bool] = None) -> None:
+        data = dump_json(entry)
+        created = time.time()
+        self.put_in_memory(key, created, data)
+        if self.disk if disk is None else disk:
+            self.put_on_disk(key, created, data)
+
+    def put_in_memory(self, key: str, created: float, data: bytes) -> None:
+        if len(data) > self.max_bytes:
+            return
+        with self.lock:
+            if key in self.entries:
+                self.size -= len(self.entries.pop(key)[1])
+            self.entries[key] = (created, data)
+            self.size += len(data)
+            while self.size > self.max_bytes:
+                _, (_, evicted) = self.entries.popitem(last=False)
+                self.size -= len(evicted)
+
+    def get_connection(self) -> sqlite3.Connection:
+        if self.connection is None:
+            self.connection = sqlite3.connect(self.get_file(), check_same_thread=False)
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS entries "
+                "(key TEXT PRIMARY KEY, created REAL, accessed REAL, size INTEGER, data BLOB)"
+            )
+        return self.connection
+
+    def get_from_disk(self, key: str) -> Optional[tuple[float, bytes]]:
+        try:
+            with self.lock:
+                connection = self.get_connection()
+                row = connection.execute("SELECT created, data FROM entries WHERE key = ?", (key,)).fetchone()
+                if row is not None:
+                    with connection:
+                        connection.execute("UPDATE entries SET accessed = ? WHERE key = ?", (time.time(), key))
+        except sqlite3.Error as e:
+            debug.log(f"Read response cache failed: {type(e).__name__}: {e}")
+            return None
+        return None if row is None else (row[0], bytes(row[1]))
+
+    def put_on_disk(self, key: str, created: float, data: bytes) -> None:
+        try:
+            with self.lock:
+                connection = self.get_connection()
+                with connection:
+                    connection.execute(
+                        "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?)",
+                        (key, created, created, len(data), data)
+                    )
+                    connection.execute("DELETE FROM entries WHERE created < ?", (time.time() - self.ttl,))
+                    size, = connection.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()
+                    for evicted_key, evicted_size in connection.execute("SELECT key, size FROM entries ORDER BY accessed").fetchall():
+                        if size <= self.disk_max_bytes:
+                            break
+                        connection.execute("DELETE FROM entries WHERE key = ?", (evicted_key,))
+                        size -= evicted_size
+        except sqlite3.Error as e:
+            debug.log(f"Write response cache failed: {type(e).__name__}: {e}")
+
+    def record(self, key: str, response: Iterator, cache_control: CacheControl) -> Iterator:
+        """Yields the chunks of a response and stores them, when the last chunk arrives."""
+        recorder = CacheRecorder()
+        for chunk in response:
+            if recorder.add(chunk) and not cache_control.no_store:
+                self.put(key, recorder.get_entry())
+            yield chunk
+
+    async def async_record(self, key: str, response: AsyncIterator, cache_control: CacheControl) -> AsyncIterator:
+        recorder = CacheRecorder()
+        async for chunk in response:
+            if recorder.add(chunk) and not cache_control.no_store:
+                self.put(key, recorder.get_entry())
+            yield chunk
+
+    def lookup(self, key: Optional[str], stream: bool, cache_control: CacheControl) -> Optional[list]:
+        """
+        Returns the replayed chunks of a cached response, or None.
+        The cache status of the request is set in `cache_status`.
+        """
+        if key is None:
+            return None
+        item = None if cache_control.no_cache else self.get(key, cache_control.max_age)
+        if item is not None and item[0].get("stream", stream) != stream and item[0].get("tool_calls"):
+            # A streamed replay would lose the tool calls
+            item = None
+        if item is None:
+            self.misses += 1
+            cache_status.set((MISS, 0))
+            return None
+        self.hits += 1
+        entry, age = item
+        cache_status.set((HIT, age))
+        return list(replay(entry, stream))
+
+    def clear(self) -> None:
+        with self.lock:
+            self.entries.clear()
+            self.size = 0
+            if self.disk or self.connection is not None:
+                with self.get_connection() as connection:
+                    connection.execute("DELETE FROM entries")
+
+    def get_file(self) -> Path:
+        return Path(get_cookies_dir()) / CACHE_FILE
+
+    def get_dict(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "hits": self.hits,
+            "misses": self.misses,
+            "entries": len(self.entries),
+            "size": self.size,
+        }
+
+def replay(entry: dict, stream: bool) -> Iterator[Union[ChatCompletion, ChatCompletionChunk]]:
+    """Yields a cached response as chunks, or as one completion."""
+    completion_id = "".join(random.choices(string.ascii_letters + string.digits, k=28))
+    created = int(time.time())
+    if stream:
+        chunks = [
+            ChatCompletionChunk.model_construct(content, None, completion_id, created)
+            for content in entry["chunks"]
+        ]
+        chunks.append(ChatCompletionChunk.model_construct(
+            None, entry["finish_reason"], completion_id, created, usage=entry.get("usage")
+        ))
+    else:
+        chunks = [ChatCompletion.model_construct(
+            "".join(entry["chunks"]), entry["finish_reason"], completion_id, created,
+            tool_calls=entry.get("tool_calls"), usage=entry.get("usage")
+        )]
+    for chunk in chunks:
+        chunk.model = entry.get("model")
+        chunk.provider = entry.get("provider")
+        yield chunk
+
+async def async_replay(chunks: list) -> AsyncIterator:
+    for chunk in chunks:
+        yield chunk
+
+response_cache = ResponseCache()
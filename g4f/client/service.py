@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import copy
 from typing import Union
 
 from .. import debug, version
@@ -8,6 +9,8 @@ from ..models import Model, ModelUtils, default, default_vision
 from ..Provider import ProviderUtils
 from ..providers.types import BaseRetryProvider, ProviderType
 from ..providers.retry_provider import IterListProvider
+from ..providers.circuit_breaker import breakers
+from ..capabilities import index
 
 def convert_to_provider(provider: str) -> ProviderType:
     if " " in provider:
@@ -50,7 +53,7 @@ def get_model_and_provider(model    : Union[Model, str],
     """
     if debug.version_check:
         debug.version_check = False
-        version.utils.check_version()
+        version.utils.check_version_in_background()
 
     if isinstance(provider, str):
         provider = convert_to_provider(provider)
@@ -75,6 +78,13 @@ def get_model_and_provider(model    : Union[Model, str],
                 raise ModelNotFoundError(f'Model not found: {model}')
         elif isinstance(model, Model):
             provider = model.best_provider
+            # The index has only the working providers, else all providers of the model are used
+            if isinstance(provider, IterListProvider) and model.name in ModelUtils.convert and not ignore_working:
+                providers = index.get_providers(model.name)
+                if providers:
+                    # The best provider of the model is shared by all requests
+                    provider = copy.copy(provider)
+                    provider.providers = list(providers)
         else:
             raise ValueError(f"Unexpected type: {type(model)}")
     if not provider:
@@ -91,6 +101,11 @@ def get_model_and_provider(model    : Union[Model, str],
     if isinstance(provider, BaseRetryProvider):
         if not ignore_working:
             provider.providers = [p for p in provider.providers if p.working]
+            if provider.providers and not any(breakers.is_available(p.__name__, model) for p in provider.providers):
+                raise ProviderNotWorkingError(f"Circuit breaker is open for all providers of: {model}")
+    elif not ignore_working and not breakers.is_available(provider_name, model):
+        breaker = breakers.get(provider_name, model)
+        raise ProviderNotWorkingError(f"{provider_name} is skipped by circuit breaker: {breaker.reason}")
 
     if not ignore_stream and not provider.supports_stream and stream:
         raise StreamNotSupportedError(f'{provider_name} does not support "stream" argument')
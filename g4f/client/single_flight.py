@@ -0,0 +1,136 @@
+from __future__ import annotations
+
+import asyncio
+from typing import AsyncIterator, Optional, Any
+
+from .helper import get_request_key, safe_aclose
+from .. import debug
+
+class Flight:
+    """
+    One upstream call, shared by all concurrent identical requests.
+
+    The upstream response is consumed by a task, so it continues if a waiter leaves.
+    Each waiter replays the chunks from the start and then waits for new ones.
+    The task is cancelled, when the last waiter leaves.
+    """
+    def __init__(self, response: AsyncIterator) -> None:
+        self.response = response
+        self.chunks: list = []
+        self.done = False
+        self.error: Optional[BaseException] = None
+        self.waiters = 0
+        self.changed = asyncio.Event()
+        self.task: Optional[asyncio.Task] = None
+
+    def notify(self) -> None:
+        self.changed.set()
+        self.changed = asyncio.Event()
+
+    async def run(self) -> None:
+        try:
+            async for chunk in self.response:
+                self.chunks.append(chunk)
+                self.notify()
+        except Exception as e:
+            self.error = e
+        finally:
+            self.done = True
+            self.notify()
+            await safe_aclose(self.response)
+
+    async def iter(self) -> AsyncIterator:
+        index = 0
+        while True:
+            changed = self.changed
+            while index < len(self.chunks):
+                yield self.chunks[index]
+                index += 1
+            if self.done:
+                if self.error is not None:
+                    raise self.error
+                return
+            await changed.wait()
+
+class SingleFlight:
+    """
+    Coalesces identical concurrent completions into one upstream call.
+
+    Requests are identical, if model, provider, messages and sampling parameters are equal.
+    The chunks (and the final completion) are shared by all waiters, they should not be modified.
+    Requests with a non-zero or without a temperature are skipped, unless `force` is set,
+    as well as requests with a conversation or with arguments, that are not JSON serializable.
+
+    Attributes:
+        enabled (bool): Coalescing is off by default.
+        force (bool): Coalesce requests with a non-zero or without a temperature too.
+        hits (int): Requests, that joined a running call.
+        misses (int): Requests, that started an upstream call.
+        skipped (int): Requests, that could not be coalesced.
+    """
+    enabled: bool = False
+    force: bool = False
+
+    def __init__(self) -> None:
+        self.flights: dict[tuple[str, int], Flight] = {}
+        self.hits = 0
+        self.misses = 0
+        self.skipped = 0
+
+    def get_key(self, model: str, provider: Any, messages: list, stream: bool, **kwargs) -> Optional[str]:
+        """Returns the normalized key of a request or None, if it can't be coalesced."""
+        if not self.enabled:
+            return None
+        if kwargs.get("conversation") is not None or kwargs.get("return_conversation"):
+            self.skipped += 1
+            return None
+        # The default temperature of the providers is not 0
+        if not self.force and kwargs.get("temperature", 1) != 0:
+            self.skipped += 1
+            return None
+        key = get_request_key(model, provider, messages, stream=stream, **kwargs)
+        if key is None:
+            self.skipped += 1
+        return key
+
+    async def iter(self, key: str, response: AsyncIterator) -> AsyncIterator:
+        """
+        Yields the chunks of the running call with the same key.
+        If there is no running call, it is started with the response.
+        """
+        flight_key = (key, id(asyncio.get_running_loop()))
+        flight = self.flights.get(flight_key)
+        if flight is None:
+            self.misses += 1
+            flight = Flight(response)
+            self.flights[flight_key] = flight
+            flight.task = asyncio.create_task(flight.run())
+            flight.task.add_done_callback(lambda task: self.remove(flight_key, flight))
+        else:
+            self.hits += 1
+            debug.log(f"Join running completion: {key[:16]}")
+            await safe_aclose(response)
+        flight.waiters += 1
+        try:
+            async for chunk in flight.iter():
+                yield chunk
+        finally:
+            flight.waiters -= 1
+            if not flight.waiters and not flight.done:
+                self.remove(flight_key, flight)
+                flight.task.cancel()
+
+    def remove(self, flight_key: tuple[str, int], flight: Flight) -> None:
+        if self.flights.get(flight_key) is flight:
+            del self.flights[flight_key]
+
+    def get_dict(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "hits": self.hits,
+            "misses": self.misses,
+            "skipped": self.skipped,
+            "running": len(self.flights),
+        }
+
+single_flight = SingleFlight()
@@ -1,10 +1,18 @@
 from __future__ import annotations
 
-from typing import Optional, List, Dict, Any
+import json
+import asyncio
+from typing import Optional, List, Dict, Any, AsyncIterator
 from time import time
 
 from .helper import filter_none
 
+try:
+    import orjson
+    has_orjson = True
+except ImportError:
+    has_orjson = False
+
 ToolCalls = Optional[List[Dict[str, Any]]]
 Usage = Optional[Dict[str, int]]
 
@@ -159,4 +167,123 @@ class ImagesResponse(BaseModel):
             model=model,
             provider=provider,
             created=created
-        )
\ No newline at end of file
+        )
+
+
+def dump_json(value) -> bytes:
+    if has_orjson:
+        return orjson.dumps(value)
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode()
+
+class ChunkEncoder:
+    """
+    Encodes the chunks of a streamed chat completion as server-sent events.
+
+    The envelope of a content delta (id, created, model, provider) is rendered once
+    into a byte template, so only the content is escaped per chunk. Other chunks are
+    encoded completely. Tiny deltas can be coalesced into one frame, until
+    `coalesce_size` characters are buffered or `coalesce_interval` seconds have passed.
+    Use `stream` to flush the buffered content on time, also if no chunk arrives.
+    """
+    def __init__(self, coalesce_size: int = 0, coalesce_interval: float = 0) -> None:
+        self.coalesce_size = coalesce_size
+        self.coalesce_interval = coalesce_interval
+        self.envelope: Optional[tuple] = None
+        self.prefix: bytes = b""
+        self.buffer: list[str] = []
+        self.buffer_size = 0
+        self.buffer_started = 0
+        self.buffer_prefix: bytes = b""
+
+    def get_prefix(self, chunk: ChatCompletionChunk) -> bytes:
+        envelope = (chunk.id, chunk.created, chunk.model, chunk.provider)
+        if envelope != self.envelope:
+            self.envelope = envelope
+            self.prefix = b"".join([
+                b'data: {"id":', dump_json(chunk.id),
+                b',"object":', dump_json(chunk.object),
+                b',"created":', dump_json(chunk.created),
+                b',"model":', dump_json(chunk.model),
+                b',"provider":', dump_json(chunk.provider),
+                b',"choices":[{"index":0,"delta":{"role":"assistant","content":'
+            ])
+        return self.prefix
+
+    def encode(self, chunk: ChatCompletionChunk) -> bytes:
+        """Returns the SSE frames of a chunk. It is empty, if the content is buffered."""
+        choice = chunk.choices[0]
+        content = choice.delta.content
+        if content is None or choice.finish_reason is not None or getattr(chunk, "usage", None) is not None:
+            return self.flush() + b"data: " + chunk.json().encode() + b"\n\n"
+        prefix = self.get_prefix(chunk)
+        if not self.coalesce_size and not self.coalesce_interval:
+            return prefix + dump_json(content) + b'},"finish_reason":null}]}\n\n'
+        if not self.buffer:
+            self.buffer_started = time()
+        self.buffer.append(content)
+        self.buffer_size += len(content)
+        self.buffer_prefix = prefix
+        if (self.coalesce_size and self.buffer_size >= self.coalesce_size) or (
+            self.coalesce_interval and time() - self.buffer_started >= self.coalesce_interval
+        ):
+            return self.flush()
+        return b""
+
+    def get_timeout(self) -> Optional[float]:
+        """Returns the seconds until the buffered content is due, or None if there is no deadline."""
+        if not self.buffer or not self.coalesce_interval:
+            return None
+        return max(0, self.buffer_started + self.coalesce_interval - time())
+
+    async def stream(self, response: AsyncIterator) -> AsyncIterator:
+        """
+        Yields the SSE frames of the completion chunks, other chunks are passed through.
+        The buffered content is flushed after `coalesce_interval`, while the next chunk is awaited.
+        Errors of the response, like a TimeoutError of its deadline, are raised.
+        """
+        if not self.coalesce_interval:
+            async for chunk in response:
+                if isinstance(chunk, ChatCompletionChunk):
+                    chunk = self.encode(chunk)
+                    if not chunk:
+                        continue
+                yield chunk
+            return
+        # The response is iterated in one task from the first to the last chunk,
+        # so that the timeouts of the providers stay bound to the task, that awaits them
+        queue: asyncio.Queue = asyncio.Queue(1)
+        async def iterate() -> None:
+            try:
+                async for chunk in response:
+                    await queue.put((chunk, None))
+                await queue.put((None, StopAsyncIteration()))
+            except Exception as e:
+                await queue.put((None, e))
+        task = asyncio.ensure_future(iterate())
+        try:
+            while True:
+                try:
+                    chunk, error = await asyncio.wait_for(queue.get(), self.get_timeout())
+                except asyncio.TimeoutError:
+                    yield self.flush()
+                    continue
+                if isinstance(error, StopAsyncIteration):
+                    break
+                elif error is not None:
+                    raise error
+                if isinstance(chunk, ChatCompletionChunk):
+                    chunk = self.encode(chunk)
+                    if not chunk:
+                        continue
+                yield chunk
+        finally:
+            task.cancel()
+
+    def flush(self) -> bytes:
+        """Returns the buffered content as one frame."""
+        if not self.buffer:
+            return b""
+        content = "".join(self.buffer)
+        self.buffer = []
+        self.buffer_size = 0
+        return self.buffer_prefix + dump_json(content) + b'},"finish_reason":null}]}\n\n'
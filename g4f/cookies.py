@@ -2,7 +2,6 @@ from __future__ import annotations
 
 import os
 import time
-import json
 
 try:
     from platformdirs import user_config_dir
@@ -135,11 +134,12 @@ def read_cookie_files(dirPath: str = None):
         debug.log(f"Read cookies: {dirPath} dir is not readable")
         return
 
+    from .har_index import har_index
+
     def get_domain(v: dict) -> str:
-        host = [h["value"] for h in v['request']['headers'] if h["name"].lower() in ("host", ":authority")]
+        host = v["headers"].get("host", v["headers"].get(":authority"))
         if not host:
             return
-        host = host.pop()
         for d in DOMAINS:
             if d in host:
                 return d
@@ -155,42 +155,29 @@ def read_cookie_files(dirPath: str = None):
 
     CookiesConfig.cookies = {}
     for path in harFiles:
-        with open(path, 'rb') as file:
-            try:
-                harFile = json.load(file)
-            except json.JSONDecodeError:
-                # Error: not a HAR file!
+        # Only changed files are parsed again
+        entries = har_index.get_entries(path)
+        if entries is None:
+            # Error: not a HAR file!
+            continue
+        debug.log(f"Read .har file: {path}")
+        new_cookies = {}
+        for v in entries:
+            domain = get_domain(v)
+            if domain is None:
                 continue
-            debug.log(f"Read .har file: {path}")
-            new_cookies = {}
-            for v in harFile['log']['entries']:
-                domain = get_domain(v)
-                if domain is None:
-                    continue
-                v_cookies = {}
-                for c in v['request']['cookies']:
-                    v_cookies[c['name']] = c['value']
-                if len(v_cookies) > 0:
-                    CookiesConfig.cookies[domain] = v_cookies
-                    new_cookies[domain] = len(v_cookies)
-            for domain, new_values in new_cookies.items():
-                debug.log(f"Cookies added: {new_values} from {domain}")
+            if len(v['cookies']) > 0:
+                CookiesConfig.cookies[domain] = dict(v['cookies'])
+                new_cookies[domain] = len(v['cookies'])
+        for domain, new_values in new_cookies.items():
+            debug.log(f"Cookies added: {new_values} from {domain}")
     for path in cookieFiles:
-        with open(path, 'rb') as file:
-            try:
-                cookieFile = json.load(file)
-            except json.JSONDecodeError:
-                # Error: not a json file!
-                continue
-            if not isinstance(cookieFile, list) or not isinstance(cookieFile[0], dict) or "domain" not in cookieFile[0]:
-                continue
-            debug.log(f"Read cookie file: {path}")
-            new_cookies = {}
-            for c in cookieFile:
-                if isinstance(c, dict) and "domain" in c:
-                    if c["domain"] not in new_cookies:
-                        new_cookies[c["domain"]] = {}
-                    new_cookies[c["domain"]][c["name"]] = c["value"]
-            for domain, new_values in new_cookies.items():
-                debug.log(f"Cookies added: {len(new_values)} from {domain}")
-                CookiesConfig.cookies[domain] = new_values
\ No newline at end of file
+        new_cookies = har_index.get_cookies(path)
+        if new_cookies is None:
+            # Error: not a cookie file!
+            continue
+        debug.log(f"Read cookie file: {path}")
+        for domain, new_values in new_cookies.items():
+            debug.log(f"Cookies added: {len(new_values)} from {domain}")
+            CookiesConfig.cookies[domain] = dict(new_values)
+    har_index.save()
\ No newline at end of file
@@ -44,7 +44,10 @@ class ResponseStatusError(Exception):
     ...
 
 class RateLimitError(ResponseStatusError):
-    ...
+    """Raised for rate limits. `retry_after` is the number of seconds until the limit resets, if known."""
+    def __init__(self, *args, retry_after: float = None):
+        super().__init__(*args)
+        self.retry_after = retry_after
 
 class NoValidHarFileError(Exception):
     ...
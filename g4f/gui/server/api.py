@@ -2,20 +2,22 @@ from __future__ import annotations
 
 import logging
 import os
-import asyncio
 from typing import Iterator
 from flask import send_from_directory
 from inspect import signature
 
 from ...errors import VersionNotFoundError
 from ...image.copy_images import copy_images, ensure_images_dir, images_dir
+from ...image.thumbnails import get_preview_url
 from ...tools.run_tools import iter_run_tools
-from ...Provider import ProviderUtils, __providers__
+from ...Provider import ProviderUtils
 from ...providers.base_provider import ProviderModelMixin
 from ...providers.retry_provider import BaseRetryProvider
 from ...providers.helper import format_image_prompt
+from ...providers.asyncio import run_sync
 from ...providers.response import *
-from ... import version, models
+from ...capabilities import index, Capability
+from ... import version
 from ... import ChatCompletion, get_model_and_provider
 from ... import debug
 
@@ -25,17 +27,17 @@ conversations: dict[dict[str, BaseConversation]] = {}
 class Api:
     @staticmethod
     def get_models():
+        index.refresh()
         return [{
-            "name": model.name,
-            "image": isinstance(model, models.ImageModel),
-            "vision": isinstance(model, models.VisionModel),
+            "name": model,
+            "image": bool(index.model_flags[model] & Capability.IMAGE),
+            "vision": bool(index.model_flags[model] & Capability.VISION),
             "providers": [
                 getattr(provider, "parent", provider.__name__)
                 for provider in providers
-                if provider.working
             ]
         }
-        for model, providers in models.__models__.values()]
+        for model, providers in index.model_providers.items()]
 
     @staticmethod
     def get_provider_models(provider: str, api_key: str = None, api_base: str = None):
@@ -59,16 +61,17 @@ class Api:
 
     @staticmethod
     def get_providers() -> dict[str, str]:
+        index.refresh()
         return [{
             "name": provider.__name__,
             "label": provider.label if hasattr(provider, "label") else provider.__name__,
             "parent": getattr(provider, "parent", None),
-            "image": bool(getattr(provider, "image_models", False)),
+            "image": bool(index.provider_flags[name] & Capability.IMAGE),
             "vision": getattr(provider, "default_vision_model", None) is not None,
             "nodriver": getattr(provider, "use_nodriver", False),
-            "auth": provider.needs_auth,
+            "auth": bool(index.provider_flags[name] & Capability.AUTH),
             "login_url": getattr(provider, "login_url", None),
-        } for provider in __providers__ if provider.working]
+        } for name, provider in index.providers.items() if provider.working]
 
     @staticmethod
     def get_version() -> dict:
@@ -192,8 +195,8 @@ class Api:
                     images = chunk
                     if download_images or chunk.get("cookies"):
                         chunk.alt = format_image_prompt(kwargs.get("messages"), chunk.alt)
-                        images = asyncio.run(copy_images(chunk.get_list(), chunk.get("cookies"), proxy=proxy, alt=chunk.alt))
-                        images = ImageResponse(images, chunk.alt)
+                        images = run_sync(copy_images(chunk.get_list(), chunk.get("cookies"), proxy=proxy))
+                        images = ImageResponse(images, chunk.alt, {"preview": [get_preview_url(image) for image in images]})
                     yield self._format_json("content", str(images), images=chunk.get_list(), alt=chunk.alt)
                 elif isinstance(chunk, SynthesizeData):
                     yield self._format_json("synthesize", chunk.get_dict())
@@ -11,8 +11,6 @@ import datetime
 from flask import Flask, Response, request, jsonify, render_template
 from typing import Generator
 from pathlib import Path
-from urllib.parse import quote_plus
-from hashlib import sha256
 from werkzeug.utils import secure_filename
 try:
     from flask_limiter import Limiter
@@ -21,14 +19,17 @@ try:
 except ImportError:
     has_flask_limiter = False
 
-from ...image import is_allowed_extension, to_image
+from ...image import is_allowed_extension, to_image, ImageRef
 from ...client.service import convert_to_provider
-from ...providers.asyncio import to_sync_generator
-from ...client.helper import filter_markdown
+from ...providers.asyncio import to_sync_generator, run_sync
+from ...client.helper import filter_markdown, get_request_key
+from ...client.response_cache import response_cache
 from ...tools.files import supports_filename, get_streaming, get_bucket_dir, get_buckets
 from ...tools.run_tools import iter_run_tools
-from ...errors import ProviderNotFoundError
+from ...errors import ProviderNotFoundError, MissingRequirementsError
+from ...image.thumbnails import thumbnails
 from ...cookies import get_cookies_dir
+from ...capabilities import index
 from ... import ChatCompletion
 from ... import models
 from .api import Api
@@ -82,12 +83,17 @@ class Backend_Api(Api):
             def home():
                 return render_template('home.html')
 
+        def jsonify_cached(key: str, create: callable):
+            content, etag = index.get_response(key, create)
+            response = Response(content, mimetype="application/json")
+            response.set_etag(etag)
+            return response.make_conditional(request)
+
         @app.route('/backend-api/v2/models', methods=['GET'])
         def jsonify_models(**kwargs):
-            response = get_demo_models() if app.demo else self.get_models(**kwargs)
-            if isinstance(response, list):
-                return jsonify(response)
-            return response
+            if app.demo:
+                return jsonify(get_demo_models())
+            return jsonify_cached("gui/models", lambda: self.get_models(**kwargs))
 
         @app.route('/backend-api/v2/models/<provider>', methods=['GET'])
         def jsonify_provider_models(**kwargs):
@@ -98,10 +104,7 @@ class Backend_Api(Api):
 
         @app.route('/backend-api/v2/providers', methods=['GET'])
         def jsonify_providers(**kwargs):
-            response = self.get_providers(**kwargs)
-            if isinstance(response, list):
-                return jsonify(response)
-            return response
+            return jsonify_cached("gui/providers", lambda: self.get_providers(**kwargs))
 
         def get_demo_models():
             return [{
@@ -128,7 +131,10 @@ class Backend_Api(Api):
                 images = []
                 for file in request.files.getlist('files[]'):
                     if file.filename != '' and is_allowed_extension(file.filename):
-                        images.append((to_image(file.stream, file.filename.endswith('.svg')), file.filename))
+                        if file.filename.endswith('.svg'):
+                            images.append((to_image(file.stream, True), file.filename))
+                        else:
+                            images.append((ImageRef(file.read()), file.filename))
                 kwargs['images'] = images
             if "json" in request.form:
                 json_data = json.loads(request.form['json'])
@@ -233,6 +239,10 @@ class Backend_Api(Api):
             '/images/<path:name>': {
                 'function': self.serve_images,
                 'methods': ['GET']
+            },
+            '/thumbnail/<path:name>': {
+                'function': self.serve_thumbnail,
+                'methods': ['GET']
             }
         }
 
@@ -265,18 +275,14 @@ class Backend_Api(Api):
                     "tool_calls": tool_calls,
                 }
                 if cache_id:
-                    cache_id = sha256(cache_id.encode() + json.dumps(parameters, sort_keys=True).encode()).hexdigest()
-                    cache_dir = Path(get_cookies_dir()) / ".scrape_cache" / "create"
-                    cache_file = cache_dir / f"{quote_plus(request.args.get('prompt').strip()[:20])}.{cache_id}.txt"
-                    if cache_file.exists():
-                        with cache_file.open("r") as f:
-                            response = f.read()
+                    # Cached responses are stored on disk, so they are kept on restarts
+                    cache_key = get_request_key(**parameters, cache=cache_id)
+                    cached = response_cache.get(cache_key, disk=True)
+                    if cached is not None:
+                        response = cached[0]["chunks"]
                     else:
-                        response = iter_run_tools(ChatCompletion.create, **parameters)
-                        cache_dir.mkdir(parents=True, exist_ok=True)
-                        with cache_file.open("w") as f:
-                            for chunk in response:
-                                f.write(str(chunk))
+                        response = [str(chunk) for chunk in iter_run_tools(ChatCompletion.create, **parameters)]
+                        response_cache.put(cache_key, {"chunks": response, "finish_reason": "stop"}, disk=True)
                 else:
                     response = iter_run_tools(ChatCompletion.create, **parameters)
 
@@ -392,7 +398,7 @@ class Backend_Api(Api):
             return "Provider doesn't support synthesize", 500
         response_data = provider_handler.synthesize({**request.args})
         if asyncio.iscoroutinefunction(provider_handler.synthesize):
-            response_data = asyncio.run(response_data)
+            response_data = run_sync(response_data)
         else:
             if hasattr(response_data, "__aiter__"):
                 response_data = to_sync_generator(response_data)
@@ -402,6 +408,24 @@ class Backend_Api(Api):
         response.headers['Cache-Control'] = "max-age=604800"
         return response
 
+    def serve_thumbnail(self, name: str):
+        try:
+            target = thumbnails.get_sync(
+                name,
+                request.args.get("w", 200, type=int),
+                request.args.get("h", 200, type=int),
+                request.args.get("format", "webp")
+            )
+        except MissingRequirementsError:
+            return self.serve_images(name)
+        except ValueError as e:
+            return jsonify({"error": {"message": str(e)}}), 400
+        if target is None:
+            return "File not found", 404
+        response = flask.send_file(target)
+        response.headers['Cache-Control'] = "public, max-age=31536000"
+        return response
+
     def get_provider_models(self, provider: str):
         api_key = request.headers.get("x_api_key")
         api_base = request.headers.get("x_api_base")
@@ -0,0 +1,169 @@
+from __future__ import annotations
+
+import os
+import re
+import json
+import threading
+from typing import Iterator, Optional
+
+from .cookies import get_cookies_dir
+from . import debug
+
+INDEX_FILE = ".har_index"
+ENTRIES_PATTERN = re.compile(r'"entries"\s*:\s*\[')
+ACCESS_TOKEN_PATTERN = re.compile(r'"accessToken":"(.*?)"')
+
+def iter_har_entries(path: str, chunk_size: int = 1024 * 1024) -> Iterator[dict]:
+    """
+    Yields the entries of a .har file, one at a time.
+    Only the entry, that is decoded, and the next chunk of the file are in memory.
+
+    Raises:
+        json.JSONDecodeError: If the file is not a valid HAR file.
+    """
+    decoder = json.JSONDecoder()
+    with open(path, "r", encoding="utf-8", errors="replace") as file:
+        buffer = ""
+        while True:
+            chunk = file.read(chunk_size)
+            if not chunk:
+                raise json.JSONDecodeError("No entries found", buffer, 0)
+            buffer += chunk
+            match = ENTRIES_PATTERN.search(buffer)
+            if match:
+                buffer = buffer[match.end():]
+                break
+            # Keep the end, the "entries" key could be split between two chunks
+            buffer = buffer[-32:]
+        pos = 0
+        eof = False
+        while True:
+            while pos < len(buffer) and buffer[pos] in " \t\r\n,":
+                pos += 1
+            if pos < len(buffer) and buffer[pos] == "]":
+                return
+            try:
+                if pos >= len(buffer):
+                    raise json.JSONDecodeError("Unexpected end of entries", buffer, pos)
+                entry, pos = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+                # The entry is incomplete: Read at least as much as buffered, to keep decoding linear
+                chunk = file.read(max(chunk_size, len(buffer) - pos))
+                eof = not chunk
+                buffer = buffer[pos:] + chunk
+                pos = 0
+                continue
+            yield entry
+            if pos > chunk_size:
+                buffer = buffer[pos:]
+                pos = 0
+
+def compact_entry(entry: dict) -> dict:
+    """Returns the URL, the headers, the cookies and the form params of the request of a HAR entry."""
+    request = entry.get("request", {})
+    compact = {
+        "url": request.get("url", ""),
+        "headers": {
+            header["name"].lower(): header["value"]
+            for header in request.get("headers", [])
+            if header["name"].lower() != "cookie"
+        },
+        "cookies": {cookie["name"]: cookie["value"] for cookie in request.get("cookies", [])},
+    }
+    params = (request.get("postData") or {}).get("params")
+    if params:
+        compact["params"] = {param["name"]: param["value"] for param in params}
+    # The access token of a session response
+    text = ((entry.get("response") or {}).get("content") or {}).get("text")
+    if text:
+        match = ACCESS_TOKEN_PATTERN.search(text)
+        if match:
+            compact["access_token"] = match.group(1)
+    return compact
+
+class HarIndex:
+    """
+    Index of the .har and cookie files in the cookies dir.
+
+    HAR files are parsed incrementally. Only the request URLs, headers, cookies
+    and form params are kept. The index is stored in the cookies dir
+    and a file is only parsed again, if its mtime or size changed.
+    """
+    def __init__(self) -> None:
+        self.files: dict[str, dict] = {}
+        self.index_file: Optional[str] = None
+        self.changed = False
+        self.lock = threading.RLock()
+
+    def get_index_file(self) -> str:
+        return os.path.join(get_cookies_dir(), INDEX_FILE)
+
+    def load(self) -> None:
+        index_file = self.get_index_file()
+        if self.index_file == index_file:
+            return
+        self.index_file = index_file
+        self.files = {}
+        try:
+            with open(index_file, "r") as file:
+                self.files = json.load(file)
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError) as e:
+            debug.log(f"Read HAR index failed: {type(e).__name__}: {e}")
+
+    def save(self) -> None:
+        """Stores the index, if it changed. Files that no longer exist are removed."""
+        with self.lock:
+            if not self.changed or self.index_file is None:
+                return
+            self.files = {path: record for path, record in self.files.items() if os.path.exists(path)}
+            try:
+                with open(self.index_file, "w") as file:
+                    json.dump(self.files, file)
+                self.changed = False
+            except OSError as e:
+                debug.log(f"Write HAR index failed: {type(e).__name__}: {e}")
+
+    def get(self, path: str, key: str, parse: callable):
+        path = os.path.abspath(path)
+        with self.lock:
+            self.load()
+            try:
+                stat = os.stat(path)
+            except OSError:
+                return None
+            record = self.files.get(path)
+            if record is not None and record["mtime"] == stat.st_mtime and record["size"] == stat.st_size and key in record:
+                return record[key]
+            try:
+                value = parse(path)
+            except (OSError, ValueError, KeyError, IndexError, TypeError, AttributeError) as e:
+                debug.log(f"Read file failed: {path}: {type(e).__name__}: {e}")
+                value = None
+            self.files[path] = {"mtime": stat.st_mtime, "size": stat.st_size, key: value}
+            self.changed = True
+            return value
+
+    def get_entries(self, path: str) -> Optional[list[dict]]:
+        """Returns the compact entries of a .har file, or None if it is not a valid HAR file."""
+        return self.get(path, "entries", lambda path: [compact_entry(entry) for entry in iter_har_entries(path)])
+
+    def get_cookies(self, path: str) -> Optional[dict[str, dict]]:
+        """Returns the cookies by domain of a cookie file, or None if it is not a cookie file."""
+        return self.get(path, "cookies", read_cookie_file)
+
+def read_cookie_file(path: str) -> Optional[dict[str, dict]]:
+    with open(path, "rb") as file:
+        cookie_file = json.load(file)
+    if not isinstance(cookie_file, list) or not isinstance(cookie_file[0], dict) or "domain" not in cookie_file[0]:
+        return None
+    cookies = {}
+    for cookie in cookie_file:
+        if isinstance(cookie, dict) and "domain" in cookie:
+            cookies.setdefault(cookie["domain"], {})[cookie["name"]] = cookie["value"]
+    return cookies
+
+har_index = HarIndex()
@@ -4,6 +4,8 @@ import os
 import re
 import io
 import base64
+import hashlib
+from functools import cached_property
 from io import BytesIO
 from pathlib import Path
 try:
@@ -13,9 +15,11 @@ try:
 except ImportError:
     has_requirements = False
 
-from ..typing import ImageType, Union, Image
+from ..typing import ImageType, ImagesType, Union, Image
 from ..errors import MissingRequirementsError
 
+DATA_URI_PATTERN = re.compile(r'data:image/(\w+);base64,')
+
 ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg', 'gif', 'webp', 'svg'}
 
 EXTENSIONS_MAP: dict[str, str] = {
@@ -38,6 +42,12 @@ def to_image(image: ImageType, is_svg: bool = False) -> Image:
     if not has_requirements:
         raise MissingRequirementsError('Install "pillow" package for images')
 
+    if isinstance(image, ImageRef):
+        if is_svg:
+            image = image.data
+        else:
+            return image.to_image()
+
     if isinstance(image, str) and image.startswith("data:"):
         is_data_uri_an_image(image)
         image = extract_data_uri(image)
@@ -87,10 +97,11 @@ def is_data_uri_an_image(data_uri: str) -> bool:
         ValueError: If the data URI is invalid or the image format is not allowed.
     """
     # Check if the data URI starts with 'data:image' and contains an image format (e.g., jpeg, png, gif)
-    if not re.match(r'data:image/(\w+);base64,', data_uri):
+    match = DATA_URI_PATTERN.match(data_uri)
+    if not match:
         raise ValueError("Invalid data URI image.")
     # Extract the image format from the data URI
-    image_format = re.match(r'data:image/(\w+);base64,', data_uri).group(1).lower()
+    image_format = match.group(1).lower()
     # Check if the image format is one of the allowed formats (jpg, jpeg, png, gif)
     if image_format not in ALLOWED_EXTENSIONS and image_format != "svg+xml":
         raise ValueError("Invalid image format (from mime file type).")
@@ -175,7 +186,9 @@ def process_image(image: Image, new_width: int, new_height: int) -> Image:
             image = image.transpose(ROTATE_90)
     # Resize image
     image.thumbnail((new_width, new_height))
-    # Remove transparency
+    # Remove transparency, also of palette and grayscale images
+    if image.mode in ("LA", "PA") or (image.mode == "P" and "transparency" in image.info):
+        image = image.convert("RGBA")
     if image.mode == "RGBA":
         image.load()
         white = new_image('RGB', image.size, (255, 255, 255))
@@ -198,6 +211,8 @@ def to_bytes(image: ImageType) -> bytes:
     """
     if isinstance(image, bytes):
         return image
+    elif isinstance(image, ImageRef):
+        return image.data
     elif isinstance(image, str) and image.startswith("data:"):
         is_data_uri_an_image(image)
         return extract_data_uri(image)
@@ -218,12 +233,116 @@ def to_bytes(image: ImageType) -> bytes:
         return image.read()
 
 def to_data_uri(image: ImageType) -> str:
+    if isinstance(image, ImageRef):
+        return image.data_uri
     if not isinstance(image, str):
         data = to_bytes(image)
         data_base64 = base64.b64encode(data).decode()
         return f"data:{is_accepted_format(data)};base64,{data_base64}"
     return image
 
+class ImageRef:
+    """
+    Reference to an input image, that is decoded at most once.
+
+    The bytes, the data URI, the mime type, the dimensions and the content hash
+    are computed on first use and cached. The image functions of this module
+    and the providers accept it wherever an ImageType is expected.
+
+    Args:
+        image (ImageType): A data URI, the image bytes, a PIL Image, a file or a path.
+    """
+    def __init__(self, image: ImageType) -> None:
+        self.source = image
+        self.declared_type = None
+        if isinstance(image, str) and image.startswith("data:"):
+            is_data_uri_an_image(image)
+            self.declared_type = DATA_URI_PATTERN.match(image).group(0)[5:-8]
+        elif isinstance(image, bytes):
+            self.data = image
+
+    @classmethod
+    def from_data_uri(cls, data_uri: str) -> ImageRef:
+        """Creates a reference from a data URI. Raises a ValueError, if it is not an image data URI."""
+        if not isinstance(data_uri, str) or not data_uri.startswith("data:"):
+            raise ValueError("Invalid data URI image.")
+        return cls(data_uri)
+
+    @cached_property
+    def data(self) -> bytes:
+        return to_bytes(self.source)
+
+    @cached_property
+    def header(self) -> bytes:
+        """The first bytes of the image. They are decoded without the rest of a data URI."""
+        if self.declared_type is not None and "data" not in self.__dict__:
+            start = self.source.index(",") + 1
+            return base64.b64decode(self.source[start:start + 16])
+        return self.data[:12]
+
+    @cached_property
+    def mime_type(self) -> str:
+        try:
+            return is_accepted_format(self.header)
+        except ValueError:
+            if self.declared_type is None:
+                raise
+            return self.declared_type
+
+    @cached_property
+    def data_uri(self) -> str:
+        if self.declared_type is not None:
+            return self.source
+        return f"data:{self.mime_type};base64,{base64.b64encode(self.data).decode()}"
+
+    @cached_property
+    def digest(self) -> str:
+        """The sha256 hash of the image bytes."""
+        return hashlib.sha256(self.data).hexdigest()
+
+    @cached_property
+    def dimensions(self) -> tuple[int, int]:
+        """The width and height of the image. Only the header of the image is parsed."""
+        with self.to_image() as image:
+            return image.size
+
+    @property
+    def width(self) -> int:
+        return self.dimensions[0]
+
+    @property
+    def height(self) -> int:
+        return self.dimensions[1]
+
+    @property
+    def extension(self) -> str:
+        return self.mime_type.split("/")[-1].split("+")[0]
+
+    def to_image(self) -> Image:
+        if not has_requirements:
+            raise MissingRequirementsError('Install "pillow" package for images')
+        return open_image(BytesIO(self.data))
+
+    def __len__(self) -> int:
+        return len(self.data)
+
+    def __repr__(self) -> str:
+        return f"ImageRef({self.mime_type}, {len(self)} bytes)"
+
+def to_image_ref(image: ImageType) -> ImageRef:
+    """Returns a reference of an image. Existing references are returned unchanged."""
+    return image if isinstance(image, ImageRef) else ImageRef(image)
+
+def to_image_refs(images: ImagesType) -> ImagesType:
+    """
+    Replaces data URIs and image bytes in a list of images with references,
+    so that they are decoded once. Other images, like URLs, are not changed.
+    """
+    return [
+        (to_image_ref(image) if isinstance(image, bytes) or (isinstance(image, str) and image.startswith("data:")) else image, image_name)
+        for image, image_name in images
+    ]
+
 class ImageDataResponse():
     def __init__(
         self,
@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+import base64
+import asyncio
+import weakref
+from urllib.parse import urlparse
+from typing import AsyncIterator, Awaitable, Callable, TypeVar
+
+from aiohttp import ClientSession, ClientConnectionError, ClientPayloadError, ClientResponseError
+
+from .. import debug
+
+T = TypeVar("T")
+
+RETRY_STATUS = (408, 429, 500, 502, 503, 504)
+
+class ImageDownloader:
+    """
+    Downloads images with a bounded concurrency, in total and per host.
+
+    Responses are streamed in large chunks. Transient errors (connection errors,
+    timeouts and retryable status codes) are retried with an exponential backoff.
+
+    Attributes:
+        limit (int): The maximum number of concurrent downloads.
+        limit_per_host (int): The maximum number of concurrent downloads per host.
+        chunk_size (int): The size of the streamed chunks.
+        retries (int): The number of retries after a transient error.
+        retry_delay (float): Seconds before the first retry, doubled on each retry.
+    """
+    limit: int = 16
+    limit_per_host: int = 4
+    chunk_size: int = 64 * 1024
+    retries: int = 2
+    retry_delay: float = 0.5
+
+    def __init__(self) -> None:
+        self.semaphores: weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, dict[str, asyncio.Semaphore]] = weakref.WeakKeyDictionary()
+
+    def get_semaphores(self, url: str) -> tuple[asyncio.Semaphore, asyncio.Semaphore]:
+        semaphores = self.semaphores.setdefault(asyncio.get_running_loop(), {})
+        host = urlparse(url).netloc
+        if "" not in semaphores:
+            semaphores[""] = asyncio.Semaphore(self.limit)
+        if host not in semaphores:
+            semaphores[host] = asyncio.Semaphore(self.limit_per_host)
+        return semaphores[""], semaphores[host]
+
+    async def fetch(
+        self,
+        session: ClientSession,
+        url: str,
+        handler: Callable[[AsyncIterator[bytes]], Awaitable[T]],
+        **kwargs
+    ) -> T:
+        """
+        Downloads an image and passes the streamed chunks to the handler.
+        The handler is called again on a retry.
+        """
+        total, per_host = self.get_semaphores(url)
+        delay = self.retry_delay
+        for retry in range(self.retries + 1):
+            try:
+                # A busy host doesn't hold slots of the total limit, while it waits
+                async with per_host, total:
+                    async with session.get(url, **kwargs) as response:
+                        if response.status in RETRY_STATUS and retry < self.retries:
+                            raise ClientResponseError(response.request_info, (), status=response.status)
+                        response.raise_for_status()
+                        return await handler(response.content.iter_chunked(self.chunk_size))
+            except (ClientConnectionError, ClientPayloadError, ClientResponseError, asyncio.TimeoutError) as e:
+                if retry >= self.retries or (isinstance(e, ClientResponseError) and e.status not in RETRY_STATUS):
+                    raise
+                debug.log(f"Download image failed: {type(e).__name__}: {e}, retry in {delay}s: {url}")
+            await asyncio.sleep(delay)
+            delay *= 2
+
+    async def fetch_base64(self, session: ClientSession, url: str, **kwargs) -> str:
+        """Downloads an image and encodes it to base64 while it is streamed."""
+        return await self.fetch(session, url, encode_base64, **kwargs)
+
+async def encode_base64(chunks: AsyncIterator[bytes]) -> str:
+    """Encodes streamed bytes to base64. Only a remainder of less than 3 bytes is buffered."""
+    encoded = []
+    rest = b""
+    async for chunk in chunks:
+        if rest:
+            chunk = rest + chunk
+        end = len(chunk) - len(chunk) % 3
+        encoded.append(base64.b64encode(chunk[:end]))
+        rest = chunk[end:]
+    encoded.append(base64.b64encode(rest))
+    return b"".join(encoded).decode()
+
+downloader = ImageDownloader()
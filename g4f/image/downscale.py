@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+import math
+import threading
+from io import BytesIO
+from collections import OrderedDict
+from typing import Optional
+try:
+    from PIL.Image import DecompressionBombError
+except ImportError:
+    DecompressionBombError = OSError
+
+from . import ImageRef, has_requirements, process_image, to_image_refs
+from ..typing import ImagesType
+from .. import debug
+
+FORMATS = {"jpeg": "JPEG", "jpg": "JPEG", "webp": "WEBP", "png": "PNG"}
+
+class ImageDownscaler:
+    """
+    Fits input images into the image budget of a provider, before they are uploaded.
+
+    Images are resized and re-encoded only if they exceed the budget.
+    The results are cached by content hash and budget,
+    so images sent again in a multi-turn conversation are not processed again.
+
+    Attributes:
+        max_entries (int): The number of cached images.
+        quality (int): The quality of re-encoded images.
+        min_side (int): The smallest side length, when the byte budget is approached.
+    """
+    max_entries: int = 32
+    quality: int = 85
+    min_side: int = 64
+
+    def __init__(self) -> None:
+        self.entries: OrderedDict[tuple, ImageRef] = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def exceeds(self, image: ImageRef, max_pixels: Optional[int], max_bytes: Optional[int]) -> bool:
+        if max_bytes and len(image) > max_bytes:
+            return True
+        if max_pixels and has_requirements:
+            try:
+                return image.width * image.height > max_pixels
+            except (OSError, DecompressionBombError) as e:
+                # Invalid images are passed on unchanged
+                debug.log(f"Read image failed: {type(e).__name__}: {e}")
+        return False
+
+    def fit(self, image: ImageRef, max_pixels: Optional[int] = None, max_bytes: Optional[int] = None, format: str = "jpeg") -> ImageRef:
+        """Returns the image, or a downscaled copy, if it exceeds the budget."""
+        if not self.exceeds(image, max_pixels, max_bytes):
+            return image
+        if not has_requirements:
+            debug.log('Install "pillow" package to downscale images')
+            return image
+        key = (image.digest, max_pixels, max_bytes, format)
+        with self.lock:
+            cached = self.entries.get(key)
+            if cached is not None:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return cached
+            self.misses += 1
+        result = self.downscale(image, max_pixels, max_bytes, format)
+        with self.lock:
+            self.entries[key] = result
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+        return result
+
+    def downscale(self, image: ImageRef, max_pixels: Optional[int], max_bytes: Optional[int], format: str) -> ImageRef:
+        try:
+            width, height = image.dimensions
+        except (OSError, DecompressionBombError) as e:
+            debug.log(f"Read image failed: {type(e).__name__}: {e}")
+            return image
+        scale = min(1, math.sqrt(max_pixels / (width * height))) if max_pixels else 1
+        while True:
+            # The long side fits into the box, also if the image is rotated by its orientation
+            side = max(self.min_side, int(max(width, height) * scale))
+            try:
+                with image.to_image() as source:
+                    resized = process_image(source, side, side)
+                    buffer = BytesIO()
+                    resized.save(buffer, FORMATS[format], quality=self.quality)
+            except (OSError, ValueError, DecompressionBombError) as e:
+                debug.log(f"Downscale image failed: {type(e).__name__}: {e}")
+                return image
+            data = buffer.getvalue()
+            if not max_bytes or len(data) <= max_bytes or side <= self.min_side:
+                break
+            scale *= min(0.9, math.sqrt(max_bytes / len(data)))
+        debug.log(f"Downscaled image from {width}x{height} ({len(image)} bytes) to {resized.width}x{resized.height} ({len(data)} bytes)")
+        return ImageRef(data)
+
+    def fit_images(self, images: ImagesType, max_pixels: Optional[int] = None, max_bytes: Optional[int] = None, format: str = "jpeg") -> ImagesType:
+        """Fits all data URIs and image bytes into the budget. Other images, like URLs, are not changed."""
+        return [
+            (self.fit(image, max_pixels, max_bytes, format) if isinstance(image, ImageRef) else image, image_name)
+            for image, image_name in to_image_refs(images)
+        ]
+
+    def clear(self) -> None:
+        with self.lock:
+            self.entries.clear()
+
+downscaler = ImageDownscaler()
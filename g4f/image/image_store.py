@@ -0,0 +1,183 @@
+from __future__ import annotations
+
+import os
+import re
+import time
+import uuid
+import asyncio
+import hashlib
+import threading
+from typing import AsyncIterator, Optional
+
+from . import is_accepted_format
+from .. import debug
+
+# Directory for storing generated images
+images_dir = "./generated_images"
+
+# Subdirectory of the resized variants of the images
+THUMBNAILS_DIR = "thumbnails"
+
+HASH_PATTERN = re.compile(r"^[0-9a-f]{64}$")
+
+def get_extension(header: bytes, default: str = ".jpg") -> str:
+    """Returns the extension of an image from its magic bytes."""
+    try:
+        return f".{is_accepted_format(header).split('/')[-1]}"
+    except ValueError:
+        return default
+
+class ImageWriter:
+    """Writes an image to a temporary file and hashes it on the fly."""
+    def __init__(self, directory: str) -> None:
+        self.path = os.path.join(directory, f".{uuid.uuid4().hex}.tmp")
+        self.digest = hashlib.sha256()
+        self.header = b""
+
+    def write(self, chunk: bytes) -> None:
+        if len(self.header) < 12:
+            self.header += chunk[:12]
+        self.digest.update(chunk)
+        self.file.write(chunk)
+
+    def __enter__(self) -> ImageWriter:
+        self.file = open(self.path, "wb")
+        return self
+
+    def __exit__(self, exc_type, *args) -> None:
+        self.file.close()
+        if exc_type is not None:
+            try:
+                os.unlink(self.path)
+            except OSError:
+                pass
+
+class ImageStore:
+    """
+    Content-addressed store of generated images.
+
+    Images are saved as "<sha256 of the bytes><extension>", so identical images are stored once.
+    The least recently used images are evicted if the store exceeds its size or age budget.
+    The thumbnails of an image count to its size and are evicted with it.
+
+    Attributes:
+        max_size (int): The size budget in bytes, 0 is unlimited.
+        max_age (float): Seconds after the last use, when an image is evicted, 0 is unlimited.
+        evict_interval (float): Minimum seconds between two eviction runs.
+    """
+    max_size: int = 0
+    max_age: float = 0
+    evict_interval: float = 60
+
+    def __init__(self) -> None:
+        self.last_evict = 0
+        self.lock = threading.Lock()
+
+    def get_dir(self) -> str:
+        os.makedirs(images_dir, exist_ok=True)
+        return images_dir
+
+    def save_bytes(self, data: bytes, extension: str = None) -> str:
+        """Stores an image and returns its filename."""
+        with ImageWriter(self.get_dir()) as writer:
+            writer.write(data)
+        return self.add(writer, extension)
+
+    async def save(self, chunks: AsyncIterator[bytes], extension: str = None) -> str:
+        """Stores a streamed image and returns its filename."""
+        with ImageWriter(self.get_dir()) as writer:
+            async for chunk in chunks:
+                writer.write(chunk)
+        return self.add(writer, extension)
+
+    def add(self, writer: ImageWriter, extension: str = None) -> str:
+        filename = f"{writer.digest.hexdigest()}{get_extension(writer.header, extension or '.jpg')}"
+        target = os.path.join(images_dir, filename)
+        if os.path.exists(target):
+            # Deduplicate: Keep the stored image and mark it as recently used
+            self.remove(writer.path)
+            self.touch(target)
+        else:
+            os.replace(writer.path, target)
+        self.schedule_evict()
+        return filename
+
+    def touch(self, path: str) -> None:
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+
+    def remove(self, path: str) -> None:
+        try:
+            os.unlink(path)
+        except OSError:
+            pass
+
+    def get_etag(self, filename: str) -> Optional[str]:
+        """Returns the content hash of a stored image as ETag, or None for other files."""
+        digest = os.path.splitext(filename)[0]
+        return f'"{digest}"' if HASH_PATTERN.match(digest) else None
+
+    def schedule_evict(self) -> None:
+        if not self.max_size and not self.max_age:
+            return
+        if time.monotonic() - self.last_evict < self.evict_interval:
+            return
+        self.last_evict = time.monotonic()
+        try:
+            asyncio.get_running_loop().run_in_executor(None, self.evict)
+        except RuntimeError:
+            self.evict()
+
+    def get_thumbnails(self) -> dict[str, list[tuple[int, str]]]:
+        """Returns the sizes and paths of the thumbnails by the content hash of their image."""
+        thumbnails = {}
+        try:
+            entries = list(os.scandir(os.path.join(images_dir, THUMBNAILS_DIR)))
+        except OSError:
+            return thumbnails
+        for entry in entries:
+            if entry.name.endswith(".tmp"):
+                continue
+            try:
+                size = entry.stat().st_size
+            except OSError:
+                continue
+            thumbnails.setdefault(entry.name.split("_", 1)[0], []).append((size, entry.path))
+        return thumbnails
+
+    def evict(self) -> None:
+        """Removes expired images and the least recently used images over the size budget."""
+        with self.lock:
+            try:
+                entries = [entry for entry in os.scandir(images_dir) if entry.is_file() and not entry.name.startswith(".")]
+            except OSError:
+                return
+            thumbnails = self.get_thumbnails()
+            files = []
+            for entry in entries:
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    continue
+                variants = thumbnails.get(os.path.splitext(entry.name)[0], [])
+                size = stat.st_size + sum(variant_size for variant_size, _ in variants)
+                files.append((stat.st_mtime, size, entry.path, variants))
+            files.sort(key=lambda file: file[:3])
+            now = time.time()
+            total = sum(file[1] for file in files)
+            removed = 0
+            for mtime, size, path, variants in files:
+                expired = self.max_age and now - mtime > self.max_age
+                if not expired and not (self.max_size and total > self.max_size):
+                    break
+                self.remove(path)
+                for _, variant in variants:
+                    self.remove(variant)
+                total -= size
+                removed += 1
+            if removed:
+                debug.log(f"Evicted {removed} images from: {images_dir}")
+
+image_store = ImageStore()
@@ -0,0 +1,110 @@
+from __future__ import annotations
+
+import os
+import uuid
+import asyncio
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor, Future
+from urllib.parse import quote, urlparse, unquote
+from typing import Optional
+
+from . import has_requirements, process_image
+from . import image_store as store
+from .image_store import image_store, THUMBNAILS_DIR
+from ..errors import MissingRequirementsError
+
+try:
+    from PIL.Image import open as open_image
+except ImportError:
+    pass
+
+FORMATS = {"webp": "WEBP", "jpeg": "JPEG", "jpg": "JPEG"}
+
+def get_preview_url(image: str, size: int = 200) -> str:
+    """Returns the thumbnail URL of a local image URL like "/images/<filename>", otherwise the image URL."""
+    path = urlparse(image).path
+    if not path.startswith("/images/"):
+        return image
+    return f"/thumbnail/{quote(os.path.basename(unquote(path)))}?w={size}&h={size}"
+
+class ThumbnailCache:
+    """
+    Resized variants of stored images, cached on disk by content hash, size and format.
+
+    Images are resized with process_image in a bounded thread pool.
+    Concurrent requests of the same variant share one resize.
+    The thumbnails are evicted with their image by the image store.
+
+    Attributes:
+        max_size (int): The maximum width and height of a thumbnail.
+        max_workers (int): The number of threads, that resize images.
+        quality (int): The quality of the encoded thumbnails.
+    """
+    max_size: int = 1024
+    max_workers: int = 2
+    quality: int = 80
+
+    def __init__(self) -> None:
+        self.executor: Optional[ThreadPoolExecutor] = None
+        self.pending: dict[tuple, Future] = {}
+        self.lock = threading.Lock()
+
+    def get_dir(self) -> str:
+        directory = os.path.join(store.images_dir, THUMBNAILS_DIR)
+        os.makedirs(directory, exist_ok=True)
+        return directory
+
+    def get_digest(self, source: str) -> str:
+        etag = image_store.get_etag(os.path.basename(source))
+        if etag is not None:
+            return etag.strip('"')
+        digest = hashlib.sha256()
+        with open(source, "rb") as file:
+            for chunk in iter(lambda: file.read(65536), b""):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    def get_file(self, filename: str, width: int, height: int, format: str = "webp") -> Optional[str]:
+        """Returns the path of the thumbnail, or None if the image does not exist. It is created if missing."""
+        if format not in FORMATS:
+            raise ValueError(f"Unsupported format: {format}")
+        if not has_requirements:
+            raise MissingRequirementsError('Install "pillow" package for thumbnails')
+        width = max(1, min(width, self.max_size))
+        height = max(1, min(height, self.max_size))
+        source = os.path.join(store.images_dir, os.path.basename(filename))
+        if not os.path.isfile(source):
+            return None
+        target = os.path.join(self.get_dir(), f"{self.get_digest(source)}_{width}x{height}.{format}")
+        if os.path.isfile(target):
+            return target
+        with open_image(source) as image:
+            image = process_image(image, width, height)
+            temp_path = f"{target}.{uuid.uuid4().hex}.tmp"
+            image.save(temp_path, FORMATS[format], quality=self.quality)
+        os.replace(temp_path, target)
+        return target
+
+    def submit(self, filename: str, width: int, height: int, format: str = "webp") -> Future:
+        """Gets the thumbnail in the thread pool. Requests of the same variant share the future."""
+        key = (os.path.basename(filename), width, height, format)
+        with self.lock:
+            if self.executor is None:
+                self.executor = ThreadPoolExecutor(self.max_workers, thread_name_prefix="thumbnail")
+            future = self.pending.get(key)
+            if future is None:
+                future = self.executor.submit(self.get_file, filename, width, height, format)
+                self.pending[key] = future
+                future.add_done_callback(lambda _: self.pending.pop(key, None))
+        return future
+
+    async def get(self, filename: str, width: int, height: int, format: str = "webp") -> Optional[str]:
+        """Returns the path of the thumbnail. Missing thumbnails are created in the thread pool."""
+        return await asyncio.shield(asyncio.wrap_future(self.submit(filename, width, height, format)))
+
+    def get_sync(self, filename: str, width: int, height: int, format: str = "webp") -> Optional[str]:
+        """Returns the path of the thumbnail, for threaded servers. Missing thumbnails are created in the thread pool."""
+        return self.submit(filename, width, height, format).result()
+
+thumbnails = ThumbnailCache()
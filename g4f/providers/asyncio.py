@@ -1,8 +1,12 @@
 from __future__ import annotations
 
+import os
+import queue
+import atexit
 import asyncio
+import threading
 from asyncio import AbstractEventLoop, runners
-from typing import Optional, Callable, AsyncIterator, Iterator
+from typing import Optional, Callable, AsyncIterator, Iterator, Awaitable, Any
 
 from ..errors import NestAsyncioError
 
@@ -40,8 +44,113 @@ async def await_callback(callback: Callable):
 async def async_generator_to_list(generator: AsyncIterator) -> list:
     return [item async for item in generator]
 
+class Runtime:
+    """
+    Process-wide event loop in a daemon thread.
+
+    Synchronous code submits coroutines to this loop instead of creating a loop per call,
+    so sessions and other loop bound resources can be reused across calls.
+    Async generators are streamed back through a thread-safe queue. The producer
+    waits, if `queue_size` items are not consumed yet.
+
+    Attributes:
+        enabled (bool): Use the runtime in run_sync and to_sync_generator. Disabled with G4F_RUNTIME=0.
+        queue_size (int): Max items an async generator produces ahead of the consumer.
+    """
+    enabled: bool = os.environ.get("G4F_RUNTIME") != "0"
+    queue_size: int = 64
+
+    def __init__(self) -> None:
+        self.loop: Optional[AbstractEventLoop] = None
+        self.thread: Optional[threading.Thread] = None
+        self.lock = threading.Lock()
+
+    def get_loop(self) -> AbstractEventLoop:
+        with self.lock:
+            if self.loop is None:
+                self.loop = asyncio.new_event_loop()
+                self.thread = threading.Thread(target=self.loop.run_forever, name="g4f-runtime", daemon=True)
+                self.thread.start()
+        return self.loop
+
+    def is_available(self) -> bool:
+        """Returns False, if the runtime is disabled or called from its own thread."""
+        return self.enabled and (self.thread is None or threading.current_thread() is not self.thread)
+
+    def run(self, coro: Awaitable, timeout: float = None) -> Any:
+        """Runs a coroutine in the runtime loop and waits for the result."""
+        future = asyncio.run_coroutine_threadsafe(coro, self.get_loop())
+        try:
+            return future.result(timeout)
+        except BaseException:
+            future.cancel()
+            raise
+
+    def iter(self, generator: AsyncIterator) -> Iterator:
+        """Iterates an async generator in the runtime loop."""
+        loop = self.get_loop()
+        items = queue.Queue()
+        semaphore: Optional[asyncio.Semaphore] = None
+
+        async def produce():
+            nonlocal semaphore
+            semaphore = asyncio.Semaphore(self.queue_size)
+            try:
+                async for item in generator:
+                    await semaphore.acquire()
+                    items.put((True, item))
+                items.put((False, None))
+            except asyncio.CancelledError:
+                pass
+            except Exception as e:
+                items.put((False, e))
+            finally:
+                if hasattr(generator, "aclose"):
+                    await generator.aclose()
+
+        future = asyncio.run_coroutine_threadsafe(produce(), loop)
+        try:
+            while True:
+                is_item, item = items.get()
+                if not is_item:
+                    if item is not None:
+                        raise item
+                    break
+                loop.call_soon_threadsafe(semaphore.release)
+                yield item
+        finally:
+            future.cancel()
+
+    def shutdown(self) -> None:
+        with self.lock:
+            if self.loop is None:
+                return
+            self.loop.call_soon_threadsafe(self.loop.stop)
+            self.thread.join(5)
+            self.loop = None
+            self.thread = None
+
+runtime = Runtime()
+atexit.register(runtime.shutdown)
+
+def run_sync(coro: Awaitable) -> Any:
+    """Runs a coroutine from synchronous code, in the runtime loop if available."""
+    if runtime.is_available():
+        return runtime.run(coro)
+    # Patch a running loop with nest_asyncio, so asyncio.run works inside of it
+    get_running_loop(check_nested=True)
+    return asyncio.run(coro)
+
 def to_sync_generator(generator: AsyncIterator, stream: bool = True) -> Iterator:
+    if runtime.is_available():
+        if stream:
+            yield from runtime.iter(generator)
+        else:
+            yield from runtime.run(async_generator_to_list(generator))
+        return
+
     if not stream:
+        get_running_loop(check_nested=True)
         yield from asyncio.run(async_generator_to_list(generator))
         return
 
@@ -1,12 +1,14 @@
 from __future__ import annotations
 
 import asyncio
+import inspect
 
 from asyncio import AbstractEventLoop
 from concurrent.futures import ThreadPoolExecutor
 from abc import abstractmethod
 import json
 from inspect import signature, Parameter
+from functools import wraps
 from typing import Optional, _GenericAlias
 from pathlib import Path
 try:
@@ -16,10 +18,12 @@ except ImportError:
 
 from ..typing import CreateResult, AsyncResult, Messages
 from .types import BaseProvider
-from .asyncio import get_running_loop, to_sync_generator, to_async_iterator
+from .asyncio import get_running_loop, to_sync_generator, to_async_iterator, run_sync
 from .response import BaseConversation, AuthResult
 from .helper import concat_chunks, async_concat_chunks
 from ..cookies import get_cookies_dir
+from .credential_pool import credential_pool, Account, AUTH
+from ..image.downscale import downscaler
 from ..errors import ModelNotSupportedError, ResponseError, MissingAuthError, NoValidHarFileError
 from .. import debug
 
@@ -66,6 +70,40 @@ PARAMETER_EXAMPLES = {
     "tools": [],
 }
 
+def with_image_budget(provider: type[BaseProvider], create_function: callable) -> callable:
+    """
+    Wraps the create function of a provider with an image budget,
+    so that images are downscaled before they are passed to the provider.
+    """
+    if not provider.image_max_pixels and not provider.image_max_bytes:
+        return create_function
+
+    def fit_images(kwargs: dict) -> dict:
+        return {**kwargs, "images": downscaler.fit_images(
+            kwargs["images"], provider.image_max_pixels, provider.image_max_bytes, provider.image_format
+        )}
+
+    if inspect.isasyncgenfunction(create_function):
+        @wraps(create_function)
+        async def wrapper(*args, **kwargs):
+            if kwargs.get("images"):
+                kwargs = await asyncio.get_running_loop().run_in_executor(None, fit_images, kwargs)
+            async for chunk in create_function(*args, **kwargs):
+                yield chunk
+    elif inspect.iscoroutinefunction(create_function):
+        @wraps(create_function)
+        async def wrapper(*args, **kwargs):
+            if kwargs.get("images"):
+                kwargs = await asyncio.get_running_loop().run_in_executor(None, fit_images, kwargs)
+            return await create_function(*args, **kwargs)
+    else:
+        @wraps(create_function)
+        def wrapper(*args, **kwargs):
+            if kwargs.get("images"):
+                kwargs = fit_images(kwargs)
+            return create_function(*args, **kwargs)
+    return wrapper
+
 class AbstractProvider(BaseProvider):
 
     @classmethod
@@ -128,11 +166,11 @@ class AbstractProvider(BaseProvider):
 
     @classmethod
     def get_create_function(cls) -> callable:
-        return cls.create_completion
+        return with_image_budget(cls, cls.create_completion)
 
     @classmethod
     def get_async_create_function(cls) -> callable:
-        return cls.create_async
+        return with_image_budget(cls, cls.create_async)
 
     @classmethod
     def get_parameters(cls, as_json: bool = False) -> dict[str, Parameter]:
@@ -239,8 +277,7 @@ class AsyncProvider(AbstractProvider):
         Returns:
             CreateResult: The result of the completion creation.
         """
-        get_running_loop(check_nested=False)
-        yield asyncio.run(cls.create_async(model, messages, **kwargs))
+        yield run_sync(cls.create_async(model, messages, **kwargs))
 
     @staticmethod
     @abstractmethod
@@ -267,11 +304,11 @@ class AsyncProvider(AbstractProvider):
 
     @classmethod
     def get_create_function(cls) -> callable:
-        return cls.create_completion
+        return with_image_budget(cls, cls.create_completion)
 
     @classmethod
     def get_async_create_function(cls) -> callable:
-        return cls.create_async
+        return with_image_budget(cls, cls.create_async)
 
 class AsyncGeneratorProvider(AbstractProvider):
     """
@@ -333,11 +370,11 @@ class AsyncGeneratorProvider(AbstractProvider):
 
     @classmethod
     def get_create_function(cls) -> callable:
-        return cls.create_completion
+        return with_image_budget(cls, cls.create_completion)
 
     @classmethod
     def get_async_create_function(cls) -> callable:
-        return cls.create_async_generator
+        return with_image_budget(cls, cls.create_async_generator)
 
 class ProviderModelMixin:
     default_model: str = None
@@ -395,20 +432,30 @@ class AsyncAuthedProvider(AsyncGeneratorProvider):
         auth_result = cls.on_auth_async(**kwargs)
         if hasattr(auth_result, "__aiter__"):
             return to_sync_generator(auth_result)
-        return asyncio.run(auth_result)
+        return run_sync(auth_result)
 
     @classmethod
     def get_create_function(cls) -> callable:
-        return cls.create_completion
+        return with_image_budget(cls, cls.create_completion)
 
     @classmethod
     def get_async_create_function(cls) -> callable:
-        return cls.create_async_generator
+        return with_image_budget(cls, cls.create_async_generator)
 
     @classmethod
     def get_cache_file(cls) -> Path:
         return Path(get_cookies_dir()) / f"auth_{cls.parent if hasattr(cls, 'parent') else cls.__name__}.json"
 
+    @classmethod
+    def read_auth_result(cls, cache_file: Path, account: Optional[Account]) -> Optional[AuthResult]:
+        """Returns the stored auth result, or the auth result of a .har file account."""
+        if cache_file.exists():
+            with cache_file.open("r") as f:
+                return AuthResult(**json.load(f))
+        if account is not None and account.data:
+            return AuthResult(**account.data)
+        return None
+
     @classmethod
     def create_completion(
         cls,
@@ -417,28 +464,28 @@ class AsyncAuthedProvider(AsyncGeneratorProvider):
         **kwargs
 ) -> CreateResult:
         auth_result = AuthResult()
-        cache_file = cls.get_cache_file()
-        try:
-            if cache_file.exists():
-                with cache_file.open("r") as f:
-                    auth_result = AuthResult(**json.load(f))
-            else:
+        account = credential_pool.acquire(cls, AUTH)
+        cache_file = cls.get_cache_file() if account is None else account.path
+        with credential_pool.use(account):
+            try:
+                auth_result = cls.read_auth_result(cache_file, account)
+                if auth_result is None:
+                    auth_result = cls.on_auth(**kwargs)
+                    for chunk in auth_result:
+                        if hasattr(chunk, "get_dict"):
+                            auth_result = chunk
+                        else:
+                            yield chunk
+                yield from to_sync_generator(cls.create_authed(model, messages, auth_result, **kwargs))
+            except (MissingAuthError, NoValidHarFileError):
                 auth_result = cls.on_auth(**kwargs)
                 for chunk in auth_result:
                     if hasattr(chunk, "get_dict"):
                         auth_result = chunk
                     else:
                         yield chunk
-            yield from to_sync_generator(cls.create_authed(model, messages, auth_result, **kwargs))
-        except (MissingAuthError, NoValidHarFileError):
-            auth_result = cls.on_auth(**kwargs)
-            for chunk in auth_result:
-                if hasattr(chunk, "get_dict"):
-                    auth_result = chunk
-                else:
-                    yield chunk
-            yield from to_sync_generator(cls.create_authed(model, messages, auth_result, **kwargs))
-        finally:
+                yield from to_sync_generator(cls.create_authed(model, messages, auth_result, **kwargs))
+            finally:
                 if hasattr(auth_result, "get_dict"):
                     data = auth_result.get_dict()
                     cache_file.parent.mkdir(parents=True, exist_ok=True)
@@ -453,37 +500,37 @@ class AsyncAuthedProvider(AsyncGeneratorProvider):
         messages: Messages,
         **kwargs
     ) -> AsyncResult:
-        try:
-            auth_result = AuthResult()
-            cache_file = Path(get_cookies_dir()) / f"auth_{cls.parent if hasattr(cls, 'parent') else cls.__name__}.json"
-            if cache_file.exists():
-                with cache_file.open("r") as f:
-                    auth_result = AuthResult(**json.load(f))
-            else:
+        auth_result = AuthResult()
+        account = credential_pool.acquire(cls, AUTH)
+        cache_file = cls.get_cache_file() if account is None else account.path
+        with credential_pool.use(account):
+            try:
+                auth_result = cls.read_auth_result(cache_file, account)
+                if auth_result is None:
+                    auth_result = cls.on_auth_async(**kwargs)
+                    async for chunk in auth_result:
+                        if hasattr(chunk, "get_dict"):
+                            auth_result = chunk
+                        else:
+                            yield chunk
+                response = to_async_iterator(cls.create_authed(model, messages, **kwargs, auth_result=auth_result))
+                async for chunk in response:
+                    yield chunk
+            except (MissingAuthError, NoValidHarFileError):
+                if cache_file.exists():
+                    cache_file.unlink()
                 auth_result = cls.on_auth_async(**kwargs)
                 async for chunk in auth_result:
                     if hasattr(chunk, "get_dict"):
                         auth_result = chunk
                     else:
                         yield chunk
-            response = to_async_iterator(cls.create_authed(model, messages, **kwargs, auth_result=auth_result))
-            async for chunk in response:
-                yield chunk
-        except (MissingAuthError, NoValidHarFileError):
-            if cache_file.exists():
-                cache_file.unlink()
-            auth_result = cls.on_auth_async(**kwargs)
-            async for chunk in auth_result:
-                if hasattr(chunk, "get_dict"):
-                    auth_result = chunk
-                else:
+                response = to_async_iterator(cls.create_authed(model, messages, **kwargs, auth_result=auth_result))
+                async for chunk in response:
                     yield chunk
-            response = to_async_iterator(cls.create_authed(model, messages, **kwargs, auth_result=auth_result))
-            async for chunk in response:
-                yield chunk
-        finally:
-            if hasattr(auth_result, "get_dict"):
-                cache_file.parent.mkdir(parents=True, exist_ok=True)
-                cache_file.write_text(json.dumps(auth_result.get_dict()))
-            elif cache_file.exists():
-                cache_file.unlink()
\ No newline at end of file
+            finally:
+                if hasattr(auth_result, "get_dict"):
+                    cache_file.parent.mkdir(parents=True, exist_ok=True)
+                    cache_file.write_text(json.dumps(auth_result.get_dict()))
+                elif cache_file.exists():
+                    cache_file.unlink()
\ No newline at end of file
@@ -0,0 +1,218 @@
+from __future__ import annotations
+
+import re
+import time
+import asyncio
+import threading
+from collections import deque
+from typing import Optional
+
+from ..errors import ResponseStatusError, TimeoutError
+from .. import debug
+
+try:
+    from aiohttp import ClientError
+except ImportError:
+    ClientError = OSError
+
+try:
+    from curl_cffi import CurlError
+except ImportError:
+    CurlError = OSError
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+FAILURE_ERRORS = (OSError, ClientError, CurlError, asyncio.TimeoutError, TimeoutError)
+
+def get_status(error: Exception) -> Optional[int]:
+    """Returns the status code of an error response, or None."""
+    status = getattr(error, "status", None)
+    if isinstance(status, int):
+        return status
+    if isinstance(error, ResponseStatusError):
+        match = re.match(r"Response (\d{3})", str(error))
+        if match:
+            return int(match.group(1))
+    return None
+
+def is_provider_failure(error: Optional[Exception]) -> bool:
+    """
+    Returns True for errors of the provider: Transport errors, 5xx responses and timeouts.
+    Client errors, like a missing auth, an unknown model or a 4xx response, are not counted.
+    """
+    if error is None:
+        return True
+    status = get_status(error)
+    if status is not None:
+        return status >= 500
+    return isinstance(error, FAILURE_ERRORS)
+
+class CircuitBreaker:
+    """
+    Health state of a provider (or a provider and model).
+
+    The breaker opens after `failure_threshold` consecutive failures or if the
+    error rate of the last `window_size` requests exceeds `error_rate_threshold`.
+    While open, the provider is skipped. After `cooldown` seconds a single
+    half-open probe is let through: Its success closes the breaker, its failure opens it again.
+    Only errors of the provider are failures, client errors release the probe.
+    """
+    failure_threshold: int = 5
+    error_rate_threshold: float = 0.5
+    min_requests: int = 10
+    window_size: int = 20
+    cooldown: float = 60
+    probe_timeout: float = 300
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.state = CLOSED
+        self.consecutive_failures = 0
+        self.results = deque(maxlen=self.window_size)
+        self.opened_at: float = 0
+        self.probe_started_at: Optional[float] = None
+        self.reason: Optional[str] = None
+        self.last_error: Optional[str] = None
+
+    def get_error_rate(self) -> float:
+        if not self.results:
+            return 0.0
+        return self.results.count(False) / len(self.results)
+
+    def get_retry_after(self) -> float:
+        if self.state == CLOSED:
+            return 0
+        return max(0, self.opened_at + self.cooldown - time.time())
+
+    def is_available(self) -> bool:
+        """Returns True if a request would be allowed, without reserving the half-open probe."""
+        if self.state == CLOSED:
+            return True
+        if self.probe_started_at is not None:
+            return time.time() - self.probe_started_at > self.probe_timeout
+        return self.get_retry_after() <= 0
+
+    def allow_request(self) -> bool:
+        """Returns True if a request is allowed. In half-open state only one probe is allowed."""
+        if not self.is_available():
+            return False
+        if self.state != CLOSED:
+            self.state = HALF_OPEN
+            self.probe_started_at = time.time()
+            debug.log(f"Circuit breaker: {self.name} is half-open, send probe")
+        return True
+
+    def add_success(self) -> None:
+        self.results.append(True)
+        self.consecutive_failures = 0
+        if self.state != CLOSED:
+            debug.log(f"Circuit breaker: {self.name} is closed")
+            self.results.clear()
+        self.state = CLOSED
+        self.probe_started_at = None
+        self.reason = None
+
+    def add_failure(self, error: Exception = None) -> None:
+        if not is_provider_failure(error):
+            self.release()
+            return
+        self.results.append(False)
+        self.consecutive_failures += 1
+        if error is not None:
+            self.last_error = f"{error.__class__.__name__}: {error}"
+        if self.state == HALF_OPEN:
+            self.open("Half-open probe failed")
+        elif self.state == CLOSED:
+            if self.consecutive_failures >= self.failure_threshold:
+                self.open(f"{self.consecutive_failures} consecutive failures")
+            elif len(self.results) >= self.min_requests and self.get_error_rate() > self.error_rate_threshold:
+                self.open(f"Error rate {self.get_error_rate():.0%} in the last {len(self.results)} requests")
+
+    def release(self) -> None:
+        """Releases the half-open probe, if the request finished without a result."""
+        if self.state == HALF_OPEN:
+            self.probe_started_at = None
+
+    def open(self, reason: str) -> None:
+        self.state = OPEN
+        self.opened_at = time.time()
+        self.probe_started_at = None
+        self.reason = reason
+        debug.log(f"Circuit breaker: {self.name} is open: {reason}")
+
+    def get_dict(self) -> dict:
+        return {
+            "state": self.state,
+            "reason": self.reason,
+            "last_error": self.last_error,
+            "consecutive_failures": self.consecutive_failures,
+            "error_rate": self.get_error_rate(),
+            "retry_after": self.get_retry_after(),
+        }
+
+class CircuitBreakers:
+    """
+    Registry of circuit breakers keyed by provider name,
+    or by provider name and model if `by_model` is enabled.
+    """
+    by_model: bool = False
+
+    def __init__(self) -> None:
+        self.breakers: dict[str, CircuitBreaker] = {}
+        self.lock = threading.Lock()
+
+    def get_key(self, provider: str, model: str = None) -> str:
+        return f"{provider}:{model}" if self.by_model and model else provider
+
+    def get(self, provider: str, model: str = None) -> CircuitBreaker:
+        key = self.get_key(provider, model)
+        if key not in self.breakers:
+            self.breakers[key] = CircuitBreaker(key)
+        return self.breakers[key]
+
+    def is_available(self, provider: str, model: str = None) -> bool:
+        key = self.get_key(provider, model)
+        return key not in self.breakers or self.breakers[key].is_available()
+
+    def allow_request(self, provider: str, model: str = None) -> bool:
+        with self.lock:
+            return self.get(provider, model).allow_request()
+
+    def add_success(self, provider: str, model: str = None) -> None:
+        with self.lock:
+            self.get(provider, model).add_success()
+
+    def add_failure(self, provider: str, model: str = None, error: Exception = None) -> None:
+        with self.lock:
+            self.get(provider, model).add_failure(error)
+
+    def release(self, provider: str, model: str = None) -> None:
+        key = self.get_key(provider, model)
+        if key in self.breakers:
+            self.breakers[key].release()
+
+    def get_state(self, provider: str) -> Optional[dict]:
+        """Returns the state of all breakers of a provider, or None if it has no open breaker."""
+        states = {
+            key: breaker.get_dict()
+            for key, breaker in list(self.breakers.items())
+            if breaker.state != CLOSED and (key == provider or key.startswith(f"{provider}:"))
+        }
+        if not states:
+            return None
+        return states.get(provider, next(iter(states.values())))
+
+    def is_closed(self) -> bool:
+        """Returns True if no breaker is open or half-open."""
+        return all(breaker.state == CLOSED for breaker in list(self.breakers.values()))
+
+    def get_dict(self) -> dict[str, dict]:
+        return {key: breaker.get_dict() for key, breaker in list(self.breakers.items())}
+
+    def reset(self) -> None:
+        with self.lock:
+            self.breakers = {}
+
+breakers = CircuitBreakers()
@@ -0,0 +1,259 @@
+from __future__ import annotations
+
+import json
+import time
+import threading
+from pathlib import Path
+from urllib.parse import urlparse
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+from ..cookies import get_cookies_dir
+from ..errors import RateLimitError
+from .. import debug
+
+API_KEY = "api_key"
+AUTH = "auth"
+
+LEAST_LOADED = "least_loaded"
+ROUND_ROBIN = "round_robin"
+
+class Account:
+    """
+    A credential of a provider.
+
+    Attributes:
+        name (str): The name of the account, from its file name.
+        kind (str): "api_key" for api key files, "auth" for auth files and .har files.
+        data (dict): The api key, or the auth result, that is used if no auth file is stored yet.
+        path (Path): The file, that stores the account. Auth results are written to it.
+        active (int): The number of running requests.
+        requests (int): The number of requests.
+        parked_until (float): The time until which the account is rate limited.
+        last_used (float): The time of the last request.
+    """
+    __slots__ = ("name", "kind", "data", "path", "active", "requests", "parked_until", "last_used")
+
+    def __init__(self, name: str, kind: str, data: dict, path: Path) -> None:
+        self.name = name
+        self.kind = kind
+        self.data = data
+        self.path = path
+        self.active = 0
+        self.requests = 0
+        self.parked_until = 0
+        self.last_used = 0
+
+    def get_retry_after(self) -> float:
+        return max(0, self.parked_until - time.time())
+
+    def get_dict(self) -> dict:
+        return {
+            "name": self.name,
+            "kind": self.kind,
+            "active": self.active,
+            "requests": self.requests,
+            "retry_after": self.get_retry_after(),
+        }
+
+class CredentialPool:
+    """
+    Spreads the requests of a provider across multiple accounts.
+
+    The accounts are read from the cookies dir:
+    "api_key_<Provider>.json" and "api_key_<Provider>-<name>.json" files with an api key,
+    "auth_<Provider>.json" and "auth_<Provider>-<name>.json" files with a stored auth result
+    and, for providers with `har_accounts`, the access token of each .har file.
+    The files are read again, when they change.
+
+    An account, that responds with a rate limit, is parked until its limit resets.
+    If all accounts are parked, a RateLimitError is raised.
+
+    Attributes:
+        strategy (str): "least_loaded" selects the account with the fewest running requests,
+            "round_robin" selects the accounts in turn.
+        park_time (float): Seconds to park an account, if the reset time of its limit is unknown.
+        max_park_time (float): The maximum seconds to park an account.
+    """
+    strategy: str = LEAST_LOADED
+    park_time: float = 60
+    max_park_time: float = 24 * 60 * 60
+
+    def __init__(self) -> None:
+        self.accounts: dict[tuple[str, str], dict[str, Account]] = {}
+        self.signatures: dict[tuple[str, str], tuple] = {}
+        self.turns: dict[tuple[str, str], int] = {}
+        self.lock = threading.Lock()
+
+    def get_name(self, provider) -> str:
+        return provider.parent if hasattr(provider, "parent") else provider.__name__
+
+    def get_files(self, name: str, kind: str) -> list[Path]:
+        cookies_dir = Path(get_cookies_dir())
+        prefix = f"{kind}_{name}"
+        try:
+            return sorted(
+                path for path in cookies_dir.iterdir()
+                if path.suffix == ".json" and (path.stem == prefix or path.stem.startswith(f"{prefix}-"))
+            )
+        except OSError:
+            return []
+
+    def get_har_files(self) -> list[Path]:
+        try:
+            return sorted(path for path in Path(get_cookies_dir()).iterdir() if path.suffix == ".har")
+        except OSError:
+            return []
+
+    def load(self, provider, kind: str) -> dict[str, Account]:
+        """Returns the accounts of a provider. They are read again, if a file was changed."""
+        name = self.get_name(provider)
+        key = (name, kind)
+        files = self.get_files(name, kind)
+        har_files = self.get_har_files() if kind == AUTH and getattr(provider, "har_accounts", False) else []
+        signature = tuple(self.get_signature(path) for path in [*har_files, *files])
+        if self.signatures.get(key) == signature:
+            return self.accounts[key]
+        accounts = {}
+        secrets = set()
+        # Stored auth results replace the .har file they were created from
+        for path in files:
+            account = self.read_file(path, name, kind)
+            if account is not None:
+                secrets.add(account.data.get("api_key"))
+                accounts[account.name] = account
+        if har_files:
+            url = getattr(provider, "url", None)
+            for path in har_files:
+                data = read_har_account(path, url)
+                if data is None or data["api_key"] in secrets or path.stem in accounts:
+                    continue
+                secrets.add(data["api_key"])
+                accounts[path.stem] = Account(path.stem, kind, data, Path(get_cookies_dir()) / f"{AUTH}_{name}-{path.stem}.json")
+        # Keep the known accounts, running requests release them
+        previous = self.accounts.get(key, {})
+        for account_name, account in accounts.items():
+            if account_name in previous:
+                known = previous[account_name]
+                known.data, known.path = account.data, account.path
+                accounts[account_name] = known
+        if accounts or previous:
+            debug.log(f"Credentials: {name}: {len(accounts)} {kind} accounts")
+        self.accounts[key] = accounts
+        self.signatures[key] = signature
+        return accounts
+
+    def get_signature(self, path: Path) -> tuple:
+        try:
+            stat = path.stat()
+            return (str(path), stat.st_mtime, stat.st_size)
+        except OSError:
+            return (str(path),)
+
+    def read_file(self, path: Path, name: str, kind: str) -> Optional[Account]:
+        account_name = path.stem[len(f"{kind}_{name}") + 1:] or "default"
+        try:
+            with path.open("r") as file:
+                data = json.load(file)
+        except (OSError, ValueError) as e:
+            debug.log(f"Read credentials failed: {path}: {type(e).__name__}: {e}")
+            return None
+        if not isinstance(data, dict) or (kind == API_KEY and not data.get("api_key")):
+            return None
+        return Account(account_name, kind, data, path)
+
+    def acquire(self, provider, kind: str = API_KEY) -> Optional[Account]:
+        """
+        Selects an account of the provider and counts its request. Returns None if it has no accounts.
+
+        Raises:
+            RateLimitError: If all accounts are rate limited.
+        """
+        with self.lock:
+            accounts = self.load(provider, kind)
+            if not accounts:
+                return None
+            now = time.time()
+            available = [account for account in accounts.values() if account.parked_until <= now]
+            if not available:
+                retry_after = min(account.get_retry_after() for account in accounts.values())
+                raise RateLimitError(
+                    f"All accounts of {self.get_name(provider)} are rate limited, retry after {retry_after:.0f}s",
+                    retry_after=retry_after
+                )
+            if self.strategy == ROUND_ROBIN:
+                key = (self.get_name(provider), kind)
+                turn = self.turns.get(key, 0)
+                self.turns[key] = turn + 1
+                account = available[turn % len(available)]
+            else:
+                account = min(available, key=lambda account: (account.active, account.last_used))
+            account.active += 1
+            account.requests += 1
+            account.last_used = now
+            return account
+
+    def release(self, account: Account, error: Exception = None) -> None:
+        """Ends a request of the account. A rate limit error parks it."""
+        with self.lock:
+            account.active -= 1
+        if isinstance(error, RateLimitError):
+            self.park(account, error.retry_after)
+
+    def park(self, account: Account, retry_after: float = None) -> None:
+        retry_after = self.park_time if retry_after is None else min(retry_after, self.max_park_time)
+        account.parked_until = time.time() + retry_after
+        debug.log(f"Credentials: Account {account.name} is rate limited for {retry_after:.0f}s")
+
+    @contextmanager
+    def use(self, account: Optional[Account]) -> Iterator[Optional[Account]]:
+        """Releases the account after the request, a rate limit parks it."""
+        if account is None:
+            yield account
+            return
+        error = None
+        try:
+            yield account
+        except Exception as e:
+            error = e
+            raise
+        finally:
+            self.release(account, error)
+
+    def get_dict(self) -> dict:
+        return {
+            f"{name}:{kind}": [account.get_dict() for account in accounts.values()]
+            for (name, kind), accounts in self.accounts.items()
+            if accounts
+        }
+
+def read_har_account(path: Path, url: Optional[str]) -> Optional[dict]:
+    """Returns the access token, the cookies and the headers of the requests to the url in a .har file."""
+    from ..har_index import har_index
+    if not url:
+        return None
+    domain = urlparse(url).netloc
+    domain = domain[4:] if domain.startswith("www.") else domain
+    entries = har_index.get_entries(str(path))
+    if not entries:
+        return None
+    api_key = None
+    cookies = {}
+    headers = {}
+    for entry in entries:
+        if not urlparse(entry["url"]).netloc.endswith(domain):
+            continue
+        cookies.update(entry["cookies"])
+        authorization = entry["headers"].get("authorization", "")
+        if entry.get("access_token"):
+            api_key = entry["access_token"]
+        elif authorization.startswith("Bearer ") and len(authorization) > 7 and api_key is None:
+            api_key = authorization[7:]
+            headers = entry["headers"]
+        elif not headers:
+            headers = entry["headers"]
+    if api_key is None:
+        return None
+    return {"api_key": api_key, "cookies": cookies, "headers": headers}
+
+credential_pool = CredentialPool()
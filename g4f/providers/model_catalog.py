@@ -0,0 +1,229 @@
+from __future__ import annotations
+
+import os
+import json
+import time
+import asyncio
+import threading
+from concurrent.futures import Future
+from pathlib import Path
+from typing import Optional
+
+from .types import ProviderType
+from .asyncio import runtime
+from .upload_cache import get_account
+from ..cookies import get_cookies_dir
+from .. import debug
+
+CATALOG_FILE = ".model_catalog.json"
+
+class CatalogEntry:
+    """
+    Model lists of a provider, as returned by its `fetch_models` method.
+
+    Attributes:
+        models (list[str]): All models of the provider.
+        image_models (list[str]): The image models, if the provider reports them.
+        vision_models (list[str]): The vision models, if the provider reports them.
+        fetched_at (float): Unix time of the fetch.
+    """
+    def __init__(
+        self,
+        models: list[str],
+        image_models: Optional[list[str]] = None,
+        vision_models: Optional[list[str]] = None,
+        fetched_at: float = 0
+    ) -> None:
+        self.models = models
+        self.image_models = image_models
+        self.vision_models = vision_models
+        self.fetched_at = fetched_at
+
+    def is_stale(self, ttl: float) -> bool:
+        return time.time() - self.fetched_at > ttl
+
+    def get_dict(self) -> dict:
+        return {
+            "models": self.models,
+            "image_models": self.image_models,
+            "vision_models": self.vision_models,
+            "fetched_at": self.fetched_at,
+        }
+
+class ModelCatalog:
+    """
+    Cache of the model lists of all providers.
+
+    The lists are fetched with the async `fetch_models` method of the providers,
+    concurrently on the runtime event loop, and persisted in the cookies dir,
+    so new processes start warm. `get_models` returns instantly from the cache:
+    A stale entry is returned and refreshed in the background (stale-while-revalidate).
+    Without any entry the `fallback_models` of the provider are returned. Only a
+    synchronous caller outside of an event loop waits for the first fetch, up to `cold_timeout`.
+
+    Attributes:
+        default_ttl (float): Seconds until an entry is stale, if the provider has no `models_ttl`.
+        error_ttl (float): Seconds until a failed fetch is retried.
+        fetch_timeout (float): Max seconds of a single fetch.
+        cold_timeout (float): Max seconds a synchronous caller waits for a missing entry.
+    """
+    default_ttl: float = 3600
+    error_ttl: float = 60
+    fetch_timeout: float = 30
+    cold_timeout: float = 10
+
+    def __init__(self) -> None:
+        self.entries: dict[str, CatalogEntry] = {}
+        self.pending: dict[str, Future] = {}
+        self.failed_at: dict[str, float] = {}
+        self.lock = threading.Lock()
+        self.loaded = False
+
+    def get_key(self, provider: ProviderType, api_base: str = None, api_key: str = None) -> str:
+        """
+        Returns the key of the entry. The models of an api key are stored per account,
+        the providers pass an api key only, if their model list depends on it.
+        """
+        key = provider.__name__
+        if api_base is not None and api_base != getattr(provider, "api_base", None):
+            key = f"{key}:{api_base}"
+        account = get_account(api_key)
+        return key if account is None else f"{key}#{account}"
+
+    def get_ttl(self, provider: ProviderType) -> float:
+        return getattr(provider, "models_ttl", None) or self.default_ttl
+
+    def get_entry(self, key: str) -> Optional[CatalogEntry]:
+        self.load()
+        return self.entries.get(key)
+
+    def get_models(self, provider: ProviderType, api_key: str = None, api_base: str = None, **kwargs) -> list[str]:
+        """
+        Returns the models of a provider without waiting for the network.
+        The cached lists are also set on the provider class.
+        """
+        if self.has_static_models(provider):
+            return provider.models
+        key = self.get_key(provider, api_base, api_key)
+        entry = self.get_entry(key)
+        if entry is None or entry.is_stale(self.get_ttl(provider)):
+            future = self.schedule(provider, key, api_key=api_key, api_base=api_base, **kwargs)
+            if entry is None and future is not None and not is_running_loop():
+                try:
+                    entry = future.result(self.cold_timeout)
+                except Exception:
+                    pass
+        if entry is None:
+            return getattr(provider, "fallback_models", None) or provider.models
+        if key == provider.__name__:
+            self.apply(provider, entry)
+        return entry.models
+
+    def has_static_models(self, provider: ProviderType) -> bool:
+        """Returns True if the model list is predefined in the class body and not fetched by the catalog."""
+        for cls in provider.__mro__:
+            if "models" in cls.__dict__:
+                return bool(cls.__dict__["models"]) and self.get_entry(cls.__name__) is None
+        return False
+
+    def apply(self, provider: ProviderType, entry: CatalogEntry) -> None:
+        if provider.models is not entry.models:
+            provider.models = entry.models
+        if entry.image_models is not None and provider.image_models is not entry.image_models:
+            provider.image_models = entry.image_models
+        if entry.vision_models is not None and provider.vision_models is not entry.vision_models:
+            provider.vision_models = entry.vision_models
+
+    def schedule(self, provider: ProviderType, key: str = None, **kwargs) -> Optional[Future]:
+        """Starts a refresh on the background loop, unless one is running or the last one failed recently."""
+        key = self.get_key(provider, kwargs.get("api_base"), kwargs.get("api_key")) if key is None else key
+        with self.lock:
+            if key in self.pending:
+                return self.pending[key]
+            if time.time() - self.failed_at.get(key, 0) < self.error_ttl:
+                return None
+            future = asyncio.run_coroutine_threadsafe(self.refresh(provider, key, **kwargs), runtime.get_loop())
+            self.pending[key] = future
+        future.add_done_callback(lambda _: self.pending.pop(key, None))
+        return future
+
+    async def refresh(self, provider: ProviderType, key: str = None, **kwargs) -> Optional[CatalogEntry]:
+        """Fetches the models of a provider and stores them in the catalog."""
+        key = self.get_key(provider, kwargs.get("api_base"), kwargs.get("api_key")) if key is None else key
+        try:
+            data = await asyncio.wait_for(provider.fetch_models(**kwargs), self.fetch_timeout)
+            if not data:
+                raise ValueError("Empty model list")
+        except Exception as e:
+            self.failed_at[key] = time.time()
+            debug.log(f"Failed to fetch models of {provider.__name__}: {e.__class__.__name__}: {e}")
+            return None
+        if isinstance(data, list):
+            data = {"models": data}
+        entry = CatalogEntry(**data, fetched_at=time.time())
+        self.entries[key] = entry
+        self.failed_at.pop(key, None)
+        self.save()
+        return entry
+
+    async def refresh_all(self, providers: list[ProviderType]) -> None:
+        """Fetches the models of all providers with a `fetch_models` method concurrently."""
+        await asyncio.gather(*[
+            self.refresh(provider)
+            for provider in providers
+            if hasattr(provider, "fetch_models") and not self.has_static_models(provider)
+        ])
+
+    def warm_up(self, providers: list[ProviderType]) -> None:
+        """Refreshes the missing and stale entries of the providers in the background."""
+        for provider in providers:
+            if not hasattr(provider, "fetch_models") or self.has_static_models(provider):
+                continue
+            entry = self.get_entry(provider.__name__)
+            if entry is None or entry.is_stale(self.get_ttl(provider)):
+                self.schedule(provider)
+
+    def get_file(self) -> Path:
+        return Path(get_cookies_dir()) / CATALOG_FILE
+
+    def load(self) -> None:
+        if self.loaded:
+            return
+        self.loaded = True
+        cache_file = self.get_file()
+        if not cache_file.exists():
+            return
+        try:
+            with cache_file.open("r") as f:
+                data = json.load(f)
+            for key, entry in data.items():
+                self.entries.setdefault(key, CatalogEntry(**entry))
+            debug.log(f"Read model catalog: {cache_file}")
+        except (OSError, ValueError, TypeError) as e:
+            debug.log(f"Failed to read model catalog: {e.__class__.__name__}: {e}")
+
+    def save(self) -> None:
+        cache_file = self.get_file()
+        try:
+            with self.lock:
+                data = json.dumps({key: entry.get_dict() for key, entry in self.entries.items()})
+            if os.access(cache_file.parent, os.W_OK):
+                temp_file = cache_file.with_suffix(".tmp")
+                temp_file.write_text(data)
+                temp_file.replace(cache_file)
+        except OSError as e:
+            debug.log(f"Failed to save model catalog: {e.__class__.__name__}: {e}")
+
+    def reset(self) -> None:
+        with self.lock:
+            self.entries = {}
+            self.failed_at = {}
+
+def is_running_loop() -> bool:
+    try:
+        asyncio.get_running_loop()
+        return True
+    except RuntimeError:
+        return False
+
+catalog = ModelCatalog()
@@ -1,29 +1,43 @@
 from __future__ import annotations
 
-import random
+import asyncio
 
-from ..typing import Type, List, CreateResult, Messages, AsyncResult
+from ..typing import Type, List, CreateResult, Messages, AsyncResult, AsyncIterator, Union, Optional
 from .types import BaseProvider, BaseRetryProvider, ProviderType
 from .response import ImageResponse, ProviderInfo
+from .asyncio import to_sync_generator
+from .scores import scores
+from .circuit_breaker import breakers
 from .. import debug
-from ..errors import RetryProviderError, RetryNoProviderError
+from ..errors import RetryProviderError, RetryNoProviderError, ProviderNotWorkingError, TimeoutError
+
+# Hedge delay in seconds, if "auto" is used and there are no TTFT samples
+DEFAULT_HEDGE_DELAY = 5.0
 
 class IterListProvider(BaseRetryProvider):
     def __init__(
         self,
         providers: List[Type[BaseProvider]],
-        shuffle: bool = True
+        shuffle: bool = True,
+        hedge_after: Union[float, str, None] = None,
+        deadline: Optional[float] = None,
+        first_token_timeout: Optional[float] = None
     ) -> None:
         """
         Initialize the BaseRetryProvider.
         Args:
             providers (List[Type[BaseProvider]]): List of providers to use.
-            shuffle (bool): Whether to shuffle the providers list.
-            single_provider_retry (bool): Whether to retry a single provider if it fails.
-            max_retries (int): Maximum number of retries for a single provider.
+            shuffle (bool): Whether to order the providers by their scores (randomly without scores).
+            hedge_after (Union[float, str, None]): Start the next provider in parallel, if the running one
+                has not produced a token after this many seconds. "auto" uses the observed p95 TTFT.
+            deadline (Optional[float]): Total seconds for the request, split across the remaining providers.
+            first_token_timeout (Optional[float]): Seconds to wait for the first token, before the next provider is used.
         """
         self.providers = providers
         self.shuffle = shuffle
+        self.hedge_after = hedge_after
+        self.deadline = deadline
+        self.first_token_timeout = first_token_timeout
         self.working = True
         self.last_provider: Type[BaseProvider] = None
 
@@ -34,6 +48,9 @@ class IterListProvider(BaseRetryProvider):
         stream: bool = False,
         ignore_stream: bool = False,
         ignored: list[str] = [],
+        hedge_after: Union[float, str, None] = None,
+        deadline: Optional[float] = None,
+        first_token_timeout: Optional[float] = None,
         **kwargs,
     ) -> CreateResult:
         """
@@ -47,28 +64,46 @@ class IterListProvider(BaseRetryProvider):
         Raises:
             Exception: Any exception encountered during the completion process.
         """
+        if (self.get_hedge_after(hedge_after) is not None
+                or self.get_deadline(deadline) is not None
+                or self.get_first_token_timeout(first_token_timeout) is not None):
+            # Hedged requests and timeouts need the event loop to cancel providers.
+            yield from to_sync_generator(self.create_async_generator(
+                model, messages, stream=stream, ignore_stream=ignore_stream, ignored=ignored,
+                hedge_after=hedge_after, deadline=deadline, first_token_timeout=first_token_timeout, **kwargs
+            ))
+            return
+
         exceptions = {}
         started: bool = False
 
-        for provider in self.get_providers(stream and not ignore_stream, ignored):
+        for provider in self.get_providers(stream and not ignore_stream, ignored, model):
+            if not breakers.allow_request(provider.__name__, model):
+                continue
             self.last_provider = provider
             debug.log(f"Using {provider.__name__} provider")
             yield ProviderInfo(**provider.get_dict(), model=model if model else getattr(provider, "default_model"))
+            tracker = scores.track(provider.__name__, model)
             try:
                 response = provider.get_create_function()(model, messages, stream=stream, **kwargs)
                 for chunk in response:
                     if chunk:
                         yield chunk
                         if isinstance(chunk, str) or isinstance(chunk, ImageResponse):
+                            tracker.add_token()
                             started = True
                 if started:
                     return
+                tracker.finish(False)
             except Exception as e:
+                tracker.finish(False, e)
                 exceptions[provider.__name__] = e
                 debug.log(f"{provider.__name__}: {e.__class__.__name__}: {e}")
                 if started:
                     raise e
                 yield e
+            finally:
+                tracker.finish()
 
         raise_exceptions(exceptions)
 
@@ -79,49 +114,224 @@ class IterListProvider(BaseRetryProvider):
         stream: bool = True,
         ignore_stream: bool = False,
         ignored: list[str] = [],
+        hedge_after: Union[float, str, None] = None,
+        deadline: Optional[float] = None,
+        first_token_timeout: Optional[float] = None,
         **kwargs
     ) -> AsyncResult:
         exceptions = {}
         started: bool = False
 
-        for provider in self.get_providers(stream and not ignore_stream, ignored):
+        providers = self.get_providers(stream and not ignore_stream, ignored, model)
+        hedge_after = self.get_hedge_after(hedge_after)
+        deadline = self.get_deadline(deadline)
+        first_token_timeout = self.get_first_token_timeout(first_token_timeout)
+        loop = asyncio.get_running_loop()
+        deadline_at = None if deadline is None else loop.time() + deadline
+        if hedge_after is not None and len(providers) > 1:
+            async for chunk in self.create_hedged_generator(
+                providers, model, messages, stream, hedge_after,
+                deadline_at=deadline_at, first_token_timeout=first_token_timeout, **kwargs
+            ):
+                yield chunk
+            return
+
+        for idx, provider in enumerate(providers):
+            if deadline_at is not None and loop.time() >= deadline_at:
+                exceptions[provider.__name__] = TimeoutError(f"Deadline of {deadline}s exceeded")
+                break
+            if not breakers.allow_request(provider.__name__, model):
+                continue
             self.last_provider = provider
             debug.log(f"Using {provider.__name__} provider")
             yield ProviderInfo(**provider.get_dict())
+            tracker = scores.track(provider.__name__, model)
             try:
-                response = provider.get_async_create_function()(model, messages, stream=stream, **kwargs)
+                first_token_at = get_first_token_at(loop, first_token_timeout, deadline_at, len(providers) - idx)
+                response = provider.get_async_create_function()(
+                    model, messages, stream=stream, **get_timeout_kwargs(loop, deadline_at, kwargs)
+                )
                 if hasattr(response, "__aiter__"):
+                    if first_token_at is not None or deadline_at is not None:
+                        response = iter_with_watchdog(response, first_token_at, deadline_at)
                     async for chunk in response:
                         if chunk:
                             yield chunk
                             if isinstance(chunk, str) or isinstance(chunk, ImageResponse):
+                                tracker.add_token()
                                 started = True
                 elif response:
-                    response = await response
+                    response = await wait_for_response(loop, response, first_token_at)
                     if response:
+                        tracker.add_token()
                         yield response
                         started = True
                 if started:
                     return
+                tracker.finish(False)
             except Exception as e:
+                tracker.finish(False, e)
                 exceptions[provider.__name__] = e
                 debug.log(f"{provider.__name__}: {e.__class__.__name__}: {e}")
                 if started:
                     raise e
                 yield e
+            finally:
+                tracker.finish()
 
         raise_exceptions(exceptions)
 
+    async def create_hedged_generator(
+        self,
+        providers: list[ProviderType],
+        model: str,
+        messages: Messages,
+        stream: bool,
+        hedge_after: Union[float, str],
+        deadline_at: Optional[float] = None,
+        first_token_timeout: Optional[float] = None,
+        **kwargs
+    ) -> AsyncResult:
+        """
+        Race the providers: If the running providers produced no token within the hedge delay,
+        the next provider is started in parallel. The first provider that yields content
+        (str or ImageResponse) wins, all other providers are cancelled.
+        """
+        queue: asyncio.Queue = asyncio.Queue()
+        pending = list(providers)
+        tasks: dict[str, asyncio.Task] = {}
+        cancelled: list[asyncio.Task] = []
+        buffers: dict[str, list] = {}
+        exceptions = {}
+        winner: Optional[ProviderType] = None
+
+        loop = asyncio.get_running_loop()
+
+        async def run_provider(provider: ProviderType):
+            tracker = scores.track(provider.__name__, model)
+            response = None
+            try:
+                first_token_at = get_first_token_at(loop, first_token_timeout, deadline_at)
+                response = provider.get_async_create_function()(
+                    model, messages, stream=stream, **get_timeout_kwargs(loop, deadline_at, kwargs)
+                )
+                if hasattr(response, "__aiter__"):
+                    if first_token_at is not None or deadline_at is not None:
+                        response = iter_with_watchdog(response, first_token_at, deadline_at)
+                    async for chunk in response:
+                        if chunk:
+                            if isinstance(chunk, str) or isinstance(chunk, ImageResponse):
+                                tracker.add_token()
+                            await queue.put((provider, chunk))
+                elif response:
+                    response = await wait_for_response(loop, response, first_token_at)
+                    if response:
+                        tracker.add_token()
+                        await queue.put((provider, response))
+                tracker.finish(tracker.first_token is not None)
+                await queue.put((provider, None))
+            except Exception as e:
+                tracker.finish(False, e)
+                await queue.put((provider, e))
+            finally:
+                tracker.finish()
+                if hasattr(response, "aclose"):
+                    try:
+                        await response.aclose()
+                    except Exception:
+                        pass
+
+        def start_next() -> float:
+            while pending:
+                provider = pending.pop(0)
+                if breakers.allow_request(provider.__name__, model):
+                    debug.log(f"Using {provider.__name__} provider" + (" (hedged)" if tasks else ""))
+                    buffers[provider.__name__] = [ProviderInfo(**provider.get_dict())]
+                    tasks[provider.__name__] = asyncio.create_task(run_provider(provider))
+                    return self.get_hedge_delay(hedge_after, provider, model)
+            return 0
+
+        next_start = loop.time() + start_next()
+        try:
+            while tasks:
+                timeout = max(0, next_start - loop.time()) if winner is None and pending else None
+                if deadline_at is not None:
+                    remaining = max(0, deadline_at - loop.time())
+                    timeout = remaining if timeout is None else min(timeout, remaining)
+                try:
+                    provider, chunk = await asyncio.wait_for(queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    if deadline_at is not None and loop.time() >= deadline_at:
+                        raise TimeoutError("Deadline exceeded")
+                    next_start = loop.time() + start_next()
+                    continue
+                name = provider.__name__
+                if name not in tasks:
+                    # Chunk of a cancelled provider
+                    continue
+                if winner is not None:
+                    if chunk is None:
+                        return
+                    if isinstance(chunk, Exception):
+                        raise chunk
+                    yield chunk
+                elif chunk is None or isinstance(chunk, Exception):
+                    del tasks[name]
+                    if chunk is not None:
+                        exceptions[name] = chunk
+                        debug.log(f"{name}: {chunk.__class__.__name__}: {chunk}")
+                        yield chunk
+                    if pending and not tasks:
+                        next_start = loop.time() + start_next()
+                else:
+                    buffers[name].append(chunk)
+                    if isinstance(chunk, str) or isinstance(chunk, ImageResponse):
+                        winner = provider
+                        self.last_provider = provider
+                        for other in list(tasks.keys()):
+                            if other != name:
+                                cancelled.append(tasks.pop(other))
+                                cancelled[-1].cancel()
+                        for chunk in buffers.pop(name):
+                            yield chunk
+        finally:
+            for task in tasks.values():
+                task.cancel()
+            await asyncio.gather(*tasks.values(), *cancelled, return_exceptions=True)
+
+        raise_exceptions(exceptions)
+
+    def get_hedge_after(self, hedge_after: Union[float, str, None] = None) -> Union[float, str, None]:
+        return self.hedge_after if hedge_after is None else hedge_after
+
+    def get_deadline(self, deadline: Optional[float] = None) -> Optional[float]:
+        return self.deadline if deadline is None else deadline
+
+    def get_first_token_timeout(self, first_token_timeout: Optional[float] = None) -> Optional[float]:
+        return self.first_token_timeout if first_token_timeout is None else first_token_timeout
+
+    def get_hedge_delay(self, hedge_after: Union[float, str], provider: ProviderType, model: str) -> float:
+        if hedge_after == "auto":
+            score = scores.get(provider.__name__, model)
+            p95 = None if score is None else score.quantile(0.95)
+            return DEFAULT_HEDGE_DELAY if p95 is None else p95
+        return float(hedge_after)
+
     def get_create_function(self) -> callable:
         return self.create_completion
 
     def get_async_create_function(self) -> callable:
         return self.create_async_generator
 
-    def get_providers(self, stream: bool, ignored: list[str]) -> list[ProviderType]:
-        providers = [p for p in self.providers if (p.supports_stream or not stream) and p.__name__ not in ignored]
+    def get_providers(self, stream: bool, ignored: list[str], model: str = None) -> list[ProviderType]:
+        providers = [
+            p for p in self.providers
+            if (p.supports_stream or not stream)
+            and p.__name__ not in ignored
+            and breakers.is_available(p.__name__, model)
+        ]
         if self.shuffle:
-            random.shuffle(providers)
+            providers = scores.sort_providers(providers, model)
         return providers
 
 class RetryProvider(IterListProvider):
@@ -131,6 +341,9 @@ class RetryProvider(IterListProvider):
         shuffle: bool = True,
         single_provider_retry: bool = False,
         max_retries: int = 3,
+        hedge_after: Union[float, str, None] = None,
+        deadline: Optional[float] = None,
+        first_token_timeout: Optional[float] = None,
     ) -> None:
         """
         Initialize the BaseRetryProvider.
@@ -139,8 +352,11 @@ class RetryProvider(IterListProvider):
             shuffle (bool): Whether to shuffle the providers list.
             single_provider_retry (bool): Whether to retry a single provider if it fails.
             max_retries (int): Maximum number of retries for a single provider.
+            hedge_after (Union[float, str, None]): Delay in seconds (or "auto") before the next provider is raced.
+            deadline (Optional[float]): Total seconds for the request, split across the remaining providers.
+            first_token_timeout (Optional[float]): Seconds to wait for the first token of a provider.
         """
-        super().__init__(providers, shuffle)
+        super().__init__(providers, shuffle, hedge_after, deadline, first_token_timeout)
         self.single_provider_retry = single_provider_retry
         self.max_retries = max_retries
 
@@ -149,6 +365,8 @@ class RetryProvider(IterListProvider):
         model: str,
         messages: Messages,
         stream: bool = False,
+        deadline: Optional[float] = None,
+        first_token_timeout: Optional[float] = None,
         **kwargs,
     ) -> CreateResult:
         """
@@ -162,12 +380,22 @@ class RetryProvider(IterListProvider):
         Raises:
             Exception: Any exception encountered during the completion process.
         """
-        if self.single_provider_retry:
+        if self.single_provider_retry and (
+            self.get_deadline(deadline) is not None
+            or self.get_first_token_timeout(first_token_timeout) is not None
+        ):
+            yield from to_sync_generator(self.create_async_generator(
+                model, messages, stream, deadline=deadline, first_token_timeout=first_token_timeout, **kwargs
+            ))
+        elif self.single_provider_retry:
             exceptions = {}
             started: bool = False
             provider = self.providers[0]
             self.last_provider = provider
             for attempt in range(self.max_retries):
+                if not breakers.allow_request(provider.__name__, model):
+                    exceptions[provider.__name__] = get_circuit_open_error(provider, model)
+                    break
                 try:
                     if debug.logging:
                         print(f"Using {provider.__name__} provider (attempt {attempt + 1})")
@@ -177,8 +405,11 @@ class RetryProvider(IterListProvider):
                             yield chunk
                             started = True
                     if started:
+                        breakers.add_success(provider.__name__, model)
                         return
+                    breakers.release(provider.__name__, model)
                 except Exception as e:
+                    breakers.add_failure(provider.__name__, model, e)
                     exceptions[provider.__name__] = e
                     if debug.logging:
                         print(f"{provider.__name__}: {e.__class__.__name__}: {e}")
@@ -186,13 +417,17 @@ class RetryProvider(IterListProvider):
                         raise e
             raise_exceptions(exceptions)
         else:
-            yield from super().create_completion(model, messages, stream, **kwargs)
+            yield from super().create_completion(
+                model, messages, stream, deadline=deadline, first_token_timeout=first_token_timeout, **kwargs
+            )
 
     async def create_async_generator(
         self,
         model: str,
         messages: Messages,
         stream: bool = True,
+        deadline: Optional[float] = None,
+        first_token_timeout: Optional[float] = None,
         **kwargs
     ) -> AsyncResult:
         exceptions = {}
@@ -201,31 +436,172 @@ class RetryProvider(IterListProvider):
         if self.single_provider_retry:
             provider = self.providers[0]
             self.last_provider = provider
+            deadline = self.get_deadline(deadline)
+            first_token_timeout = self.get_first_token_timeout(first_token_timeout)
+            loop = asyncio.get_running_loop()
+            deadline_at = None if deadline is None else loop.time() + deadline
             for attempt in range(self.max_retries):
+                if deadline_at is not None and loop.time() >= deadline_at:
+                    exceptions[provider.__name__] = TimeoutError(f"Deadline of {deadline}s exceeded")
+                    break
+                if not breakers.allow_request(provider.__name__, model):
+                    exceptions[provider.__name__] = get_circuit_open_error(provider, model)
+                    break
                 try:
                     debug.log(f"Using {provider.__name__} provider (attempt {attempt + 1})")
-                    response = provider.get_async_create_function()(model, messages, stream=stream, **kwargs)
+                    first_token_at = get_first_token_at(loop, first_token_timeout, deadline_at, self.max_retries - attempt)
+                    response = provider.get_async_create_function()(
+                        model, messages, stream=stream, **get_timeout_kwargs(loop, deadline_at, kwargs)
+                    )
                     if hasattr(response, "__aiter__"):
+                        if first_token_at is not None or deadline_at is not None:
+                            response = iter_with_watchdog(response, first_token_at, deadline_at)
                         async for chunk in response:
                             if isinstance(chunk, str) or isinstance(chunk, ImageResponse):
                                 yield chunk
                                 started = True
                     else:
-                        response = await response
+                        response = await wait_for_response(loop, response, first_token_at)
                         if response:
                             yield response
                             started = True
                     if started:
+                        breakers.add_success(provider.__name__, model)
                         return
+                    breakers.release(provider.__name__, model)
                 except Exception as e:
+                    breakers.add_failure(provider.__name__, model, e)
                     exceptions[provider.__name__] = e
                     if debug.logging:
                         print(f"{provider.__name__}: {e.__class__.__name__}: {e}")
             raise_exceptions(exceptions)
         else:
-            async for chunk in super().create_async_generator(model, messages, stream, **kwargs):
+            async for chunk in super().create_async_generator(
+                model, messages, stream, deadline=deadline, first_token_timeout=first_token_timeout, **kwargs
+            ):
                 yield chunk
                 
+def get_first_token_at(
+    loop: asyncio.AbstractEventLoop,
+    first_token_timeout: Optional[float],
+    deadline_at: Optional[float],
+    remaining_providers: int = 1
+) -> Optional[float]:
+    """
+    Returns the loop time until the first token is expected.
+    The remaining time of the deadline is split across the remaining providers.
+    """
+    limits = []
+    if first_token_timeout is not None:
+        limits.append(loop.time() + first_token_timeout)
+    if deadline_at is not None:
+        limits.append(loop.time() + max(0, deadline_at - loop.time()) / max(1, remaining_providers))
+    return min(limits) if limits else None
+
+def get_timeout_kwargs(loop: asyncio.AbstractEventLoop, deadline_at: Optional[float], kwargs: dict) -> dict:
+    """Limits the timeout of the provider to the remaining time of the deadline."""
+    if deadline_at is None:
+        return kwargs
+    remaining = max(1, deadline_at - loop.time())
+    timeout = kwargs.get("timeout")
+    return {**kwargs, "timeout": remaining if not timeout else min(timeout, remaining)}
+
+async def wait_for_response(loop: asyncio.AbstractEventLoop, response, first_token_at: Optional[float]):
+    if first_token_at is None:
+        return await response
+    try:
+        return await asyncio.wait_for(response, max(0, first_token_at - loop.time()))
+    except asyncio.TimeoutError:
+        raise TimeoutError("No response before first token timeout")
+
+async def iter_with_watchdog(
+    response: AsyncIterator,
+    first_token_at: Optional[float],
+    deadline_at: Optional[float]
+) -> AsyncResult:
+    """
+    Yields the chunks of the response and raises a TimeoutError,
+    if the first token is not received until first_token_at,
+    or if the response is not finished until deadline_at.
+
+    The response is iterated in the task of the caller, under one timeout,
+    which is rescheduled after the first token. It is disarmed while a chunk is
+    yielded, so it never cancels the caller outside of the response.
+    """
+    if not hasattr(asyncio, "timeout_at"):
+        # Python < 3.11: Each chunk is awaited in its own task
+        async for chunk in iter_with_wait_for(response, first_token_at, deadline_at):
+            yield chunk
+        return
+    iterator = response.__aiter__()
+    started = False
+    def get_limit() -> Optional[float]:
+        if not started and first_token_at is not None:
+            return first_token_at if deadline_at is None else min(first_token_at, deadline_at)
+        return deadline_at
+    try:
+        async with asyncio.timeout_at(get_limit()) as timeout:
+            while True:
+                try:
+                    chunk = await iterator.__anext__()
+                except StopAsyncIteration:
+                    break
+                if isinstance(chunk, str) or isinstance(chunk, ImageResponse):
+                    started = True
+                timeout.reschedule(None)
+                yield chunk
+                timeout.reschedule(get_limit())
+    except asyncio.TimeoutError:
+        if started:
+            raise TimeoutError("Deadline exceeded")
+        raise TimeoutError("No first token before timeout")
+    finally:
+        if hasattr(iterator, "aclose"):
+            try:
+                await iterator.aclose()
+            except Exception:
+                pass
+
+async def iter_with_wait_for(
+    response: AsyncIterator,
+    first_token_at: Optional[float],
+    deadline_at: Optional[float]
+) -> AsyncResult:
+    loop = asyncio.get_running_loop()
+    iterator = response.__aiter__()
+    started = False
+    try:
+        while True:
+            limit = deadline_at
+            if not started and first_token_at is not None:
+                limit = first_token_at if deadline_at is None else min(first_token_at, deadline_at)
+            try:
+                chunk = await asyncio.wait_for(
+                    iterator.__anext__(),
+                    None if limit is None else max(0, limit - loop.time())
+                )
+            except StopAsyncIteration:
+                break
+            except asyncio.TimeoutError:
+                if started:
+                    raise TimeoutError("Deadline exceeded")
+                raise TimeoutError("No first token before timeout")
+            if isinstance(chunk, str) or isinstance(chunk, ImageResponse):
+                started = True
+            yield chunk
+    finally:
+        if hasattr(iterator, "aclose"):
+            try:
+                await iterator.aclose()
+            except Exception:
+                pass
+
+def get_circuit_open_error(provider: ProviderType, model: str = None) -> ProviderNotWorkingError:
+    breaker = breakers.get(provider.__name__, model)
+    return ProviderNotWorkingError(
+        f"Circuit breaker is open: {breaker.reason} (retry after {breaker.get_retry_after():.0f}s)"
+    )
+
 def raise_exceptions(exceptions: dict) -> None:
     """
     Raise a combined exception if any occurred during retries.
@@ -0,0 +1,252 @@
+from __future__ import annotations
+
+import os
+import json
+import time
+import random
+import atexit
+import threading
+from collections import deque
+from pathlib import Path
+from typing import Optional
+
+from .circuit_breaker import breakers
+from ..cookies import get_cookies_dir
+from .. import debug
+
+SCORES_FILE = ".provider_scores.json"
+
+class ProviderScore:
+    """
+    Latency and reliability statistics of a provider for a single model.
+
+    Attributes:
+        success_rate (float): EWMA of successful requests (1.0 = always successful).
+        ttft (float): EWMA of the time to first token in seconds.
+        tokens_per_second (float): EWMA of the streaming throughput.
+        samples (deque): Sliding window of the last time to first token values.
+    """
+    window_size: int = 50
+
+    def __init__(
+        self,
+        success_rate: float = 1.0,
+        ttft: Optional[float] = None,
+        tokens_per_second: Optional[float] = None,
+        requests: int = 0,
+        failures: int = 0,
+        last_used: float = 0,
+        samples: list[float] = None
+    ) -> None:
+        self.success_rate = success_rate
+        self.ttft = ttft
+        self.tokens_per_second = tokens_per_second
+        self.requests = requests
+        self.failures = failures
+        self.last_used = last_used
+        self.samples = deque(samples or [], maxlen=self.window_size)
+
+    def add_success(self, ttft: float, tokens: int, duration: float, alpha: float) -> None:
+        self.requests += 1
+        self.last_used = time.time()
+        self.success_rate = ewma(self.success_rate, 1.0, alpha)
+        self.ttft = ewma(self.ttft, ttft, alpha)
+        self.samples.append(ttft)
+        stream_time = duration - ttft
+        if tokens > 1 and stream_time > 0:
+            self.tokens_per_second = ewma(self.tokens_per_second, tokens / stream_time, alpha)
+
+    def add_failure(self, alpha: float) -> None:
+        self.requests += 1
+        self.failures += 1
+        self.last_used = time.time()
+        self.success_rate = ewma(self.success_rate, 0.0, alpha)
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Returns the q-quantile of the time to first token window."""
+        if not self.samples:
+            return None
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+    def expected_latency(self) -> Optional[float]:
+        """
+        Expected seconds until a successful first token.
+        Failed attempts are paid with the mean latency, so a slow but reliable
+        provider can rank before a fast provider that fails often.
+        """
+        if self.ttft is None:
+            return None
+        return self.ttft / max(self.success_rate, 0.05)
+
+    def get_dict(self) -> dict:
+        return {
+            "success_rate": self.success_rate,
+            "ttft": self.ttft,
+            "tokens_per_second": self.tokens_per_second,
+            "requests": self.requests,
+            "failures": self.failures,
+            "last_used": self.last_used,
+            "samples": list(self.samples),
+        }
+
+def ewma(current: Optional[float], value: float, alpha: float) -> float:
+    if current is None:
+        return value
+    return alpha * value + (1 - alpha) * current
+
+class ProviderScores:
+    """
+    Scoreboard of all providers, keyed by provider name and model.
+    It orders the candidates of a IterListProvider by expected latency
+    and persists the table in the cookies dir, so new processes start warm.
+
+    Attributes:
+        alpha (float): Weight of new observations in the EWMA.
+        exploration (float): Probability to probe a random provider first.
+        save_interval (int): Minimal seconds between two writes of the score file.
+        persist (bool): Whether the table is read from and written to the cookies dir.
+    """
+    alpha: float = 0.3
+    exploration: float = 0.1
+    save_interval: int = 30
+    persist: bool = True
+
+    def __init__(self) -> None:
+        self.scores: dict[str, dict[str, ProviderScore]] = {}
+        self.lock = threading.Lock()
+        self.loaded = False
+        self.last_saved = time.time()
+
+    def get(self, provider: str, model: str = None) -> Optional[ProviderScore]:
+        self.load()
+        return self.scores.get(provider, {}).get(model or "")
+
+    def get_or_create(self, provider: str, model: str = None) -> ProviderScore:
+        self.load()
+        models = self.scores.setdefault(provider, {})
+        model = model or ""
+        if model not in models:
+            models[model] = ProviderScore()
+        return models[model]
+
+    def add_success(self, provider: str, model: str, ttft: float, tokens: int = 0, duration: float = 0) -> None:
+        with self.lock:
+            self.get_or_create(provider, model).add_success(ttft, tokens, max(duration, ttft), self.alpha)
+        self.save(force=False)
+
+    def add_failure(self, provider: str, model: str) -> None:
+        with self.lock:
+            self.get_or_create(provider, model).add_failure(self.alpha)
+        self.save(force=False)
+
+    def track(self, provider: str, model: str) -> ScoreTracker:
+        return ScoreTracker(self, provider, model)
+
+    def sort_providers(self, providers: list, model: str = None) -> list:
+        """
+        Sorts providers by expected latency. Providers without statistics
+        are tried first in random order, because they could be the fastest.
+        With a small probability a random provider is moved to the front,
+        to give recovered providers traffic again.
+        """
+        unknown = []
+        known = []
+        for provider in providers:
+            score = self.get(provider.__name__, model)
+            latency = None if score is None else score.expected_latency()
+            if latency is None:
+                unknown.append(provider)
+            else:
+                known.append((latency, provider))
+        random.shuffle(unknown)
+        known.sort(key=lambda item: item[0])
+        ordered = unknown + [provider for _, provider in known]
+        if len(ordered) > 1 and random.random() < self.exploration:
+            ordered.insert(0, ordered.pop(random.randrange(1, len(ordered))))
+        return ordered
+
+    def get_dict(self) -> dict[str, dict[str, dict]]:
+        self.load()
+        with self.lock:
+            return {
+                provider: {model: score.get_dict() for model, score in models.items()}
+                for provider, models in self.scores.items()
+            }
+
+    def get_file(self) -> Path:
+        return Path(get_cookies_dir()) / SCORES_FILE
+
+    def load(self) -> None:
+        if self.loaded or not self.persist:
+            return
+        self.loaded = True
+        cache_file = self.get_file()
+        if not cache_file.exists():
+            return
+        try:
+            with cache_file.open("r") as f:
+                data = json.load(f)
+            for provider, models in data.items():
+                for model, score in models.items():
+                    self.scores.setdefault(provider, {})[model] = ProviderScore(**score)
+            debug.log(f"Read provider scores: {cache_file}")
+        except (OSError, ValueError, TypeError) as e:
+            debug.log(f"Failed to read provider scores: {e.__class__.__name__}: {e}")
+
+    def save(self, force: bool = True) -> None:
+        if not self.persist or not self.scores or (not force and time.time() - self.last_saved < self.save_interval):
+            return
+        self.last_saved = time.time()
+        cache_file = self.get_file()
+        try:
+            data = json.dumps(self.get_dict())
+            if os.access(cache_file.parent, os.W_OK):
+                temp_file = cache_file.with_suffix(".tmp")
+                temp_file.write_text(data)
+                temp_file.replace(cache_file)
+        except OSError as e:
+            debug.log(f"Failed to save provider scores: {e.__class__.__name__}: {e}")
+
+    def reset(self) -> None:
+        with self.lock:
+            self.scores = {}
+
+class ScoreTracker:
+    """
+    Measures a single request of a provider and records the result
+    in the scores and in the circuit breaker of the provider.
+    """
+    def __init__(self, scores: ProviderScores, provider: str, model: str) -> None:
+        self.scores = scores
+        self.provider = provider
+        self.model = model
+        self.start = time.time()
+        self.first_token: Optional[float] = None
+        self.tokens = 0
+        self.finished = False
+
+    def add_token(self) -> None:
+        if self.first_token is None:
+            self.first_token = time.time() - self.start
+        self.tokens += 1
+
+    def finish(self, success: bool = True, error: Exception = None) -> None:
+        """
+        Records the request once. A successful request without any token
+        (e.g. closed by the consumer) is not recorded.
+        """
+        if self.finished:
+            return
+        self.finished = True
+        if not success:
+            self.scores.add_failure(self.provider, self.model)
+            breakers.add_failure(self.provider, self.model, error)
+        elif self.first_token is not None:
+            self.scores.add_success(self.provider, self.model, self.first_token, self.tokens, time.time() - self.start)
+            breakers.add_success(self.provider, self.model)
+        else:
+            breakers.release(self.provider, self.model)
+
+scores = ProviderScores()
+atexit.register(scores.save)
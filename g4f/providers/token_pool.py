@@ -0,0 +1,154 @@
+from __future__ import annotations
+
+import time
+import asyncio
+from collections import deque
+from typing import Awaitable, Callable, Optional, Any
+
+from .. import debug
+
+class TokenFactory:
+    """
+    The tokens of a provider, that are fetched ahead of the requests.
+
+    Attributes:
+        fetch (Callable): Fetches a new token. It must not depend on the session of a request.
+        ttl (float): Seconds after which a token expires.
+        size (int): The number of tokens, that are kept warm.
+        tokens (deque): The fetched tokens with their expiry time.
+        task (asyncio.Task): The task, that fetches tokens in the background.
+        used (asyncio.Event): Set, when a token is handed out, so the task replaces it.
+        last_used (float): The time of the last request of a token.
+        failures (int): The number of failed prefetches in a row.
+        retry_at (float): The time before which no prefetch is started after a failure.
+    """
+    __slots__ = ("fetch", "ttl", "size", "tokens", "task", "used", "last_used", "failures", "retry_at")
+
+    def __init__(self, fetch: Callable[[], Awaitable[Any]], ttl: float, size: int) -> None:
+        self.fetch = fetch
+        self.ttl = ttl
+        self.size = size
+        self.tokens: deque[tuple[float, Any]] = deque()
+        self.task: Optional[asyncio.Task] = None
+        self.used: Optional[asyncio.Event] = None
+        self.last_used = time.monotonic()
+        self.failures = 0
+        self.retry_at = 0
+
+    def discard_expired(self) -> None:
+        now = time.monotonic()
+        while self.tokens and self.tokens[0][0] <= now:
+            self.tokens.popleft()
+
+    def pop(self) -> Optional[Any]:
+        self.discard_expired()
+        return self.tokens.popleft()[1] if self.tokens else None
+
+class TokenPool:
+    """
+    Keeps one-shot tokens of providers, like anti-bot or session tokens, warm.
+
+    A provider requests a token with a key and a factory. A prefetched token is
+    handed out once, the used token is replaced in the background.
+    On a miss the token is fetched on the request path, prefetching starts after it.
+    Tokens are fetched only while the key is in use.
+    After a failed prefetch, the next prefetch of the key waits with an exponential backoff.
+
+    Attributes:
+        enabled (bool): Whether tokens are fetched in the background. Enabled with --prefetch-tokens.
+        idle_timeout (float): Seconds after the last request, after which no tokens are fetched.
+        retry_delay (float): Seconds to wait after the first failed prefetch, doubled on each failure.
+        max_retry_delay (float): The maximum seconds to wait after a failed prefetch.
+    """
+    enabled: bool = False
+    idle_timeout: float = 300
+    retry_delay: float = 30
+    max_retry_delay: float = 600
+
+    def __init__(self) -> None:
+        self.factories: dict[tuple, TokenFactory] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def register(self, key: tuple, fetch: Callable[[], Awaitable[Any]], ttl: float = 60, size: int = 1) -> TokenFactory:
+        """Adds the factory of a key, or updates it, so later fetches use the current arguments."""
+        factory = self.factories.get(key)
+        if factory is None:
+            factory = TokenFactory(fetch, ttl, size)
+            self.factories[key] = factory
+        else:
+            factory.fetch = fetch
+            factory.ttl = ttl
+            factory.size = size
+        return factory
+
+    async def get(self, key: tuple, fetch: Callable[[], Awaitable[Any]], ttl: float = 60, size: int = 1) -> Any:
+        """
+        Returns a prefetched token, or fetches one.
+
+        Args:
+            key (tuple): The provider and everything the token depends on, like the proxy or the account.
+            fetch (Callable): Fetches a new token.
+            ttl (float): Seconds after which a token expires.
+            size (int): The number of tokens, that are kept warm.
+        """
+        factory = self.register(key, fetch, ttl, size)
+        factory.last_used = time.monotonic()
+        token = factory.pop()
+        if token is not None:
+            self.hits += 1
+            self.prefetch(key, factory)
+            if factory.task is not None and factory.task.get_loop() is asyncio.get_running_loop():
+                factory.used.set()
+            return token
+        self.misses += 1
+        # Prefetch only after the token of the request, so they are not fetched at once
+        token = await fetch()
+        self.prefetch(key, factory)
+        return token
+
+    def prefetch(self, key: tuple, factory: TokenFactory) -> None:
+        if not self.enabled or time.monotonic() < factory.retry_at:
+            return
+        if factory.task is not None and not factory.task.done() and not factory.task.get_loop().is_closed():
+            return
+        factory.used = asyncio.Event()
+        factory.task = asyncio.ensure_future(self.fill(key, factory))
+
+    async def fill(self, key: tuple, factory: TokenFactory) -> None:
+        while time.monotonic() - factory.last_used < self.idle_timeout:
+            factory.discard_expired()
+            if len(factory.tokens) < factory.size:
+                try:
+                    token = await factory.fetch()
+                except Exception as e:
+                    delay = min(self.retry_delay * 2 ** factory.failures, self.max_retry_delay)
+                    factory.failures += 1
+                    factory.retry_at = time.monotonic() + delay
+                    debug.log(f"Prefetch token failed: {key[0]}: {type(e).__name__}: {e}, retry in {delay}s")
+                    return
+                factory.failures = 0
+                factory.tokens.append((time.monotonic() + factory.ttl, token))
+            else:
+                # Wait until a token is used or the first token expires
+                factory.used.clear()
+                timer = asyncio.get_running_loop().call_later(max(0, factory.tokens[0][0] - time.monotonic()), factory.used.set)
+                try:
+                    await factory.used.wait()
+                finally:
+                    timer.cancel()
+
+    def clear(self) -> None:
+        for factory in self.factories.values():
+            if factory.task is not None and not factory.task.get_loop().is_closed():
+                factory.task.cancel()
+        self.factories.clear()
+
+    def get_dict(self) -> dict:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "tokens": sum(len(factory.tokens) for factory in self.factories.values()),
+        }
+
+token_pool = TokenPool()
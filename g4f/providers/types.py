@@ -16,6 +16,9 @@ class BaseProvider(ABC):
         supports_message_history (bool): Indicates if the provider supports message history.
         supports_system_message (bool): Indicates if the provider supports system messages.
         params (str): List parameters for the provider.
+        image_max_pixels (int): Input images with more pixels are downscaled.
+        image_max_bytes (int): Input images with more bytes are downscaled.
+        image_format (str): The format of downscaled images.
     """
 
     url: str = None
@@ -24,6 +27,9 @@ class BaseProvider(ABC):
     supports_stream: bool = False
     supports_message_history: bool = False
     supports_system_message: bool = False
+    image_max_pixels: int = None
+    image_max_bytes: int = None
+    image_format: str = "jpeg"
     params: str
 
     @abstractmethod
@@ -0,0 +1,143 @@
+from __future__ import annotations
+
+import time
+import asyncio
+import hashlib
+import weakref
+from collections import OrderedDict
+from typing import Awaitable, Callable, Optional, Any
+
+from ..typing import ImagesType
+from ..image import ImageRef, to_image_ref
+from .. import debug
+
+def get_account(secret: Optional[str]) -> Optional[str]:
+    """Returns an identifier of an account, without keeping its secret."""
+    if not secret:
+        return None
+    return hashlib.sha256(secret.encode()).hexdigest()[:16]
+
+class UploadCache:
+    """
+    Remembers uploaded images per provider, account and content hash.
+
+    An image, that was uploaded before and is not expired, is referenced by
+    the stored result (e.g. a file id) and not uploaded again.
+    Uploads of a request run concurrently, bounded by `concurrency`.
+
+    Attributes:
+        ttl (float): Seconds after which an upload expires.
+        max_entries (int): The number of remembered uploads.
+        concurrency (int): The maximum number of concurrent uploads.
+    """
+    ttl: float = 3600
+    max_entries: int = 256
+    concurrency: int = 4
+
+    def __init__(self) -> None:
+        self.entries: OrderedDict[tuple, tuple[float, Any]] = OrderedDict()
+        self.pending: dict[tuple, asyncio.Future] = {}
+        self.semaphores: weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore] = weakref.WeakKeyDictionary()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: tuple) -> Optional[Any]:
+        item = self.entries.get(key)
+        if item is None:
+            return None
+        expires, value = item
+        if expires < time.time():
+            del self.entries[key]
+            return None
+        self.entries.move_to_end(key)
+        return value
+
+    def put(self, key: tuple, value: Any, ttl: Optional[float] = None) -> None:
+        self.entries[key] = (time.time() + (self.ttl if ttl is None else ttl), value)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def remove(self, provider: str, account: Optional[str], image: ImageRef) -> None:
+        self.entries.pop((provider, account, image.digest), None)
+
+    def get_semaphore(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        if loop not in self.semaphores:
+            self.semaphores[loop] = asyncio.Semaphore(self.concurrency)
+        return self.semaphores[loop]
+
+    async def upload(
+        self,
+        provider: str,
+        account: Optional[str],
+        image: ImageRef,
+        image_name: Optional[str],
+        upload: Callable[[ImageRef, Optional[str]], Awaitable[Any]],
+        ttl: Optional[float] = None
+    ) -> Any:
+        """
+        Returns the cached result of an upload, or uploads the image.
+        Concurrent uploads of the same image share one upload.
+        The image name is only sent with the first upload of an image.
+        """
+        key = (provider, account, image.digest)
+        value = self.get(key)
+        if value is not None:
+            self.hits += 1
+            debug.log(f"{provider}: Reuse uploaded image: {image.digest[:16]}")
+            return value
+        pending_key = (*key, id(asyncio.get_running_loop()))
+        future = self.pending.get(pending_key)
+        if future is None:
+            self.misses += 1
+            future = asyncio.ensure_future(self.run_upload(key, image, image_name, upload, ttl))
+            self.pending[pending_key] = future
+            future.add_done_callback(lambda _: self.pending.pop(pending_key, None))
+        return await asyncio.shield(future)
+
+    async def run_upload(self, key: tuple, image: ImageRef, image_name: Optional[str], upload: Callable[[ImageRef, Optional[str]], Awaitable[Any]], ttl: Optional[float]) -> Any:
+        async with self.get_semaphore():
+            value = await upload(image, image_name)
+        self.put(key, value, ttl)
+        return value
+
+    async def upload_all(
+        self,
+        provider: str,
+        account: Optional[str],
+        images: ImagesType,
+        upload: Callable[[ImageRef, Optional[str]], Awaitable[Any]],
+        ttl: Optional[float] = None,
+        cache: bool = True
+    ) -> list:
+        """
+        Uploads the images concurrently and returns the results in order.
+        With `cache=False` the uploads are neither reused nor remembered,
+        e.g. if the account of an anonymous session is unknown.
+        """
+        if not cache:
+            return await asyncio.gather(*[
+                self.run_uncached(to_image_ref(image), image_name, upload)
+                for image, image_name in images
+            ])
+        return await asyncio.gather(*[
+            self.upload(provider, account, to_image_ref(image), image_name, upload, ttl)
+            for image, image_name in images
+        ])
+
+    async def run_uncached(self, image: ImageRef, image_name: Optional[str], upload: Callable[[ImageRef, Optional[str]], Awaitable[Any]]) -> Any:
+        async with self.get_semaphore():
+            return await upload(image, image_name)
+
+    def clear(self) -> None:
+        self.entries.clear()
+
+    def get_dict(self) -> dict:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "entries": len(self.entries),
+        }
+
+upload_cache = UploadCache()
@@ -1,12 +1,8 @@
 from __future__ import annotations
 
-import os
-import time
-import random
 from urllib.parse import urlparse
 from typing import Iterator
 from http.cookies import Morsel
-from pathlib import Path
 import asyncio
 try:
     from curl_cffi.requests import Session, Response
@@ -24,24 +20,20 @@ except ImportError:
 try:
     import nodriver
     from nodriver.cdp.network import CookieParam
-    from nodriver.core.config import find_chrome_executable
-    from nodriver import Browser, Tab, util
+    from nodriver import Browser, Tab
     has_nodriver = True
 except ImportError:
     from typing import Type as Browser
     from typing import Type as Tab
     has_nodriver = False
-try:
-    from platformdirs import user_config_dir
-    has_platformdirs = True
-except ImportError:
-    has_platformdirs = False
 
 from .. import debug
 from .raise_for_status import raise_for_status
+from .decoder import iter_sse, iter_ndjson, get_delta_content
+from .session_pool import SessionPool, SessionLease, session_pool
+from .browser_pool import BrowserPool, BrowserLease, browser_pool
 from ..errors import MissingRequirementsError
 from ..typing import Cookies
-from ..cookies import get_cookies_dir
 from .defaults import DEFAULT_HEADERS, WEBVIEW_HAEDERS
 
 if not has_curl_cffi:
@@ -73,7 +65,7 @@ async def get_args_from_webview(url: str) -> dict:
     return {"headers": headers, "cookies": cookies}
 
 def get_cookie_params_from_dict(cookies: Cookies, url: str = None, domain: str = None) -> list[CookieParam]:
-    [CookieParam.from_json({
+    return [CookieParam.from_json({
         "name": key,
         "value": value,
         "url": url,
@@ -87,22 +79,17 @@ async def get_args_from_nodriver(
     wait_for: str = None,
     callback: callable = None,
     cookies: Cookies = None,
-    browser: Browser = None
+    user_data_dir: str = "nodriver"
 ) -> dict:
-    if browser is None:
-        browser, stop_browser = await get_nodriver(proxy=proxy, timeout=timeout)
-    else:
-        def stop_browser():
-            ...
-    try:
+    async with browser_pool.lease(user_data_dir, proxy=proxy, timeout=timeout) as lease:
         if debug.logging:
             print(f"Open nodriver with url: {url}")
         domain = urlparse(url).netloc
         if cookies is None:
             cookies = {}
         else:
-            await browser.cookies.set_all(get_cookie_params_from_dict(cookies, url=url, domain=domain))
-        page = await browser.get(url)
+            await lease.browser.cookies.set_all(get_cookie_params_from_dict(cookies, url=url, domain=domain))
+        page = await lease.get(url)
         user_agent = await page.evaluate("window.navigator.userAgent")
         await page.wait_for("body:not(.no-js)", timeout=timeout)
         if wait_for is not None:
@@ -111,7 +98,6 @@ async def get_args_from_nodriver(
             await callback(page)
         for c in await page.send(nodriver.cdp.network.get_cookies([url])):
             cookies[c.name] = c.value
-        await page.close()
         return {
             "impersonate": "chrome",
             "cookies": cookies,
@@ -122,8 +108,6 @@ async def get_args_from_nodriver(
             },
             "proxy": proxy,
         }
-    finally:
-        stop_browser()
 
 def merge_cookies(cookies: Iterator[Morsel], response: Response) -> Cookies:
     if cookies is None:
@@ -138,48 +122,17 @@ async def get_nodriver(
     browser_executable_path=None,
     **kwargs
 ) -> tuple[Browser, callable]:
-    if not has_nodriver:
-        raise MissingRequirementsError('Install "nodriver" and "platformdirs" package | pip install -U nodriver platformdirs')
-    user_data_dir = user_config_dir(f"g4f-{user_data_dir}") if has_platformdirs else None
-    if browser_executable_path is None:
-        try:
-            browser_executable_path = find_chrome_executable()
-        except FileNotFoundError:
-            # Default to Edge if Chrome is not available.
-            browser_executable_path = "C:\\Program Files (x86)\\Microsoft\\Edge\\Application\\msedge.exe"
-            if not os.path.exists(browser_executable_path):
-                browser_executable_path = None
-    lock_file = Path(get_cookies_dir()) / ".nodriver_is_open"
-    # Implement a short delay (milliseconds) to prevent race conditions.
-    await asyncio.sleep(0.1 * random.randint(0, 50))
-    if lock_file.exists():
-        opend_at = float(lock_file.read_text())
-        time_open = time.time() - opend_at
-        if timeout * 2 > time_open:
-            debug.log(f"Nodriver: Browser is already in use since {time_open} secs.")
-            for _ in range(timeout):
-                if lock_file.exists():
-                    await asyncio.sleep(1)
-                else:
-                    break
-    lock_file.write_text(str(time.time()))
-    debug.log(f"Open nodriver with user_dir: {user_data_dir}")
-    try:
-        browser = await nodriver.start(
-            user_data_dir=user_data_dir,
-            browser_args=None if proxy is None else [f"--proxy-server={proxy}"],
-            browser_executable_path=browser_executable_path,
-            **kwargs
-        )
-    except:
-        if util.get_registered_instances():
-            browser = util.get_registered_instances().pop()
-        else:
-            raise
-    def on_stop():
-        try:
-            if browser.connection:
-                browser.stop()
-        finally:
-            lock_file.unlink(missing_ok=True)
-    return browser, on_stop
\ No newline at end of file
+    """
+    Leases a pooled browser exclusively. Prefer `browser_pool.lease`, it leases a tab.
+    The returned function releases the lease, the browser stays open for the next caller.
+    """
+    lease = browser_pool.lease(
+        user_data_dir,
+        proxy=proxy,
+        timeout=timeout,
+        exclusive=True,
+        browser_executable_path=browser_executable_path,
+        **kwargs
+    )
+    await lease.__aenter__()
+    return lease.browser, lease.release
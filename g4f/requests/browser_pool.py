@@ -0,0 +1,348 @@
+from __future__ import annotations
+
+import os
+import time
+import asyncio
+from typing import Optional
+
+try:
+    import nodriver
+    from nodriver.core.config import find_chrome_executable
+    from nodriver import Browser, Tab
+    has_nodriver = True
+except ImportError:
+    from typing import Type as Browser
+    from typing import Type as Tab
+    has_nodriver = False
+try:
+    from platformdirs import user_config_dir
+    has_platformdirs = True
+except ImportError:
+    has_platformdirs = False
+
+from .. import debug
+from ..errors import MissingRequirementsError
+
+class PooledBrowser:
+    """
+    A browser process in the pool.
+
+    Attributes:
+        key (tuple): The user data dir, the proxy and the event loop id.
+        loop (asyncio.AbstractEventLoop): The event loop the browser is bound to.
+        browser (Browser): The browser, None until it is started.
+        ready (asyncio.Future): Done, when the browser is started.
+        leases (int): The number of active leases.
+        exclusive (bool): Whether the browser is leased exclusively.
+        uses (int): The number of leases, since the browser was started.
+        retired (bool): Whether the browser is stopped, when its last lease is released.
+        last_used (float): The time the last lease was released.
+        last_checked (float): The time of the last health check.
+        idle_timer (asyncio.TimerHandle): Stops the browser, if it stays unused within the idle timeout.
+    """
+    __slots__ = ("key", "loop", "browser", "ready", "leases", "exclusive", "uses", "retired", "last_used", "last_checked", "idle_timer")
+
+    def __init__(self, key: tuple, loop: asyncio.AbstractEventLoop) -> None:
+        self.key = key
+        self.loop = loop
+        self.browser: Optional[Browser] = None
+        self.ready: asyncio.Future = loop.create_future()
+        self.leases = 0
+        self.exclusive = False
+        self.uses = 0
+        self.retired = False
+        self.last_used = time.monotonic()
+        self.last_checked = time.monotonic()
+        self.idle_timer: Optional[asyncio.TimerHandle] = None
+
+    @property
+    def closed(self) -> bool:
+        return self.loop.is_closed() or (self.browser is not None and getattr(self.browser, "stopped", False))
+
+    def can_lease(self, exclusive: bool, max_tabs: int) -> bool:
+        if self.retired or self.exclusive:
+            return False
+        return self.leases == 0 if exclusive else self.leases < max_tabs
+
+class BrowserLease:
+    """
+    A lease of a pooled browser. Use it as an async context manager.
+
+    A shared lease navigates its own tab, which is closed when the lease is released.
+    An exclusive lease navigates the main tab and no other lease uses the browser meanwhile.
+    """
+    def __init__(self, pool: BrowserPool, user_data_dir: str, proxy: str = None, timeout: float = 120, exclusive: bool = False, **kwargs) -> None:
+        self.pool = pool
+        self.user_data_dir = user_data_dir
+        self.proxy = proxy
+        self.timeout = timeout
+        self.exclusive = exclusive
+        self.kwargs = kwargs
+        self.pooled: Optional[PooledBrowser] = None
+        self.tab: Optional[Tab] = None
+
+    @property
+    def browser(self) -> Browser:
+        return self.pooled.browser
+
+    async def get(self, url: str) -> Tab:
+        """Navigates the tab of the lease to the url. The tab is opened by the first call."""
+        if self.tab is not None:
+            return await self.tab.get(url)
+        if self.exclusive:
+            self.tab = await self.browser.get(url)
+        else:
+            self.tab = await self.browser.get(url, new_tab=True)
+        return self.tab
+
+    async def __aenter__(self) -> BrowserLease:
+        self.pooled = await self.pool.acquire(self.user_data_dir, self.proxy, self.timeout, self.exclusive, **self.kwargs)
+        return self
+
+    async def __aexit__(self, *args) -> None:
+        tab, self.tab = self.tab, None
+        try:
+            if tab is not None and not self.exclusive:
+                await tab.close()
+        except Exception as e:
+            debug.log(f"Nodriver: Close tab failed: {type(e).__name__}: {e}")
+        finally:
+            self.release()
+
+    def release(self) -> None:
+        if self.pooled is not None:
+            self.pool.release(self.pooled, self.exclusive)
+            self.pooled = None
+
+class BrowserPool:
+    """
+    Keeps nodriver browsers open between logins, so a login doesn't start a browser.
+
+    A browser is started per user data dir (the profile of a provider) and proxy.
+    Callers lease tabs of the browsers. Leases wait in the event loop,
+    when all tabs of a browser or all browsers of the pool are in use.
+    Idle browsers are checked before they are leased again
+    and a browser is restarted after `max_uses` leases.
+
+    Attributes:
+        max_browsers (int): The maximum number of open browsers.
+        max_tabs (int): The maximum number of shared leases of a browser.
+        max_uses (int): The number of leases, after which a browser is restarted.
+        idle_timeout (float): Seconds after which an unused browser is stopped.
+        check_interval (float): Seconds after which an idle browser is checked, before it is leased.
+        check_timeout (float): Seconds to wait for the answer of a health check.
+    """
+    max_browsers: int = 2
+    max_tabs: int = 4
+    max_uses: int = 50
+    idle_timeout: float = 900
+    check_interval: float = 30
+    check_timeout: float = 5
+
+    def __init__(self) -> None:
+        self.browsers: dict[tuple, PooledBrowser] = {}
+        self.waiters: list[asyncio.Future] = []
+
+    def lease(self, user_data_dir: str = "nodriver", proxy: str = None, timeout: float = 120, exclusive: bool = False, **kwargs) -> BrowserLease:
+        """
+        Returns a lease of a pooled browser. Use it as an async context manager.
+
+        Args:
+            user_data_dir (str): The name of the browser profile, e.g. the provider.
+            proxy (str): The proxy of the browser.
+            timeout (float): Seconds to wait for a free browser.
+            exclusive (bool): Lease the whole browser and navigate its main tab.
+            **kwargs: Arguments of nodriver.start, if the browser is started.
+        """
+        return BrowserLease(self, user_data_dir, proxy, timeout, exclusive, **kwargs)
+
+    async def acquire(self, user_data_dir: str, proxy: str = None, timeout: float = 120, exclusive: bool = False, **kwargs) -> PooledBrowser:
+        return await asyncio.wait_for(self.wait_for_browser(user_data_dir, proxy, exclusive, kwargs), timeout)
+
+    async def wait_for_browser(self, user_data_dir: str, proxy: Optional[str], exclusive: bool, kwargs: dict) -> PooledBrowser:
+        loop = asyncio.get_running_loop()
+        key = (user_data_dir, proxy, id(loop))
+        while True:
+            self.evict_idle()
+            pooled = self.browsers.get(key)
+            if pooled is None and self.has_capacity(loop):
+                pooled = PooledBrowser(key, loop)
+                self.browsers[key] = pooled
+                pooled.leases += 1
+                pooled.exclusive = exclusive
+                await self.start(pooled, user_data_dir, proxy, kwargs)
+                return pooled
+            if pooled is not None and pooled.can_lease(exclusive, self.max_tabs):
+                pooled.leases += 1
+                pooled.exclusive = exclusive
+                if await self.is_ready(pooled):
+                    return pooled
+                continue
+            await self.wait()
+
+    def has_capacity(self, loop: asyncio.AbstractEventLoop) -> bool:
+        browsers = [pooled for pooled in self.browsers.values() if pooled.loop is loop]
+        if len(browsers) < self.max_browsers:
+            return True
+        # Make room by stopping the least recently used idle browser
+        idle = [pooled for pooled in browsers if not pooled.leases and pooled.ready.done()]
+        if idle:
+            self.remove(min(idle, key=lambda pooled: pooled.last_used))
+            return True
+        return False
+
+    async def start(self, pooled: PooledBrowser, user_data_dir: str, proxy: Optional[str], kwargs: dict) -> None:
+        try:
+            pooled.browser = await self.start_browser(user_data_dir, proxy, **kwargs)
+        except BaseException as e:
+            if isinstance(e, asyncio.CancelledError):
+                pooled.ready.cancel()
+            else:
+                pooled.ready.set_exception(e)
+                # Retrieve the exception, it is raised here
+                pooled.ready.exception()
+            pooled.leases -= 1
+            self.remove(pooled)
+            raise
+        pooled.ready.set_result(None)
+        pooled.uses += 1
+
+    async def is_ready(self, pooled: PooledBrowser) -> bool:
+        """Waits until the browser is started and checks it, if it was idle. Unusable browsers are removed."""
+        try:
+            await asyncio.shield(pooled.ready)
+        except asyncio.CancelledError:
+            if not pooled.ready.cancelled():
+                self.release(pooled, pooled.exclusive)
+                raise
+            pooled.leases -= 1
+            return False
+        except Exception:
+            # The start failed, the caller that started the browser raised the exception
+            pooled.leases -= 1
+            return False
+        if pooled.leases == 1 and time.monotonic() - pooled.last_checked > self.check_interval:
+            try:
+                healthy = await self.check_browser(pooled.browser)
+            except asyncio.CancelledError:
+                self.release(pooled, pooled.exclusive)
+                raise
+            pooled.last_checked = time.monotonic()
+            if not healthy:
+                debug.log(f"Nodriver: Restart browser of: {pooled.key[0]}")
+                pooled.retired = True
+                self.release(pooled, pooled.exclusive)
+                return False
+        pooled.uses += 1
+        if pooled.uses >= self.max_uses:
+            pooled.retired = True
+        return True
+
+    def release(self, pooled: PooledBrowser, exclusive: bool = False) -> None:
+        pooled.leases -= 1
+        if exclusive:
+            pooled.exclusive = False
+        pooled.last_used = time.monotonic()
+        if not pooled.leases and (pooled.retired or pooled.closed):
+            self.remove(pooled)
+        elif not pooled.leases and not pooled.loop.is_closed():
+            if pooled.idle_timer is not None:
+                pooled.idle_timer.cancel()
+            pooled.idle_timer = pooled.loop.call_later(self.idle_timeout, self.evict, pooled)
+        self.notify()
+
+    def remove(self, pooled: PooledBrowser) -> None:
+        if self.browsers.get(pooled.key) is pooled:
+            del self.browsers[pooled.key]
+        if pooled.idle_timer is not None:
+            pooled.idle_timer.cancel()
+            pooled.idle_timer = None
+        if pooled.browser is not None:
+            self.stop_browser(pooled.browser)
+            pooled.browser = None
+        self.notify()
+
+    async def wait(self) -> None:
+        future = asyncio.get_running_loop().create_future()
+        self.waiters.append(future)
+        try:
+            await future
+        finally:
+            if future in self.waiters:
+                self.waiters.remove(future)
+
+    def notify(self) -> None:
+        """Wakes up all waiting leases, they check again for a free browser."""
+        waiters, self.waiters = self.waiters, []
+        for future in waiters:
+            if not future.done():
+                future.get_loop().call_soon_threadsafe(lambda future=future: future.done() or future.set_result(None))
+
+    def evict(self, pooled: PooledBrowser) -> None:
+        """Stops a browser, that was not leased again within the idle timeout."""
+        pooled.idle_timer = None
+        if not pooled.leases and self.browsers.get(pooled.key) is pooled:
+            debug.log(f"Nodriver: Stop idle browser of: {pooled.key[0]}")
+            self.remove(pooled)
+
+    def evict_idle(self) -> None:
+        """Stops the browsers, that were not used within the idle timeout."""
+        now = time.monotonic()
+        for pooled in list(self.browsers.values()):
+            if not pooled.leases and pooled.ready.done() and (pooled.closed or now - pooled.last_used > self.idle_timeout):
+                self.remove(pooled)
+
+    async def start_browser(self, user_data_dir: str, proxy: str = None, browser_executable_path: str = None, **kwargs) -> Browser:
+        if not has_nodriver:
+            raise MissingRequirementsError('Install "nodriver" and "platformdirs" package | pip install -U nodriver platformdirs')
+        user_data_dir = user_config_dir(f"g4f-{user_data_dir}") if has_platformdirs else None
+        if browser_executable_path is None:
+            try:
+                browser_executable_path = find_chrome_executable()
+            except FileNotFoundError:
+                # Default to Edge if Chrome is not available.
+                browser_executable_path = "C:\\Program Files (x86)\\Microsoft\\Edge\\Application\\msedge.exe"
+                if not os.path.exists(browser_executable_path):
+                    browser_executable_path = None
+        debug.log(f"Open nodriver with user_dir: {user_data_dir}")
+        return await nodriver.start(
+            user_data_dir=user_data_dir,
+            browser_args=None if proxy is None else [f"--proxy-server={proxy}"],
+            browser_executable_path=browser_executable_path,
+            **kwargs
+        )
+
+    async def check_browser(self, browser: Browser) -> bool:
+        """Returns whether the browser process runs and answers."""
+        if browser.stopped:
+            return False
+        try:
+            await asyncio.wait_for(browser.connection.send(nodriver.cdp.browser.get_version()), self.check_timeout)
+            return True
+        except Exception as e:
+            debug.log(f"Nodriver: Health check failed: {type(e).__name__}: {e}")
+            return False
+
+    def stop_browser(self, browser: Browser) -> None:
+        try:
+            browser.stop()
+        except Exception as e:
+            debug.log(f"Nodriver: Stop browser failed: {type(e).__name__}: {e}")
+
+    async def warm(self, user_data_dir: str = "nodriver", proxy: str = None, timeout: float = 120, **kwargs) -> None:
+        """Starts the browser of a profile, if it is not open."""
+        pooled = await self.acquire(user_data_dir, proxy, timeout, **kwargs)
+        self.release(pooled)
+
+    def close(self) -> None:
+        """Stops all idle browsers. Called on shutdown."""
+        for pooled in list(self.browsers.values()):
+            if pooled.leases:
+                pooled.retired = True
+            elif pooled.ready.done():
+                self.remove(pooled)
+
+    def __len__(self) -> int:
+        return len(self.browsers)
+
+browser_pool = BrowserPool()
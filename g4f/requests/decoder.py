@@ -0,0 +1,206 @@
+from __future__ import annotations
+
+import json
+from typing import AsyncIterator, Iterator, Optional, Any
+
+try:
+    import orjson
+    loads = orjson.loads
+    has_orjson = True
+except ImportError:
+    has_orjson = False
+    try:
+        import simdjson
+        loads = simdjson.loads
+    except ImportError:
+        loads = json.loads
+
+CONTENT_KEY = b'"content":"'
+NOT_SIMPLE_DELTA = (b'"tool_calls"', b'"usage":{', b'"finish_reason":"', b'"error"', b'"reasoning')
+MISSING = object()
+
+class ServerSentEvent:
+    """
+    A dispatched server-sent event.
+
+    Attributes:
+        data (bytes): The data lines of the event, joined by newlines.
+        event (str): The event type, "message" by default.
+        id (str): The last event id.
+        value: The decoded JSON data, once it is decoded.
+    """
+    __slots__ = ("data", "event", "id", "value")
+
+    def __init__(self, data: bytes, event: str = "message", id: str = None, value: Any = MISSING) -> None:
+        self.data = data
+        self.event = event
+        self.id = id
+        self.value = value
+
+    def json(self) -> Any:
+        if self.value is MISSING:
+            self.value = loads(self.data)
+        return self.value
+
+class LineDecoder:
+    """
+    Splits raw byte chunks into lines. Partial lines are kept until the next chunk.
+    CRLF and LF line endings are supported.
+    """
+    def __init__(self) -> None:
+        self.buffer = bytearray()
+
+    def feed(self, chunk: bytes) -> Iterator[bytes]:
+        if not self.buffer and chunk.endswith(b"\n"):
+            # Fast path: The chunk contains only complete lines
+            lines = chunk.split(b"\n")
+            lines.pop()
+        else:
+            self.buffer += chunk
+            end = self.buffer.rfind(b"\n")
+            if end == -1:
+                return
+            lines = bytes(self.buffer[:end]).split(b"\n")
+            del self.buffer[:end + 1]
+        for line in lines:
+            yield line[:-1] if line.endswith(b"\r") else line
+
+    def flush(self) -> Optional[bytes]:
+        if not self.buffer:
+            return None
+        line = bytes(self.buffer).rstrip(b"\r")
+        self.buffer.clear()
+        return line
+
+class SSEDecoder:
+    """
+    Incremental decoder of server-sent events (text/event-stream).
+
+    Multi-line data is joined, comments and unknown fields are ignored.
+    An event is dispatched on an empty line, or at the end of the stream.
+    Some servers don't send the empty line, or send it with the next chunk.
+    A data line with complete JSON, or "[DONE]", is dispatched at the end of its chunk then,
+    or when the next data line arrives.
+    """
+    def __init__(self) -> None:
+        self.lines = LineDecoder()
+        self.data: list[bytes] = []
+        self.event: Optional[str] = None
+        self.id: Optional[str] = None
+
+    def feed(self, chunk: bytes) -> Iterator[ServerSentEvent]:
+        for line in self.lines.feed(chunk):
+            event = self.decode_line(line)
+            if event is not None:
+                yield event
+        event = self.dispatch_json()
+        if event is not None:
+            yield event
+
+    def decode_line(self, line: bytes) -> Optional[ServerSentEvent]:
+        if not line:
+            return self.dispatch()
+        if line.startswith(b"data:"):
+            value = line[5:]
+            # Line mode: The previous data line was a complete event
+            event = self.dispatch_json()
+            self.data.append(value[1:] if value.startswith(b" ") else value)
+            return event
+        elif line.startswith(b":"):
+            pass
+        else:
+            field, _, value = line.partition(b":")
+            value = value[1:] if value.startswith(b" ") else value
+            if field == b"event":
+                self.event = value.decode()
+            elif field == b"id":
+                self.id = value.decode()
+        return None
+
+    def dispatch(self) -> Optional[ServerSentEvent]:
+        if not self.data:
+            self.event = None
+            return None
+        data = self.data[0] if len(self.data) == 1 else b"\n".join(self.data)
+        event = ServerSentEvent(data, self.event or "message", self.id)
+        self.data = []
+        self.event = None
+        return event
+
+    def dispatch_json(self) -> Optional[ServerSentEvent]:
+        """Dispatches a single pending data line, if it is complete JSON or "[DONE]"."""
+        if len(self.data) != 1:
+            return None
+        data = self.data[0]
+        if data == b"[DONE]":
+            value = MISSING
+        elif not (data.startswith(b"{") and data.endswith(b"}")) and not (data.startswith(b"[{") and data.endswith(b"]")):
+            return None
+        else:
+            try:
+                value = loads(data)
+            except ValueError:
+                return None
+        event = ServerSentEvent(data, self.event or "message", self.id, value)
+        self.data = []
+        self.event = None
+        return event
+
+    def flush(self) -> Optional[ServerSentEvent]:
+        line = self.lines.flush()
+        if line is not None:
+            # The pending data lines were dispatched with the last chunk, if they were complete JSON
+            self.decode_line(line)
+        return self.dispatch()
+
+class NDJSONDecoder:
+    """Incremental decoder of newline delimited JSON. Empty lines are skipped."""
+    def __init__(self) -> None:
+        self.lines = LineDecoder()
+
+    def feed(self, chunk: bytes) -> Iterator[Any]:
+        for line in self.lines.feed(chunk):
+            if line.strip():
+                yield loads(line)
+
+    def flush(self) -> Optional[Any]:
+        line = self.lines.flush()
+        return loads(line) if line and line.strip() else None
+
+async def iter_sse(response) -> AsyncIterator[ServerSentEvent]:
+    """Yields the server-sent events of a StreamResponse."""
+    decoder = SSEDecoder()
+    async for chunk in response.iter_content():
+        for event in decoder.feed(chunk):
+            yield event
+    event = decoder.flush()
+    if event is not None:
+        yield event
+
+async def iter_ndjson(response) -> AsyncIterator[Any]:
+    """Yields the decoded JSON lines of a StreamResponse."""
+    decoder = NDJSONDecoder()
+    async for chunk in response.iter_content():
+        for item in decoder.feed(chunk):
+            yield item
+    item = decoder.flush()
+    if item is not None:
+        yield item
+
+def get_delta_content(data: bytes) -> Optional[str]:
+    """
+    Returns choices[0].delta.content of an OpenAI chunk without decoding the JSON.
+    Returns None, if the chunk has more than a plain content delta
+    (escapes, tool calls, usage, a finish reason or an error). It has to be decoded then.
+    """
+    start = data.find(CONTENT_KEY)
+    if start == -1:
+        return None
+    start += len(CONTENT_KEY)
+    end = data.find(b'"', start)
+    if end == -1 or data.find(b"\\", start, end) != -1 or data.find(CONTENT_KEY, end) != -1:
+        return None
+    for key in NOT_SIMPLE_DELTA:
+        if key in data:
+            return None
+    return data[start:end].decode()
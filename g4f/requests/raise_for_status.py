@@ -1,6 +1,9 @@
 from __future__ import annotations
 
-from typing import Union
+import re
+import time
+from typing import Union, Optional
+from email.utils import parsedate_to_datetime
 from aiohttp import ClientResponse
 from requests import Response as RequestsResponse
 
@@ -20,6 +23,38 @@ def is_cloudflare(text: str) -> bool:
 def is_openai(text: str) -> bool:
     return "<p>Unable to load site</p>" in text or 'id="challenge-error-text"' in text
 
+def get_retry_after(headers) -> Optional[float]:
+    """Returns the seconds until a rate limit resets, from the retry-after or x-ratelimit-reset headers."""
+    value = headers.get("retry-after")
+    if value:
+        try:
+            return max(0, float(value))
+        except ValueError:
+            pass
+        try:
+            return max(0, parsedate_to_datetime(value).timestamp() - time.time())
+        except (TypeError, ValueError):
+            pass
+    for name in ("x-ratelimit-reset-requests", "x-ratelimit-reset"):
+        value = headers.get(name)
+        if value:
+            seconds = parse_duration(value)
+            if seconds is not None:
+                # Some APIs send the reset time as unix timestamp
+                return max(0, seconds - time.time()) if seconds > 1e9 else seconds
+    return None
+
+def parse_duration(value: str) -> Optional[float]:
+    """Parses seconds, or durations like "1m30s" and "250ms"."""
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    seconds = 0
+    for number, unit in re.findall(r"([\d.]+)(ms|h|m|s)", value):
+        seconds += float(number) * {"ms": 0.001, "s": 1, "m": 60, "h": 3600}[unit]
+    return seconds if seconds else None
+
 async def raise_for_status_async(response: Union[StreamResponse, ClientResponse], message: str = None):
     if response.ok:
         return
@@ -36,6 +71,8 @@ async def raise_for_status_async(response: Union[StreamResponse, ClientResponse]
         raise CloudflareError(f"Response {response.status}: Cloudflare detected")
     elif response.status == 403 and is_openai(text):
         raise ResponseStatusError(f"Response {response.status}: OpenAI Bot detected")
+    elif response.status == 429:
+        raise RateLimitError(f"Response {response.status}: {message}", retry_after=get_retry_after(response.headers))
     elif response.status == 502:
         raise ResponseStatusError(f"Response {response.status}: Bad gateway")
     else:
@@ -54,11 +91,13 @@ def raise_for_status(response: Union[Response, StreamResponse, ClientResponse, R
             message = "Unknown error (Cloudflare)"
         elif response.status_code in (429, 402):
             message = "Rate limit"
-        raise RateLimitError(f"Response {response.status_code}: {message}")
+        raise RateLimitError(f"Response {response.status_code}: {message}", retry_after=get_retry_after(response.headers))
     if response.status_code == 403 and is_cloudflare(response.text):
         raise CloudflareError(f"Response {response.status_code}: Cloudflare detected")
     elif response.status_code == 403 and is_openai(response.text):
         raise ResponseStatusError(f"Response {response.status_code}: OpenAI Bot detected")
+    elif response.status_code == 429:
+        raise RateLimitError(f"Response {response.status_code}: {message}", retry_after=get_retry_after(response.headers))
     elif response.status_code == 502:
         raise ResponseStatusError(f"Response {response.status_code}: Bad gateway")
     else:
@@ -0,0 +1,253 @@
+from __future__ import annotations
+
+import time
+import atexit
+import asyncio
+from functools import partialmethod
+from typing import Optional, Any
+
+try:
+    from aiohttp import ClientSession, ClientTimeout, TCPConnector, DummyCookieJar
+    has_aiohttp = True
+except ImportError:
+    has_aiohttp = False
+
+from .. import debug
+from ..typing import Cookies
+
+class PooledSession:
+    """
+    A session in the pool.
+
+    Attributes:
+        session: The HTTP session, a StreamSession or an aiohttp ClientSession.
+        loop (asyncio.AbstractEventLoop): The event loop the session is bound to.
+        leases (int): The number of active leases.
+        last_used (float): The time the last lease was released.
+        shared (bool): False for a session of a single lease, it is closed on release.
+    """
+    __slots__ = ("session", "loop", "leases", "last_used", "shared")
+
+    def __init__(self, session, loop: asyncio.AbstractEventLoop, shared: bool = True) -> None:
+        self.session = session
+        self.loop = loop
+        self.leases = 0
+        self.last_used = time.monotonic()
+        self.shared = shared
+
+    @property
+    def closed(self) -> bool:
+        return self.loop.is_closed() or getattr(self.session, "closed", False)
+
+class SessionLease:
+    """
+    A pooled session with the headers, cookies and timeout of one caller.
+    They are merged into each request, so the pooled session is not modified.
+    All other attributes are those of the pooled session.
+    """
+    def __init__(
+        self,
+        pool: SessionPool,
+        pooled: PooledSession,
+        headers: dict = None,
+        cookies: Cookies = None,
+        timeout: Any = None
+    ) -> None:
+        self.pool = pool
+        self.pooled = pooled
+        self.session = pooled.session
+        self.headers = headers
+        self.cookies = cookies
+        self.timeout = pool.get_timeout(self.session, timeout)
+
+    def request(self, method: str, url: str, headers: dict = None, cookies: Cookies = None, timeout: Any = None, **kwargs):
+        if self.headers:
+            headers = self.headers if headers is None else {**self.headers, **headers}
+        if self.cookies:
+            cookies = self.cookies if cookies is None else {**self.cookies, **cookies}
+        if timeout is not None:
+            timeout = self.pool.get_timeout(self.session, timeout)
+        elif self.timeout is not None:
+            timeout = self.timeout
+        if headers is not None:
+            kwargs["headers"] = headers
+        if cookies is not None:
+            kwargs["cookies"] = cookies
+        if timeout is not None:
+            kwargs["timeout"] = timeout
+        return self.session.request(method, url, **kwargs)
+
+    head = partialmethod(request, "HEAD")
+    get = partialmethod(request, "GET")
+    post = partialmethod(request, "POST")
+    put = partialmethod(request, "PUT")
+    patch = partialmethod(request, "PATCH")
+    delete = partialmethod(request, "DELETE")
+    options = partialmethod(request, "OPTIONS")
+
+    def __getattr__(self, name: str):
+        return getattr(self.session, name)
+
+    async def __aenter__(self) -> SessionLease:
+        return self
+
+    async def __aexit__(self, *args) -> None:
+        self.pool.release(self.pooled)
+
+class SessionPool:
+    """
+    Shares HTTP sessions between requests, so connections, TLS sessions
+    and resolved addresses are reused.
+
+    Sessions are keyed by provider, proxy, impersonate profile, ssl settings
+    and account. So cookie jars stay isolated per provider and account.
+    Sessions, that are shared by users with their own cookies, don't store cookies.
+    Sessions without an option to disable their cookie jar, like curl_cffi,
+    are not shared then: Each lease gets a new session.
+    A session is bound to the event loop it was created in.
+
+    Attributes:
+        limit (int): The maximum number of connections of a session.
+        limit_per_host (int): The maximum number of connections per host.
+        keepalive_timeout (float): Seconds to keep an idle connection open.
+        dns_cache_ttl (int): Seconds to cache resolved addresses.
+        idle_timeout (float): Seconds after which an unused session is closed.
+    """
+    limit: int = 100
+    limit_per_host: int = 10
+    keepalive_timeout: float = 30
+    dns_cache_ttl: int = 300
+    idle_timeout: float = 300
+
+    def __init__(self) -> None:
+        self.sessions: dict[tuple, PooledSession] = {}
+
+    def lease(
+        self,
+        provider: str,
+        session_class: type = None,
+        proxy: str = None,
+        impersonate: str = None,
+        ssl: Any = None,
+        account: str = None,
+        headers: dict = None,
+        cookies: Cookies = None,
+        timeout: Any = None,
+        store_cookies: bool = True
+    ) -> SessionLease:
+        """
+        Returns a lease of a pooled session. Use it as an async context manager.
+
+        Args:
+            provider (str): The name of the provider.
+            session_class (type): The session class, StreamSession by default.
+            proxy (str): The proxy of the connections.
+            impersonate (str): The browser profile of curl_cffi.
+            ssl: The ssl settings, if the session class handles them per session.
+            account (str): Isolates the cookie jar of a cookie-authenticated account.
+            headers (dict): Headers of the lease, merged into each request.
+            cookies (Cookies): Cookies of the lease, sent with each request.
+            timeout: The timeout of each request, in seconds or as a (connect, total) tuple.
+            store_cookies (bool): Whether the session stores the cookies of responses.
+        """
+        if session_class is None:
+            from . import StreamSession
+            session_class = StreamSession
+        loop = asyncio.get_running_loop()
+        self.evict_idle()
+        if not store_cookies and not (has_aiohttp and issubclass(session_class, ClientSession)):
+            # The cookie jar can't be disabled, so it is not shared with other leases
+            pooled = PooledSession(self.create_session(session_class, proxy, impersonate, ssl), loop, shared=False)
+            pooled.leases += 1
+            return SessionLease(self, pooled, headers, cookies, timeout)
+        key = (provider, session_class, proxy, impersonate, ssl, account, store_cookies, id(loop))
+        pooled = self.sessions.get(key)
+        if pooled is None or pooled.closed or pooled.loop is not loop:
+            pooled = PooledSession(self.create_session(session_class, proxy, impersonate, ssl, store_cookies), loop)
+            self.sessions[key] = pooled
+        pooled.leases += 1
+        return SessionLease(self, pooled, headers, cookies, timeout)
+
+    def release(self, pooled: PooledSession) -> None:
+        pooled.leases -= 1
+        pooled.last_used = time.monotonic()
+        if not pooled.shared and not pooled.leases:
+            self.close_session(pooled)
+
+    def create_session(self, session_class: type, proxy: str = None, impersonate: str = None, ssl: Any = None, store_cookies: bool = True):
+        if has_aiohttp and issubclass(session_class, ClientSession):
+            if proxy:
+                from .aiohttp import get_connector
+                connector = get_connector(proxy=proxy)
+            else:
+                connector = TCPConnector(
+                    limit=self.limit,
+                    limit_per_host=self.limit_per_host,
+                    keepalive_timeout=self.keepalive_timeout,
+                    ttl_dns_cache=self.dns_cache_ttl,
+                    **({} if ssl is None else {"ssl": ssl})
+                )
+            cookie_jar = None if store_cookies else DummyCookieJar()
+            if session_class is ClientSession:
+                return session_class(connector=connector, cookie_jar=cookie_jar)
+            return session_class(connector=connector, cookie_jar=cookie_jar, impersonate=impersonate)
+        return session_class(proxy=proxy, impersonate=impersonate, max_clients=self.limit)
+
+    def get_timeout(self, session, timeout: Any) -> Any:
+        if timeout is None or not has_aiohttp or not isinstance(session, ClientSession):
+            return timeout
+        if isinstance(timeout, ClientTimeout):
+            return timeout
+        if isinstance(timeout, tuple):
+            connect, timeout = timeout
+            return ClientTimeout(timeout, connect)
+        return ClientTimeout(timeout)
+
+    def evict_idle(self) -> None:
+        """Closes the sessions, that were not used within the idle timeout."""
+        now = time.monotonic()
+        for key, pooled in list(self.sessions.items()):
+            if pooled.closed or (not pooled.leases and now - pooled.last_used > self.idle_timeout):
+                del self.sessions[key]
+                self.close_session(pooled)
+
+    def close_session(self, pooled: PooledSession) -> Optional[asyncio.Future]:
+        if pooled.closed:
+            return None
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if pooled.loop is running:
+            return asyncio.ensure_future(pooled.session.close())
+        if pooled.loop.is_running():
+            future = asyncio.run_coroutine_threadsafe(pooled.session.close(), pooled.loop)
+            return None if running is None else asyncio.wrap_future(future)
+        return None
+
+    async def close(self) -> None:
+        """Closes all sessions. Called on shutdown."""
+        sessions = list(self.sessions.values())
+        self.sessions.clear()
+        futures = [future for future in map(self.close_session, sessions) if future is not None]
+        if futures:
+            results = await asyncio.gather(*futures, return_exceptions=True)
+            for result in results:
+                if isinstance(result, Exception):
+                    debug.log(f"Close session failed: {type(result).__name__}: {result}")
+
+    def shutdown(self) -> None:
+        """Closes the sessions of event loops, that run in other threads. Called at exit."""
+        for pooled in list(self.sessions.values()):
+            if not pooled.closed and pooled.loop.is_running():
+                try:
+                    asyncio.run_coroutine_threadsafe(pooled.session.close(), pooled.loop).result(5)
+                except Exception as e:
+                    debug.log(f"Close session failed: {type(e).__name__}: {e}")
+        self.sessions.clear()
+
+    def __len__(self) -> int:
+        return len(self.sessions)
+
+session_pool = SessionPool()
+atexit.register(session_pool.shutdown)
@@ -2,16 +2,16 @@ from __future__ import annotations
 
 import re
 import json
-import asyncio
 import time
 from pathlib import Path
 from typing import Optional, Callable, AsyncIterator
 
 from ..typing import Messages
 from ..providers.helper import filter_none
-from ..providers.asyncio import to_async_iterator
+from ..providers.asyncio import to_async_iterator, run_sync
 from ..providers.response import Reasoning
 from ..providers.types import ProviderType
+from ..providers.credential_pool import credential_pool, API_KEY
 from ..cookies import get_cookies_dir
 from .web_search import do_search, get_search_message
 from .files import read_bucket, get_bucket_dir
@@ -48,14 +48,12 @@ async def async_iter_run_tools(provider: ProviderType, model: str, messages, too
             # Keep web_search in kwargs for provider native support
             pass
 
-    # Read api_key from config file
+    # Read api_key from config files, spread across the accounts
+    account = None
     if getattr(provider, "needs_auth", False) and "api_key" not in kwargs:
-        auth_file = get_api_key_file(provider)
-        if auth_file.exists():
-            with auth_file.open("r") as f:
-                auth_result = json.load(f)
-            if "api_key" in auth_result:
-                kwargs["api_key"] = auth_result["api_key"]
+        account = credential_pool.acquire(provider, API_KEY)
+        if account is not None:
+            kwargs["api_key"] = account.data["api_key"]
 
     if tool_calls is not None:
         for tool in tool_calls:
@@ -84,9 +82,10 @@ async def async_iter_run_tools(provider: ProviderType, model: str, messages, too
                     if has_bucket and isinstance(messages[-1]["content"], str):
                         messages[-1]["content"] += BUCKET_INSTRUCTIONS
     create_function = provider.get_async_create_function()
-    response = to_async_iterator(create_function(model=model, messages=messages, **kwargs))
-    async for chunk in response:
-        yield chunk
+    with credential_pool.use(account):
+        response = to_async_iterator(create_function(model=model, messages=messages, **kwargs))
+        async for chunk in response:
+            yield chunk
         
 def process_thinking_chunk(chunk: str, start_time: float = 0) -> tuple[float, list]:
     """Process a thinking chunk and return timing and results."""
@@ -147,20 +146,18 @@ def iter_run_tools(
         try:
             messages = messages.copy()
             web_search = web_search if isinstance(web_search, str) and web_search != "true" else None
-            messages[-1]["content"] = asyncio.run(do_search(messages[-1]["content"], web_search))
+            messages[-1]["content"] = run_sync(do_search(messages[-1]["content"], web_search))
         except Exception as e:
             debug.log(f"Couldn't do web search: {e.__class__.__name__}: {e}")
             # Keep web_search in kwargs for provider native support
             pass
 
-    # Read api_key from config file
+    # Read api_key from config files, spread across the accounts
+    account = None
     if provider is not None and provider.needs_auth and "api_key" not in kwargs:
-        auth_file = get_api_key_file(provider)
-        if auth_file.exists():
-            with auth_file.open("r") as f:
-                auth_result = json.load(f)
-            if "api_key" in auth_result:
-                kwargs["api_key"] = auth_result["api_key"]
+        account = credential_pool.acquire(provider, API_KEY)
+        if account is not None:
+            kwargs["api_key"] = account.data["api_key"]
 
     if tool_calls is not None:
         for tool in tool_calls:
@@ -195,12 +192,13 @@ def iter_run_tools(
                         messages[-1]["content"] += BUCKET_INSTRUCTIONS
 
     thinking_start_time = 0
-    for chunk in iter_callback(model=model, messages=messages, provider=provider, **kwargs):
-        if not isinstance(chunk, str):
-            yield chunk
-            continue
-            
-        thinking_start_time, results = process_thinking_chunk(chunk, thinking_start_time)
-        
-        for result in results:
-            yield result
+    with credential_pool.use(account):
+        for chunk in iter_callback(model=model, messages=messages, provider=provider, **kwargs):
+            if not isinstance(chunk, str):
+                yield chunk
+                continue
+
+            thinking_start_time, results = process_thinking_chunk(chunk, thinking_start_time)
+
+            for result in results:
+                yield result
@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from aiohttp import ClientSession, ClientTimeout, ClientError
+from aiohttp import ClientSession, ClientError
 import json
 import hashlib
 from pathlib import Path
@@ -25,6 +25,8 @@ except:
 from typing import Iterator
 from ..cookies import get_cookies_dir
 from ..providers.response import format_link
+from ..providers.asyncio import run_sync
+from ..requests.session_pool import session_pool
 from ..errors import MissingRequirementsError
 from .. import debug
 
@@ -167,7 +169,7 @@ async def search(query: str, max_results: int = 5, max_words: int = 2500, backen
 
         if add_text:
             requests = []
-            async with ClientSession(timeout=ClientTimeout(timeout)) as session:
+            async with session_pool.lease("web_search", ClientSession, timeout=timeout) as session:
                 for entry in results:
                     requests.append(fetch_and_scrape(session, entry.url, int(max_words / (max_results - 1)), False))
                 texts = await asyncio.gather(*requests)
@@ -233,7 +235,7 @@ User request:
 
 def get_search_message(prompt: str, raise_search_exceptions=False, **kwargs) -> str:
     try:
-        return asyncio.run(do_search(prompt, **kwargs))
+        return run_sync(do_search(prompt, **kwargs))
     except (DuckDuckGoSearchException, MissingRequirementsError) as e:
         if raise_search_exceptions:
             raise e
@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 from os import environ
-import requests
+from threading import Thread
 from functools import cached_property
 from importlib.metadata import version as get_package_version, PackageNotFoundError
 from subprocess import check_output, CalledProcessError, PIPE
@@ -24,6 +24,7 @@ def get_pypi_version(package_name: str) -> str:
     Raises:
         VersionNotFoundError: If there is an error in fetching the version from PyPI.
     """
+    import requests
     try:
         response = requests.get(f"https://pypi.org/pypi/{package_name}/json").json()
         return response["info"]["version"]
@@ -43,6 +44,7 @@ def get_github_version(repo: str) -> str:
     Raises:
         VersionNotFoundError: If there is an error in fetching the version from GitHub.
     """
+    import requests
     try:
         response = requests.get(f"https://api.github.com/repos/{repo}/releases/latest").json()
         return response["tag_name"]
@@ -116,4 +118,10 @@ class VersionUtils:
         except Exception as e:
             print(f'Failed to check g4f version: {e}')
 
+    def check_version_in_background(self) -> None:
+        """
+        Runs check_version in a daemon thread, so the network requests don't block the caller.
+        """
+        Thread(target=self.check_version, daemon=True).start()
+
 utils = VersionUtils()